@@ -0,0 +1,8 @@
+"""
+Benchmark di metriche, analyzer e pipeline del service.
+
+Uso:
+    python -m benchmarks                              # profilo "quick"
+    python -m benchmarks --profile full --save benchmarks/baseline.json
+    python -m benchmarks --baseline benchmarks/baseline.json --threshold 0.25
+"""
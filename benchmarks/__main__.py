@@ -0,0 +1,83 @@
+"""
+Entry point: python -m benchmarks [opzioni].
+
+Termina con codice 1 se un caso è più lento della baseline oltre la soglia.
+"""
+import typer
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+from .baseline import compare, load_baseline, save_baseline
+from .suite import PROFILES, build_suite, run_suite
+
+app = typer.Typer(add_completion=False)
+console = Console()
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+@app.command()
+def main(
+    profile: str = typer.Option("quick", "--profile", help=f"Dimensioni dei dati: {', '.join(PROFILES)}"),
+    pattern: str = typer.Option(None, "--filter", "-k", help="Esegui solo i casi il cui nome contiene il testo"),
+    repeat: int = typer.Option(5, "--repeat", "-r", help="Ripetizioni per caso (si tiene il tempo minimo)"),
+    save: str = typer.Option(None, "--save", help="Salva i risultati come baseline JSON"),
+    baseline: str = typer.Option(None, "--baseline", "-b", help="Baseline JSON con cui confrontare"),
+    threshold: float = typer.Option(0.2, "--threshold", "-t", help="Rallentamento tollerato (0.2 = +20%)"),
+    min_delta: float = typer.Option(1e-5, "--min-delta", help="Differenza minima in secondi per segnalare una regressione"),
+):
+    """
+    Misura le metriche, l'analyzer e la pipeline del service su dati sintetici.
+    """
+    try:
+        benchmarks = build_suite(profile)
+        reference = load_baseline(baseline) if baseline else {}
+    except (ValueError, FileNotFoundError) as e:
+        console.print(f"[red]Errore: {e}[/red]")
+        raise typer.Exit(2)
+
+    results = run_suite(
+        benchmarks,
+        pattern=pattern,
+        repeat=repeat,
+        on_result=lambda r: console.print(f"[dim]{escape(r.name):<70}[/dim] {_format_seconds(r.seconds):>10}"),
+    )
+
+    if save:
+        save_baseline(results, save, profile)
+        console.print(f"[green]✅ Baseline salvata in: {save}[/green]")
+
+    if not reference:
+        return
+
+    comparisons = compare(results, reference)
+    regressions = [c for c in comparisons if c.is_regression(threshold, min_delta)]
+
+    table = Table(title=f"Confronto con {baseline} (soglia +{threshold:.0%})")
+    table.add_column("Caso", style="cyan", overflow="fold")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Attuale", justify="right")
+    table.add_column("Rapporto", justify="right")
+    for comparison in comparisons:
+        color = "red" if comparison in regressions else "green" if comparison.ratio < 1 else "white"
+        table.add_row(
+            escape(comparison.name),
+            _format_seconds(comparison.baseline),
+            _format_seconds(comparison.current),
+            f"[{color}]{comparison.ratio:.2f}×[/{color}]",
+        )
+    console.print(table)
+
+    if regressions:
+        console.print(f"[red]❌ {len(regressions)} regressioni oltre la soglia[/red]")
+        raise typer.Exit(1)
+    console.print("[green]Nessuna regressione.[/green]")
+
+
+if __name__ == "__main__":
+    app()
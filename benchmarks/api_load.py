@@ -0,0 +1,127 @@
+"""
+Test di carico dell'API HTTP: python -m benchmarks.api_load [opzioni].
+
+Avvia il server su una porta libera con un fetcher sintetico dietro il
+CoalescingFetcher, poi lancia le richieste da più client con connessioni
+keep-alive. Dopo la prima richiesta tutti i prezzi sono in memoria: si
+misura il throughput del server su dati in cache.
+"""
+import http.client
+import json
+import threading
+import time
+from dataclasses import dataclass
+import typer
+from rich.console import Console
+from src.application.services.analysis_service import AnalysisService
+from src.data.fetchers.coalescing_fetcher import CoalescingFetcher
+from src.presentation.api.server import AnalysisAPI, create_server
+from .synthetic import StubFetcher, make_universe
+
+app = typer.Typer(add_completion=False)
+console = Console()
+
+
+@dataclass
+class LoadResult:
+    """
+    Esito di un test di carico.
+
+    Attributes:
+        requests: Richieste completate
+        failures: Risposte con stato diverso da 200
+        seconds: Durata complessiva
+        latencies: Latenza di ogni richiesta in secondi
+    """
+    requests: int
+    failures: int
+    seconds: float
+    latencies: list[float]
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.seconds if self.seconds > 0 else float("inf")
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def run_load(host: str, port: int, body: bytes, requests: int, clients: int) -> LoadResult:
+    """
+    Invia `requests` POST /analyze ripartite su `clients` thread.
+
+    Ogni client riusa una sola connessione HTTP/1.1.
+    """
+    latencies: list[float] = []
+    failures = [0]
+    lock = threading.Lock()
+    headers = {"Content-Type": "application/json"}
+
+    def client(count: int):
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        local, failed = [], 0
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                connection.request("POST", "/analyze", body, headers)
+                response = connection.getresponse()
+                response.read()
+                local.append(time.perf_counter() - start)
+                failed += response.status != 200
+        finally:
+            connection.close()
+        with lock:
+            latencies.extend(local)
+            failures[0] += failed
+
+    shares = [requests // clients + (i < requests % clients) for i in range(clients)]
+    threads = [threading.Thread(target=client, args=(share,)) for share in shares if share]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return LoadResult(len(latencies), failures[0], time.perf_counter() - start, latencies)
+
+
+@app.command()
+def main(
+    requests: int = typer.Option(2_000, "--requests", "-n", help="Richieste totali"),
+    clients: int = typer.Option(8, "--clients", "-c", help="Client concorrenti"),
+    assets: int = typer.Option(10, "--assets", "-a", help="Asset del portafoglio"),
+    days: int = typer.Option(252, "--days", "-d", help="Barre per asset"),
+):
+    """
+    Misura richieste al secondo e latenze di POST /analyze su dati in cache.
+    """
+    universe = make_universe(assets, days)
+    fetcher = CoalescingFetcher(StubFetcher(universe))
+    api = AnalysisAPI(AnalysisService(fetcher=fetcher))
+    server = create_server(api, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    weight = 1.0 / assets
+    body = json.dumps({
+        "portfolio": {"name": "Carico", "assets": [{"ticker": t, "weight": weight} for t in universe]},
+        "period": "max",
+    }).encode()
+    try:
+        result = run_load("127.0.0.1", server.server_port, body, requests, clients)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    console.print(f"[bold]{result.requests} richieste[/bold] da {clients} client, {assets} asset × {days} barre")
+    console.print(f"Throughput: [bold green]{result.throughput:,.0f} req/s[/bold green]")
+    console.print(
+        f"Latenza p50 {result.percentile(0.5) * 1e3:.2f} ms · "
+        f"p99 {result.percentile(0.99) * 1e3:.2f} ms · errori {result.failures}"
+    )
+    console.print(f"[dim]Cache prezzi: {fetcher.stats.to_dict()}[/dim]")
+    if result.failures:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,78 @@
+"""
+Baseline JSON dei benchmark e controllo delle regressioni.
+"""
+import json
+import platform
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from .suite import BenchmarkResult
+
+
+@dataclass
+class Comparison:
+    """
+    Confronto di un caso con la baseline.
+
+    Attributes:
+        name: Nome del caso
+        baseline: Tempo nella baseline (secondi)
+        current: Tempo attuale (secondi)
+    """
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """Tempo attuale / tempo baseline (> 1 = più lento)."""
+        return self.current / self.baseline if self.baseline > 0 else float("inf")
+
+    def is_regression(self, threshold: float, min_delta: float = 0.0) -> bool:
+        """
+        Vero se il caso è più lento della baseline oltre la soglia.
+
+        Args:
+            threshold: Rallentamento relativo tollerato (0.2 = +20%)
+            min_delta: Differenza assoluta minima in secondi, per ignorare il rumore sui casi brevissimi
+        """
+        return self.ratio > 1.0 + threshold and self.current - self.baseline > min_delta
+
+
+def save_baseline(results: list[BenchmarkResult], path: str | Path, profile: str) -> None:
+    """Salva i risultati come baseline, con i metadati della macchina."""
+    data = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "profile": profile,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": {result.name: result.seconds for result in results},
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def load_baseline(path: str | Path) -> dict[str, float]:
+    """
+    Legge i tempi di una baseline.
+
+    Raises:
+        FileNotFoundError: Se il file non esiste
+        ValueError: Se il file non è una baseline valida
+    """
+    data = json.loads(Path(path).read_text())
+    if not isinstance(data.get("results"), dict):
+        raise ValueError(f"Baseline non valida: {path}")
+    return {name: float(seconds) for name, seconds in data["results"].items()}
+
+
+def compare(results: list[BenchmarkResult], baseline: dict[str, float]) -> list[Comparison]:
+    """Confronta i risultati con la baseline (i casi assenti nella baseline sono ignorati)."""
+    return [
+        Comparison(result.name, baseline[result.name], result.seconds)
+        for result in results
+        if result.name in baseline
+    ]
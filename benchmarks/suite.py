@@ -0,0 +1,306 @@
+"""
+Definizione ed esecuzione dei benchmark.
+
+Le funzioni di src/domain/metrics sono scoperte automaticamente: gli
+argomenti sono costruiti in base al nome del parametro (prices, returns,
+window, ...), così una nuova metrica pubblica entra nel benchmark senza
+modifiche. Le funzioni dei moduli a liste ricevono liste Python, quelle
+di vectorized e rolling array NumPy.
+"""
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Callable
+import numpy as np
+from src.application.services.analysis_service import AnalysisService
+from src.domain.analysis.backtest import backtest
+from src.domain.analysis.portfolio_analyzer import PortfolioAnalyzer
+from src.domain.analysis import universe_correlation
+from src.domain.analysis.value_at_risk import METHODS as VAR_METHODS, value_at_risk
+from src.domain.metrics import correlation, online, ratios, returns, rolling, vectorized, volatility
+from src.presentation.reports.writers import WRITERS
+from .synthetic import StubFetcher, make_portfolio, make_prices, make_universe
+
+
+PROFILES = {
+    "quick": {"points": (1_000, 100_000), "assets": (10, 100)},
+    "full": {"points": (1_000, 10_000, 100_000, 1_000_000, 10_000_000), "assets": (10, 100, 1_000, 5_000)},
+}
+
+# Moduli a liste (API storica) e moduli NumPy
+LIST_MODULES = (returns, volatility, correlation, ratios)
+ARRAY_MODULES = (vectorized, rolling)
+
+# I loop Python puri (accumulatori online) oltre questa soglia durano minuti
+MAX_PURE_PYTHON_POINTS = 1_000_000
+
+# Giorni di storia per i benchmark sugli universi (5 anni di trading)
+UNIVERSE_DAYS = 1_260
+
+ROLLING_WINDOW = 90
+
+# Politiche confrontate nel benchmark del backtest (calendario, bande e combinazioni)
+BACKTEST_POLICIES = (
+    ["quarterly", "none", "monthly", "annual"]
+    + [f"band:{band}%" for band in (1, 2, 3, 5, 7, 10, 15, 20)]
+    + [f"{frequency}+band:{band}%" for frequency in ("monthly", "quarterly") for band in (2, 5, 10, 20)]
+)
+
+
+@dataclass
+class Benchmark:
+    """
+    Un caso di benchmark.
+
+    Attributes:
+        name: Nome univoco, con la dimensione tra parentesi quadre
+        setup: Prepara gli argomenti (non cronometrato)
+        run: Funzione cronometrata, chiamata con il risultato di setup
+    """
+    name: str
+    setup: Callable[[], tuple]
+    run: Callable[..., object]
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Tempo misurato per un caso.
+
+    Attributes:
+        name: Nome del caso
+        seconds: Miglior tempo per chiamata
+        loops: Chiamate per ripetizione
+        repeats: Ripetizioni eseguite
+    """
+    name: str
+    seconds: float
+    loops: int
+    repeats: int
+
+
+def _argument(name: str, prices: np.ndarray, as_list: bool):
+    """Costruisce l'argomento di una metrica a partire dal nome del parametro."""
+    daily = prices[1:] / prices[:-1] - 1.0
+    values = {
+        "prices": prices,
+        "values": daily,
+        "daily_returns": daily,
+        "returns": daily,
+        "x": daily,
+        "y": daily[::-1].copy(),
+        "price_start": float(prices[0]),
+        "price_end": float(prices[-1]),
+        "years": 5.0,
+        "window": ROLLING_WINDOW,
+    }
+    if name not in values:
+        raise KeyError(name)
+    value = values[name]
+    if as_list and isinstance(value, np.ndarray):
+        return value.tolist()
+    return value
+
+
+def metric_functions() -> list[tuple[str, Callable]]:
+    """Funzioni pubbliche dei moduli di metriche, come (modulo.funzione, funzione)."""
+    functions = []
+    for module in LIST_MODULES + ARRAY_MODULES:
+        short = module.__name__.rsplit(".", 1)[-1]
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith("_") or function.__module__ != module.__name__:
+                continue
+            functions.append((f"{short}.{name}", function))
+    return functions
+
+
+def _metric_benchmark(label: str, function: Callable, points: int, as_list: bool) -> Benchmark | None:
+    """Benchmark di una metrica sui soli parametri obbligatori."""
+    parameters = [
+        p.name for p in inspect.signature(function).parameters.values()
+        if p.default is inspect.Parameter.empty
+    ]
+    # Le matrici vanno misurate sugli universi, non sulle serie lunghe
+    if "cov" in parameters or label.endswith("_matrix"):
+        return None
+
+    def setup():
+        prices = make_prices(points)
+        return tuple(_argument(name, prices, as_list) for name in parameters)
+
+    return Benchmark(f"metrics.{label}[n={points}]", setup, function)
+
+
+def metric_benchmarks(points_sizes) -> list[Benchmark]:
+    """Benchmark di ogni metrica per ogni lunghezza di serie."""
+    cases = []
+    for label, function in metric_functions():
+        as_list = inspect.getmodule(function) in LIST_MODULES
+        for points in points_sizes:
+            case = _metric_benchmark(label, function, points, as_list)
+            if case is not None:
+                cases.append(case)
+
+    for points in points_sizes:
+        if points <= MAX_PURE_PYTHON_POINTS:
+            cases.append(Benchmark(
+                f"metrics.online.AssetAccumulator.from_prices[n={points}]",
+                lambda points=points: (make_prices(points).tolist(),),
+                online.AssetAccumulator.from_prices,
+            ))
+    return cases
+
+
+class _Sink:
+    """File di testo che scarta l'output: si misura solo la formattazione."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def writelines(self, lines) -> None:
+        for _ in lines:
+            pass
+
+
+def universe_benchmarks(asset_sizes) -> list[Benchmark]:
+    """Benchmark su universi di asset: matrici, analyzer e service end-to-end."""
+    cases = []
+    for assets in asset_sizes:
+        def returns_setup(assets=assets):
+            prices = make_prices(UNIVERSE_DAYS, assets)
+            return (prices[1:] / prices[:-1] - 1.0,)
+
+        def covariance_setup(assets=assets):
+            (daily,) = returns_setup(assets)
+            return (vectorized.covariance_matrix(daily),)
+
+        def analyzer_setup(assets=assets):
+            universe = make_universe(assets, UNIVERSE_DAYS)
+            weights = {ticker: 1.0 / assets for ticker in universe}
+            return {ticker: series.close for ticker, series in universe.items()}, weights, 5.0
+
+        def service_setup(assets=assets):
+            universe = make_universe(assets, UNIVERSE_DAYS)
+            service = AnalysisService(fetcher=StubFetcher(universe))
+            return service, make_portfolio(list(universe))
+
+        def screen_setup(assets=assets, dtype=np.float64):
+            (daily,) = returns_setup(assets)
+            return daily, [str(i) for i in range(assets)], 5, universe_correlation.DEFAULT_BLOCK_SIZE, dtype
+
+        def var_setup(assets=assets):
+            (daily,) = returns_setup(assets)
+            return daily, np.full(assets, 1.0 / assets), [str(i) for i in range(assets)]
+
+        def report_setup(assets=assets):
+            service, portfolio = service_setup(assets)
+            return (service.analyze_portfolio(portfolio, period="5y", include_ai_insight=False),)
+
+        def backtest_setup(assets=assets, policies=1):
+            prices = make_prices(UNIVERSE_DAYS, assets)
+            dates = np.arange("2020-01-01", UNIVERSE_DAYS, dtype="datetime64[D]")
+            return prices, np.full(assets, 1.0 / assets), dates, BACKTEST_POLICIES[:policies]
+
+        cases += [
+            Benchmark(f"metrics.vectorized.covariance_matrix[assets={assets}]", returns_setup,
+                      vectorized.covariance_matrix),
+            Benchmark(f"metrics.vectorized.correlation_matrix[assets={assets}]", returns_setup,
+                      vectorized.correlation_matrix),
+            Benchmark(f"metrics.vectorized.correlation_from_covariance[assets={assets}]", covariance_setup,
+                      vectorized.correlation_from_covariance),
+            Benchmark(f"analysis.blocked_correlation_matrix[assets={assets}]", returns_setup,
+                      universe_correlation.blocked_correlation_matrix),
+            Benchmark(f"analysis.top_correlated_pairs[assets={assets}]", screen_setup,
+                      universe_correlation.top_correlated_pairs),
+            Benchmark(f"analysis.top_correlated_pairs[assets={assets},float32]",
+                      lambda assets=assets: screen_setup(assets, np.float32),
+                      universe_correlation.top_correlated_pairs),
+            Benchmark(f"analysis.hierarchical_order[assets={assets}]",
+                      lambda assets=assets: screen_setup(assets)[:2],
+                      universe_correlation.hierarchical_order),
+            *(Benchmark(f"analysis.value_at_risk[assets={assets},method={method}]", var_setup,
+                        lambda *args, method=method: value_at_risk(*args, method=method, seed=0))
+              for method in VAR_METHODS),
+            Benchmark(f"analyzer.analyze_portfolio[assets={assets}]", analyzer_setup,
+                      PortfolioAnalyzer().analyze_portfolio),
+            Benchmark(f"service.analyze_portfolio[assets={assets}]", service_setup,
+                      lambda service, portfolio: service.analyze_portfolio(
+                          portfolio, period="5y", include_ai_insight=False)),
+            Benchmark(f"analysis.backtest[assets={assets},policies=1]", backtest_setup, backtest),
+            Benchmark(f"analysis.backtest[assets={assets},policies={len(BACKTEST_POLICIES)}]",
+                      lambda assets=assets: backtest_setup(assets, len(BACKTEST_POLICIES)), backtest),
+            *(Benchmark(f"export.{writer.format}[assets={assets}]", report_setup,
+                        lambda report, writer=writer: writer().write(report, _Sink()))
+              for writer in WRITERS),
+        ]
+    return cases
+
+
+def build_suite(profile: str = "quick") -> list[Benchmark]:
+    """
+    Costruisce i benchmark di un profilo.
+
+    Raises:
+        ValueError: Se il profilo non esiste
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Profilo sconosciuto: {profile} (disponibili: {', '.join(PROFILES)})")
+    sizes = PROFILES[profile]
+    return metric_benchmarks(sizes["points"]) + universe_benchmarks(sizes["assets"])
+
+
+def measure(benchmark: Benchmark, repeat: int = 5, min_time: float = 0.05) -> BenchmarkResult:
+    """
+    Misura un benchmark come fa timeit: raddoppia le chiamate per ripetizione
+    finché una ripetizione dura almeno `min_time`, poi prende il tempo minimo.
+
+    Un caso che da solo dura più di un secondo viene eseguito una volta sola.
+    """
+    args = benchmark.setup()
+
+    start = time.perf_counter()
+    benchmark.run(*args)
+    first = time.perf_counter() - start
+    if first > 1.0:
+        return BenchmarkResult(benchmark.name, first, loops=1, repeats=1)
+
+    loops = 1
+    while loops * first < min_time:
+        loops *= 2
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            benchmark.run(*args)
+        timings.append((time.perf_counter() - start) / loops)
+    return BenchmarkResult(benchmark.name, min(timings), loops=loops, repeats=repeat)
+
+
+def run_suite(
+    benchmarks: list[Benchmark],
+    pattern: str | None = None,
+    repeat: int = 5,
+    on_result: Callable[[BenchmarkResult], None] | None = None,
+) -> list[BenchmarkResult]:
+    """
+    Esegue i benchmark, opzionalmente solo quelli il cui nome contiene `pattern`.
+
+    Args:
+        benchmarks: Casi da eseguire
+        pattern: Sottostringa da cercare nel nome
+        repeat: Ripetizioni per caso
+        on_result: Callback chiamata dopo ogni caso (es. avanzamento a video)
+
+    Returns:
+        Risultati nell'ordine di esecuzione
+    """
+    results = []
+    for benchmark in benchmarks:
+        if pattern and pattern not in benchmark.name:
+            continue
+        result = measure(benchmark, repeat=repeat)
+        results.append(result)
+        if on_result:
+            on_result(result)
+    return results
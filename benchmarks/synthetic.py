@@ -0,0 +1,61 @@
+"""
+Dati sintetici per i benchmark: prezzi con moto browniano geometrico.
+"""
+import numpy as np
+from src.data.exceptions import TickerNotFoundError
+from src.data.models.asset import Asset
+from src.data.models.portfolio import Portfolio
+from src.data.models.price_series import PriceSeries
+
+
+def make_prices(points: int, assets: int | None = None, seed: int = 0) -> np.ndarray:
+    """
+    Genera prezzi sintetici positivi.
+
+    I rendimenti logaritmici hanno media nulla: anche su 10M di punti i
+    prezzi restano lontani da overflow e underflow.
+
+    Args:
+        points: Numero di osservazioni
+        assets: Numero di colonne (None = serie 1D)
+        seed: Seme del generatore
+
+    Returns:
+        Array (points,) o (points, assets)
+    """
+    rng = np.random.default_rng(seed)
+    shape = (points,) if assets is None else (points, assets)
+    log_returns = rng.normal(0.0, 0.01, shape)
+    return 100.0 * np.exp(np.cumsum(log_returns, axis=0))
+
+
+def make_universe(assets: int, days: int, seed: int = 0) -> dict[str, PriceSeries]:
+    """Universo di `assets` serie giornaliere con date lavorative comuni."""
+    prices = make_prices(days, assets, seed)
+    dates = np.busday_offset("2015-01-01", np.arange(days), roll="forward").astype("datetime64[ns]")
+    volume = np.ones(days)
+    return {
+        f"A{i:04d}": PriceSeries(dates=dates, open=column, high=column, low=column, close=column, volume=volume)
+        for i, column in enumerate(np.ascontiguousarray(prices.T))
+    }
+
+
+def make_portfolio(tickers: list[str]) -> Portfolio:
+    """Portafoglio equipesato sui ticker dati."""
+    weight = 1.0 / len(tickers)
+    return Portfolio(
+        name="Benchmark",
+        assets=[Asset(ticker=ticker, name=ticker, asset_type="ETF", weight=weight) for ticker in tickers],
+    )
+
+
+class StubFetcher:
+    """Fetcher in memoria: la pipeline viene misurata senza rete."""
+
+    def __init__(self, series: dict[str, PriceSeries]):
+        self.series = series
+
+    def fetch_prices(self, ticker: str, period: str = "1y") -> PriceSeries:
+        if ticker not in self.series:
+            raise TickerNotFoundError(ticker)
+        return self.series[ticker]
@@ -71,4 +71,40 @@ def format_portfolio_prompt(report) -> str:
         cagr=report.portfolio_cagr,
         volatility=report.portfolio_volatility,
         assets_detail=assets_detail,
-    )
\ No newline at end of file
+    )
+
+ASSET_COMMENT_TEMPLATE = """Commenta brevemente questo asset del portafoglio "{portfolio_name}" (periodo {period}):
+
+- Ticker: {ticker}
+- Rendimento totale: {total_return:.2%}
+- CAGR: {cagr:.2%}
+- Volatilità annualizzata: {volatility:.2%}
+- Sharpe ratio: {sharpe_ratio:.2f}
+- Max drawdown: {max_drawdown:.2%}
+
+Rispondi in 2-3 frasi: andamento, rischio e ruolo nel portafoglio.
+"""
+
+
+def format_asset_prompt(portfolio_name: str, period: str, analysis) -> str:
+    """
+    Formatta il prompt per il commento di un singolo asset.
+    
+    Args:
+        portfolio_name: Nome del portafoglio
+        period: Periodo analizzato
+        analysis: AssetAnalysis dell'asset
+    
+    Returns:
+        Prompt formattato
+    """
+    return ASSET_COMMENT_TEMPLATE.format(
+        portfolio_name=portfolio_name,
+        period=period,
+        ticker=analysis.ticker,
+        total_return=analysis.total_return,
+        cagr=analysis.cagr,
+        volatility=analysis.volatility,
+        sharpe_ratio=analysis.sharpe_ratio,
+        max_drawdown=analysis.max_drawdown,
+    )
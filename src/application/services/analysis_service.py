@@ -1,29 +1,68 @@
 """
 Service per l'analisi del portafoglio.
+
+YahooFetcher e i client AI sono importati solo quando servono davvero
+(nessun fetcher o client passato), per non caricare yfinance/pandas e
+l'SDK anthropic all'avvio.
 """
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
 from datetime import datetime
-from src.data.fetchers.yahoo_fetcher import YahooFetcher
-from src.data.fetchers.ai_client import AIClient
+from typing import Callable, TYPE_CHECKING
+import numpy as np
+from src.data.exceptions import DataFetchError
+from src.data.fetchers.base import PriceFetcher, BatchFetchResult, DEFAULT_MAX_WORKERS, fetch_many_concurrently
+from src.data.fetchers.insight_cache import InsightCache, CachedInsight
 from src.data.models.portfolio import Portfolio
+from src.data.models.price_series import PriceSeries
+from src.data.periods import period_start
 from src.domain.analysis.portfolio_analyzer import PortfolioAnalyzer, AssetAnalysis
-from config.prompts.financial_analyst import SYSTEM_PROMPT, format_portfolio_prompt
+from src.domain.analysis.risk_engine import PortfolioRisk
+from src.domain.analysis.alignment import AlignedPrices, align_prices
+from src.domain.analysis.backtest import DEFAULT_POLICIES, BacktestResult, RebalancePolicy, backtest
+from src.domain.analysis.monte_carlo import MonteCarloResult, simulate_portfolio
+from src.domain.analysis.optimizer import EfficientFrontier, efficient_frontier
+from src.domain.analysis.value_at_risk import DEFAULT_CONFIDENCES, DEFAULT_HORIZONS, VaRResult
+from src.domain.analysis.universe_correlation import (
+    DEFAULT_BLOCK_SIZE, CorrelatedPairs, HierarchicalOrder, hierarchical_order, top_correlated_pairs
+)
+from src.profiling import Profiler, Span, active_profiler, span
+from config.prompts.financial_analyst import SYSTEM_PROMPT, format_portfolio_prompt, format_asset_prompt
+
+if TYPE_CHECKING:
+    from src.data.fetchers.ai_client import AIClient, AsyncAIClient
+
+
+# Join ammessi per le metriche di portafoglio: "union" lascia buchi (NaN)
+PORTFOLIO_JOIN_MODES = ("inner", "ffill")
+
+DAYS_PER_YEAR = 365.25
 
 
 @dataclass
 class AIInsight:
     """
     Insight generato dall'AI sul portafoglio.
+    
+    `asset_comments` contiene i commenti per singolo asset (solo analisi asincrona).
+    `from_cache` indica che l'analisi è stata letta dalla cache invece che generata.
     """
     summary: str
     full_analysis: str
     generated_at: datetime
+    asset_comments: dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
 
 
 @dataclass
 class PortfolioReport:
     """
     Report completo dell'analisi di un portafoglio.
+    
+    `timings` è l'albero dei tempi per stadio (fetch con latenza per ticker,
+    metriche, rischio, AI...), vedi src.profiling.
+    `value_at_risk` contiene VaR e CVaR di asset e portafoglio per livello
+    di confidenza e orizzonte.
     """
     portfolio_name: str
     analysis_date: datetime
@@ -33,6 +72,61 @@ class PortfolioReport:
     portfolio_cagr: float
     portfolio_volatility: float
     ai_insight: AIInsight | None = None
+    risk: PortfolioRisk | None = None
+    value_at_risk: VaRResult | None = None
+    fetch_errors: dict[str, DataFetchError] = field(default_factory=dict)
+    timings: Span | None = None
+
+
+@dataclass
+class BatchAnalysis:
+    """
+    Risultato dell'analisi di più portafogli con dati condivisi.
+    """
+    universe: list[str]
+    reports: dict[str, PortfolioReport] = field(default_factory=dict)
+    errors: dict[str, DataFetchError | ValueError] = field(default_factory=dict)
+    fetch_errors: dict[str, DataFetchError] = field(default_factory=dict)
+
+
+@dataclass
+class MultiPeriodAnalysis:
+    """
+    Analisi dello stesso portafoglio su più orizzonti, da un solo fetch.
+    
+    Attributes:
+        portfolio_name: Nome del portafoglio
+        fetched_period: Orizzonte più lungo, l'unico scaricato
+        reports: Report per orizzonte, nell'ordine richiesto
+        errors: Orizzonti senza dati sufficienti o senza date in comune
+        timings: Albero dei tempi (un solo fetch, poi uno span per orizzonte)
+    """
+    portfolio_name: str
+    fetched_period: str
+    reports: dict[str, PortfolioReport] = field(default_factory=dict)
+    errors: dict[str, DataFetchError | ValueError] = field(default_factory=dict)
+    timings: Span | None = None
+
+
+@dataclass
+class CorrelationScreen:
+    """
+    Screen di correlazione su un universo di ticker.
+    
+    Attributes:
+        tickers: Ticker analizzati, nell'ordine delle colonne
+        observations: Rendimenti giornalieri usati dopo l'allineamento
+        pairs: Asset più e meno correlati con ciascun asset
+        clusters: Ordinamento gerarchico (None se non richiesto)
+        fetch_errors: Ticker non recuperati
+        timings: Albero dei tempi (fetch, allineamento, correlazioni, clustering)
+    """
+    tickers: list[str]
+    observations: int
+    pairs: CorrelatedPairs
+    clusters: HierarchicalOrder | None = None
+    fetch_errors: dict[str, DataFetchError] = field(default_factory=dict)
+    timings: Span | None = None
 
 
 class AnalysisService:
@@ -42,37 +136,551 @@ class AnalysisService:
     
     def __init__(
         self, 
-        fetcher: YahooFetcher = None, 
-        ai_client: AIClient = None,
-        risk_free_rate: float = 0.02
+        fetcher: PriceFetcher = None, 
+        ai_client: "AIClient" = None,
+        risk_free_rate: float = 0.02,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        async_ai_client: "AsyncAIClient" = None,
+        ai_timeout: float | None = None,
+        insight_cache: InsightCache = None,
+        join: str = "inner",
+        var_method: str = "historical",
+        var_confidences: tuple[float, ...] = DEFAULT_CONFIDENCES,
+        var_horizons: tuple[int, ...] = DEFAULT_HORIZONS
     ):
-        self.fetcher = fetcher or YahooFetcher()
+        if fetcher is None:
+            from src.data.fetchers.yahoo_fetcher import YahooFetcher
+            fetcher = YahooFetcher()
+        self.fetcher = fetcher
         self.ai_client = ai_client
-        self.analyzer = PortfolioAnalyzer(risk_free_rate)
+        self.async_ai_client = async_ai_client
+        self.ai_timeout = ai_timeout
+        self.insight_cache = insight_cache
+        if join not in PORTFOLIO_JOIN_MODES:
+            raise ValueError(
+                f"Modalità di join non supportata: {join} (disponibili: {', '.join(PORTFOLIO_JOIN_MODES)})"
+            )
+        self.join = join
+        self.analyzer = PortfolioAnalyzer(risk_free_rate, var_method, var_confidences, var_horizons)
+        self.risk_free_rate = risk_free_rate
+        self.max_workers = max_workers
     
     def analyze_portfolio(
         self, 
         portfolio: Portfolio, 
         period: str = "1y",
-        include_ai_insight: bool = True
+        include_ai_insight: bool = True,
+        profiler: Profiler | None = None
     ) -> PortfolioReport:
         """
         Analizza un portafoglio completo.
+        
+        I prezzi di tutti gli asset sono recuperati in parallelo. Gli asset il cui
+        fetch fallisce sono esclusi (e riportati in `fetch_errors`); i pesi dei
+        restanti vengono rinormalizzati.
+        
+        Args:
+            portfolio: Portafoglio da analizzare
+            period: Periodo di analisi
+            include_ai_insight: Se True genera l'insight AI
+            profiler: Profiler in cui registrare i tempi (es. quello della CLI);
+                se assente ne viene creato uno per questa analisi
+        
+        Returns:
+            PortfolioReport, con l'albero dei tempi in `timings`
+        
+        Raises:
+            DataFetchError: Se non è stato possibile recuperare nessun asset
+        """
+        profiler = profiler or Profiler()
+        
+        with profiler.activate():
+            with span("fetch"):
+                series, weights, fetch_errors = self._fetch_portfolio_prices(portfolio, period)
+            
+            result = self._analyze_fetched(series, weights, period)
+            report = self.build_report(portfolio, period, result, fetch_errors)
+            report.timings = profiler.root
+            
+            if include_ai_insight:
+                with span("ai"):
+                    report.ai_insight = self._generate_ai_insight(report)
+        
+        return report
+    
+    def analyze_periods(
+        self,
+        portfolio: Portfolio,
+        periods: list[str],
+        include_ai_insight: bool = False,
+        profiler: Profiler | None = None
+    ) -> MultiPeriodAnalysis:
+        """
+        Analizza il portafoglio su più orizzonti con un solo fetch.
+        
+        Viene scaricato solo l'orizzonte più lungo; gli altri sono viste
+        tagliate per data sulle stesse serie, a ritroso dall'ultima barra
+        disponibile. Gli anni di ogni orizzonte sono quelli effettivamente
+        coperti dalle barre, non quelli dell'etichetta.
+        
+        Args:
+            portfolio: Portafoglio da analizzare
+            periods: Orizzonti (es. ["1mo", "3mo", "1y", "5y"])
+            include_ai_insight: Se True genera l'insight AI per l'orizzonte più lungo
+            profiler: Profiler in cui registrare i tempi (default: uno nuovo)
+        
+        Returns:
+            MultiPeriodAnalysis con un report per orizzonte
+        
+        Raises:
+            ValueError: Se non ci sono orizzonti o uno non è riconosciuto
+            DataFetchError: Se non è stato possibile recuperare nessun asset
+        """
+        periods = list(dict.fromkeys(periods))
+        if not periods:
+            raise ValueError("Serve almeno un periodo")
+        longest = self._longest_period(periods)
+        profiler = profiler or Profiler()
+        analysis = MultiPeriodAnalysis(portfolio_name=portfolio.name, fetched_period=longest)
+        
+        with profiler.activate():
+            with span("fetch"):
+                series, _, fetch_errors = self._fetch_portfolio_prices(portfolio, longest)
+            end = max(prices.end for prices in series.values())
+            
+            for period in periods:
+                with span(period):
+                    sliced, errors = self._slice_period(series, period, end)
+                    try:
+                        selected, weights, errors = self.select_assets(portfolio, sliced, fetch_errors | errors)
+                        result = self._analyze_fetched(selected, weights, period)
+                    except (DataFetchError, ValueError) as e:
+                        # Un orizzonte senza dati o senza date in comune non ferma gli altri
+                        analysis.errors[period] = e
+                        continue
+                    analysis.reports[period] = self.build_report(portfolio, period, result, errors)
+            
+            if include_ai_insight and longest in analysis.reports:
+                with span("ai"):
+                    analysis.reports[longest].ai_insight = self._generate_ai_insight(analysis.reports[longest])
+        
+        analysis.timings = profiler.root
+        for report in analysis.reports.values():
+            report.timings = profiler.root
+        return analysis
+    
+    async def analyze_portfolio_async(
+        self,
+        portfolio: Portfolio,
+        period: str = "1y",
+        include_ai_insight: bool = True,
+        on_report: Callable[[PortfolioReport], None] | None = None,
+        profiler: Profiler | None = None
+    ) -> PortfolioReport:
         """
-        years = self._period_to_years(period)
+        Variante asincrona di analyze_portfolio che sovrappone AI e calcolo.
+        
+        Il fetch gira in un thread. Il commento AI di ogni asset viene richiesto
+        appena la sua analisi è pronta, mentre si analizzano gli altri asset e
+        il rischio di portafoglio; il riassunto finale è richiesto mentre
+        `on_report` (es. la stampa del report) gira in un thread. Se qualcosa
+        fallisce o il task viene cancellato, le richieste AI in volo sono cancellate.
+        
+        Args:
+            portfolio: Portafoglio da analizzare
+            period: Periodo di analisi
+            include_ai_insight: Se True richiede commenti per asset e riassunto
+            on_report: Callback chiamata col report (senza insight) appena pronto
+            profiler: Profiler in cui registrare i tempi (default: uno nuovo)
+        
+        Returns:
+            PortfolioReport con `ai_insight` (None se l'AI non è disponibile)
+        
+        Raises:
+            DataFetchError: Se non è stato possibile recuperare nessun asset
+        """
+        profiler = profiler or Profiler()
+        with profiler.activate():
+            return await self._analyze_portfolio_async(portfolio, period, include_ai_insight, on_report)
+    
+    async def _analyze_portfolio_async(
+        self,
+        portfolio: Portfolio,
+        period: str,
+        include_ai_insight: bool,
+        on_report: Callable[[PortfolioReport], None] | None
+    ) -> PortfolioReport:
+        """Corpo di analyze_portfolio_async, eseguito col profiler attivo."""
+        with span("fetch"):
+            series, weights, fetch_errors = await asyncio.to_thread(
+                self._fetch_portfolio_prices, portfolio, period
+            )
+        
+        ai_client, owns_client = self._get_async_ai_client() if include_ai_insight else (None, False)
+        comment_tasks: dict[str, asyncio.Task] = {}
+        summary_task: asyncio.Task | None = None
+        
+        try:
+            asset_analyses = {}
+            with span("metriche"):
+                for ticker, prices in series.items():
+                    asset_analyses[ticker] = self._analyze_asset(ticker, prices, period)
+                    if ai_client:
+                        prompt = format_asset_prompt(portfolio.name, period, asset_analyses[ticker])
+                        comment_tasks[ticker] = asyncio.create_task(self._ask_async(ai_client, prompt, 300))
+                        # Cede il controllo: la richiesta parte prima del prossimo asset
+                        await asyncio.sleep(0)
+            
+            with span("rischio"):
+                result = await asyncio.to_thread(self.aggregate, asset_analyses, series, weights)
+            report = self.build_report(portfolio, period, result, fetch_errors)
+            report.timings = self._active_timings()
+            
+            if ai_client:
+                summary_task = asyncio.create_task(
+                    self._ask_async(ai_client, format_portfolio_prompt(report), 1024)
+                )
+            if on_report:
+                with span("render"):
+                    await asyncio.to_thread(on_report, report)
+            if ai_client:
+                # Solo l'attesa residua: le richieste sono partite durante i calcoli
+                with span("ai"):
+                    report.ai_insight = await self._collect_ai_insight(summary_task, comment_tasks)
+        finally:
+            for task in [summary_task, *comment_tasks.values()]:
+                if task is not None and not task.done():
+                    task.cancel()
+            if owns_client:
+                await ai_client.close()
+        
+        return report
+    
+    def analyze_portfolios(
+        self,
+        portfolios: dict[str, Portfolio],
+        period: str = "1y",
+        include_ai_insight: bool = False
+    ) -> BatchAnalysis:
+        """
+        Analizza più portafogli condividendo fetch e analisi degli asset.
+        
+        L'universo dei ticker viene deduplicato: ogni ticker è scaricato e
+        analizzato una sola volta, poi ogni PortfolioReport è assemblato dalle
+        analisi condivise. Un portafoglio senza alcun asset recuperato, o i cui
+        asset non hanno date in comune, non interrompe il batch ma finisce in
+        `errors`.
+        
+        Args:
+            portfolios: Dict {chiave: Portfolio} (es. nome del file YAML)
+            period: Periodo di analisi
+            include_ai_insight: Se True genera l'insight AI per ogni report
+        
+        Returns:
+            BatchAnalysis con i report per chiave
+        """
+        universe = list(dict.fromkeys(
+            asset.ticker for portfolio in portfolios.values() for asset in portfolio.assets
+        ))
+        
+        fetched = self.fetch_many(universe, period)
+        asset_analyses = {
+            ticker: self._analyze_asset(ticker, series, period)
+            for ticker, series in fetched.prices.items()
+        }
+        
+        batch = BatchAnalysis(universe=universe, fetch_errors=fetched.errors)
+        for key, portfolio in portfolios.items():
+            try:
+                series, weights, errors = self.select_assets(portfolio, fetched.prices, fetched.errors)
+                result = self.aggregate(asset_analyses, series, weights)
+            except (DataFetchError, ValueError) as e:
+                batch.errors[key] = e
+                continue
+            report = self.build_report(portfolio, period, result, errors)
+            if include_ai_insight:
+                report.ai_insight = self._generate_ai_insight(report)
+            batch.reports[key] = report
+        
+        return batch
+    
+    def simulate_portfolio(
+        self,
+        portfolio: Portfolio,
+        period: str = "5y",
+        **simulation_options
+    ) -> MonteCarloResult:
+        """
+        Proietta il valore del portafoglio con Monte Carlo sui rendimenti storici.
+        
+        Args:
+            portfolio: Portafoglio da simulare
+            period: Storia usata per stimare la distribuzione dei rendimenti
+            **simulation_options: Opzioni di simulate_portfolio (horizon_days, n_paths, mode, ...)
+        
+        Returns:
+            MonteCarloResult con bande percentili e probabilità di perdita
+        """
+        series, weights, _ = self._fetch_portfolio_prices(portfolio, period)
+        aligned = self._align(series)
+        return simulate_portfolio(
+            aligned.returns(), [weights[ticker] for ticker in aligned.tickers], **simulation_options
+        )
+    
+    def optimize_portfolio(
+        self,
+        portfolio: Portfolio,
+        period: str = "5y",
+        long_only: bool = True,
+        bounds: dict[str, tuple[float, float]] | None = None,
+        n_points: int = 50
+    ) -> EfficientFrontier:
+        """
+        Calcola la frontiera efficiente sugli asset del portafoglio.
+        
+        Args:
+            portfolio: Portafoglio di cui ottimizzare i pesi
+            period: Storia usata per stimare rendimenti e covarianze
+            long_only: Se True i pesi non possono essere negativi
+            bounds: Limiti (min, max) dei pesi per ticker
+            n_points: Numero di punti della frontiera
+        
+        Returns:
+            EfficientFrontier con i portafogli a varianza minima e Sharpe massimo
+        """
+        series, _, _ = self._fetch_portfolio_prices(portfolio, period)
+        aligned = self._align(series)
+        return efficient_frontier(
+            aligned.returns(),
+            aligned.tickers,
+            risk_free_rate=self.risk_free_rate,
+            long_only=long_only,
+            bounds=bounds,
+            n_points=n_points,
+        )
+    
+    def backtest_portfolio(
+        self,
+        portfolio: Portfolio,
+        period: str = "5y",
+        policies: list[RebalancePolicy | str] = DEFAULT_POLICIES,
+        **backtest_options
+    ) -> BacktestResult:
+        """
+        Simula il portafoglio sulla storia con diverse politiche di ribilanciamento.
+        
+        Args:
+            portfolio: Portafoglio da simulare (i pesi YAML sono il target)
+            period: Storia su cui eseguire il backtest
+            policies: Politiche da confrontare (es. "none", "quarterly", "band:5%")
+            **backtest_options: Opzioni di backtest (transaction_cost, initial_value, ...)
+        
+        Returns:
+            BacktestResult con una colonna per politica
+        """
+        series, weights, _ = self._fetch_portfolio_prices(portfolio, period)
+        aligned = self._align(series)
+        return backtest(
+            aligned.prices,
+            [weights[ticker] for ticker in aligned.tickers],
+            aligned.dates,
+            policies,
+            tickers=aligned.tickers,
+            risk_free_rate=self.risk_free_rate,
+            **backtest_options,
+        )
+    
+    def screen_correlations(
+        self,
+        tickers: list[str],
+        period: str = "1y",
+        top_k: int = 5,
+        cluster: bool = True,
+        dtype=np.float64,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        profiler: Profiler | None = None
+    ) -> CorrelationScreen:
+        """
+        Correlazioni su un universo ampio di ticker (migliaia), a blocchi.
+        
+        Senza clustering la matrice N×N non viene mai materializzata: si
+        tengono solo le k coppie per asset.
+        
+        Args:
+            tickers: Universo da analizzare
+            period: Storia usata per i rendimenti
+            top_k: Asset più/meno correlati da riportare per ciascun asset
+            cluster: Se True calcola anche l'ordinamento gerarchico
+            dtype: np.float64 oppure np.float32 (metà memoria)
+            block_size: Righe della matrice calcolate per blocco
+            profiler: Profiler in cui registrare i tempi
+        
+        Returns:
+            CorrelationScreen, con l'albero dei tempi in `timings`
         
-        assets_data: dict[str, list[float]] = {}
+        Raises:
+            DataFetchError: Se meno di 2 ticker sono stati recuperati
+        """
+        tickers = list(dict.fromkeys(tickers))
+        profiler = profiler or Profiler()
+        
+        with profiler.activate():
+            with span("fetch"):
+                fetched = self.fetch_many(tickers, period)
+            if len(fetched.prices) < 2:
+                raise DataFetchError(
+                    f"Servono almeno 2 ticker con dati ({len(fetched.prices)} recuperati): "
+                    + "; ".join(str(e) for e in fetched.errors.values())
+                )
+            
+            aligned = self._align(fetched.prices)
+            returns = aligned.returns()
+            with span("correlazioni"):
+                pairs = top_correlated_pairs(returns, aligned.tickers, top_k, block_size, dtype)
+            clusters = None
+            if cluster:
+                with span("clustering"):
+                    clusters = hierarchical_order(returns, aligned.tickers, block_size, dtype)
+        
+        return CorrelationScreen(
+            tickers=aligned.tickers,
+            observations=len(returns),
+            pairs=pairs,
+            clusters=clusters,
+            fetch_errors=fetched.errors,
+            timings=profiler.root,
+        )
+    
+    def _analyze_fetched(
+        self,
+        series: dict[str, PriceSeries],
+        weights: dict[str, float],
+        period: str
+    ) -> dict:
+        """Come PortfolioAnalyzer.analyze_portfolio, con uno span per metriche e rischio."""
+        with span("metriche"):
+            asset_analyses = {
+                ticker: self._analyze_asset(ticker, prices, period)
+                for ticker, prices in series.items()
+            }
+        with span("rischio"):
+            return self.aggregate(asset_analyses, series, weights)
+    
+    def aggregate(
+        self,
+        asset_analyses: dict[str, AssetAnalysis],
+        series: dict[str, PriceSeries],
+        weights: dict[str, float]
+    ) -> dict:
+        """
+        Metriche di portafoglio sui prezzi allineati per data.
+        
+        Args:
+            asset_analyses: Analisi dei singoli asset, per ticker
+            series: Serie degli asset del portafoglio (vedi select_assets)
+            weights: Pesi degli asset, per ticker
+        
+        Returns:
+            Risultato di PortfolioAnalyzer.aggregate_portfolio (vedi build_report)
+        
+        Raises:
+            ValueError: Se le serie non hanno date in comune
+        """
+        aligned = self._align(series)
+        closes = {ticker: prices.close for ticker, prices in series.items()}
+        return self.analyzer.aggregate_portfolio(asset_analyses, closes, weights, prices=aligned.prices)
+    
+    def _align(self, series: dict[str, PriceSeries]) -> AlignedPrices:
+        """Allinea le chiusure per data con la modalità di join del service."""
+        with span("allineamento"):
+            return align_prices(
+                {ticker: (prices.dates, prices.close) for ticker, prices in series.items()},
+                how=self.join,
+            )
+    
+    @staticmethod
+    def _active_timings() -> Span | None:
+        """Radice dell'albero dei tempi del profiler attivo."""
+        profiler = active_profiler()
+        return profiler.root if profiler else None
+    
+    def _fetch_portfolio_prices(
+        self,
+        portfolio: Portfolio,
+        period: str
+    ) -> tuple[dict[str, PriceSeries], dict[str, float], dict[str, DataFetchError]]:
+        """
+        Recupera le serie di tutti gli asset e i relativi pesi.
+        
+        Gli asset non recuperati sono esclusi e i pesi dei restanti rinormalizzati.
+        
+        Raises:
+            DataFetchError: Se non è stato possibile recuperare nessun asset
+        """
+        fetched = self.fetch_many([asset.ticker for asset in portfolio.assets], period)
+        return self.select_assets(portfolio, fetched.prices, fetched.errors)
+    
+    @staticmethod
+    def select_assets(
+        portfolio: Portfolio,
+        fetched: dict[str, PriceSeries],
+        errors: dict[str, DataFetchError]
+    ) -> tuple[dict[str, PriceSeries], dict[str, float], dict[str, DataFetchError]]:
+        """
+        Seleziona le serie degli asset del portafoglio tra quelle recuperate.
+        
+        Gli asset non recuperati sono esclusi e i pesi dei restanti rinormalizzati.
+        
+        Args:
+            portfolio: Portafoglio da analizzare
+            fetched: Serie recuperate, per ticker (anche di altri portafogli)
+            errors: Errori di fetch, per ticker
+        
+        Returns:
+            (serie, pesi, errori) degli asset del portafoglio
+        
+        Raises:
+            DataFetchError: Se nessun asset del portafoglio è stato recuperato
+        """
+        assets_data: dict[str, PriceSeries] = {}
         weights: dict[str, float] = {}
+        missing: dict[str, DataFetchError] = {}
         
         for asset in portfolio.assets:
-            price_data = self.fetcher.fetch_prices(asset.ticker, period)
-            close_prices = [price.close for price in price_data]
-            assets_data[asset.ticker] = close_prices
-            weights[asset.ticker] = asset.weight
+            if asset.ticker in fetched:
+                assets_data[asset.ticker] = fetched[asset.ticker]
+                weights[asset.ticker] = asset.weight
+            elif asset.ticker in errors:
+                missing[asset.ticker] = errors[asset.ticker]
         
-        result = self.analyzer.analyze_portfolio(assets_data, weights, years)
+        if not assets_data:
+            raise DataFetchError(
+                "Nessun prezzo recuperato: " + "; ".join(str(e) for e in missing.values())
+            )
+        
+        if missing:
+            total_weight = sum(weights.values())
+            weights = {ticker: weight / total_weight for ticker, weight in weights.items()}
         
-        report = PortfolioReport(
+        return assets_data, weights, missing
+    
+    @staticmethod
+    def build_report(
+        portfolio: Portfolio,
+        period: str,
+        result: dict,
+        fetch_errors: dict[str, DataFetchError]
+    ) -> PortfolioReport:
+        """
+        Costruisce il PortfolioReport dal risultato dell'analyzer.
+        
+        Args:
+            portfolio: Portafoglio analizzato
+            period: Periodo di analisi
+            result: Risultato di aggregate
+            fetch_errors: Asset esclusi perché non recuperati
+        """
+        return PortfolioReport(
             portfolio_name=portfolio.name,
             analysis_date=datetime.now(),
             period=period,
@@ -80,16 +688,109 @@ class AnalysisService:
             portfolio_return=result["portfolio"]["total_return"],
             portfolio_cagr=result["portfolio"]["cagr"],
             portfolio_volatility=result["portfolio"]["volatility"],
+            risk=result["portfolio"]["risk"],
+            value_at_risk=result["portfolio"]["value_at_risk"],
+            fetch_errors=fetch_errors,
         )
+    
+    def fetch_many(self, tickers: list[str], period: str) -> BatchFetchResult:
+        """
+        Recupera in parallelo le serie di più ticker.
         
-        if include_ai_insight:
-            report.ai_insight = self._generate_ai_insight(report)
+        Usa fetch_many del fetcher, o il thread pool di default se manca.
+        Gli errori dei singoli ticker sono raccolti, non sollevati.
+        """
+        fetch_many = getattr(self.fetcher, "fetch_many", None)
+        if fetch_many is not None:
+            return fetch_many(tickers, period, max_workers=self.max_workers)
+        return fetch_many_concurrently(self.fetcher, tickers, period, self.max_workers)
+    
+    def _get_async_ai_client(self) -> tuple["AsyncAIClient | None", bool]:
+        """
+        Restituisce il client asincrono e se va chiuso a fine analisi.
         
-        return report
+        Un client creato qui vive solo per una chiamata: le sue connessioni
+        sono legate all'event loop corrente.
+        """
+        if self.async_ai_client:
+            return self.async_ai_client, False
+        from src.data.fetchers.ai_client import AsyncAIClient
+        try:
+            return AsyncAIClient(), True
+        except ValueError:
+            return None, False
+    
+    async def _ask_async(
+        self,
+        ai_client: "AsyncAIClient",
+        prompt: str,
+        max_tokens: int
+    ) -> tuple[str, datetime | None]:
+        """
+        Invia un prompt col system prompt dell'analista e il timeout del service.
+        
+        Returns:
+            Tupla (risposta, istante di generazione se letta dalla cache, altrimenti None)
+        """
+        key, cached = self._cache_lookup(ai_client.model, prompt)
+        if cached is not None:
+            return cached.text, cached.created_at
+        
+        answer = await ai_client.ask(
+            prompt, system_prompt=SYSTEM_PROMPT, max_tokens=max_tokens, timeout=self.ai_timeout
+        )
+        if key:
+            self.insight_cache.put(key, answer)
+        return answer, None
+    
+    def _cache_lookup(self, model: str, prompt: str) -> tuple[str | None, CachedInsight | None]:
+        """Restituisce (chiave, risposta in cache); (None, None) senza cache."""
+        if self.insight_cache is None:
+            return None, None
+        key = self.insight_cache.key(model, SYSTEM_PROMPT, prompt)
+        return key, self.insight_cache.get(key)
+    
+    @staticmethod
+    async def _collect_ai_insight(
+        summary_task: asyncio.Task,
+        comment_tasks: dict[str, asyncio.Task]
+    ) -> AIInsight | None:
+        """
+        Attende riassunto e commenti: i commenti falliti sono omessi,
+        senza riassunto non c'è insight.
+        """
+        asset_comments = {}
+        for ticker, task in comment_tasks.items():
+            try:
+                asset_comments[ticker], _ = await task
+            except Exception:
+                continue
+        
+        try:
+            analysis, cached_at = await summary_task
+        except Exception:
+            return None
+        
+        insight = AnalysisService._make_insight(analysis, cached_at)
+        insight.asset_comments = asset_comments
+        return insight
+    
+    @staticmethod
+    def _make_insight(analysis: str, cached_at: datetime | None = None) -> AIInsight:
+        """Crea l'AIInsight dal testo dell'analisi (`cached_at` se viene dalla cache)."""
+        first_sentence = analysis.split('.')[0] + '.'
+        
+        return AIInsight(
+            summary=first_sentence,
+            full_analysis=analysis,
+            generated_at=cached_at or datetime.now(),
+            from_cache=cached_at is not None
+        )
     
     def _generate_ai_insight(self, report: PortfolioReport) -> AIInsight | None:
-        """Genera insight AI per il report."""
+        """Genera insight AI per il report, riusando la cache se presente."""
         if not self.ai_client:
+            from src.data.fetchers.ai_client import AIClient
             try:
                 self.ai_client = AIClient()
             except ValueError:
@@ -97,21 +798,119 @@ class AnalysisService:
         
         try:
             prompt = format_portfolio_prompt(report)
+            key, cached = self._cache_lookup(self.ai_client.model, prompt)
+            if cached is not None:
+                return self._make_insight(cached.text, cached.created_at)
+            
             analysis = self.ai_client.ask(prompt, system_prompt=SYSTEM_PROMPT)
+            if key:
+                self.insight_cache.put(key, analysis)
             
-            first_sentence = analysis.split('.')[0] + '.'
+            return self._make_insight(analysis)
+        except Exception:
+            return None
+    
+    def stream_ai_insight(
+        self,
+        report: PortfolioReport,
+        on_text: Callable[[str], None]
+    ) -> AIInsight | None:
+        """
+        Genera l'insight AI in streaming, passando ogni frammento a `on_text`.
+        
+        Una risposta in cache viene passata a `on_text` in un unico frammento.
+        
+        Args:
+            report: Report da commentare
+            on_text: Callback chiamata per ogni delta di testo (es. aggiornamento a video)
+        
+        Returns:
+            AIInsight con il testo completo, o None se l'AI non è disponibile
+        """
+        if not self.ai_client:
+            from src.data.fetchers.ai_client import AIClient
+            try:
+                self.ai_client = AIClient()
+            except ValueError:
+                return None
+        
+        try:
+            prompt = format_portfolio_prompt(report)
+            key, cached = self._cache_lookup(self.ai_client.model, prompt)
+            if cached is not None:
+                on_text(cached.text)
+                return self._make_insight(cached.text, cached.created_at)
             
-            return AIInsight(
-                summary=first_sentence,
-                full_analysis=analysis,
-                generated_at=datetime.now()
-            )
+            parts = []
+            for delta in self.ai_client.stream(prompt, system_prompt=SYSTEM_PROMPT):
+                parts.append(delta)
+                on_text(delta)
+            analysis = "".join(parts)
+            if key:
+                self.insight_cache.put(key, analysis)
+            
+            return self._make_insight(analysis)
         except Exception:
             return None
     
     @staticmethod
-    def _period_to_years(period: str) -> float:
-        """Converte una stringa periodo in numero di anni."""
+    def _longest_period(periods: list[str]) -> str:
+        """Periodo con l'inizio più lontano ("max" vince su tutti)."""
+        now = datetime.now()
+        starts = {period: period_start(period, now) for period in periods}
+        unbounded = [period for period, start in starts.items() if start is None]
+        if unbounded:
+            return unbounded[0]
+        return min(periods, key=lambda period: starts[period])
+    
+    @staticmethod
+    def _slice_period(
+        series: dict[str, PriceSeries],
+        period: str,
+        end: datetime
+    ) -> tuple[dict[str, PriceSeries], dict[str, DataFetchError]]:
+        """
+        Taglia le serie all'orizzonte `period` che termina in `end` (viste, senza copie).
+        
+        Le serie con meno di due barre nell'orizzonte finiscono negli errori.
+        """
+        start = period_start(period, end)
+        if start is None:
+            return series, {}
+        # Il giorno di inizio è incluso per intero, come fa yfinance
+        start = datetime.combine(start.date(), datetime.min.time())
+        
+        sliced: dict[str, PriceSeries] = {}
+        errors: dict[str, DataFetchError] = {}
+        for ticker, prices in series.items():
+            view = prices.since(start)
+            if len(view) < 2:
+                errors[ticker] = DataFetchError(f"Dati insufficienti per {ticker} nel periodo {period}")
+            else:
+                sliced[ticker] = view
+        return sliced, errors
+    
+    def _analyze_asset(self, ticker: str, series: PriceSeries, period: str) -> AssetAnalysis:
+        """Analizza un asset usando gli anni effettivamente coperti dalla sua serie."""
+        return self.analyzer.analyze_asset(ticker, series.close, self.period_to_years(period, series.dates))
+    
+    @staticmethod
+    def period_to_years(period: str, dates: np.ndarray | None = None) -> float:
+        """
+        Converte un periodo in numero di anni.
+        
+        Con le date della serie gli anni sono quelli effettivamente coperti
+        (dalla prima all'ultima barra), così CAGR e periodi tagliati per data
+        sono esatti; senza date si usa l'etichetta ("6mo" → 0.5).
+        
+        Raises:
+            ValueError: Se il periodo non è riconosciuto
+        """
+        if dates is not None and len(dates) > 1:
+            span_days = (dates[-1] - dates[0]) / np.timedelta64(1, "D")
+            if span_days > 0:
+                return float(span_days / DAYS_PER_YEAR)
+        
         period = period.lower().strip()
         
         if period.endswith("y"):
@@ -0,0 +1,288 @@
+"""
+Modalità watch: portafoglio, prezzi e metriche residenti in memoria.
+
+Dopo il caricamento iniziale ogni aggiornamento:
+- ricarica il YAML solo se il suo mtime è cambiato, scaricando per intero
+  solo gli asset nuovi (quelli rimossi vengono scartati, un cambio di pesi
+  richiede solo la nuova aggregazione);
+- scarica per gli altri asset solo le barre dall'ultima in memoria
+  (fetch_prices_since, se il fetcher lo espone);
+- aggiorna le metriche degli asset cambiati con gli accumulatori online,
+  ricalcolando da capo solo quando la finestra del periodo scorre;
+- riaggrega il portafoglio (rischio, VaR) solo se qualcosa è cambiato.
+
+Ogni serie è tagliata alla finestra del periodo (es. ultimo anno) e non si
+conserva lo storico degli aggiornamenti: la memoria resta costante anche
+dopo giorni di esecuzione (con period="max" cresce di una barra al giorno).
+"""
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+from src.data.exceptions import DataFetchError
+from src.data.fetchers.base import PriceFetcher, fetch_many_concurrently
+from src.data.models.portfolio import Portfolio
+from src.data.models.price_series import PriceSeries
+from src.data.periods import period_start
+from src.domain.analysis.portfolio_analyzer import AssetAnalysis
+from src.domain.metrics.online import AssetAccumulator
+from .analysis_service import AnalysisService, PortfolioReport
+
+
+@dataclass
+class WatchedAsset:
+    """
+    Stato residente di un asset.
+
+    L'ultima barra può ancora cambiare (giornata in corso), quindi
+    l'accumulatore contiene solo le barre consolidate; le metriche si
+    ottengono da una sua copia aggiornata con l'ultima barra.
+
+    Attributes:
+        series: Prezzi nella finestra del periodo
+        settled: Accumulatore di tutte le barre tranne l'ultima
+        analysis: Metriche correnti dell'asset
+    """
+    series: PriceSeries
+    settled: AssetAccumulator
+    analysis: AssetAnalysis
+
+
+@dataclass
+class WatchUpdate:
+    """
+    Esito di un aggiornamento.
+
+    Attributes:
+        refreshed_at: Istante dell'aggiornamento
+        new_bars: Barre nuove per ticker (solo i ticker con novità)
+        recomputed: Asset le cui metriche sono state ricalcolate
+        config_reloaded: True se il YAML è stato ricaricato
+        config_error: Errore di caricamento del YAML (si tiene la versione precedente)
+        analysis_error: Errore di aggregazione, es. asset senza date in comune
+            (resta l'ultimo report)
+        errors: Ticker non aggiornati (restano le ultime metriche note)
+    """
+    refreshed_at: datetime
+    new_bars: dict[str, int] = field(default_factory=dict)
+    recomputed: list[str] = field(default_factory=list)
+    config_reloaded: bool = False
+    config_error: Exception | None = None
+    analysis_error: ValueError | None = None
+    errors: dict[str, DataFetchError] = field(default_factory=dict)
+
+
+class _TailFetcher:
+    """Adatta fetch_prices_since all'interfaccia di fetch_many_concurrently."""
+
+    def __init__(self, fetcher: PriceFetcher, since: dict[str, datetime]):
+        self.fetcher = fetcher
+        self.since = since
+
+    def fetch_prices(self, ticker: str, period: str) -> PriceSeries:
+        fetch_since = getattr(self.fetcher, "fetch_prices_since", None)
+        if fetch_since is None:
+            return self.fetcher.fetch_prices(ticker, period)
+        return fetch_since(ticker, self.since[ticker])
+
+
+class PortfolioWatcher:
+    """
+    Mantiene in memoria portafoglio, prezzi e metriche e li aggiorna
+    in modo incrementale.
+    """
+
+    def __init__(
+        self,
+        service: AnalysisService,
+        config_path: str,
+        loader: Callable[[str], Portfolio],
+        period: str = "1y",
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        """
+        Args:
+            service: Service con fetcher, analyzer e modalità di join
+            config_path: File YAML del portafoglio
+            loader: Funzione che carica il portafoglio dal YAML
+            period: Finestra di analisi (es. "1y")
+            clock: Funzione che restituisce l'istante corrente
+        """
+        self.service = service
+        self.config_path = config_path
+        self.loader = loader
+        self.period = period
+        self.clock = clock
+        self.portfolio: Portfolio | None = None
+        self.assets: dict[str, WatchedAsset] = {}
+        self.report: PortfolioReport | None = None
+        self.last_update: WatchUpdate | None = None
+        self._config_mtime: int | None = None
+
+    def start(self) -> PortfolioReport:
+        """
+        Carica il YAML e scarica l'intero periodo di tutti gli asset.
+
+        Raises:
+            FileNotFoundError, ValueError: Se il YAML non è valido
+            DataFetchError: Se nessun asset è stato recuperato
+        """
+        self._config_mtime = self._mtime()
+        self.portfolio = self.loader(self.config_path)
+        self.assets.clear()
+        update = WatchUpdate(refreshed_at=self.clock())
+        self._load_missing(update)
+        self._aggregate(update)
+        self.last_update = update
+        return self.report
+
+    def refresh(self) -> WatchUpdate:
+        """
+        Ricarica il YAML se modificato e scarica solo le barre nuove.
+
+        Gli errori (YAML non valido, fetch falliti, asset senza date in
+        comune) sono riportati nell'esito: il watch continua con l'ultimo
+        stato valido.
+        """
+        if self.portfolio is None:
+            raise RuntimeError("Chiamare start() prima di refresh()")
+        update = WatchUpdate(refreshed_at=self.clock())
+        changed = self._reload_config(update)
+
+        # Asset già in memoria: solo la coda; asset mancanti: periodo intero
+        tickers = [t for t in self._tickers() if t in self.assets]
+        since = {ticker: self.assets[ticker].series.end for ticker in tickers}
+        fetched = fetch_many_concurrently(
+            _TailFetcher(self.service.fetcher, since), tickers, self.period, self.service.max_workers
+        )
+        update.errors.update(fetched.errors)
+        start = self._window_start(update.refreshed_at)
+        for ticker, tail in fetched.prices.items():
+            try:
+                if self._apply_tail(ticker, tail, start, update):
+                    changed = True
+            except ValueError as e:
+                update.errors[ticker] = DataFetchError(f"Serie di {ticker} non valida: {e}", original_error=e)
+        if self._load_missing(update):
+            changed = True
+
+        if changed or self.report is None:
+            try:
+                self._aggregate(update)
+            except DataFetchError:
+                # Nessun asset disponibile: resta l'ultimo report, gli errori sono nell'esito
+                pass
+            except ValueError as e:
+                # Es. un asset aggiunto al YAML senza date in comune con gli altri
+                update.analysis_error = e
+        self.last_update = update
+        return update
+
+    def _tickers(self) -> list[str]:
+        return [asset.ticker for asset in self.portfolio.assets]
+
+    def _mtime(self) -> int | None:
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _window_start(self, now: datetime) -> datetime | None:
+        """Primo giorno della finestra (incluso per intero, come yfinance)."""
+        start = period_start(self.period, now)
+        return None if start is None else datetime.combine(start.date(), datetime.min.time())
+
+    def _reload_config(self, update: WatchUpdate) -> bool:
+        """Ricarica il YAML se il mtime è cambiato; True se il portafoglio è cambiato."""
+        mtime = self._mtime()
+        if mtime == self._config_mtime:
+            return False
+        self._config_mtime = mtime
+        try:
+            portfolio = self.loader(self.config_path)
+        except Exception as e:
+            # Un file salvato a metà non deve fermare il watch
+            update.config_error = e
+            return False
+
+        update.config_reloaded = True
+        tickers = {asset.ticker for asset in portfolio.assets}
+        for ticker in [t for t in self.assets if t not in tickers]:
+            del self.assets[ticker]
+        changed = portfolio != self.portfolio
+        self.portfolio = portfolio
+        return changed
+
+    def _load_missing(self, update: WatchUpdate) -> bool:
+        """Scarica il periodo intero degli asset non ancora in memoria."""
+        missing = [t for t in self._tickers() if t not in self.assets]
+        if not missing:
+            return False
+        fetched = self.service.fetch_many(missing, self.period)
+        update.errors.update(fetched.errors)
+        start = self._window_start(update.refreshed_at)
+        for ticker, series in fetched.prices.items():
+            window = series.since(start) if start else series
+            if len(window) < 2:
+                update.errors[ticker] = DataFetchError(f"Dati insufficienti per {ticker} nel periodo {self.period}")
+                continue
+            settled = AssetAccumulator.from_prices(window.close[:-1])
+            self.assets[ticker] = WatchedAsset(window, settled, self._analyze(ticker, window, settled))
+            update.new_bars[ticker] = len(window)
+            update.recomputed.append(ticker)
+        return bool(fetched.prices)
+
+    def _apply_tail(self, ticker: str, tail: PriceSeries, start: datetime | None, update: WatchUpdate) -> bool:
+        """
+        Unisce le barre nuove allo stato dell'asset.
+
+        Se la finestra non è scorsa e la coda parte dall'ultima barra in
+        memoria basta estendere l'accumulatore con le barre consolidate,
+        altrimenti lo si ricostruisce sulla finestra (O(T), al più una
+        volta al giorno).
+
+        Returns:
+            True se le metriche dell'asset sono cambiate
+        """
+        state = self.assets[ticker]
+        old = state.series
+        if len(tail) == 0:
+            return False
+        merged = PriceSeries.concat([old, tail])
+        window = merged.since(start) if start else merged
+        new_bars = len(merged) - len(old)
+        if (
+            new_bars == 0
+            and window.dates[0] == old.dates[0]
+            and window.close[-1] == old.close[-1]
+        ):
+            return False
+        if len(window) < 2:
+            raise ValueError("meno di 2 barre nella finestra")
+
+        if window.dates[0] == old.dates[0] and tail.dates[0] >= old.dates[-1]:
+            # L'ultima barra in memoria (forse rivista) e le nuove, tranne l'ultima, si consolidano
+            state.settled.extend(window.close[len(old) - 1:-1])
+        else:
+            state.settled = AssetAccumulator.from_prices(window.close[:-1])
+        state.series = window
+        state.analysis = self._analyze(ticker, window, state.settled)
+        if new_bars:
+            update.new_bars[ticker] = new_bars
+        update.recomputed.append(ticker)
+        return True
+
+    def _analyze(self, ticker: str, series: PriceSeries, settled: AssetAccumulator) -> AssetAnalysis:
+        """Metriche da una copia dell'accumulatore aggiornata con l'ultima barra."""
+        current = AssetAccumulator.from_dict(settled.to_dict())
+        current.update(series.close[-1])
+        years = self.service.period_to_years(self.period, series.dates)
+        return self.service.analyzer.analyze_accumulated(ticker, current, years)
+
+    def _aggregate(self, update: WatchUpdate) -> None:
+        """Riaggrega il portafoglio dagli asset in memoria."""
+        series = {ticker: state.series for ticker, state in self.assets.items()}
+        selected, weights, missing = self.service.select_assets(self.portfolio, series, update.errors)
+        analyses = {ticker: self.assets[ticker].analysis for ticker in selected}
+        result = self.service.aggregate(analyses, selected, weights)
+        self.report = self.service.build_report(self.portfolio, self.period, result, missing)
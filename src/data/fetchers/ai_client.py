@@ -1,12 +1,42 @@
 """
 Client per l'API Claude di Anthropic.
+
+L'SDK anthropic e dotenv sono importati alla creazione del primo client,
+così i comandi che non usano l'AI (es. analyze --no-ai) non li caricano.
 """
+import asyncio
 import os
-from anthropic import Anthropic
-from dotenv import load_dotenv
+from typing import Iterator
+
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+DEFAULT_TIMEOUT = 60.0
+
 
-# Carica variabili da .env
-load_dotenv()
+def _resolve_api_key(api_key: str | None) -> str:
+    """Usa la key passata o quella in ANTHROPIC_API_KEY (anche da file .env)."""
+    if not api_key:
+        from dotenv import load_dotenv
+        
+        # Carica variabili da .env
+        load_dotenv()
+    api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY non trovata. Crea un file .env con la key.")
+    return api_key
+
+
+def _request_kwargs(model: str, prompt: str, system_prompt: str | None, max_tokens: int) -> dict:
+    """Parametri di messages.create comuni ai client sincrono e asincrono."""
+    kwargs = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    
+    if system_prompt:
+        kwargs["system"] = system_prompt
+    
+    return kwargs
 
 
 class AIClient:
@@ -14,16 +44,23 @@ class AIClient:
     Client wrapper per Claude API.
     """
     
-    def __init__(self, model: str = "claude-sonnet-4-20250514"):
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        timeout: float = DEFAULT_TIMEOUT
+    ):
         """
         Args:
             model: Modello Claude da usare
+            api_key: API key (default: variabile ANTHROPIC_API_KEY)
+            base_url: Endpoint alternativo dell'API (es. uno stub locale)
+            timeout: Timeout in secondi di ogni richiesta HTTP
         """
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY non trovata. Crea un file .env con la key.")
+        from anthropic import Anthropic
         
-        self.client = Anthropic(api_key=api_key)
+        self.client = Anthropic(api_key=_resolve_api_key(api_key), base_url=base_url, timeout=timeout)
         self.model = model
     
     def ask(self, prompt: str, system_prompt: str = None, max_tokens: int = 1024) -> str:
@@ -38,17 +75,95 @@ class AIClient:
         Returns:
             La risposta di Claude come stringa
         """
-        messages = [{"role": "user", "content": prompt}]
+        response = self.client.messages.create(**_request_kwargs(self.model, prompt, system_prompt, max_tokens))
+        
+        return response.content[0].text
+    
+    def stream(self, prompt: str, system_prompt: str = None, max_tokens: int = 1024) -> Iterator[str]:
+        """
+        Invia una richiesta a Claude e restituisce la risposta man mano che arriva.
+        
+        Args:
+            prompt: Il messaggio da inviare
+            system_prompt: Istruzioni di sistema (opzionale)
+            max_tokens: Massimo numero di token nella risposta
+        
+        Yields:
+            Frammenti di testo (delta) nell'ordine di arrivo; concatenati danno
+            la stessa risposta di ask()
+        """
+        with self.client.messages.stream(**_request_kwargs(self.model, prompt, system_prompt, max_tokens)) as stream:
+            yield from stream.text_stream
+
+
+class AsyncAIClient:
+    """
+    Client asincrono per Claude API, basato su AsyncAnthropic.
+    
+    Più richieste possono essere in volo contemporaneamente (es. un commento
+    per asset mentre si calcolano le altre metriche). Ogni richiesta ha un
+    timeout e può essere cancellata cancellando il task che la attende.
+    """
+    
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = 2
+    ):
+        """
+        Args:
+            model: Modello Claude da usare
+            api_key: API key (default: variabile ANTHROPIC_API_KEY)
+            base_url: Endpoint alternativo dell'API (es. uno stub locale)
+            timeout: Timeout in secondi di ogni richiesta HTTP
+            max_retries: Tentativi ulteriori dell'SDK su errori transitori
+        """
+        from anthropic import AsyncAnthropic
         
-        kwargs = {
-            "model": self.model,
-            "max_tokens": max_tokens,
-            "messages": messages,
-        }
+        self.client = AsyncAnthropic(
+            api_key=_resolve_api_key(api_key),
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=max_retries,
+        )
+        self.model = model
+    
+    async def ask(
+        self,
+        prompt: str,
+        system_prompt: str = None,
+        max_tokens: int = 1024,
+        timeout: float | None = None
+    ) -> str:
+        """
+        Invia una richiesta a Claude senza bloccare l'event loop.
         
-        if system_prompt:
-            kwargs["system"] = system_prompt
+        Args:
+            prompt: Il messaggio da inviare
+            system_prompt: Istruzioni di sistema (opzionale)
+            max_tokens: Massimo numero di token nella risposta
+            timeout: Tempo massimo complessivo (retry inclusi); None = solo quello HTTP
+        
+        Returns:
+            La risposta di Claude come stringa
         
-        response = self.client.messages.create(**kwargs)
+        Raises:
+            TimeoutError: Se la risposta non arriva entro `timeout`
+        """
+        request = self.client.messages.create(**_request_kwargs(self.model, prompt, system_prompt, max_tokens))
+        response = await asyncio.wait_for(request, timeout)
         
-        return response.content[0].text
\ No newline at end of file
+        return response.content[0].text
+    
+    async def close(self) -> None:
+        """Chiude le connessioni HTTP del client."""
+        await self.client.close()
+    
+    async def __aenter__(self) -> "AsyncAIClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
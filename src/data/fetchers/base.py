@@ -1,22 +1,117 @@
 """
 Interfacce per i data fetcher.
 """
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Protocol
-from ..models.price_data import PriceData
+from ...profiling import span
+from ..models.price_series import PriceSeries
 from ..models.asset_info import AssetInfo
+from ..exceptions import DataFetchError
+
+
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass
+class BatchFetchResult:
+    """
+    Risultato del recupero prezzi di più ticker.
+
+    Attributes:
+        prices: Serie recuperate, per ticker (nell'ordine richiesto)
+        errors: Errori per i ticker non recuperati
+        latencies: Secondi impiegati per ogni ticker (anche quelli falliti)
+    """
+    prices: dict[str, PriceSeries] = field(default_factory=dict)
+    errors: dict[str, DataFetchError] = field(default_factory=dict)
+    latencies: dict[str, float] = field(default_factory=dict)
+
+
+def _timed_fetch(fetcher: "PriceFetcher", ticker: str, period: str, latencies: dict[str, float]) -> PriceSeries:
+    """Esegue fetch_prices in uno span per ticker e ne registra la latenza."""
+    start = time.perf_counter()
+    try:
+        with span(ticker):
+            return fetcher.fetch_prices(ticker, period)
+    finally:
+        latencies[ticker] = time.perf_counter() - start
+
+
+def fetch_many_concurrently(
+    fetcher: "PriceFetcher",
+    tickers: list[str],
+    period: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> BatchFetchResult:
+    """
+    Recupera i prezzi di più ticker in parallelo su un thread pool limitato.
+
+    Il fetch è I/O bound, quindi i thread sovrappongono i round-trip di rete.
+    Un errore su un ticker non interrompe gli altri: viene raccolto in
+    `errors` come DataFetchError. Ogni richiesta gira in una copia del
+    contesto corrente, così gli span dei worker finiscono sotto lo span
+    del chiamante (vedi src.profiling).
+
+    Args:
+        fetcher: Qualsiasi oggetto con un metodo fetch_prices(ticker, period)
+        tickers: Ticker da recuperare (i duplicati sono ignorati)
+        period: Periodo di tempo (es. "1y")
+        max_workers: Numero massimo di richieste contemporanee
+
+    Returns:
+        BatchFetchResult con serie ed errori per ticker
+    """
+    unique = list(dict.fromkeys(tickers))
+    result = BatchFetchResult()
+    if not unique:
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique)))) as pool:
+        futures = {
+            ticker: pool.submit(
+                contextvars.copy_context().run, _timed_fetch, fetcher, ticker, period, result.latencies
+            )
+            for ticker in unique
+        }
+
+    for ticker, future in futures.items():
+        error = future.exception()
+        if error is None:
+            result.prices[ticker] = future.result()
+        elif isinstance(error, DataFetchError):
+            result.errors[ticker] = error
+        else:
+            result.errors[ticker] = DataFetchError(
+                f"Errore nel recupero di {ticker}: {error}", original_error=error
+            )
+    return result
 
 
 class PriceFetcher(Protocol):
     """Interfaccia per recuperare prezzi storici."""
-    
-    def fetch_prices(self, ticker: str, period: str) -> list[PriceData]:
-        """Recupera i prezzi storici di un asset."""
+
+    def fetch_prices(self, ticker: str, period: str) -> PriceSeries:
+        """Recupera i prezzi storici di un asset in formato colonnare."""
         ...
 
+    def fetch_many(
+        self, tickers: list[str], period: str, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> BatchFetchResult:
+        """
+        Recupera i prezzi di più asset.
+
+        L'implementazione di default esegue fetch_prices su un thread pool;
+        i fetcher con un'API batch nativa possono ridefinirla.
+        """
+        return fetch_many_concurrently(self, tickers, period, max_workers)
+
 
 class AssetInfoFetcher(Protocol):
     """Interfaccia per recuperare info sugli asset."""
-    
+
     def fetch_info(self, ticker: str) -> AssetInfo:
         """Recupera i metadati di un asset."""
-        ...
\ No newline at end of file
+        ...
@@ -0,0 +1,245 @@
+"""
+Cache persistente su disco per i prezzi storici.
+
+CachedPriceFetcher decora un qualsiasi PriceFetcher: conserva le serie in un
+database SQLite locale (una riga per ticker, colonne salvate come blob NumPy)
+e alla richiesta successiva scarica solo la coda mancante.
+"""
+import sqlite3
+import threading
+from dataclasses import dataclass
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+import numpy as np
+from ..models.price_series import PriceSeries
+from ..periods import period_start
+from .base import PriceFetcher
+
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "portfolio-intelligence" / "prices.sqlite"
+
+_COLUMNS = ("open", "high", "low", "close", "volume")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    ticker TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL,
+    checked_at TEXT NOT NULL,
+    last_access INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    dates BLOB NOT NULL,
+    open BLOB NOT NULL,
+    high BLOB NOT NULL,
+    low BLOB NOT NULL,
+    close BLOB NOT NULL,
+    volume BLOB NOT NULL
+)
+"""
+
+
+@dataclass
+class CacheEntry:
+    """
+    Serie in cache per un ticker, con i metadati di copertura.
+
+    Attributes:
+        ticker: Simbolo dell'asset
+        series: Prezzi memorizzati
+        covered_from: Inizio del periodo già scaricato per intero
+        checked_at: Ultimo controllo con la sorgente remota
+    """
+    ticker: str
+    series: PriceSeries
+    covered_from: datetime
+    checked_at: datetime
+
+
+class PriceCache:
+    """
+    Store SQLite delle serie di prezzi.
+
+    Ogni ticker occupa una riga; le colonne OHLCV sono salvate come blob
+    float64 contigui, quindi la lettura è una copia di memoria senza parsing.
+    Quando il numero totale di righe supera `max_rows`, vengono rimossi i
+    ticker usati meno di recente (LRU).
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH, max_rows: int = 5_000_000):
+        """
+        Args:
+            path: File del database (":memory:" per una cache volatile)
+            max_rows: Numero massimo di barre conservate in totale
+        """
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, ticker: str) -> CacheEntry | None:
+        """
+        Legge la serie in cache di un ticker.
+
+        Args:
+            ticker: Simbolo dell'asset
+
+        Returns:
+            CacheEntry, o None se il ticker non è in cache
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT covered_from, checked_at, dates, open, high, low, close, volume "
+                "FROM series WHERE ticker = ?",
+                (ticker,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        covered_from, checked_at, dates, *columns = row
+        series = PriceSeries(
+            dates=np.frombuffer(dates, dtype="datetime64[ns]"),
+            **{name: np.frombuffer(blob, dtype=np.float64) for name, blob in zip(_COLUMNS, columns)},
+        )
+        return CacheEntry(
+            ticker=ticker,
+            series=series,
+            covered_from=datetime.fromisoformat(covered_from),
+            checked_at=datetime.fromisoformat(checked_at),
+        )
+
+    def put(self, ticker: str, series: PriceSeries, covered_from: datetime, checked_at: datetime) -> None:
+        """
+        Salva (o sostituisce) la serie di un ticker e applica l'eviction.
+
+        Args:
+            ticker: Simbolo dell'asset
+            series: Serie completa da memorizzare
+            covered_from: Inizio del periodo coperto
+            checked_at: Momento del controllo con la sorgente remota
+        """
+        blobs = [np.ascontiguousarray(series.dates, dtype="datetime64[ns]").tobytes()]
+        blobs += [np.ascontiguousarray(getattr(series, name), dtype=np.float64).tobytes() for name in _COLUMNS]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (ticker, covered_from.isoformat(), checked_at.isoformat(),
+                 time.time_ns(), len(series), *blobs),
+            )
+            self._evict(keep=ticker)
+            self._conn.commit()
+
+    def touch(self, ticker: str) -> None:
+        """Aggiorna l'istante di ultimo accesso di un ticker (per la LRU)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE series SET last_access = ? WHERE ticker = ?",
+                (time.time_ns(), ticker),
+            )
+            self._conn.commit()
+
+    def total_rows(self) -> int:
+        """Numero totale di barre in cache."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(rows), 0) FROM series").fetchone()[0]
+
+    def tickers(self) -> list[str]:
+        """Ticker presenti in cache."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT ticker FROM series ORDER BY ticker")]
+
+    def _evict(self, keep: str) -> None:
+        """Rimuove i ticker meno usati finché il totale rientra in max_rows."""
+        total = self._conn.execute("SELECT COALESCE(SUM(rows), 0) FROM series").fetchone()[0]
+        if total <= self.max_rows:
+            return
+        candidates = self._conn.execute(
+            "SELECT ticker, rows FROM series WHERE ticker != ? ORDER BY last_access",
+            (keep,),
+        ).fetchall()
+        for ticker, rows in candidates:
+            if total <= self.max_rows:
+                break
+            self._conn.execute("DELETE FROM series WHERE ticker = ?", (ticker,))
+            total -= rows
+
+
+class CachedPriceFetcher(PriceFetcher):
+    """
+    Decoratore di PriceFetcher con cache persistente e aggiornamento incrementale.
+
+    - Se la cache copre il periodo richiesto ed è stata controllata entro
+      `max_age`, la serie viene servita senza chiamate di rete.
+    - Se la cache copre il periodo ma è scaduta, viene scaricata solo la coda
+      a partire dall'ultima barra (se il fetcher sottostante espone
+      `fetch_prices_since`, altrimenti si riscarica il periodo).
+    - Se la cache non copre il periodo, il periodo viene scaricato per intero.
+
+    I periodi senza inizio definito ("max") passano direttamente al fetcher.
+    """
+
+    def __init__(
+        self,
+        fetcher: PriceFetcher,
+        cache: PriceCache | None = None,
+        max_age: timedelta = timedelta(hours=12),
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        """
+        Args:
+            fetcher: Fetcher da decorare (es. YahooFetcher)
+            cache: Store su disco (default: file in ~/.cache/portfolio-intelligence)
+            max_age: Dopo quanto tempo una serie va ricontrollata
+            clock: Funzione che restituisce l'istante corrente
+        """
+        self.fetcher = fetcher
+        self.cache = cache or PriceCache()
+        self.max_age = max_age
+        self.clock = clock
+
+    def fetch_prices(self, ticker: str, period: str = "1y") -> PriceSeries:
+        """
+        Recupera i prezzi usando la cache quando possibile.
+
+        Args:
+            ticker: Simbolo dell'asset
+            period: Periodo di tempo (es. "1mo", "1y")
+
+        Returns:
+            PriceSeries del periodo richiesto
+
+        Raises:
+            TickerNotFoundError: Propagata dal fetcher sottostante
+        """
+        now = self.clock()
+        start = period_start(period, now)
+        if start is None:
+            return self.fetcher.fetch_prices(ticker, period)
+        # Il giorno di inizio è incluso per intero, come fa yfinance
+        start = datetime.combine(start.date(), datetime.min.time())
+
+        entry = self.cache.get(ticker)
+
+        if entry is None or entry.covered_from > start:
+            series = self.fetcher.fetch_prices(ticker, period)
+            if entry is not None:
+                series = PriceSeries.concat([entry.series, series])
+            self.cache.put(ticker, series, covered_from=start, checked_at=now)
+        elif now - entry.checked_at > self.max_age:
+            series = PriceSeries.concat([entry.series, self._fetch_tail(ticker, entry, period)])
+            self.cache.put(ticker, series, covered_from=entry.covered_from, checked_at=now)
+        else:
+            series = entry.series
+            self.cache.touch(ticker)
+
+        return series.since(start)
+
+    def _fetch_tail(self, ticker: str, entry: CacheEntry, period: str) -> PriceSeries:
+        """Scarica le barre dall'ultima in cache (inclusa, può essere cambiata)."""
+        fetch_since = getattr(self.fetcher, "fetch_prices_since", None)
+        if fetch_since is None or len(entry.series) == 0:
+            return self.fetcher.fetch_prices(ticker, period)
+        return fetch_since(ticker, entry.series.end)
@@ -0,0 +1,157 @@
+"""
+Fetcher condiviso in memoria con coalescing delle richieste (single-flight).
+
+Pensato per processi a lunga vita che servono molti chiamanti (API HTTP):
+- le serie recuperate restano in una cache in memoria per `ttl`, con
+  eviction LRU oltre `max_entries`;
+- richieste concorrenti per lo stesso (ticker, periodo) non ancora in
+  cache attendono un unico fetch a monte e ne condividono il risultato
+  (o l'errore, che non viene messo in cache).
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Callable
+from ..models.price_series import PriceSeries
+from .base import DEFAULT_MAX_WORKERS, BatchFetchResult, PriceFetcher, fetch_many_concurrently
+
+
+@dataclass
+class CoalescingStats:
+    """
+    Contatori delle richieste servite.
+
+    Attributes:
+        hits: Servite dalla cache
+        misses: Fetch eseguiti a monte
+        coalesced: Richieste che hanno atteso un fetch già in corso
+        errors: Fetch a monte falliti
+    """
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    errors: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class CoalescingFetcher(PriceFetcher):
+    """
+    Decoratore di PriceFetcher con cache in memoria condivisa tra thread e
+    un solo fetch a monte per chiave alla volta.
+    """
+
+    def __init__(
+        self,
+        fetcher: PriceFetcher,
+        ttl: timedelta = timedelta(minutes=5),
+        max_entries: int = 1_024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            fetcher: Fetcher da decorare (es. CachedPriceFetcher o LocalStoreFetcher)
+            ttl: Per quanto una serie in memoria è considerata aggiornata
+            max_entries: Numero massimo di serie in memoria
+            clock: Funzione che restituisce l'istante corrente in secondi
+        """
+        self.fetcher = fetcher
+        self.ttl = ttl.total_seconds()
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = CoalescingStats()
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple[str, str], tuple[float, PriceSeries]] = OrderedDict()
+        self._inflight: dict[tuple[str, str], Future] = {}
+
+    def fetch_prices(self, ticker: str, period: str = "1y") -> PriceSeries:
+        """
+        Recupera i prezzi dalla cache, da un fetch già in corso o a monte.
+
+        Raises:
+            Le eccezioni del fetcher sottostante, a tutti i chiamanti in attesa
+        """
+        key = (ticker, period)
+        with self._lock:
+            series = self._lookup(key)
+            if series is not None:
+                return series
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.stats.misses += 1
+            else:
+                self.stats.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            series = self.fetcher.fetch_prices(ticker, period)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+                self.stats.errors += 1
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._cache[key] = (self.clock(), series)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            del self._inflight[key]
+        future.set_result(series)
+        return series
+
+    def fetch_many(
+        self, tickers: list[str], period: str, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> BatchFetchResult:
+        """
+        Serve dalla cache i ticker presenti e usa il thread pool solo per gli altri.
+
+        Con tutti i prezzi in memoria (il caso tipico di un server) non si
+        crea nessun thread: è la parte più costosa di una richiesta.
+        """
+        unique = list(dict.fromkeys(tickers))
+        cached = {}
+        with self._lock:
+            for ticker in unique:
+                series = self._lookup((ticker, period))
+                if series is not None:
+                    cached[ticker] = series
+        missing = [ticker for ticker in unique if ticker not in cached]
+        fetched = fetch_many_concurrently(self, missing, period, max_workers)
+        # Stesso ordine della richiesta, come fetch_many_concurrently
+        fetched.prices = {
+            ticker: cached[ticker] if ticker in cached else fetched.prices[ticker]
+            for ticker in unique
+            if ticker in cached or ticker in fetched.prices
+        }
+        return fetched
+
+    def _lookup(self, key: tuple[str, str]) -> PriceSeries | None:
+        """Serie in cache non scaduta (da chiamare con il lock acquisito)."""
+        entry = self._cache.get(key)
+        if entry is None or self.clock() - entry[0] >= self.ttl:
+            return None
+        self._cache.move_to_end(key)
+        self.stats.hits += 1
+        return entry[1]
+
+    def fetch_prices_since(self, ticker: str, start: datetime) -> PriceSeries:
+        """Passa al fetcher sottostante (le code non vengono messe in cache)."""
+        return self.fetcher.fetch_prices_since(ticker, start)
+
+    def clear(self) -> None:
+        """Svuota la cache in memoria (i fetch in corso non sono toccati)."""
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -0,0 +1,169 @@
+"""
+Cache persistente delle risposte AI, indirizzata per contenuto.
+
+La chiave è lo SHA-256 di modello, system prompt e prompt renderizzato: a
+parità di dati il prompt è identico e la risposta viene riusata senza
+chiamare l'API. Con `tolerance` i numeri del prompt sono arrotondati a
+multipli della tolleranza prima dell'hash, così il rumore sull'ultima cifra
+decimale delle metriche non invalida la cache.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+
+DEFAULT_INSIGHT_CACHE_PATH = Path.home() / ".cache" / "portfolio-intelligence" / "insights.sqlite"
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS insights (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access INTEGER NOT NULL
+)
+"""
+
+
+@dataclass
+class CachedInsight:
+    """
+    Risposta AI in cache.
+
+    Attributes:
+        text: Testo della risposta
+        created_at: Momento in cui la risposta è stata generata
+    """
+    text: str
+    created_at: datetime
+
+
+def bucket_numbers(text: str, tolerance: float) -> str:
+    """
+    Sostituisce ogni numero con l'indice del suo multiplo di `tolerance` più vicino.
+
+    Es. con tolerance=0.05 "12.34%" e "12.36%" diventano entrambi "247%".
+
+    Raises:
+        ValueError: Se tolerance <= 0
+    """
+    if tolerance <= 0:
+        raise ValueError("La tolleranza deve essere maggiore di zero")
+    return _NUMBER.sub(lambda match: str(round(float(match.group()) / tolerance)), text)
+
+
+def insight_key(model: str, system_prompt: str | None, prompt: str, tolerance: float | None = None) -> str:
+    """
+    Calcola la chiave di cache di una richiesta.
+
+    Args:
+        model: Modello Claude
+        system_prompt: System prompt (None se assente)
+        prompt: Prompt renderizzato
+        tolerance: Se indicata, i numeri nel prompt sono arrotondati prima dell'hash
+
+    Returns:
+        Digest SHA-256 esadecimale
+    """
+    if tolerance:
+        prompt = bucket_numbers(prompt, tolerance)
+    digest = hashlib.sha256()
+    for part in (model, system_prompt or "", prompt):
+        encoded = part.encode()
+        # Lunghezza come prefisso: nessuna ambiguità tra i confini dei campi
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class InsightCache:
+    """
+    Store SQLite delle risposte AI con scadenza (TTL) ed eviction LRU.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_INSIGHT_CACHE_PATH,
+        ttl: timedelta = timedelta(days=7),
+        max_entries: int = 1_000,
+        tolerance: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            path: File del database (":memory:" per una cache volatile)
+            ttl: Durata di validità di una risposta
+            max_entries: Numero massimo di risposte conservate
+            tolerance: Tolleranza per il bucketing dei numeri nei prompt (None = esatto)
+            clock: Funzione che restituisce l'istante corrente (timestamp Unix)
+        """
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.tolerance = tolerance
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def key(self, model: str, system_prompt: str | None, prompt: str) -> str:
+        """Chiave di una richiesta con la tolleranza della cache."""
+        return insight_key(model, system_prompt, prompt, self.tolerance)
+
+    def get(self, key: str) -> CachedInsight | None:
+        """
+        Legge una risposta e ne aggiorna l'ultimo accesso.
+
+        Returns:
+            CachedInsight, o None se assente o scaduta (le scadute sono rimosse)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, created_at FROM insights WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            text, created_at = row
+            if self.clock() - created_at > self.ttl.total_seconds():
+                self._conn.execute("DELETE FROM insights WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE insights SET last_access = ? WHERE key = ?", (time.time_ns(), key)
+            )
+            self._conn.commit()
+        return CachedInsight(text=text, created_at=datetime.fromtimestamp(created_at))
+
+    def put(self, key: str, text: str) -> None:
+        """Salva (o sostituisce) una risposta e applica l'eviction."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO insights VALUES (?, ?, ?, ?)",
+                (key, text, self.clock(), time.time_ns()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM insights").fetchone()[0]
+
+    def _evict(self) -> None:
+        """Rimuove le risposte scadute, poi le meno usate oltre max_entries."""
+        self._conn.execute(
+            "DELETE FROM insights WHERE created_at < ?", (self.clock() - self.ttl.total_seconds(),)
+        )
+        self._conn.execute(
+            "DELETE FROM insights WHERE key NOT IN "
+            "(SELECT key FROM insights ORDER BY last_access DESC LIMIT ?)",
+            (self.max_entries,),
+        )
@@ -0,0 +1,246 @@
+"""
+Archivio locale di prezzi in formato binario, letto tramite memory map.
+
+Ogni ticker ha un file colonnare a larghezza fissa:
+
+    header (64 byte): magic, versione, numero di colonne, numero di barre
+    date   (barre × int64, nanosecondi)
+    open, high, low, close, volume (barre × float64 ciascuna)
+
+tutto little-endian, più un `index.json` con file, barre e intervallo di
+date di ogni ticker. Aprire una serie è una mmap del file: le colonne sono
+viste NumPy sulle pagine del file, senza parsing né copie, e il sistema
+operativo carica solo le pagine davvero lette (uno slice per periodo tocca
+solo la coda di una serie trentennale).
+"""
+import json
+import mmap
+import os
+import struct
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+import numpy as np
+from ..exceptions import TickerNotFoundError
+from ..models.price_series import PriceSeries
+from ..periods import period_start
+from .base import PriceFetcher
+
+
+DEFAULT_STORE_PATH = Path.home() / ".local" / "share" / "portfolio-intelligence" / "prices"
+
+MAGIC = b"PISTORE\x00"
+VERSION = 1
+HEADER_SIZE = 64
+INDEX_FILE = "index.json"
+
+_COLUMNS = ("open", "high", "low", "close", "volume")
+_HEADER = struct.Struct("<8sIIQ")
+
+
+def _file_name(ticker: str) -> str:
+    """Nome di file sicuro per un ticker (es. "^GSPC" → "%5EGSPC.bin")."""
+    return quote(ticker, safe="") + ".bin"
+
+
+def _sorted_unique(series: PriceSeries) -> PriceSeries:
+    """Ordina per data; se una data compare più volte vale l'ultima."""
+    _, last = np.unique(series.dates[::-1], return_index=True)
+    keep = len(series) - 1 - last
+    if np.array_equal(keep, np.arange(len(series))):
+        return series
+    return PriceSeries(dates=series.dates[keep], **{name: getattr(series, name)[keep] for name in _COLUMNS})
+
+
+class PriceStore:
+    """
+    Archivio su disco: un file binario per ticker più l'indice.
+
+    La scrittura di un file e dell'indice passa da un file temporaneo e
+    os.replace, quindi un lettore vede sempre la versione vecchia o quella
+    nuova per intero. Le serie già aperte restano valide dopo una
+    sostituzione (la mmap punta al file precedente).
+    """
+
+    def __init__(self, root: str | Path = DEFAULT_STORE_PATH):
+        """
+        Args:
+            root: Cartella dell'archivio (creata alla prima scrittura)
+        """
+        self.root = Path(root).expanduser()
+        index_path = self.root / INDEX_FILE
+        if index_path.exists():
+            self._index = json.loads(index_path.read_text())["tickers"]
+        else:
+            self._index = {}
+
+    def tickers(self) -> list[str]:
+        """Ticker presenti nell'archivio, in ordine alfabetico."""
+        return sorted(self._index)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._index
+
+    def info(self, ticker: str) -> dict:
+        """
+        Voce dell'indice di un ticker (file, barre, prima e ultima data).
+
+        Raises:
+            TickerNotFoundError: Se il ticker non è nell'archivio
+        """
+        try:
+            return self._index[ticker]
+        except KeyError:
+            raise TickerNotFoundError(ticker) from None
+
+    def open(self, ticker: str) -> PriceSeries:
+        """
+        Apre la serie di un ticker come viste su una memory map in sola lettura.
+
+        Args:
+            ticker: Simbolo dell'asset
+
+        Returns:
+            PriceSeries le cui colonne sono viste (zero-copy) sul file
+
+        Raises:
+            TickerNotFoundError: Se il ticker non è nell'archivio
+        """
+        entry = self.info(ticker)
+        with open(self.root / entry["file"], "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Array semplici (non np.memmap) sulla mappa: niente overhead per slice
+        data = np.frombuffer(
+            mapped, dtype="<f8", count=(1 + len(_COLUMNS)) * entry["rows"], offset=HEADER_SIZE
+        ).reshape(1 + len(_COLUMNS), entry["rows"])
+        return PriceSeries(
+            dates=data[0].view("<M8[ns]"),
+            **{name: data[i + 1] for i, name in enumerate(_COLUMNS)},
+        )
+
+    def write(self, ticker: str, series: PriceSeries, merge: bool = True) -> int:
+        """
+        Salva la serie di un ticker e aggiorna l'indice.
+
+        Args:
+            ticker: Simbolo dell'asset
+            series: Barre da salvare (anche non ordinate)
+            merge: Se True unisce le barre a quelle già presenti
+                (a parità di data vincono le nuove)
+
+        Returns:
+            Numero di barre salvate per il ticker
+
+        Raises:
+            ValueError: Se non resta nessuna barra da salvare
+        """
+        if merge and ticker in self._index:
+            series = PriceSeries.concat([self.open(ticker), series])
+        series = _sorted_unique(series)
+        if len(series) == 0:
+            raise ValueError(f"Nessuna barra da salvare per {ticker}")
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        name = _file_name(ticker)
+        header = _HEADER.pack(MAGIC, VERSION, 1 + len(_COLUMNS), len(series)).ljust(HEADER_SIZE, b"\0")
+        tmp = self.root / (name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(header)
+            np.ascontiguousarray(series.dates, dtype="<M8[ns]").tofile(f)
+            for column in _COLUMNS:
+                np.ascontiguousarray(getattr(series, column), dtype="<f8").tofile(f)
+        os.replace(tmp, self.root / name)
+
+        self._index[ticker] = {
+            "file": name,
+            "rows": len(series),
+            "start": str(series.dates[0].astype("datetime64[D]")),
+            "end": str(series.dates[-1].astype("datetime64[D]")),
+        }
+        self._save_index()
+        return len(series)
+
+    def _save_index(self) -> None:
+        tmp = self.root / (INDEX_FILE + ".tmp")
+        tmp.write_text(json.dumps({"version": VERSION, "tickers": self._index}, indent=1, sort_keys=True))
+        os.replace(tmp, self.root / INDEX_FILE)
+
+
+def read_header(path: str | Path) -> tuple[int, int]:
+    """
+    Legge l'header di un file dell'archivio.
+
+    Returns:
+        Tupla (versione, numero di barre)
+
+    Raises:
+        ValueError: Se il file non è nel formato dell'archivio
+    """
+    with open(path, "rb") as f:
+        magic, version, columns, rows = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != MAGIC or columns != 1 + len(_COLUMNS):
+        raise ValueError(f"{path} non è un file dell'archivio prezzi")
+    return version, rows
+
+
+class LocalStoreFetcher(PriceFetcher):
+    """
+    PriceFetcher che legge dall'archivio locale, senza rete.
+
+    I periodi sono calcolati a ritroso dall'ultima barra di ogni serie (o
+    da `as_of`), così un archivio fermo a una certa data restituisce
+    comunque il periodo richiesto. Le serie restituite sono viste sulla
+    memory map: nessuna copia finché non si calcola qualcosa.
+    """
+
+    def __init__(self, store: PriceStore | str | Path = DEFAULT_STORE_PATH, as_of: datetime | None = None):
+        """
+        Args:
+            store: Archivio (o la sua cartella)
+            as_of: Data di riferimento; le barre successive sono escluse
+        """
+        self.store = store if isinstance(store, PriceStore) else PriceStore(store)
+        self.as_of = as_of
+
+    def fetch_prices(self, ticker: str, period: str = "1y") -> PriceSeries:
+        """
+        Recupera i prezzi di un periodo dall'archivio.
+
+        Args:
+            ticker: Simbolo dell'asset
+            period: Periodo di tempo (es. "1mo", "1y", "max")
+
+        Returns:
+            PriceSeries (vista sulla memory map)
+
+        Raises:
+            TickerNotFoundError: Se il ticker non c'è o non ha barre nel periodo
+        """
+        series = self._open(ticker)
+        start = period_start(period, self.as_of or series.end)
+        if start is not None:
+            # Il giorno di inizio è incluso per intero, come fa yfinance
+            series = series.since(datetime.combine(start.date(), datetime.min.time()))
+        if len(series) == 0:
+            raise TickerNotFoundError(ticker)
+        return series
+
+    def fetch_prices_since(self, ticker: str, start: datetime) -> PriceSeries:
+        """
+        Recupera le barre da una data (inclusa) in poi.
+
+        Args:
+            ticker: Simbolo dell'asset
+            start: Prima data da includere
+
+        Returns:
+            PriceSeries (vista, eventualmente vuota)
+        """
+        return self._open(ticker).since(start)
+
+    def _open(self, ticker: str) -> PriceSeries:
+        series = self.store.open(ticker)
+        if self.as_of is not None:
+            end = np.searchsorted(series.dates, np.datetime64(self.as_of, "ns"), side="right")
+            series = series[:int(end)]
+        return series
@@ -1,20 +1,31 @@
 """
 Fetcher per dati da Yahoo Finance.
+
+yfinance (e con esso pandas) è importato solo alla prima richiesta: creare
+un YahooFetcher o importare questo modulo non costa nulla all'avvio della CLI.
 """
-import yfinance as yf
-from ..models.price_data import PriceData
+from datetime import datetime
+from ...profiling import span
+from ..models.price_series import PriceSeries
 from ..models.asset_info import AssetInfo
 from ..exceptions import TickerNotFoundError
+from .base import PriceFetcher, AssetInfoFetcher
+
+
+def _ticker(symbol: str):
+    """Crea lo yf.Ticker, importando yfinance al primo utilizzo."""
+    import yfinance as yf
+    return yf.Ticker(symbol)
 
 
-class YahooFetcher:
+class YahooFetcher(PriceFetcher, AssetInfoFetcher):
     """
     Implementazione del fetcher usando Yahoo Finance.
     
-    Implementa implicitamente PriceFetcher e AssetInfoFetcher.
+    Eredita da PriceFetcher il fetch_many concorrente di default.
     """
     
-    def fetch_prices(self, ticker: str, period: str = "1y") -> list[PriceData]:
+    def fetch_prices(self, ticker: str, period: str = "1y") -> PriceSeries:
         """
         Recupera i prezzi storici di un asset da Yahoo Finance.
         
@@ -23,30 +34,42 @@ class YahooFetcher:
             period: Periodo di tempo (es. "1mo", "3mo", "1y", "5y")
         
         Returns:
-            Lista di PriceData, uno per ogni giorno
+            PriceSeries colonnare (una riga per ogni giorno)
         
         Raises:
             TickerNotFoundError: Se il ticker non esiste o non ha dati
         """
-        asset = yf.Ticker(ticker)
-        hist = asset.history(period=period)
+        with span("yahoo"):
+            hist = _ticker(ticker).history(period=period)
         
         if hist.empty:
             raise TickerNotFoundError(ticker)
         
-        price_data_list = []
-        for date, row in hist.iterrows():
-            price_data = PriceData(
-                date=date.to_pydatetime(),
-                open=row['Open'],
-                high=row['High'],
-                low=row['Low'],
-                close=row['Close'],
-                volume=row['Volume']
-            )
-            price_data_list.append(price_data)
-        return price_data_list
-    
+        with span("conversione"):
+            return PriceSeries.from_dataframe(hist)
+
+    def fetch_prices_since(self, ticker: str, start: datetime) -> PriceSeries:
+        """
+        Recupera solo le barre a partire da una data (inclusa).
+
+        Usato dalla cache per scaricare la coda mancante di una serie.
+
+        Args:
+            ticker: Simbolo dell'asset
+            start: Prima data da recuperare
+
+        Returns:
+            PriceSeries con le nuove barre (vuota se non ce ne sono)
+        """
+        with span("yahoo"):
+            hist = _ticker(ticker).history(start=start.strftime("%Y-%m-%d"))
+
+        if hist.empty:
+            return PriceSeries.empty()
+
+        with span("conversione"):
+            return PriceSeries.from_dataframe(hist)
+
     def fetch_info(self, ticker: str) -> AssetInfo:
         """
         Recupera i metadati di un asset da Yahoo Finance.
@@ -60,7 +83,7 @@ class YahooFetcher:
         Raises:
             TickerNotFoundError: Se il ticker non esiste
         """
-        asset = yf.Ticker(ticker)
+        asset = _ticker(ticker)
         info = asset.info
         
         if not info or info.get('longName') is None:
@@ -77,7 +100,7 @@ class YahooFetcher:
 # Per retrocompatibilità, manteniamo le funzioni standalone
 _default_fetcher = YahooFetcher()
 
-def fetch_historical_prices(ticker: str, period: str = "1y") -> list[PriceData]:
+def fetch_historical_prices(ticker: str, period: str = "1y") -> PriceSeries:
     """Wrapper per retrocompatibilità."""
     return _default_fetcher.fetch_prices(ticker, period)
 
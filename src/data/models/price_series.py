@@ -0,0 +1,187 @@
+"""
+Serie storica di prezzi in formato colonnare (array NumPy).
+
+È la rappresentazione usata da fetcher, cache e analisi; PriceData resta
+disponibile come vista per riga.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, overload
+import numpy as np
+from .price_data import PriceData
+
+
+_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(eq=False)
+class PriceSeries:
+    """
+    Serie storica di prezzi in formato colonnare.
+
+    Ogni colonna è un array NumPy contiguo; le date sono un array datetime64
+    (ora locale della borsa, senza fuso). Per retrocompatibilità la serie si
+    comporta anche come una sequenza di PriceData: `len(series)`,
+    `series[i]` e l'iterazione costruiscono le righe solo quando servono.
+
+    Attributes:
+        dates: Date delle osservazioni (datetime64, ordine cronologico)
+        open: Prezzi di apertura
+        high: Prezzi massimi
+        low: Prezzi minimi
+        close: Prezzi di chiusura
+        volume: Volumi scambiati
+    """
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __post_init__(self):
+        n = len(self.dates)
+        for name in _COLUMNS:
+            if len(getattr(self, name)) != n:
+                raise ValueError(f"La colonna '{name}' ha lunghezza diversa dalle date")
+
+    @classmethod
+    def from_dataframe(cls, df) -> "PriceSeries":
+        """
+        Costruisce la serie dai buffer colonnari di un DataFrame yfinance.
+
+        Nessun lavoro per riga: ogni colonna viene convertita in blocco.
+        Un indice con fuso orario viene ridotto all'ora locale della borsa.
+
+        Args:
+            df: DataFrame con indice di date e colonne Open/High/Low/Close/Volume
+
+        Returns:
+            PriceSeries con gli stessi dati
+        """
+        index = df.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        return cls(
+            dates=index.to_numpy(dtype="datetime64[ns]"),
+            open=df["Open"].to_numpy(dtype=np.float64),
+            high=df["High"].to_numpy(dtype=np.float64),
+            low=df["Low"].to_numpy(dtype=np.float64),
+            close=df["Close"].to_numpy(dtype=np.float64),
+            volume=df["Volume"].to_numpy(dtype=np.float64),
+        )
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        """Restituisce una serie senza osservazioni."""
+        return cls(
+            dates=np.array([], dtype="datetime64[ns]"),
+            **{name: np.array([], dtype=np.float64) for name in _COLUMNS},
+        )
+
+    @classmethod
+    def concat(cls, parts: list["PriceSeries"]) -> "PriceSeries":
+        """
+        Unisce più serie in ordine cronologico.
+
+        Se una data compare in più parti vince la parte successiva,
+        così un aggiornamento sostituisce la barra già presente.
+
+        Args:
+            parts: Serie da unire, dalla più vecchia alla più recente
+
+        Returns:
+            PriceSeries ordinata e senza date duplicate
+        """
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        dates = np.concatenate([part.dates for part in parts])
+        # L'ultima occorrenza di ogni data vince: unique sulla serie invertita
+        _, last = np.unique(dates[::-1], return_index=True)
+        keep = len(dates) - 1 - last
+        return cls(
+            dates=dates[keep],
+            **{
+                name: np.concatenate([getattr(part, name) for part in parts])[keep]
+                for name in _COLUMNS
+            },
+        )
+
+    def since(self, start: datetime) -> "PriceSeries":
+        """
+        Restituisce la vista della serie a partire da una data (inclusa).
+
+        Args:
+            start: Prima data da includere
+
+        Returns:
+            PriceSeries (vista, senza copia)
+        """
+        i = np.searchsorted(self.dates, np.datetime64(start, "ns"), side="left")
+        return self[int(i):]
+
+    @classmethod
+    def from_price_data(cls, rows: list[PriceData]) -> "PriceSeries":
+        """
+        Costruisce la serie da una lista di PriceData.
+
+        Args:
+            rows: Lista di PriceData in ordine cronologico
+
+        Returns:
+            PriceSeries equivalente
+        """
+        return cls(
+            dates=np.array([row.date for row in rows], dtype="datetime64[ns]"),
+            **{
+                name: np.array([getattr(row, name) for row in rows], dtype=np.float64)
+                for name in _COLUMNS
+            },
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @overload
+    def __getitem__(self, key: int) -> PriceData: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> "PriceSeries": ...
+
+    def __getitem__(self, key):
+        """
+        Un indice intero restituisce un PriceData, uno slice una PriceSeries (vista).
+
+        Un volume mancante o non finito (es. NaN da yfinance) diventa 0.
+        """
+        if isinstance(key, slice):
+            return PriceSeries(
+                dates=self.dates[key],
+                **{name: getattr(self, name)[key] for name in _COLUMNS},
+            )
+        volume = self.volume[key]
+        return PriceData(
+            date=self.dates[key].astype("datetime64[us]").item(),
+            open=float(self.open[key]),
+            high=float(self.high[key]),
+            low=float(self.low[key]),
+            close=float(self.close[key]),
+            volume=int(volume) if np.isfinite(volume) else 0,
+        )
+
+    def __iter__(self) -> Iterator[PriceData]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def start(self) -> datetime:
+        """Data della prima osservazione."""
+        return self.dates[0].astype("datetime64[us]").item()
+
+    @property
+    def end(self) -> datetime:
+        """Data dell'ultima osservazione."""
+        return self.dates[-1].astype("datetime64[us]").item()
@@ -0,0 +1,48 @@
+"""
+Utility per i periodi in stile yfinance ("5d", "1wk", "3mo", "1y", "ytd", "max").
+"""
+import calendar
+from datetime import datetime, timedelta
+
+
+def _shift_months(moment: datetime, months: int) -> datetime:
+    """Sposta una data di `months` mesi, limitando il giorno alla fine del mese."""
+    month_index = moment.year * 12 + (moment.month - 1) + months
+    year, month = divmod(month_index, 12)
+    day = min(moment.day, calendar.monthrange(year, month + 1)[1])
+    return moment.replace(year=year, month=month + 1, day=day)
+
+
+def period_start(period: str, end: datetime) -> datetime | None:
+    """
+    Calcola la data di inizio di un periodo che termina in `end`.
+
+    Args:
+        period: Periodo (es. "5d", "1wk", "3mo", "1y", "ytd", "max")
+        end: Fine del periodo
+
+    Returns:
+        Data di inizio, o None per "max" (nessun limite)
+
+    Raises:
+        ValueError: Se il formato del periodo non è riconosciuto
+    """
+    period = period.lower().strip()
+
+    try:
+        if period == "max":
+            return None
+        if period == "ytd":
+            return end.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        if period.endswith("wk"):
+            return end - timedelta(weeks=float(period[:-2]))
+        if period.endswith("mo"):
+            return _shift_months(end, -int(period[:-2]))
+        if period.endswith("y"):
+            return _shift_months(end, -12 * int(period[:-1]))
+        if period.endswith("d"):
+            return end - timedelta(days=float(period[:-1]))
+    except ValueError:
+        pass
+
+    raise ValueError(f"Formato periodo non riconosciuto: {period}")
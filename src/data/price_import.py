@@ -0,0 +1,171 @@
+"""
+Import di file CSV di prezzi nell'archivio locale (vedi fetchers.local_store).
+
+Formati riconosciuti:
+- CSV di un solo ticker (es. `df.to_csv()` di yfinance): colonne Date (o
+  Datetime), Open, High, Low, Close, Volume; il ticker è il nome del file;
+- CSV "lungo" con una colonna Ticker: una riga per ticker e data;
+- dump di `yf.download` con più ticker: due righe di intestazione (campi e
+  ticker, in qualunque ordine) ed eventualmente una terza con "Date".
+
+Le colonne extra (Adj Close, Dividends, Stock Splits) sono ignorate. Le
+date con fuso orario sono ridotte all'ora locale della borsa, come in
+PriceSeries.from_dataframe; le righe senza chiusura sono scartate.
+"""
+import csv
+from pathlib import Path
+import numpy as np
+from .models.price_series import PriceSeries
+from .fetchers.local_store import PriceStore
+
+
+_FIELDS = ("open", "high", "low", "close", "volume")
+_KNOWN_FIELDS = set(_FIELDS) | {"adj close", "dividends", "stock splits", "capital gains"}
+_DATE_HEADERS = {"date", "datetime"}
+
+
+def _parse_dates(values: list[str]) -> np.ndarray:
+    """Date ISO, eventualmente con ora e fuso ("2024-01-02 00:00:00-05:00")."""
+    return np.array([value.strip()[:19].replace(" ", "T") for value in values], dtype="datetime64[ns]")
+
+
+def _parse_floats(values: list[str]) -> np.ndarray:
+    return np.array([value.strip() or "nan" for value in values], dtype=np.float64)
+
+
+def _build_series(dates: list[str], columns: dict[str, list[str]]) -> PriceSeries:
+    """Costruisce una serie dalle colonne testuali, scartando le righe senza chiusura."""
+    close = _parse_floats(columns["close"])
+    keep = ~np.isnan(close)
+    values = {
+        name: _parse_floats(columns[name])[keep] if name in columns else close[keep]
+        for name in ("open", "high", "low")
+    }
+    volume = _parse_floats(columns["volume"])[keep] if "volume" in columns else np.zeros(int(keep.sum()))
+    return PriceSeries(
+        dates=_parse_dates(dates)[keep],
+        close=close[keep],
+        volume=np.nan_to_num(volume),
+        **values,
+    )
+
+
+def _is_field_row(row: list[str]) -> bool:
+    cells = [cell.strip().lower() for cell in row[1:] if cell.strip()]
+    return bool(cells) and all(cell in _KNOWN_FIELDS for cell in cells)
+
+
+def _check_widths(path: Path, rows: list[list[str]], lines: list[int], start: int, width: int) -> None:
+    """
+    Controlla che le righe di dati (da `start`) abbiano almeno `width` celle.
+
+    Raises:
+        ValueError: Alla prima riga troncata, con file e numero di riga
+    """
+    for row, line in zip(rows[start:], lines[start:]):
+        if len(row) < width:
+            raise ValueError(f"{path}, riga {line}: {len(row)} colonne, ne servono almeno {width}")
+
+
+def read_price_csv(path: str | Path, ticker: str | None = None) -> dict[str, PriceSeries]:
+    """
+    Legge un CSV di prezzi in uno dei formati riconosciuti.
+
+    Args:
+        path: File CSV
+        ticker: Ticker da usare per un CSV di un solo ticker (default: nome del file)
+
+    Returns:
+        Dict {ticker: PriceSeries}
+
+    Raises:
+        ValueError: Se il formato non è riconosciuto o una riga è troncata
+    """
+    path = Path(path)
+    rows: list[list[str]] = []
+    lines: list[int] = []
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if row:
+                rows.append(row)
+                lines.append(reader.line_num)
+    if len(rows) < 2:
+        raise ValueError(f"{path}: nessun dato")
+
+    header = [cell.strip().lower() for cell in rows[0]]
+
+    # Dump multi-ticker di yf.download: campi e ticker su due righe, la
+    # prima cella è "Price"/"Ticker" o vuota (mai la colonna delle date)
+    if header[0] not in _DATE_HEADERS and (_is_field_row(rows[0]) or _is_field_row(rows[1])):
+        fields, tickers = (rows[0], rows[1]) if _is_field_row(rows[0]) else (rows[1], rows[0])
+        start = 2
+        if len(rows) > 2 and rows[2][0].strip().lower() in _DATE_HEADERS and not any(cell.strip() for cell in rows[2][1:]):
+            start = 3
+        body = rows[start:]
+        used = [
+            i for i in range(1, min(len(fields), len(tickers)))
+            if fields[i].strip().lower() in _FIELDS and tickers[i].strip()
+        ]
+        _check_widths(path, rows, lines, start, max(used, default=0) + 1)
+        columns: dict[str, dict[str, list[str]]] = {}
+        for i in used:
+            columns.setdefault(tickers[i].strip(), {})[fields[i].strip().lower()] = [row[i] for row in body]
+        dates = [row[0] for row in body]
+        return {
+            name: _build_series(dates, fields_by_name)
+            for name, fields_by_name in columns.items()
+            if "close" in fields_by_name
+        }
+
+    date_col = next((i for i, name in enumerate(header) if name in _DATE_HEADERS), None)
+    if date_col is None or "close" not in header:
+        raise ValueError(f"{path}: servono almeno le colonne Date e Close")
+    by_field = {name: i for i, name in enumerate(header) if name in _FIELDS}
+    ticker_col = next((header.index(name) for name in ("ticker", "symbol") if name in header), None)
+    _check_widths(path, rows, lines, 1, max(date_col, ticker_col or 0, *by_field.values()) + 1)
+    body = rows[1:]
+
+    # CSV lungo: una colonna con il ticker di ogni riga
+    if ticker_col is not None:
+        groups: dict[str, list[list[str]]] = {}
+        for row in body:
+            groups.setdefault(row[ticker_col].strip(), []).append(row)
+        return {
+            name: _build_series(
+                [row[date_col] for row in group],
+                {field: [row[i] for row in group] for field, i in by_field.items()},
+            )
+            for name, group in groups.items()
+        }
+
+    return {
+        ticker or path.stem: _build_series(
+            [row[date_col] for row in body],
+            {field: [row[i] for row in body] for field, i in by_field.items()},
+        )
+    }
+
+
+def import_files(store: PriceStore, paths: list[str | Path], ticker: str | None = None) -> dict[str, int]:
+    """
+    Importa più CSV nell'archivio, unendo le barre a quelle già presenti.
+
+    Args:
+        store: Archivio di destinazione
+        paths: File CSV da importare
+        ticker: Ticker per un CSV di un solo ticker (solo con un file)
+
+    Returns:
+        Dict {ticker: barre totali nell'archivio dopo l'import}
+
+    Raises:
+        ValueError: Se un file non è leggibile o `ticker` è dato con più file
+    """
+    if ticker is not None and len(paths) != 1:
+        raise ValueError("Il ticker esplicito si può usare con un solo file")
+    imported: dict[str, int] = {}
+    for path in paths:
+        for name, series in read_price_csv(path, ticker).items():
+            imported[name] = store.write(name, series)
+    return imported
@@ -0,0 +1,126 @@
+"""
+Allineamento per data di più serie di prezzi su un calendario comune.
+
+Asset quotati su borse diverse hanno festività diverse: combinarli per
+posizione mescola giorni diversi. Qui le serie sono unite per data con un
+unico merge ordinato: le date di tutte le serie vengono concatenate e
+ordinate con un sort stabile (timsort, che riconosce le k serie già
+ordinate come run e le fonde in O(n log k), praticamente lineare), poi
+ogni osservazione viene scritta nella sua riga con un solo assegnamento
+vettoriale.
+
+Modalità di join:
+- "inner": solo le date presenti in tutte le serie;
+- "ffill": unione delle date, i buchi sono riempiti con l'ultimo prezzo noto
+  (le righe prima che tutte le serie siano iniziate vengono scartate);
+- "union": unione delle date, i buchi restano NaN e sono indicati da `mask`.
+"""
+from dataclasses import dataclass
+import numpy as np
+from ..metrics import vectorized
+
+
+JOIN_MODES = ("inner", "ffill", "union")
+
+
+@dataclass(eq=False)
+class AlignedPrices:
+    """
+    Matrice dei prezzi allineata per data.
+
+    Attributes:
+        tickers: Ordine delle colonne
+        dates: Calendario comune, datetime64[D] crescente (T,)
+        prices: Prezzi (T, N); NaN dove manca il dato (solo modalità "union")
+        mask: True dove l'asset ha davvero quotato in quella data (T, N)
+        how: Modalità di join usata
+    """
+    tickers: list[str]
+    dates: np.ndarray
+    prices: np.ndarray
+    mask: np.ndarray
+    how: str
+
+    def returns(self) -> np.ndarray:
+        """
+        Rendimenti giornalieri (T-1, N) sul calendario comune.
+
+        Con "union" un rendimento è NaN se manca uno dei due prezzi.
+        """
+        return vectorized.returns_series(self.prices)
+
+    def column(self, ticker: str) -> np.ndarray:
+        """Prezzi allineati di un ticker."""
+        return self.prices[:, self.tickers.index(ticker)]
+
+
+def _forward_fill(prices: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Sostituisce i buchi con l'ultimo valore osservato della colonna."""
+    rows = np.where(mask, np.arange(len(prices))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return np.take_along_axis(prices, rows, axis=0)
+
+
+def align_prices(
+    series: dict[str, tuple[np.ndarray, np.ndarray]],
+    how: str = "inner",
+) -> AlignedPrices:
+    """
+    Allinea più serie (date, prezzi) su un calendario comune.
+
+    Le date sono ridotte al giorno (datetime64[D]), così le chiusure di
+    borse in fusi diversi cadono sulla stessa riga. Se una serie ha più
+    osservazioni nello stesso giorno vale l'ultima.
+
+    Args:
+        series: Dict {ticker: (date, prezzi)} con date in ordine cronologico
+        how: "inner", "ffill" oppure "union"
+
+    Returns:
+        AlignedPrices con le colonne nell'ordine di `series`
+
+    Raises:
+        ValueError: Se la modalità non esiste, non ci sono serie o
+            (inner/ffill) non resta nessuna data comune
+    """
+    if how not in JOIN_MODES:
+        raise ValueError(f"Modalità di join non supportata: {how} (disponibili: {', '.join(JOIN_MODES)})")
+    if not series:
+        raise ValueError("Serve almeno una serie da allineare")
+
+    tickers = list(series)
+    lengths = [len(dates) for dates, _ in series.values()]
+    for ticker, (dates, values) in series.items():
+        if len(dates) != len(values):
+            raise ValueError(f"Date e prezzi di {ticker} hanno lunghezze diverse")
+
+    all_dates = np.concatenate([np.asarray(dates).astype("datetime64[D]") for dates, _ in series.values()])
+    all_values = np.concatenate([vectorized.as_array(values) for _, values in series.values()])
+    owners = np.repeat(np.arange(len(tickers)), lengths)
+
+    # Un solo merge: ordinamento stabile delle date concatenate
+    order = np.argsort(all_dates, kind="stable")
+    sorted_dates = all_dates[order]
+    is_new = np.empty(len(sorted_dates), dtype=bool)
+    is_new[:1] = True
+    np.not_equal(sorted_dates[1:], sorted_dates[:-1], out=is_new[1:])
+    rows = np.cumsum(is_new) - 1
+
+    calendar = sorted_dates[is_new]
+    prices = np.full((len(calendar), len(tickers)), np.nan)
+    mask = np.zeros((len(calendar), len(tickers)), dtype=bool)
+    prices[rows, owners[order]] = all_values[order]
+    mask[rows, owners[order]] = True
+
+    if how == "inner":
+        keep = mask.all(axis=1)
+        calendar, prices, mask = calendar[keep], prices[keep], mask[keep]
+    elif how == "ffill":
+        prices = _forward_fill(prices, mask)
+        started = np.logical_or.accumulate(mask, axis=0).all(axis=1)
+        calendar, prices, mask = calendar[started], prices[started], mask[started]
+
+    if how != "union" and len(calendar) == 0:
+        raise ValueError("Le serie non hanno date in comune")
+
+    return AlignedPrices(tickers=tickers, dates=calendar, prices=prices, mask=mask, how=how)
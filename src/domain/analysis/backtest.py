@@ -0,0 +1,239 @@
+"""
+Backtest storico del portafoglio con politiche di ribilanciamento.
+
+Il portafoglio parte dai pesi target e lascia derivare i pesi con i prezzi;
+una politica decide quando riportarli al target:
+- "none": mai (buy and hold);
+- calendario ("monthly", "quarterly", "annual"): il primo giorno di
+  trading di ogni nuovo mese/trimestre/anno;
+- bande ("band:5%"): quando un peso si scosta dal target più della banda;
+- combinazioni ("quarterly+band:10%"): se scatta una delle due condizioni.
+
+Tutte le politiche sono simulate insieme: lo stato è una matrice (P, N) di
+controvalori, una riga per politica, e ogni giorno è un'unica operazione
+vettoriale su tutte le righe. Il loop Python è solo sul tempo (le bande
+dipendono dal percorso), quindi confrontare 20 politiche costa poco più
+che simularne una.
+"""
+from dataclasses import dataclass
+import numpy as np
+from ..metrics import vectorized
+
+
+FREQUENCIES = {"monthly": 1, "quarterly": 3, "annual": 12}
+DEFAULT_POLICIES = ("none", "monthly", "quarterly", "band:5%")
+
+
+@dataclass(frozen=True)
+class RebalancePolicy:
+    """
+    Regola di ribilanciamento.
+
+    Attributes:
+        name: Nome leggibile (es. "quarterly+band:5%")
+        frequency: "monthly", "quarterly", "annual" oppure None
+        band: Scostamento massimo di un peso dal target (es. 0.05), oppure None
+    """
+    name: str
+    frequency: str | None = None
+    band: float | None = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "RebalancePolicy":
+        """
+        Interpreta una specifica testuale.
+
+        Args:
+            spec: "none", "monthly", "quarterly", "annual", "band:5%" (o
+                "band:0.05"), oppure più condizioni unite da "+"
+
+        Returns:
+            RebalancePolicy corrispondente
+
+        Raises:
+            ValueError: Se la specifica non è riconosciuta
+        """
+        frequency, band = None, None
+        for part in spec.lower().strip().split("+"):
+            part = part.strip()
+            if part in ("none", "buy-and-hold"):
+                continue
+            if part in FREQUENCIES:
+                frequency = part
+            elif part.startswith("band:"):
+                value = part[5:]
+                try:
+                    band = float(value[:-1]) / 100 if value.endswith("%") else float(value)
+                except ValueError:
+                    raise ValueError(f"Banda non valida: {value}") from None
+                if band <= 0:
+                    raise ValueError(f"La banda deve essere positiva: {value}")
+            else:
+                raise ValueError(
+                    f"Politica non riconosciuta: {part} "
+                    f"(usa none, {', '.join(FREQUENCIES)}, band:X%)"
+                )
+        return cls(name=spec.strip(), frequency=frequency, band=band)
+
+
+@dataclass(eq=False)
+class BacktestResult:
+    """
+    Risultato del backtest, una colonna per politica.
+
+    Attributes:
+        policies: Politiche simulate (P)
+        tickers: Ordine degli asset
+        dates: Date del backtest (T,)
+        equity: Valore del portafoglio per data e politica (T, P)
+        rebalances: Numero di ribilanciamenti (P,)
+        turnover: Turnover totale one-way, ½ Σ|Δw| sommato sui ribilanciamenti (P,)
+        annual_turnover: Turnover medio per anno (P,)
+        costs: Costi di transazione pagati, in valuta (P,)
+        total_return: Rendimento totale (P,)
+        cagr: Tasso di crescita annuo composto (P,)
+        volatility: Volatilità annualizzata (P,)
+        max_drawdown: Massimo drawdown (P,)
+        sharpe_ratio: (CAGR − risk-free) / volatilità (P,)
+        final_weights: Pesi a fine periodo (P, N)
+    """
+    policies: list[RebalancePolicy]
+    tickers: list[str]
+    dates: np.ndarray
+    equity: np.ndarray
+    rebalances: np.ndarray
+    turnover: np.ndarray
+    annual_turnover: np.ndarray
+    costs: np.ndarray
+    total_return: np.ndarray
+    cagr: np.ndarray
+    volatility: np.ndarray
+    max_drawdown: np.ndarray
+    sharpe_ratio: np.ndarray
+    final_weights: np.ndarray
+
+
+def calendar_schedule(dates: np.ndarray, policies: list[RebalancePolicy]) -> np.ndarray:
+    """
+    Giorni di ribilanciamento da calendario di ogni politica.
+
+    Args:
+        dates: Date di trading in ordine cronologico (T,)
+        policies: Politiche (P)
+
+    Returns:
+        Matrice booleana (T, P): True il primo giorno di ogni nuovo periodo
+    """
+    months = np.asarray(dates).astype("datetime64[M]").astype(np.int64)
+    schedule = np.zeros((len(months), len(policies)), dtype=bool)
+    for j, policy in enumerate(policies):
+        if policy.frequency is not None:
+            bucket = months // FREQUENCIES[policy.frequency]
+            schedule[1:, j] = bucket[1:] != bucket[:-1]
+    return schedule
+
+
+def backtest(
+    prices: np.ndarray,
+    weights,
+    dates: np.ndarray,
+    policies: list[RebalancePolicy | str] = DEFAULT_POLICIES,
+    tickers: list[str] | None = None,
+    transaction_cost: float = 0.0,
+    initial_value: float = 1.0,
+    risk_free_rate: float = 0.02,
+    trading_days: int = 252,
+) -> BacktestResult:
+    """
+    Simula il portafoglio sulla storia con più politiche di ribilanciamento.
+
+    Ad ogni ribilanciamento si paga `transaction_cost` sul controvalore
+    scambiato e il valore rimanente viene riportato ai pesi target.
+
+    Args:
+        prices: Prezzi allineati per data (T, N)
+        weights: Pesi target (N,), con somma 1
+        dates: Date corrispondenti alle righe (T,)
+        policies: Politiche (oggetti o specifiche testuali)
+        tickers: Nomi delle colonne (default "0", "1", ...)
+        transaction_cost: Costo per unità scambiata (es. 0.001 = 10 bp)
+        initial_value: Valore iniziale del portafoglio
+        risk_free_rate: Tasso risk-free annuo per lo Sharpe
+        trading_days: Giorni di trading in un anno
+
+    Returns:
+        BacktestResult con una colonna per politica
+
+    Raises:
+        ValueError: Se le dimensioni non coincidono o i dati sono insufficienti
+    """
+    prices = vectorized.as_array(prices)
+    if prices.ndim == 1:
+        prices = prices[:, None]
+    weights = vectorized.as_array(weights)
+    if prices.shape[1] != len(weights):
+        raise ValueError("Prezzi e pesi devono avere lo stesso numero di asset")
+    if len(dates) != len(prices):
+        raise ValueError("Date e prezzi devono avere la stessa lunghezza")
+    if len(prices) < 2:
+        raise ValueError("Servono almeno 2 date per il backtest")
+    if transaction_cost < 0:
+        raise ValueError("Il costo di transazione non può essere negativo")
+
+    policies = [p if isinstance(p, RebalancePolicy) else RebalancePolicy.parse(p) for p in policies]
+    if not policies:
+        raise ValueError("Serve almeno una politica di ribilanciamento")
+    tickers = list(tickers) if tickers is not None else [str(i) for i in range(len(weights))]
+
+    growth = prices[1:] / prices[:-1]
+    schedule = calendar_schedule(dates, policies)
+    bands = np.array([np.inf if p.band is None else p.band for p in policies])
+
+    n_policies = len(policies)
+    holdings = np.outer(np.full(n_policies, initial_value), weights)
+    equity = np.empty((len(prices), n_policies))
+    equity[0] = initial_value
+    turnover = np.zeros(n_policies)
+    costs = np.zeros(n_policies)
+    rebalances = np.zeros(n_policies, dtype=np.int64)
+
+    for t in range(1, len(prices)):
+        holdings *= growth[t - 1]
+        value = holdings.sum(axis=1)
+        trades = value[:, None] * weights - holdings
+        drift = np.abs(trades).max(axis=1) / value
+        rebalance = schedule[t] | (drift > bands)
+        if rebalance.any():
+            traded = np.abs(trades).sum(axis=1) * rebalance
+            turnover += 0.5 * traded / value
+            cost = traded * transaction_cost
+            costs += cost
+            value = value - cost
+            rebalances += rebalance
+            holdings = np.where(rebalance[:, None], value[:, None] * weights, holdings)
+        equity[t] = value
+
+    years = (dates[-1] - dates[0]) / np.timedelta64(1, "D") / 365.25
+    daily = vectorized.returns_series(equity)
+    total = equity[-1] / equity[0] - 1
+    cagr = (equity[-1] / equity[0]) ** (1 / years) - 1 if years > 0 else np.full(n_policies, np.nan)
+    volatility = vectorized.annualized_volatility(daily, trading_days) if len(daily) > 1 else np.full(n_policies, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(volatility > 0, (cagr - risk_free_rate) / volatility, np.nan)
+
+    return BacktestResult(
+        policies=policies,
+        tickers=tickers,
+        dates=np.asarray(dates),
+        equity=equity,
+        rebalances=rebalances,
+        turnover=turnover,
+        annual_turnover=turnover / years if years > 0 else turnover,
+        costs=costs,
+        total_return=total,
+        cagr=cagr,
+        volatility=volatility,
+        max_drawdown=vectorized.max_drawdown(equity),
+        sharpe_ratio=sharpe,
+        final_weights=holdings / holdings.sum(axis=1, keepdims=True),
+    )
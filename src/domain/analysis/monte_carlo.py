@@ -0,0 +1,216 @@
+"""
+Proiezione Monte Carlo del valore di portafoglio.
+
+Due modalità:
+- "bootstrap": ricampiona con reinserimento i giorni storici (preserva code
+  grasse e correlazioni del giorno, non l'autocorrelazione);
+- "gbm": moto browniano geometrico correlato, con media e covarianza dei
+  rendimenti logaritmici storici.
+
+I pesi sono mantenuti costanti (ribilanciamento giornaliero). I percorsi sono
+simulati a blocchi (chunk) completamente vettorizzati, così la memoria resta
+limitata anche con 100k+ percorsi su orizzonti pluriennali. I chunk possono
+essere distribuiti su un pool di processi: ogni chunk ha il proprio seme
+derivato da SeedSequence, quindi il risultato non dipende dal numero di worker.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+from ..metrics import vectorized
+
+
+MODES = ("bootstrap", "gbm")
+DEFAULT_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+
+# Elementi massimi generati in un colpo (chunk × giorni × asset): limita la memoria
+_BLOCK_ELEMENTS = 4_000_000
+_MAX_BLOCK_DAYS = 63
+
+
+@dataclass(eq=False)
+class MonteCarloResult:
+    """
+    Distribuzione simulata del valore di portafoglio.
+
+    Attributes:
+        mode: Modalità di simulazione ("bootstrap" o "gbm")
+        n_paths: Numero di percorsi simulati
+        horizon_days: Orizzonte in giorni di trading
+        checkpoints: Giorni (da 1 a horizon_days) in cui sono calcolate le bande
+        percentiles: Percentili calcolati (es. 5, 50, 95)
+        bands: Valori per percentile e checkpoint, forma (len(percentiles), len(checkpoints))
+        probability_of_loss: Probabilità che il valore finale sia sotto quello iniziale
+        expected_value: Valore finale medio
+        initial_value: Valore iniziale del portafoglio
+    """
+    mode: str
+    n_paths: int
+    horizon_days: int
+    checkpoints: np.ndarray
+    percentiles: tuple[float, ...]
+    bands: np.ndarray
+    probability_of_loss: float
+    expected_value: float
+    initial_value: float
+
+
+@dataclass(eq=False)
+class _SimulationParams:
+    """Parametri condivisi da tutti i chunk di una simulazione."""
+    mode: str
+    horizon_days: int
+    checkpoints: np.ndarray
+    weights: np.ndarray
+    portfolio_returns: np.ndarray | None = None
+    log_mean: np.ndarray | None = None
+    log_cov_root: np.ndarray | None = None
+
+
+# Parametri del worker corrente, impostati una volta dall'initializer del pool
+_worker_params: _SimulationParams | None = None
+
+
+def _init_worker(params: _SimulationParams) -> None:
+    global _worker_params
+    _worker_params = params
+
+
+def _matrix_root(cov: np.ndarray) -> np.ndarray:
+    """Radice L con L Lᵀ = cov (Cholesky, o autovalori se cov è singolare)."""
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(cov)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+def _simulate_chunk(params: _SimulationParams, n_paths: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Simula un chunk di percorsi e restituisce i valori ai checkpoint.
+
+    Returns:
+        Matrice (n_paths, len(checkpoints)) di valori relativi (1.0 = iniziale)
+    """
+    rng = np.random.default_rng(seed)
+    log_value = np.zeros(n_paths)
+    out = np.empty((n_paths, len(params.checkpoints)))
+    # Indice (0-based) dell'ultimo giorno di ogni checkpoint
+    targets = params.checkpoints - 1
+    next_target = 0
+
+    width = len(params.weights) if params.mode == "gbm" else 1
+    block = max(1, min(_MAX_BLOCK_DAYS, _BLOCK_ELEMENTS // (n_paths * width)))
+
+    for start in range(0, params.horizon_days, block):
+        days = min(params.horizon_days - start, block)
+
+        if params.mode == "bootstrap":
+            picks = rng.integers(0, len(params.portfolio_returns), size=(n_paths, days))
+            daily = params.portfolio_returns[picks]
+        else:
+            shocks = rng.standard_normal((n_paths, days, len(params.weights)))
+            asset_log = params.log_mean + shocks @ params.log_cov_root.T
+            daily = np.expm1(asset_log) @ params.weights
+
+        path = log_value[:, None] + np.cumsum(np.log1p(daily), axis=1)
+        while next_target < len(targets) and targets[next_target] < start + days:
+            out[:, next_target] = path[:, targets[next_target] - start]
+            next_target += 1
+        log_value = path[:, -1]
+
+    return np.exp(out)
+
+
+def _run_chunk(n_paths: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """Entry point dei worker: usa i parametri impostati dall'initializer."""
+    return _simulate_chunk(_worker_params, n_paths, seed)
+
+
+def simulate_portfolio(
+    returns: np.ndarray,
+    weights,
+    horizon_days: int = 252,
+    n_paths: int = 100_000,
+    mode: str = "bootstrap",
+    chunk_size: int = 5_000,
+    workers: int | None = 1,
+    seed: int | None = None,
+    percentiles: tuple[float, ...] = DEFAULT_PERCENTILES,
+    n_checkpoints: int = 12,
+    initial_value: float = 1.0,
+) -> MonteCarloResult:
+    """
+    Simula la distribuzione del valore futuro del portafoglio.
+
+    Args:
+        returns: Rendimenti giornalieri storici allineati (T, N)
+        weights: Pesi del portafoglio (N,)
+        horizon_days: Orizzonte in giorni di trading (es. 252 × anni)
+        n_paths: Numero di percorsi
+        mode: "bootstrap" oppure "gbm"
+        chunk_size: Percorsi simulati per chunk (limita la memoria)
+        workers: Processi da usare (1 = nel processo corrente, None = tutte le CPU)
+        seed: Seme per la riproducibilità
+        percentiles: Percentili delle bande
+        n_checkpoints: Numero di istanti (equispaziati) in cui calcolare le bande
+        initial_value: Valore iniziale del portafoglio
+
+    Returns:
+        MonteCarloResult con bande percentili e probabilità di perdita
+
+    Raises:
+        ValueError: Se la modalità non esiste o i parametri non sono validi
+    """
+    if mode not in MODES:
+        raise ValueError(f"Modalità non supportata: {mode} (disponibili: {', '.join(MODES)})")
+    if horizon_days < 1 or n_paths < 1 or chunk_size < 1:
+        raise ValueError("horizon_days, n_paths e chunk_size devono essere positivi")
+
+    returns = vectorized.as_array(returns)
+    if returns.ndim == 1:
+        returns = returns[:, None]
+    weights = vectorized.as_array(weights)
+    if returns.shape[1] != len(weights):
+        raise ValueError("Rendimenti e pesi devono avere lo stesso numero di asset")
+    if returns.shape[0] < 2:
+        raise ValueError("Servono almeno 2 rendimenti storici")
+
+    steps = min(n_checkpoints, horizon_days)
+    checkpoints = np.unique(np.linspace(0, horizon_days, steps + 1)[1:].round().astype(int))
+    params = _SimulationParams(mode=mode, horizon_days=horizon_days, checkpoints=checkpoints, weights=weights)
+    if mode == "bootstrap":
+        params.portfolio_returns = returns @ weights
+    else:
+        log_returns = np.log1p(returns)
+        params.log_mean = log_returns.mean(axis=0)
+        params.log_cov_root = _matrix_root(vectorized.covariance_matrix(log_returns))
+
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sizes) == 1:
+        chunks = [_simulate_chunk(params, size, child) for size, child in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(sizes)), initializer=_init_worker, initargs=(params,)
+        ) as pool:
+            chunks = list(pool.map(_run_chunk, sizes, seeds))
+
+    values = np.concatenate(chunks) * initial_value
+    final = values[:, -1]
+
+    return MonteCarloResult(
+        mode=mode,
+        n_paths=n_paths,
+        horizon_days=horizon_days,
+        checkpoints=checkpoints,
+        percentiles=tuple(percentiles),
+        bands=np.percentile(values, percentiles, axis=0),
+        probability_of_loss=float(np.mean(final < initial_value)),
+        expected_value=float(final.mean()),
+        initial_value=initial_value,
+    )
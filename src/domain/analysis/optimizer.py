@@ -0,0 +1,256 @@
+"""
+Ottimizzatore media-varianza e frontiera efficiente.
+
+Per ogni livello di avversione al rischio λ si risolve
+
+    min_w  ½ wᵀΣw − λ μᵀw    con  Σw = 1,  lo ≤ w ≤ hi
+
+con un gradiente proiettato accelerato (FISTA). Tutti i λ della frontiera
+sono risolti insieme: i pesi candidati sono una matrice (K, N) e ogni
+iterazione è un unico prodotto matriciale W Σ, senza un'analisi per vettore
+di pesi. λ = 0 dà il portafoglio a varianza minima; il massimo Sharpe è
+cercato sulla frontiera e raffinato con una seconda griglia più fitta.
+"""
+from dataclasses import dataclass
+import numpy as np
+from ..metrics import vectorized
+
+
+@dataclass(eq=False)
+class OptimizedPortfolio:
+    """
+    Un portafoglio sulla frontiera efficiente.
+
+    Attributes:
+        tickers: Ordine degli asset
+        weights: Pesi ottimali (N,)
+        expected_return: Rendimento atteso annualizzato
+        volatility: Volatilità annualizzata
+        sharpe_ratio: Sharpe ratio annualizzato
+    """
+    tickers: list[str]
+    weights: np.ndarray
+    expected_return: float
+    volatility: float
+    sharpe_ratio: float
+
+    def weights_by_ticker(self, min_weight: float = 0.0) -> dict[str, float]:
+        """Pesi per ticker, omettendo quelli in valore assoluto sotto `min_weight`."""
+        return {
+            ticker: float(weight)
+            for ticker, weight in zip(self.tickers, self.weights)
+            if abs(weight) > min_weight
+        }
+
+
+@dataclass(eq=False)
+class EfficientFrontier:
+    """
+    Frontiera efficiente e portafogli notevoli.
+
+    Attributes:
+        tickers: Ordine degli asset
+        expected_returns: Rendimenti attesi dei punti della frontiera (K,)
+        volatilities: Volatilità dei punti della frontiera (K,)
+        weights: Pesi dei punti della frontiera (K, N)
+        min_variance: Portafoglio a varianza minima
+        max_sharpe: Portafoglio con Sharpe massimo
+    """
+    tickers: list[str]
+    expected_returns: np.ndarray
+    volatilities: np.ndarray
+    weights: np.ndarray
+    min_variance: OptimizedPortfolio
+    max_sharpe: OptimizedPortfolio
+
+
+def evaluate_portfolios(weights: np.ndarray, mean: np.ndarray, cov: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Valuta un batch di portafogli con due prodotti matriciali.
+
+    Args:
+        weights: Pesi candidati (K, N)
+        mean: Rendimenti attesi (N,)
+        cov: Matrice di covarianza (N, N)
+
+    Returns:
+        Tupla (rendimenti attesi (K,), volatilità (K,))
+    """
+    returns = weights @ mean
+    variances = np.einsum("kn,kn->k", weights @ cov, weights)
+    return returns, np.sqrt(np.maximum(variances, 0.0))
+
+
+def project_capped_simplex(values: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """
+    Proietta ogni riga su {w : Σw = 1, lower ≤ w ≤ upper}.
+
+    La proiezione è clip(v − τ, lower, upper). f(τ) = Σ clip(v − τ, lower, upper)
+    è lineare a tratti e decrescente, con punti di rottura in v − upper e
+    v − lower: ordinandoli, f si valuta su tutti i punti con una somma
+    cumulativa e τ si ottiene per interpolazione, in parallelo su tutte le righe.
+
+    Args:
+        values: Punti da proiettare (K, N)
+        lower: Limiti inferiori (N,)
+        upper: Limiti superiori (N,)
+
+    Returns:
+        Punti proiettati (K, N)
+    """
+    k, n = values.shape
+    breakpoints = np.concatenate([values - upper, values - lower], axis=1)
+    # Oltre v − upper un peso diventa libero (pendenza −1), oltre v − lower si ferma
+    slope_change = np.concatenate([np.full((k, n), -1.0), np.full((k, n), 1.0)], axis=1)
+
+    order = np.argsort(breakpoints, axis=1)
+    breakpoints = np.take_along_axis(breakpoints, order, axis=1)
+    slopes = np.cumsum(np.take_along_axis(slope_change, order, axis=1), axis=1)
+
+    # f al primo punto di rottura vale Σ upper; poi cresce di pendenza × intervallo
+    steps = slopes[:, :-1] * np.diff(breakpoints, axis=1)
+    levels = upper.sum() + np.concatenate([np.zeros((k, 1)), np.cumsum(steps, axis=1)], axis=1)
+
+    # Ultimo punto con f ≥ 1, poi interpolazione lineare nel tratto successivo
+    j = np.clip((levels >= 1.0).sum(axis=1) - 1, 0, 2 * n - 1)[:, None]
+    level = np.take_along_axis(levels, j, axis=1)
+    slope = np.take_along_axis(slopes, j, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tau = np.take_along_axis(breakpoints, j, axis=1) + np.where(slope < 0, (level - 1.0) / -slope, 0.0)
+    return np.clip(values - tau, lower, upper)
+
+
+def _solve_batch(
+    mean: np.ndarray,
+    cov: np.ndarray,
+    lambdas: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    max_iter: int,
+    tolerance: float,
+) -> np.ndarray:
+    """Risolve il problema media-varianza per tutti i λ insieme (FISTA)."""
+    step = 1.0 / max(np.linalg.eigvalsh(cov)[-1], 1e-18)
+    n = len(mean)
+    start = project_capped_simplex(np.full((1, n), 1.0 / n), lower, upper)
+    weights = np.repeat(start, len(lambdas), axis=0)
+    momentum = weights.copy()
+    t = 1.0
+    linear = lambdas[:, None] * mean[None, :]
+
+    for _ in range(max_iter):
+        gradient = momentum @ cov - linear
+        updated = project_capped_simplex(momentum - step * gradient, lower, upper)
+        # Riavvio adattivo: se il momento va contro il gradiente si riparte da t = 1
+        if np.sum((momentum - updated) * (updated - weights)) > 0:
+            t = 1.0
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        change = np.abs(updated - weights).max()
+        momentum = updated + ((t - 1) / t_next) * (updated - weights)
+        weights, t = updated, t_next
+        if change < tolerance:
+            break
+    return weights
+
+
+def _bounds(
+    tickers: list[str],
+    long_only: bool,
+    bounds: dict[str, tuple[float, float]] | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    default = (0.0, 1.0) if long_only else (-1.0, 1.0)
+    lower = np.empty(len(tickers))
+    upper = np.empty(len(tickers))
+    for i, ticker in enumerate(tickers):
+        lo, hi = (bounds or {}).get(ticker, default)
+        if long_only:
+            lo = max(lo, 0.0)
+        if lo > hi:
+            raise ValueError(f"Limiti non validi per {ticker}: {lo} > {hi}")
+        lower[i], upper[i] = lo, hi
+    if lower.sum() > 1.0 + 1e-12 or upper.sum() < 1.0 - 1e-12:
+        raise ValueError("I limiti dei pesi non ammettono un portafoglio con somma 1")
+    return lower, upper
+
+
+def _point(tickers, weights, expected_return, volatility, risk_free_rate) -> OptimizedPortfolio:
+    return OptimizedPortfolio(
+        tickers=list(tickers),
+        weights=weights,
+        expected_return=float(expected_return),
+        volatility=float(volatility),
+        sharpe_ratio=float((expected_return - risk_free_rate) / volatility) if volatility > 0 else float("nan"),
+    )
+
+
+def efficient_frontier(
+    returns: np.ndarray,
+    tickers: list[str],
+    risk_free_rate: float = 0.02,
+    long_only: bool = True,
+    bounds: dict[str, tuple[float, float]] | None = None,
+    n_points: int = 50,
+    trading_days: int = 252,
+    max_iter: int = 3_000,
+    tolerance: float = 1e-9,
+) -> EfficientFrontier:
+    """
+    Calcola la frontiera efficiente e i portafogli a varianza minima e Sharpe massimo.
+
+    Args:
+        returns: Rendimenti giornalieri allineati (T, N)
+        tickers: Ticker corrispondenti alle colonne
+        risk_free_rate: Tasso risk-free annuo per lo Sharpe (default 2%)
+        long_only: Se True i pesi non possono essere negativi
+        bounds: Limiti (min, max) per ticker; default (0, 1), o (-1, 1) se long_only=False
+        n_points: Numero di punti della frontiera
+        trading_days: Giorni di trading in un anno (default 252)
+        max_iter: Iterazioni massime del gradiente proiettato
+        tolerance: Variazione massima dei pesi per considerare la soluzione convergente
+
+    Returns:
+        EfficientFrontier ordinata per volatilità crescente
+
+    Raises:
+        ValueError: Se le dimensioni non coincidono o i limiti non sono ammissibili
+    """
+    returns = vectorized.as_array(returns)
+    if returns.ndim != 2 or returns.shape[1] != len(tickers):
+        raise ValueError("La matrice dei rendimenti deve avere una colonna per ticker")
+
+    mean = returns.mean(axis=0) * trading_days
+    cov = vectorized.covariance_matrix(returns) * trading_days
+    lower, upper = _bounds(tickers, long_only, bounds)
+
+    # Scala di λ: da 0 (varianza minima) fino a dove domina il rendimento
+    spread = max(float(np.ptp(mean)), 1e-12)
+    scale = float(np.trace(cov)) / len(tickers) / spread
+    lambdas = np.concatenate([[0.0], scale * np.logspace(-3, 3, n_points - 1)])
+
+    weights = _solve_batch(mean, cov, lambdas, lower, upper, max_iter, tolerance)
+    exp_returns, vols = evaluate_portfolios(weights, mean, cov)
+
+    # Raffina il massimo Sharpe tra i λ vicini al migliore della griglia
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(vols > 0, (exp_returns - risk_free_rate) / vols, -np.inf)
+    best = int(np.argmax(sharpe))
+    fine_lambdas = np.linspace(lambdas[max(best - 1, 0)], lambdas[min(best + 1, len(lambdas) - 1)], 25)
+    fine_weights = _solve_batch(mean, cov, fine_lambdas, lower, upper, max_iter, tolerance)
+    fine_returns, fine_vols = evaluate_portfolios(fine_weights, mean, cov)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fine_sharpe = np.where(fine_vols > 0, (fine_returns - risk_free_rate) / fine_vols, -np.inf)
+    fine_best = int(np.argmax(fine_sharpe))
+    if fine_sharpe[fine_best] >= sharpe[best]:
+        best_point = (fine_weights[fine_best], fine_returns[fine_best], fine_vols[fine_best])
+    else:
+        best_point = (weights[best], exp_returns[best], vols[best])
+
+    order = np.argsort(vols)
+    return EfficientFrontier(
+        tickers=list(tickers),
+        expected_returns=exp_returns[order],
+        volatilities=vols[order],
+        weights=weights[order],
+        min_variance=_point(tickers, weights[0], exp_returns[0], vols[0], risk_free_rate),
+        max_sharpe=_point(tickers, *best_point, risk_free_rate),
+    )
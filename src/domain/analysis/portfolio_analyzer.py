@@ -1,10 +1,14 @@
 """
 Analizzatore di portafoglio.
 """
+import math
 from dataclasses import dataclass
-from ..metrics.returns import returns_series, total_return, cagr
-from ..metrics.volatility import std_dev, annualized_volatility
-from ..metrics.ratios import sharpe_ratio, max_drawdown
+import numpy as np
+from ..metrics import vectorized
+from ..metrics.returns import cagr
+from ..metrics.online import AssetAccumulator
+from .risk_engine import aligned_price_matrix, compute_portfolio_risk
+from .value_at_risk import DEFAULT_CONFIDENCES, DEFAULT_HORIZONS, METHODS, value_at_risk
 
 
 @dataclass
@@ -31,47 +35,90 @@ class AssetAnalysis:
 class PortfolioAnalyzer:
     """Analizza singoli asset e portafogli."""
     
-    def __init__(self, risk_free_rate: float = 0.02):
+    def __init__(
+        self,
+        risk_free_rate: float = 0.02,
+        var_method: str = "historical",
+        var_confidences: tuple[float, ...] = DEFAULT_CONFIDENCES,
+        var_horizons: tuple[int, ...] = DEFAULT_HORIZONS
+    ):
         """
         Args:
             risk_free_rate: Tasso risk-free per Sharpe ratio (default 2%)
+            var_method: Metodo per VaR/CVaR ("historical", "parametric", "monte_carlo")
+            var_confidences: Livelli di confidenza del VaR (es. 0.95, 0.99)
+            var_horizons: Orizzonti del VaR in giorni di trading
         """
+        if var_method not in METHODS:
+            raise ValueError(f"Metodo VaR non supportato: {var_method} (disponibili: {', '.join(METHODS)})")
         self.risk_free_rate = risk_free_rate
+        self.var_method = var_method
+        self.var_confidences = tuple(var_confidences)
+        self.var_horizons = tuple(var_horizons)
     
-    def analyze_asset(self, ticker: str, prices: list[float], years: float) -> AssetAnalysis:
+    def analyze_asset(self, ticker: str, prices: list[float] | np.ndarray, years: float) -> AssetAnalysis:
         """
         Analizza un singolo asset.
         
         Args:
             ticker: Simbolo dell'asset
-            prices: Lista prezzi in ordine cronologico
+            prices: Prezzi in ordine cronologico (lista o array NumPy)
             years: Numero di anni del periodo
         
         Returns:
             AssetAnalysis con tutte le metriche
         """
+        # Un'unica conversione in array, poi tutto vettorizzato
+        prices = vectorized.as_array(prices)
+        
         # Calcola rendimenti giornalieri (riusati per volatility e sharpe)
-        daily_returns = returns_series(prices)
+        daily_returns = vectorized.returns_series(prices)
         
         # Calcola le metriche
-        total_ret = total_return(prices)
-        cagr_val = cagr(prices[0], prices[-1], years)
-        vol = annualized_volatility(daily_returns)
-        sharpe = sharpe_ratio(daily_returns, self.risk_free_rate)
-        max_dd = max_drawdown(prices)
+        total_ret = vectorized.total_return(prices)
+        cagr_val = cagr(float(prices[0]), float(prices[-1]), years)
+        vol = vectorized.annualized_volatility(daily_returns)
+        sharpe = vectorized.sharpe_ratio(daily_returns, self.risk_free_rate)
+        max_dd = vectorized.max_drawdown(prices)
         
         return AssetAnalysis(
             ticker=ticker,
-            total_return=total_ret,
+            total_return=float(total_ret),
             cagr=cagr_val,
-            volatility=vol,
-            sharpe_ratio=sharpe,
-            max_drawdown=max_dd
+            volatility=float(vol),
+            sharpe_ratio=float(sharpe),
+            max_drawdown=float(max_dd)
+        )
+    
+    def analyze_accumulated(self, ticker: str, accumulator: AssetAccumulator, years: float) -> AssetAnalysis:
+        """
+        Analizza un asset a partire dal suo stato incrementale.
+        
+        Produce gli stessi valori di analyze_asset sulla stessa storia di prezzi,
+        ma in O(1): utile quando si aggiungono poche barre a storie lunghe.
+        
+        Args:
+            ticker: Simbolo dell'asset
+            accumulator: Stato aggiornato con tutti i prezzi del periodo
+            years: Numero di anni del periodo
+        
+        Returns:
+            AssetAnalysis con tutte le metriche
+        """
+        daily_std = accumulator.returns.std_dev
+        
+        return AssetAnalysis(
+            ticker=ticker,
+            total_return=accumulator.total.total_return,
+            cagr=accumulator.total.cagr(years),
+            volatility=daily_std * math.sqrt(252),
+            sharpe_ratio=(accumulator.returns.mean - self.risk_free_rate) / daily_std,
+            max_drawdown=accumulator.drawdown.max_drawdown
         )
     
     def analyze_portfolio(
         self, 
-        assets_data: dict[str, list[float]], 
+        assets_data: dict[str, list[float] | np.ndarray], 
         weights: dict[str, float],
         years: float
     ) -> dict:
@@ -79,42 +126,85 @@ class PortfolioAnalyzer:
         Analizza un portafoglio completo.
         
         Args:
-            assets_data: Dict {ticker: lista_prezzi}
+            assets_data: Dict {ticker: prezzi} (liste o array NumPy)
             weights: Dict {ticker: peso} (i pesi devono sommare a 1)
             years: Numero di anni del periodo
         
         Returns:
-            Dict con analisi per asset e metriche aggregate del portafoglio
+            Dict con analisi per asset e metriche aggregate del portafoglio.
+            In "portfolio" → "risk" c'è il PortfolioRisk con le matrici di
+            covarianza e correlazione, in "portfolio" → "value_at_risk" il
+            VaRResult di asset e portafoglio.
         """
         # 1. Analizza ogni singolo asset
         asset_analyses = {}
         for ticker, prices in assets_data.items():
             asset_analyses[ticker] = self.analyze_asset(ticker, prices, years)
         
+        return self.aggregate_portfolio(asset_analyses, assets_data, weights)
+    
+    def aggregate_portfolio(
+        self,
+        asset_analyses: dict[str, AssetAnalysis],
+        assets_data: dict[str, list[float] | np.ndarray],
+        weights: dict[str, float],
+        prices: np.ndarray | None = None
+    ) -> dict:
+        """
+        Aggrega analisi di asset già calcolate nelle metriche di portafoglio.
+        
+        Permette di riusare le stesse AssetAnalysis per più portafogli che
+        condividono gli asset (analisi batch).
+        
+        Args:
+            asset_analyses: Dict {ticker: AssetAnalysis} (può contenere altri ticker)
+            assets_data: Dict {ticker: prezzi} dei soli asset del portafoglio
+            weights: Dict {ticker: peso} (i pesi devono sommare a 1)
+            prices: Matrice (T, N) già allineata per data, colonne nell'ordine
+                di assets_data (vedi alignment.align_prices); se None le serie
+                sono allineate per posizione sulla coda
+        
+        Returns:
+            Dict nello stesso formato di analyze_portfolio
+        """
+        tickers = list(assets_data.keys())
+        
         # 2. Calcola rendimento portafoglio (media pesata)
         portfolio_return = sum(
             asset_analyses[ticker].total_return * weights[ticker]
-            for ticker in assets_data.keys()
+            for ticker in tickers
         )
         
         # 3. Calcola CAGR portafoglio (media pesata)
         portfolio_cagr = sum(
             asset_analyses[ticker].cagr * weights[ticker]
-            for ticker in assets_data.keys()
+            for ticker in tickers
         )
         
-        # 4. Calcola volatilità portafoglio (semplificata: media pesata)
-        # Nota: la formula corretta richiederebbe le correlazioni
-        portfolio_volatility = sum(
-            asset_analyses[ticker].volatility * weights[ticker]
-            for ticker in assets_data.keys()
+        # 4. Volatilità portafoglio dalla matrice di covarianza: √(wᵀΣw)
+        if prices is None:
+            prices = aligned_price_matrix(assets_data, tickers)
+        daily_returns = vectorized.returns_series(prices)
+        weight_vector = [weights[ticker] for ticker in tickers]
+        risk = compute_portfolio_risk(daily_returns, weight_vector, tickers)
+        
+        # 5. VaR e CVaR di tutti gli asset e del portafoglio sugli stessi rendimenti
+        var = value_at_risk(
+            daily_returns,
+            weight_vector,
+            tickers,
+            confidences=self.var_confidences,
+            horizons=self.var_horizons,
+            method=self.var_method,
         )
         
         return {
-            "assets": asset_analyses,
+            "assets": {ticker: asset_analyses[ticker] for ticker in tickers},
             "portfolio": {
                 "total_return": portfolio_return,
                 "cagr": portfolio_cagr,
-                "volatility": portfolio_volatility,
+                "volatility": risk.volatility,
+                "risk": risk,
+                "value_at_risk": var,
             }
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,86 @@
+"""
+Motore di rischio di portafoglio basato sulla matrice di covarianza.
+"""
+from dataclasses import dataclass
+import numpy as np
+from ..metrics import vectorized
+
+
+@dataclass(eq=False)
+class PortfolioRisk:
+    """
+    Rischio di portafoglio calcolato dalla matrice dei rendimenti allineati.
+
+    Attributes:
+        tickers: Ordine degli asset su righe e colonne delle matrici
+        covariance: Matrice di covarianza annualizzata (N, N)
+        correlation: Matrice di correlazione (N, N)
+        weights: Pesi del portafoglio nello stesso ordine dei ticker
+        volatility: Volatilità annualizzata del portafoglio, √(wᵀΣw)
+    """
+    tickers: list[str]
+    covariance: np.ndarray
+    correlation: np.ndarray
+    weights: np.ndarray
+    volatility: float
+
+
+def aligned_price_matrix(assets_data: dict[str, np.ndarray], tickers: list[str]) -> np.ndarray:
+    """
+    Costruisce la matrice dei prezzi (T, N) allineando le serie sulla coda.
+
+    Le serie senza date vengono allineate per posizione: si tengono le ultime
+    T osservazioni comuni, con T pari alla lunghezza della serie più corta.
+
+    Args:
+        assets_data: Dict {ticker: prezzi}
+        tickers: Ordine delle colonne
+
+    Returns:
+        Matrice dei prezzi (T, N)
+    """
+    length = min(len(assets_data[ticker]) for ticker in tickers)
+    return np.column_stack([
+        vectorized.as_array(assets_data[ticker])[len(assets_data[ticker]) - length:]
+        for ticker in tickers
+    ])
+
+
+def compute_portfolio_risk(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    tickers: list[str],
+    trading_days: int = 252
+) -> PortfolioRisk:
+    """
+    Calcola covarianza, correlazione e volatilità del portafoglio in un passaggio.
+
+    Formula: σ_p = √(wᵀ Σ w), con Σ covarianza annualizzata.
+
+    Args:
+        returns: Matrice dei rendimenti giornalieri allineati (T, N)
+        weights: Pesi del portafoglio (N,)
+        tickers: Ticker corrispondenti alle colonne
+        trading_days: Giorni di trading in un anno (default 252)
+
+    Returns:
+        PortfolioRisk con matrici e volatilità
+
+    Raises:
+        ValueError: Se le dimensioni non coincidono o ci sono meno di 2 osservazioni
+    """
+    weights = vectorized.as_array(weights)
+    if returns.ndim != 2 or returns.shape[1] != len(weights) or len(weights) != len(tickers):
+        raise ValueError("Rendimenti, pesi e ticker devono avere lo stesso numero di asset")
+
+    covariance = vectorized.covariance_matrix(returns) * trading_days
+    correlation = vectorized.correlation_from_covariance(covariance)
+    variance = float(weights @ covariance @ weights)
+
+    return PortfolioRisk(
+        tickers=list(tickers),
+        covariance=covariance,
+        correlation=correlation,
+        weights=weights,
+        volatility=float(np.sqrt(max(variance, 0.0))),
+    )
@@ -0,0 +1,227 @@
+"""
+Value at Risk ed Expected Shortfall (CVaR) di asset e portafoglio.
+
+Tre metodi sulla stessa matrice dei rendimenti giornalieri (T, N):
+- "historical": quantile empirico delle perdite storiche; per orizzonti di
+  h giorni si usano i rendimenti composti su finestre sovrapposte;
+- "parametric": distribuzione normale con media e covarianza storiche,
+  μ_h = h·μ e σ_h = √h·σ;
+- "monte_carlo": rendimenti logaritmici normali correlati (come la modalità
+  "gbm" di monte_carlo), con gli stessi shock riusati per ogni orizzonte.
+
+Il portafoglio è trattato come una colonna in più (rendimenti R·w), così
+asset e portafoglio passano insieme per le stesse operazioni vettoriali.
+I quantili usano np.partition (selezione, O(T)) invece dell'ordinamento
+completo, con tutti i livelli di confidenza in una sola chiamata.
+
+VaR e CVaR sono perdite positive (0.02 = perdita del 2%).
+"""
+from dataclasses import dataclass
+from statistics import NormalDist
+import numpy as np
+from ..metrics import vectorized
+from .monte_carlo import _matrix_root
+
+
+METHODS = ("historical", "parametric", "monte_carlo")
+DEFAULT_CONFIDENCES = (0.95, 0.99)
+DEFAULT_HORIZONS = (1, 10)
+
+
+@dataclass(eq=False)
+class VaRResult:
+    """
+    VaR e CVaR per livello di confidenza, orizzonte e asset.
+
+    Attributes:
+        method: Metodo di stima ("historical", "parametric", "monte_carlo")
+        tickers: Ordine degli asset (N)
+        confidences: Livelli di confidenza (C), es. 0.95
+        horizons: Orizzonti in giorni di trading (H)
+        var: VaR degli asset (C, H, N)
+        cvar: Expected Shortfall degli asset (C, H, N)
+        portfolio_var: VaR del portafoglio (C, H)
+        portfolio_cvar: Expected Shortfall del portafoglio (C, H)
+    """
+    method: str
+    tickers: list[str]
+    confidences: tuple[float, ...]
+    horizons: tuple[int, ...]
+    var: np.ndarray
+    cvar: np.ndarray
+    portfolio_var: np.ndarray
+    portfolio_cvar: np.ndarray
+
+    def asset(self, ticker: str, confidence: float, horizon: int = 1) -> tuple[float, float]:
+        """(VaR, CVaR) di un asset a un livello e orizzonte."""
+        c, h = self._index(confidence, horizon)
+        i = self.tickers.index(ticker)
+        return float(self.var[c, h, i]), float(self.cvar[c, h, i])
+
+    def portfolio(self, confidence: float, horizon: int = 1) -> tuple[float, float]:
+        """(VaR, CVaR) del portafoglio a un livello e orizzonte."""
+        c, h = self._index(confidence, horizon)
+        return float(self.portfolio_var[c, h]), float(self.portfolio_cvar[c, h])
+
+    def _index(self, confidence: float, horizon: int) -> tuple[int, int]:
+        return self.confidences.index(confidence), self.horizons.index(horizon)
+
+
+def tail_risk(losses: np.ndarray, confidences) -> tuple[np.ndarray, np.ndarray]:
+    """
+    VaR e CVaR empirici di ogni colonna, per tutti i livelli in un passaggio.
+
+    Il VaR al livello α è la statistica d'ordine ⌈α·n⌉ delle perdite (il
+    quantile "inverted_cdf" di NumPy), la CVaR la media delle perdite da
+    quella in su. Una sola np.partition sugli indici di tutti i livelli
+    garantisce che oltre ciascun indice restino solo perdite maggiori.
+
+    Args:
+        losses: Perdite (n, M), una colonna per serie
+        confidences: Livelli di confidenza in (0, 1)
+
+    Returns:
+        Tuple (VaR, CVaR), ciascuna (C, M)
+    """
+    n = len(losses)
+    kth = np.ceil(np.asarray(confidences) * n).astype(np.int64) - 1
+    kth = np.clip(kth, 0, n - 1)
+    # Selezione lungo l'asse contiguo: una riga per serie
+    ordered = np.partition(np.ascontiguousarray(losses.T), np.unique(kth), axis=1)
+    var = ordered[:, kth].T
+    cvar = np.stack([ordered[:, k:].mean(axis=1) for k in kth])
+    return var, cvar
+
+
+def horizon_returns(returns: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Rendimenti composti su finestre sovrapposte di `horizon` giorni.
+
+    Args:
+        returns: Rendimenti giornalieri (T, M)
+        horizon: Giorni per finestra
+
+    Returns:
+        Matrice (T − horizon + 1, M)
+    """
+    if horizon == 1:
+        return returns
+    cumulative = np.vstack([np.zeros((1, returns.shape[1])), np.cumsum(np.log1p(returns), axis=0)])
+    return np.expm1(cumulative[horizon:] - cumulative[:-horizon])
+
+
+def _historical(returns: np.ndarray, confidences, horizons) -> tuple[np.ndarray, np.ndarray]:
+    var = np.full((len(confidences), len(horizons), returns.shape[1]), np.nan)
+    cvar = np.full_like(var, np.nan)
+    for h, horizon in enumerate(horizons):
+        if horizon <= len(returns):
+            var[:, h], cvar[:, h] = tail_risk(-horizon_returns(returns, horizon), confidences)
+    return var, cvar
+
+
+def _parametric(returns: np.ndarray, weights: np.ndarray, confidences, horizons) -> tuple[np.ndarray, np.ndarray]:
+    covariance = vectorized.covariance_matrix(returns[:, :-1])
+    mean = returns.mean(axis=0)
+    std = np.sqrt(np.append(np.diag(covariance), max(float(weights @ covariance @ weights), 0.0)))
+
+    normal = NormalDist()
+    z = np.array([normal.inv_cdf(c) for c in confidences])[:, None, None]
+    tail = np.array([normal.pdf(normal.inv_cdf(c)) / (1 - c) for c in confidences])[:, None, None]
+    horizons = np.asarray(horizons, dtype=float)[None, :, None]
+
+    drift = horizons * mean
+    scale = np.sqrt(horizons) * std
+    return z * scale - drift, tail * scale - drift
+
+
+def _monte_carlo(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    confidences,
+    horizons,
+    n_paths: int,
+    seed: int | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    log_returns = np.log1p(returns[:, :-1])
+    mean = log_returns.mean(axis=0)
+    root = _matrix_root(vectorized.covariance_matrix(log_returns))
+    shocks = np.random.default_rng(seed).standard_normal((n_paths, len(mean))) @ root.T
+
+    var = np.empty((len(confidences), len(horizons), returns.shape[1]))
+    cvar = np.empty_like(var)
+    for h, horizon in enumerate(horizons):
+        simulated = np.expm1(horizon * mean + np.sqrt(horizon) * shocks)
+        losses = -np.column_stack([simulated, simulated @ weights])
+        var[:, h], cvar[:, h] = tail_risk(losses, confidences)
+    return var, cvar
+
+
+def value_at_risk(
+    returns: np.ndarray,
+    weights,
+    tickers: list[str],
+    confidences=DEFAULT_CONFIDENCES,
+    horizons=DEFAULT_HORIZONS,
+    method: str = "historical",
+    n_paths: int = 20_000,
+    seed: int | None = None,
+) -> VaRResult:
+    """
+    Calcola VaR e CVaR di tutti gli asset e del portafoglio in una chiamata.
+
+    Args:
+        returns: Rendimenti giornalieri allineati (T, N)
+        weights: Pesi del portafoglio (N,)
+        tickers: Ticker corrispondenti alle colonne
+        confidences: Livelli di confidenza (es. 0.95, 0.99)
+        horizons: Orizzonti in giorni di trading (es. 1, 10)
+        method: "historical", "parametric" oppure "monte_carlo"
+        n_paths: Scenari simulati (solo monte_carlo)
+        seed: Seme per la riproducibilità (solo monte_carlo)
+
+    Returns:
+        VaRResult; con il metodo storico gli orizzonti più lunghi della
+        storia disponibile sono NaN
+
+    Raises:
+        ValueError: Se metodo, livelli, orizzonti o dimensioni non sono validi
+    """
+    if method not in METHODS:
+        raise ValueError(f"Metodo VaR non supportato: {method} (disponibili: {', '.join(METHODS)})")
+    confidences = tuple(float(c) for c in confidences)
+    horizons = tuple(int(h) for h in horizons)
+    if not confidences or any(not 0 < c < 1 for c in confidences):
+        raise ValueError("I livelli di confidenza devono essere compresi tra 0 e 1")
+    if not horizons or any(h < 1 for h in horizons):
+        raise ValueError("Gli orizzonti devono essere di almeno un giorno")
+    if n_paths < 1:
+        raise ValueError("n_paths deve essere positivo")
+
+    returns = vectorized.as_array(returns)
+    if returns.ndim == 1:
+        returns = returns[:, None]
+    weights = vectorized.as_array(weights)
+    if returns.shape[1] != len(weights) or len(weights) != len(tickers):
+        raise ValueError("Rendimenti, pesi e ticker devono avere lo stesso numero di asset")
+    if len(returns) < 2:
+        raise ValueError("Servono almeno 2 rendimenti storici")
+
+    # Il portafoglio è l'ultima colonna
+    returns = np.column_stack([returns, returns @ weights])
+    if method == "historical":
+        var, cvar = _historical(returns, confidences, horizons)
+    elif method == "parametric":
+        var, cvar = _parametric(returns, weights, confidences, horizons)
+    else:
+        var, cvar = _monte_carlo(returns, weights, confidences, horizons, n_paths, seed)
+
+    return VaRResult(
+        method=method,
+        tickers=list(tickers),
+        confidences=confidences,
+        horizons=horizons,
+        var=var[..., :-1],
+        cvar=cvar[..., :-1],
+        portfolio_var=var[..., -1],
+        portfolio_cvar=cvar[..., -1],
+    )
@@ -1,7 +1,7 @@
 """
 Funzioni per il calcolo di covarianza e correlazione.
 """
-from .volatility import std_dev
+from . import vectorized
 
 
 def covariance(x: list[float], y: list[float]) -> float:
@@ -25,11 +25,7 @@ def covariance(x: list[float], y: list[float]) -> float:
     if len(x) < 2:
         raise ValueError("Le serie devono contenere almeno 2 elementi")
     
-    mean_x = sum(x) / len(x)
-    mean_y = sum(y) / len(y)
-    
-    cov = sum((xi - mean_x) * (yi - mean_y) for xi, yi in zip(x, y)) / (len(x) - 1)
-    return cov
+    return float(vectorized.covariance(vectorized.as_array(x), vectorized.as_array(y)))
 
 
 def pearson_correlation(x: list[float], y: list[float]) -> float:
@@ -53,8 +49,4 @@ def pearson_correlation(x: list[float], y: list[float]) -> float:
     if len(x) < 2:
         raise ValueError("Le serie devono contenere almeno 2 elementi")
     
-    cov = covariance(x, y)
-    std_x = std_dev(x)
-    std_y = std_dev(y)
-    
-    return cov / (std_x * std_y)
\ No newline at end of file
+    return float(vectorized.pearson_correlation(vectorized.as_array(x), vectorized.as_array(y)))
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+Accumulatori online: metriche aggiornate in O(1) per ogni nuova osservazione.
+
+Ogni accumulatore conserva solo lo stato minimo necessario (conteggi, medie,
+somme dei quadrati degli scarti, picchi) e si serializza in un dict di float
+con to_dict()/from_dict(), così può essere salvato tra un'esecuzione e l'altra.
+"""
+import math
+from dataclasses import dataclass, field, asdict
+from typing import Iterable
+
+
+@dataclass
+class RunningMoments:
+    """
+    Media e varianza campionaria con l'algoritmo di Welford.
+
+    Attributes:
+        count: Numero di osservazioni
+        mean: Media corrente
+        m2: Somma dei quadrati degli scarti dalla media
+    """
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, value: float) -> None:
+        """Aggiunge un'osservazione."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Varianza campionaria (n - 1)."""
+        if self.count < 2:
+            raise ValueError("Servono almeno 2 osservazioni")
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std_dev(self) -> float:
+        """Deviazione standard campionaria."""
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningMoments":
+        return cls(**data)
+
+
+@dataclass
+class RunningCovariance:
+    """
+    Covarianza campionaria tra due serie, aggiornata in stile Welford.
+
+    Attributes:
+        count: Numero di coppie osservate
+        mean_x: Media corrente della prima serie
+        mean_y: Media corrente della seconda serie
+        c: Somma dei prodotti degli scarti
+    """
+    count: int = 0
+    mean_x: float = 0.0
+    mean_y: float = 0.0
+    c: float = 0.0
+
+    def update(self, x: float, y: float) -> None:
+        """Aggiunge una coppia di osservazioni."""
+        self.count += 1
+        dx = x - self.mean_x
+        self.mean_x += dx / self.count
+        self.mean_y += (y - self.mean_y) / self.count
+        self.c += dx * (y - self.mean_y)
+
+    @property
+    def covariance(self) -> float:
+        """Covarianza campionaria (n - 1)."""
+        if self.count < 2:
+            raise ValueError("Servono almeno 2 osservazioni")
+        return self.c / (self.count - 1)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningCovariance":
+        return cls(**data)
+
+
+@dataclass
+class RunningDrawdown:
+    """
+    Picco corrente e massimo drawdown di una serie di prezzi.
+
+    Attributes:
+        peak: Prezzo massimo osservato
+        max_drawdown: Drawdown peggiore (≤ 0)
+    """
+    peak: float = -math.inf
+    max_drawdown: float = 0.0
+
+    def update(self, price: float) -> None:
+        """Aggiunge un prezzo."""
+        if price > self.peak:
+            self.peak = price
+        drawdown = (price - self.peak) / self.peak
+        if drawdown < self.max_drawdown:
+            self.max_drawdown = drawdown
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningDrawdown":
+        return cls(**data)
+
+
+@dataclass
+class RunningReturn:
+    """
+    Rendimento totale e CAGR dal primo all'ultimo prezzo.
+
+    Attributes:
+        first_price: Primo prezzo osservato
+        last_price: Ultimo prezzo osservato
+        count: Numero di prezzi
+    """
+    first_price: float = 0.0
+    last_price: float = 0.0
+    count: int = 0
+
+    def update(self, price: float) -> None:
+        """Aggiunge un prezzo."""
+        if self.count == 0:
+            if price <= 0:
+                raise ValueError("price_start deve essere maggiore di zero")
+            self.first_price = price
+        self.last_price = price
+        self.count += 1
+
+    @property
+    def total_return(self) -> float:
+        """Rendimento totale come decimale."""
+        if self.count < 2:
+            raise ValueError("Servono almeno 2 prezzi")
+        return (self.last_price - self.first_price) / self.first_price
+
+    def cagr(self, years: float) -> float:
+        """
+        CAGR sul periodo osservato.
+
+        Args:
+            years: Durata del periodo in anni
+
+        Raises:
+            ValueError: Se years <= 0
+        """
+        if years <= 0:
+            raise ValueError("price_start e years devono essere maggiori di zero")
+        return (self.last_price / self.first_price) ** (1 / years) - 1
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningReturn":
+        return cls(**data)
+
+
+@dataclass
+class AssetAccumulator:
+    """
+    Stato incrementale completo per le metriche di un asset.
+
+    Ogni nuovo prezzo aggiorna in O(1) rendimento totale, momenti dei
+    rendimenti giornalieri (per volatilità e Sharpe) e drawdown.
+
+    Attributes:
+        returns: Momenti dei rendimenti giornalieri
+        drawdown: Picco e massimo drawdown dei prezzi
+        total: Primo e ultimo prezzo
+    """
+    returns: RunningMoments = field(default_factory=RunningMoments)
+    drawdown: RunningDrawdown = field(default_factory=RunningDrawdown)
+    total: RunningReturn = field(default_factory=RunningReturn)
+
+    @classmethod
+    def from_prices(cls, prices: Iterable[float]) -> "AssetAccumulator":
+        """Crea un accumulatore a partire da una storia di prezzi."""
+        accumulator = cls()
+        accumulator.extend(prices)
+        return accumulator
+
+    def update(self, price: float) -> None:
+        """
+        Aggiunge un nuovo prezzo di chiusura.
+
+        Raises:
+            ValueError: Se il prezzo precedente non è positivo
+        """
+        price = float(price)
+        if self.total.count:
+            previous = self.total.last_price
+            if previous <= 0:
+                raise ValueError("price_start deve essere maggiore di zero")
+            self.returns.update(price / previous - 1.0)
+        self.total.update(price)
+        self.drawdown.update(price)
+
+    def extend(self, prices: Iterable[float]) -> None:
+        """Aggiunge più prezzi in ordine cronologico."""
+        for price in prices:
+            self.update(price)
+
+    @property
+    def count(self) -> int:
+        """Numero di prezzi osservati."""
+        return self.total.count
+
+    def to_dict(self) -> dict:
+        return {
+            "returns": self.returns.to_dict(),
+            "drawdown": self.drawdown.to_dict(),
+            "total": self.total.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AssetAccumulator":
+        return cls(
+            returns=RunningMoments.from_dict(data["returns"]),
+            drawdown=RunningDrawdown.from_dict(data["drawdown"]),
+            total=RunningReturn.from_dict(data["total"]),
+        )
@@ -1,7 +1,7 @@
 """
 Funzioni per il calcolo di ratio finanziari.
 """
-from .volatility import std_dev
+from . import vectorized
 
 
 def sharpe_ratio(returns: list[float], risk_free_rate: float = 0.02) -> float:
@@ -23,11 +23,7 @@ def sharpe_ratio(returns: list[float], risk_free_rate: float = 0.02) -> float:
     if len(returns) < 2:
         raise ValueError("La lista deve contenere almeno 2 elementi")
     
-    mean_return = sum(returns) / len(returns)
-    excess_return = mean_return - risk_free_rate
-    volatility = std_dev(returns)
-    
-    return excess_return / volatility
+    return float(vectorized.sharpe_ratio(vectorized.as_array(returns), risk_free_rate))
 
 
 def max_drawdown(prices: list[float]) -> float:
@@ -49,14 +45,4 @@ def max_drawdown(prices: list[float]) -> float:
     if len(prices) < 2:
         raise ValueError("La lista deve contenere almeno 2 prezzi")
     
-    max_drawdown = 0.0
-    peak = prices[0]
-    
-    for price in prices:
-        if price > peak:
-            peak = price
-        drawdown = (price - peak) / peak
-        if drawdown < max_drawdown:
-            max_drawdown = drawdown
-    
-    return max_drawdown
\ No newline at end of file
+    return float(vectorized.max_drawdown(vectorized.as_array(prices)))
\ No newline at end of file
@@ -2,6 +2,7 @@
 Funzioni per il calcolo dei rendimenti.
 """
 import math
+from . import vectorized
 
 
 def simple_return(price_start: float, price_end: float) -> float:
@@ -59,11 +60,7 @@ def returns_series(prices: list[float]) -> list[float]:
     """
     if len(prices) < 2:
         raise ValueError("La lista deve contenere almeno 2 prezzi")
-    returns = []
-    for i in range(1, len(prices)):
-        r = simple_return(prices[i-1], prices[i])
-        returns.append(r)
-    return returns
+    return vectorized.returns_series(vectorized.as_array(prices)).tolist()
 
 def total_return(prices: list[float]) -> float:
     """
@@ -0,0 +1,219 @@
+"""
+Metriche su finestre mobili in tempo O(n).
+
+Media e varianza mobili usano somme cumulative (una sola per tutte le
+finestre) sui valori centrati, così il costo non dipende dalla lunghezza
+della finestra. Il massimo mobile usa l'algoritmo di van Herk/Gil-Werman
+(massimi prefisso e suffisso per blocchi), anch'esso O(n) e senza loop Python.
+
+Tutte le funzioni lavorano lungo l'asse 0 e accettano serie 1D o matrici
+(T, N). I risultati sono allineati alle date dei prezzi: l'elemento t usa
+i dati fino al giorno t incluso, i primi valori senza finestra completa sono NaN.
+"""
+from dataclasses import dataclass
+import numpy as np
+from . import vectorized
+
+
+DEFAULT_WINDOWS = (30, 90, 252)
+
+
+@dataclass(eq=False)
+class RollingMetrics:
+    """
+    Serie di metriche mobili per una lunghezza di finestra.
+
+    Attributes:
+        window: Lunghezza della finestra in giorni di trading
+        volatility: Volatilità annualizzata mobile
+        sharpe_ratio: Sharpe ratio mobile (sui rendimenti giornalieri)
+        drawdown: Drawdown rispetto al massimo della finestra
+        dates: Date dei prezzi a cui le serie sono allineate (se note)
+    """
+    window: int
+    volatility: np.ndarray
+    sharpe_ratio: np.ndarray
+    drawdown: np.ndarray
+    dates: np.ndarray | None = None
+
+
+def _check_window(length: int, window: int) -> None:
+    if window < 2:
+        raise ValueError("La finestra deve contenere almeno 2 elementi")
+    if length < window:
+        raise ValueError("La serie è più corta della finestra")
+
+
+def _prepend_nan(values: np.ndarray, count: int) -> np.ndarray:
+    """Aggiunge `count` righe NaN in testa (per allineare i rendimenti ai prezzi)."""
+    pad = np.full((count,) + values.shape[1:], np.nan)
+    return np.concatenate([pad, values])
+
+
+class _RunningSums:
+    """Somme cumulative dei valori centrati, condivise fra più finestre."""
+
+    def __init__(self, values: np.ndarray):
+        self.shift = values.mean(axis=0)
+        centered = values - self.shift
+        zero = np.zeros((1,) + values.shape[1:])
+        self.s1 = np.concatenate([zero, np.cumsum(centered, axis=0)])
+        self.s2 = np.concatenate([zero, np.cumsum(centered * centered, axis=0)])
+        self.length = values.shape[0]
+
+    def mean_std(self, window: int) -> tuple[np.ndarray, np.ndarray]:
+        """Media e deviazione standard campionaria di ogni finestra completa."""
+        _check_window(self.length, window)
+        s1 = self.s1[window:] - self.s1[:-window]
+        s2 = self.s2[window:] - self.s2[:-window]
+        mean = s1 / window
+        var = (s2 - s1 * mean) / (window - 1)
+        return mean + self.shift, np.sqrt(np.maximum(var, 0.0))
+
+
+def rolling_mean_std(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calcola media e deviazione standard mobili in O(n).
+
+    Args:
+        values: Serie 1D o matrice (T, N)
+        window: Lunghezza della finestra
+
+    Returns:
+        Tupla (media, std) allineata a `values` (NaN per le prime window-1 righe)
+
+    Raises:
+        ValueError: Se la finestra è < 2 o più lunga della serie
+    """
+    values = vectorized.as_array(values)
+    mean, std = _RunningSums(values).mean_std(window)
+    return _prepend_nan(mean, window - 1), _prepend_nan(std, window - 1)
+
+
+def rolling_volatility(daily_returns: np.ndarray, window: int, trading_days: int = 252) -> np.ndarray:
+    """
+    Calcola la volatilità annualizzata mobile.
+
+    Args:
+        daily_returns: Rendimenti giornalieri (1D o 2D)
+        window: Lunghezza della finestra
+        trading_days: Giorni di trading in un anno (default 252)
+
+    Returns:
+        Volatilità annualizzata mobile, allineata ai rendimenti
+    """
+    _, std = rolling_mean_std(daily_returns, window)
+    return std * np.sqrt(trading_days)
+
+
+def rolling_sharpe(daily_returns: np.ndarray, window: int, risk_free_rate: float = 0.02) -> np.ndarray:
+    """
+    Calcola lo Sharpe ratio mobile con la stessa formula di sharpe_ratio().
+
+    Args:
+        daily_returns: Rendimenti giornalieri (1D o 2D)
+        window: Lunghezza della finestra
+        risk_free_rate: Tasso risk-free (default 2%)
+
+    Returns:
+        Sharpe ratio mobile, allineato ai rendimenti
+    """
+    mean, std = rolling_mean_std(daily_returns, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (mean - risk_free_rate) / std
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Calcola il massimo mobile con l'algoritmo di van Herk/Gil-Werman.
+
+    La serie è divisa in blocchi di `window` elementi: il massimo di ogni
+    finestra è il massimo tra il suffisso di un blocco e il prefisso del
+    successivo, entrambi ottenuti con np.maximum.accumulate.
+
+    Args:
+        values: Serie 1D o matrice (T, N)
+        window: Lunghezza della finestra
+
+    Returns:
+        Massimo mobile allineato a `values` (NaN per le prime window-1 righe)
+
+    Raises:
+        ValueError: Se la finestra è < 2 o più lunga della serie
+    """
+    values = vectorized.as_array(values)
+    n = values.shape[0]
+    _check_window(n, window)
+
+    blocks = -(-n // window)
+    padded = np.full((blocks * window,) + values.shape[1:], -np.inf)
+    padded[:n] = values
+    padded = padded.reshape((blocks, window) + values.shape[1:])
+
+    prefix = np.maximum.accumulate(padded, axis=1).reshape((-1,) + values.shape[1:])
+    suffix = np.maximum.accumulate(padded[:, ::-1], axis=1)[:, ::-1].reshape((-1,) + values.shape[1:])
+
+    result = np.maximum(suffix[:n - window + 1], prefix[window - 1:n])
+    return _prepend_nan(result, window - 1)
+
+
+def rolling_drawdown(prices: np.ndarray, window: int) -> np.ndarray:
+    """
+    Calcola il drawdown rispetto al massimo degli ultimi `window` prezzi.
+
+    Args:
+        prices: Prezzi in ordine cronologico (1D o 2D)
+        window: Lunghezza della finestra
+
+    Returns:
+        Drawdown mobile (≤ 0) allineato ai prezzi
+    """
+    prices = vectorized.as_array(prices)
+    peaks = rolling_max(prices, window)
+    return (prices - peaks) / peaks
+
+
+def compute_rolling_metrics(
+    prices: np.ndarray,
+    windows: tuple[int, ...] = DEFAULT_WINDOWS,
+    risk_free_rate: float = 0.02,
+    trading_days: int = 252,
+    dates: np.ndarray | None = None,
+) -> dict[int, RollingMetrics]:
+    """
+    Calcola volatilità, Sharpe e drawdown mobili per più finestre in un passaggio.
+
+    I rendimenti e le somme cumulative sono calcolati una sola volta e
+    riusati per tutte le finestre. Le finestre più lunghe della serie
+    vengono ignorate.
+
+    Args:
+        prices: Prezzi in ordine cronologico (1D o matrice (T, N))
+        windows: Lunghezze delle finestre in giorni di trading
+        risk_free_rate: Tasso risk-free per lo Sharpe (default 2%)
+        trading_days: Giorni di trading in un anno (default 252)
+        dates: Date dei prezzi, riportate nel risultato
+
+    Returns:
+        Dict {finestra: RollingMetrics}, con serie lunghe quanto i prezzi
+    """
+    prices = vectorized.as_array(prices)
+    returns = vectorized.returns_series(prices)
+    sums = _RunningSums(returns)
+
+    result = {}
+    for window in windows:
+        if window >= len(prices):
+            continue
+        mean, std = sums.mean_std(window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = (mean - risk_free_rate) / std
+        # Un rendimento in meno dei prezzi: la finestra t copre i prezzi t-window..t
+        result[window] = RollingMetrics(
+            window=window,
+            volatility=_prepend_nan(std * np.sqrt(trading_days), window),
+            sharpe_ratio=_prepend_nan(sharpe, window),
+            drawdown=rolling_drawdown(prices, window + 1),
+            dates=dates,
+        )
+    return result
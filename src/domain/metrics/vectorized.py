@@ -0,0 +1,261 @@
+"""
+Motore vettorizzato NumPy per le metriche.
+
+Tutte le funzioni accettano array NumPy e lavorano lungo l'asse 0 (il tempo):
+un array 1D è una singola serie e produce uno scalare, un array 2D di forma
+(T, N) è una matrice con una colonna per asset e produce un array di N valori.
+Le funzioni list-based in returns, volatility, correlation e ratios sono
+wrapper sottili sopra questo modulo.
+"""
+import numpy as np
+
+
+def as_array(values) -> np.ndarray:
+    """
+    Converte una sequenza di valori in un array float64 (senza copia se possibile).
+
+    Args:
+        values: Lista, tupla o array di valori numerici
+
+    Returns:
+        Array NumPy float64
+    """
+    return np.asarray(values, dtype=np.float64)
+
+
+def _check_length(values: np.ndarray, minimum: int = 2, what: str = "elementi") -> None:
+    """Verifica che la serie abbia almeno `minimum` osservazioni lungo l'asse 0."""
+    if values.ndim == 0 or values.shape[0] < minimum:
+        raise ValueError(f"La lista deve contenere almeno {minimum} {what}")
+
+
+def returns_series(prices: np.ndarray) -> np.ndarray:
+    """
+    Calcola i rendimenti semplici tramite slicing: R_t = P_t / P_{t-1} - 1.
+
+    Args:
+        prices: Array di prezzi in ordine cronologico (1D o 2D)
+
+    Returns:
+        Array di rendimenti con una riga in meno dei prezzi
+
+    Raises:
+        ValueError: Se ci sono meno di 2 prezzi o prezzi non positivi
+    """
+    _check_length(prices, what="prezzi")
+    previous = prices[:-1]
+    if np.any(previous <= 0):
+        raise ValueError("price_start deve essere maggiore di zero")
+    return prices[1:] / previous - 1.0
+
+
+def total_return(prices: np.ndarray) -> np.ndarray | float:
+    """
+    Calcola il rendimento totale dal primo all'ultimo prezzo.
+
+    Args:
+        prices: Array di prezzi in ordine cronologico (1D o 2D)
+
+    Returns:
+        Rendimento totale (scalare o uno per colonna)
+
+    Raises:
+        ValueError: Se ci sono meno di 2 prezzi o il primo prezzo non è positivo
+    """
+    _check_length(prices, what="prezzi")
+    if np.any(prices[0] <= 0):
+        raise ValueError("price_start deve essere maggiore di zero")
+    return (prices[-1] - prices[0]) / prices[0]
+
+
+def variance(values: np.ndarray) -> np.ndarray | float:
+    """
+    Calcola la varianza campionaria (ddof=1) lungo l'asse del tempo.
+
+    Args:
+        values: Array di valori (1D o 2D)
+
+    Returns:
+        Varianza campionaria
+
+    Raises:
+        ValueError: Se ci sono meno di 2 elementi
+    """
+    _check_length(values)
+    return np.var(values, axis=0, ddof=1)
+
+
+def std_dev(values: np.ndarray) -> np.ndarray | float:
+    """
+    Calcola la deviazione standard campionaria (ddof=1).
+
+    Args:
+        values: Array di valori (1D o 2D)
+
+    Returns:
+        Deviazione standard
+
+    Raises:
+        ValueError: Se ci sono meno di 2 elementi
+    """
+    return np.sqrt(variance(values))
+
+
+def annualized_volatility(daily_returns: np.ndarray, trading_days: int = 252) -> np.ndarray | float:
+    """
+    Calcola la volatilità annualizzata: σ_daily × √trading_days.
+
+    Args:
+        daily_returns: Array di rendimenti giornalieri (1D o 2D)
+        trading_days: Giorni di trading in un anno (default 252)
+
+    Returns:
+        Volatilità annualizzata
+
+    Raises:
+        ValueError: Se ci sono meno di 2 elementi
+    """
+    return std_dev(daily_returns) * np.sqrt(trading_days)
+
+
+def covariance(x: np.ndarray, y: np.ndarray) -> np.ndarray | float:
+    """
+    Calcola la covarianza campionaria tra due serie (o tra colonne corrispondenti).
+
+    Args:
+        x: Prima serie (1D o 2D)
+        y: Seconda serie, stessa forma di x
+
+    Returns:
+        Covarianza campionaria
+
+    Raises:
+        ValueError: Se le serie hanno forme diverse o meno di 2 elementi
+    """
+    if x.shape != y.shape:
+        raise ValueError("Le serie devono avere la stessa lunghezza")
+    _check_length(x)
+    dx = x - x.mean(axis=0)
+    dy = y - y.mean(axis=0)
+    return (dx * dy).sum(axis=0) / (x.shape[0] - 1)
+
+
+def pearson_correlation(x: np.ndarray, y: np.ndarray) -> np.ndarray | float:
+    """
+    Calcola il coefficiente di correlazione di Pearson.
+
+    Args:
+        x: Prima serie (1D o 2D)
+        y: Seconda serie, stessa forma di x
+
+    Returns:
+        Correlazione tra -1 e +1
+
+    Raises:
+        ValueError: Se le serie hanno forme diverse o meno di 2 elementi
+    """
+    cov = covariance(x, y)
+    return cov / (std_dev(x) * std_dev(y))
+
+
+def sharpe_ratio(returns: np.ndarray, risk_free_rate: float = 0.02) -> np.ndarray | float:
+    """
+    Calcola lo Sharpe Ratio: (R_medio - R_risk_free) / σ.
+
+    Args:
+        returns: Array di rendimenti (1D o 2D)
+        risk_free_rate: Tasso risk-free (default 2% = 0.02)
+
+    Returns:
+        Sharpe Ratio
+
+    Raises:
+        ValueError: Se ci sono meno di 2 elementi
+    """
+    _check_length(returns)
+    excess_return = returns.mean(axis=0) - risk_free_rate
+    return excess_return / std_dev(returns)
+
+
+def drawdown_series(prices: np.ndarray) -> np.ndarray:
+    """
+    Calcola la serie dei drawdown rispetto al picco corrente.
+
+    Il picco è calcolato con np.maximum.accumulate, senza loop Python.
+
+    Args:
+        prices: Array di prezzi in ordine cronologico (1D o 2D)
+
+    Returns:
+        Array di drawdown (≤ 0) della stessa forma dei prezzi
+    """
+    peaks = np.maximum.accumulate(prices, axis=0)
+    return (prices - peaks) / peaks
+
+
+def max_drawdown(prices: np.ndarray) -> np.ndarray | float:
+    """
+    Calcola il Maximum Drawdown di una serie di prezzi.
+
+    Args:
+        prices: Array di prezzi in ordine cronologico (1D o 2D)
+
+    Returns:
+        Max Drawdown come decimale negativo (es. -0.25 = -25%)
+
+    Raises:
+        ValueError: Se ci sono meno di 2 prezzi
+    """
+    _check_length(prices, what="prezzi")
+    return drawdown_series(prices).min(axis=0)
+
+
+def covariance_matrix(returns: np.ndarray) -> np.ndarray:
+    """
+    Calcola la matrice di covarianza campionaria N×N di una matrice (T, N).
+
+    Un'unica moltiplicazione matriciale sui rendimenti centrati sostituisce
+    le N² chiamate a covariance().
+
+    Args:
+        returns: Matrice dei rendimenti, una colonna per asset
+
+    Returns:
+        Matrice di covarianza (N, N)
+
+    Raises:
+        ValueError: Se ci sono meno di 2 osservazioni
+    """
+    _check_length(returns)
+    centered = returns - returns.mean(axis=0)
+    return centered.T @ centered / (returns.shape[0] - 1)
+
+
+def correlation_from_covariance(cov: np.ndarray) -> np.ndarray:
+    """
+    Normalizza una matrice di covarianza in matrice di correlazione.
+
+    Args:
+        cov: Matrice di covarianza (N, N)
+
+    Returns:
+        Matrice di correlazione (N, N) con diagonale 1 (NaN per serie costanti)
+    """
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(std, std)
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return corr
+
+
+def correlation_matrix(returns: np.ndarray) -> np.ndarray:
+    """
+    Calcola la matrice di correlazione di Pearson N×N di una matrice (T, N).
+
+    Args:
+        returns: Matrice dei rendimenti, una colonna per asset
+
+    Returns:
+        Matrice di correlazione (N, N)
+    """
+    return correlation_from_covariance(covariance_matrix(returns))
@@ -1,7 +1,7 @@
 """
 Funzioni per il calcolo della volatilità.
 """
-import math
+from . import vectorized
 
 
 def variance(values: list[float]) -> float:
@@ -21,10 +21,7 @@ def variance(values: list[float]) -> float:
     """
     if len(values) < 2:
         raise ValueError("La lista deve contenere almeno 2 elementi")
-    mean = sum(values) / len(values)
-    squared_diffs = [(x - mean) ** 2 for x in values]
-    variance = sum(squared_diffs) / (len(values) - 1)
-    return variance
+    return float(vectorized.variance(vectorized.as_array(values)))
 
 
 def std_dev(values: list[float]) -> float:
@@ -44,8 +41,7 @@ def std_dev(values: list[float]) -> float:
     """
     if len(values) < 2:
         raise ValueError("La lista deve contenere almeno 2 elementi")
-    var = variance(values)
-    return math.sqrt(var)
+    return float(vectorized.std_dev(vectorized.as_array(values)))
 
 def annualized_volatility(daily_returns: list[float], trading_days: int = 252) -> float:
     """
@@ -65,5 +61,4 @@ def annualized_volatility(daily_returns: list[float], trading_days: int = 252) -
     """
     if len(daily_returns) < 2:
         raise ValueError("La lista deve contenere almeno 2 elementi")
-    daily_vol = std_dev(daily_returns)
-    return daily_vol * math.sqrt(trading_days)
\ No newline at end of file
+    return float(vectorized.annualized_volatility(vectorized.as_array(daily_returns), trading_days))
\ No newline at end of file
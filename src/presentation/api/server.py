@@ -0,0 +1,262 @@
+"""
+API HTTP locale per l'analisi dei portafogli (solo libreria standard).
+
+Endpoint (risposte JSON):
+- GET  /health: stato e contatori della cache prezzi condivisa
+- POST /analyze: {"portfolio": {...}, "period": "1y"} → PortfolioReport
+- GET  /analyze?tickers=A,B&weights=0.6,0.4&period=1y: come sopra, pesi
+  uguali se omessi
+- POST /analyze/periods: {"portfolio": {...}, "periods": ["3mo", "1y"]}
+  → un report per orizzonte da un solo download
+
+Il portafoglio ha lo stesso formato del YAML: {"name": ..., "assets":
+[{"ticker", "name", "type", "weight"}]}. L'insight AI non è generato.
+
+Ogni richiesta gira in un thread (ThreadingHTTPServer) e il service usa un
+CoalescingFetcher condiviso: richieste concorrenti sugli stessi ticker
+producono un solo fetch a monte, poi i dati sono serviti dalla memoria.
+"""
+import json
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import SplitResult, parse_qs, urlsplit
+from src.application.services.analysis_service import AnalysisService
+from src.data.exceptions import DataFetchError
+from src.data.fetchers.coalescing_fetcher import CoalescingFetcher
+from src.data.models.asset import Asset
+from src.data.models.portfolio import Portfolio
+from src.presentation.reports.json_report import multi_period_to_dict, report_to_dict
+
+
+MAX_BODY_BYTES = 1_000_000
+
+
+class ApiError(Exception):
+    """Errore da restituire al client con uno stato HTTP."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        self.status = status
+        self.message = message
+        super().__init__(message)
+
+
+def parse_portfolio(data) -> Portfolio:
+    """
+    Costruisce il Portfolio dal JSON (stesso formato del YAML).
+
+    Raises:
+        ValueError: Se il formato non è valido
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("assets"), list) or not data["assets"]:
+        raise ValueError("Il portafoglio deve avere una lista 'assets' non vuota")
+    assets = []
+    for item in data["assets"]:
+        try:
+            assets.append(Asset(
+                ticker=str(item["ticker"]),
+                name=str(item.get("name", item["ticker"])),
+                asset_type=str(item.get("type", "ETF")),
+                weight=float(item["weight"]),
+            ))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Asset non valido: {item!r} (servono ticker e weight)") from None
+    return Portfolio(name=str(data.get("name", "Portfolio")), assets=assets)
+
+
+def portfolio_from_query(query: dict[str, list[str]]) -> Portfolio:
+    """
+    Portfolio da tickers=A,B&weights=0.6,0.4 (pesi uguali se assenti).
+
+    Raises:
+        ValueError: Se ticker e pesi non sono coerenti
+    """
+    tickers = [t.strip() for t in ",".join(query.get("tickers", [])).split(",") if t.strip()]
+    if not tickers:
+        raise ValueError("Parametro 'tickers' mancante")
+    weights = [w for w in ",".join(query.get("weights", [])).split(",") if w.strip()]
+    if weights and len(weights) != len(tickers):
+        raise ValueError("Serve un peso per ogni ticker")
+    values = [float(w) for w in weights] if weights else [1.0 / len(tickers)] * len(tickers)
+    name = query.get("name", ["Portfolio"])[0]
+    return Portfolio(
+        name=name,
+        assets=[Asset(ticker=t, name=t, asset_type="ETF", weight=w) for t, w in zip(tickers, values)],
+    )
+
+
+class AnalysisAPI:
+    """Logica degli endpoint, indipendente dal trasporto HTTP."""
+
+    def __init__(
+        self,
+        service: AnalysisService,
+        include_matrices: bool = False,
+        default_period: str = "1y"
+    ):
+        """
+        Args:
+            service: Service condiviso da tutte le richieste
+            include_matrices: Se True i report includono covarianza e correlazione
+            default_period: Periodo usato se la richiesta non lo indica
+        """
+        self.service = service
+        self.include_matrices = include_matrices
+        self.default_period = default_period
+
+    def handle(self, method: str, path: str, query: dict[str, list[str]], body: bytes) -> tuple[int, dict]:
+        """
+        Esegue una richiesta.
+
+        Returns:
+            Tuple (stato HTTP, payload JSON)
+        """
+        routes = {
+            ("GET", "/health"): self._health,
+            ("GET", "/analyze"): self._analyze_query,
+            ("POST", "/analyze"): self._analyze,
+            ("POST", "/analyze/periods"): self._analyze_periods,
+        }
+        try:
+            handler = routes.get((method, path.rstrip("/") or "/"))
+            if handler is None:
+                if any(route_path == path.rstrip("/") for _, route_path in routes):
+                    raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"Metodo {method} non supportato su {path}")
+                raise ApiError(HTTPStatus.NOT_FOUND, f"Endpoint sconosciuto: {path}")
+            return HTTPStatus.OK, handler(query, body)
+        except ApiError as e:
+            return e.status, {"error": e.message}
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except DataFetchError as e:
+            return HTTPStatus.BAD_GATEWAY, {"error": str(e)}
+
+    def _health(self, query, body) -> dict:
+        fetcher = self.service.fetcher
+        data = {"status": "ok"}
+        if isinstance(fetcher, CoalescingFetcher):
+            data["price_cache"] = {"entries": len(fetcher), **fetcher.stats.to_dict()}
+        return data
+
+    def _analyze_query(self, query, body) -> dict:
+        portfolio = portfolio_from_query(query)
+        period = query.get("period", [self.default_period])[0]
+        return self._report(portfolio, period)
+
+    def _analyze(self, query, body) -> dict:
+        data = _json_body(body)
+        return self._report(parse_portfolio(data.get("portfolio")), str(data.get("period", self.default_period)))
+
+    def _analyze_periods(self, query, body) -> dict:
+        data = _json_body(body)
+        periods = data.get("periods")
+        if not isinstance(periods, list) or not periods:
+            raise ValueError("Serve una lista 'periods' non vuota")
+        multi = self.service.analyze_periods(
+            parse_portfolio(data.get("portfolio")), [str(p) for p in periods], include_ai_insight=False
+        )
+        return multi_period_to_dict(multi, self.include_matrices)
+
+    def _report(self, portfolio: Portfolio, period: str) -> dict:
+        report = self.service.analyze_portfolio(portfolio, period=period, include_ai_insight=False)
+        return report_to_dict(report, self.include_matrices)
+
+
+def _json_body(body: bytes) -> dict:
+    """Decodifica il corpo JSON della richiesta."""
+    try:
+        data = json.loads(body or b"{}")
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"JSON non valido: {e}") from None
+    if not isinstance(data, dict):
+        raise ValueError("Il corpo della richiesta deve essere un oggetto JSON")
+    return data
+
+
+def _content_length(value: str | None) -> int:
+    """
+    Lunghezza del corpo dall'intestazione Content-Length (0 se assente).
+
+    Raises:
+        ValueError: Se il valore non è un intero non negativo
+    """
+    if not value:
+        return 0
+    try:
+        length = int(value)
+    except ValueError:
+        raise ValueError(f"Content-Length non valido: {value}") from None
+    if length < 0:
+        raise ValueError(f"Content-Length non valido: {value}")
+    return length
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Adatta le richieste HTTP ad AnalysisAPI.handle."""
+
+    # Keep-alive: i client che riusano la connessione evitano un handshake per richiesta
+    protocol_version = "HTTP/1.1"
+    # Intestazioni e corpo sono scritti separatamente: senza TCP_NODELAY
+    # Nagle e il delayed ACK del client aggiungono ~40 ms a risposta
+    disable_nagle_algorithm = True
+    server: "AnalysisHTTPServer"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        try:
+            length = _content_length(self.headers.get("Content-Length"))
+        except ValueError as e:
+            # Senza una lunghezza valida il corpo non si può saltare: si chiude
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+            self.close_connection = True
+        else:
+            status, payload = self._handle(method, url, length)
+
+        data = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method: str, url: SplitResult, length: int) -> tuple[HTTPStatus, dict]:
+        """Legge il corpo e passa la richiesta all'API."""
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Richiesta troppo grande"}
+        body = self.rfile.read(length) if length else b""
+        try:
+            return self.server.api.handle(method, url.path, parse_qs(url.query), body)
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Errore interno: {e}"}
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class AnalysisHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer con l'API condivisa da tutti i thread."""
+
+    daemon_threads = True
+    # Backlog ampio: i test di carico aprono molte connessioni insieme
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], api: AnalysisAPI, verbose: bool = False):
+        self.api = api
+        self.verbose = verbose
+        super().__init__(address, _Handler)
+
+
+def create_server(api: AnalysisAPI, host: str = "127.0.0.1", port: int = 8000, verbose: bool = False) -> AnalysisHTTPServer:
+    """
+    Crea il server (port=0 sceglie una porta libera, vedi server_port).
+
+    Avviarlo con serve_forever(), eventualmente in un thread.
+    """
+    return AnalysisHTTPServer((host, port), api, verbose)
@@ -1,6 +1,7 @@
 """
 Loader per configurazione YAML.
 """
+import glob
 import yaml
 from pathlib import Path
 from src.data.models.asset import Asset
@@ -45,4 +46,37 @@ def load_portfolio(config_path: str = "config/portfolio.yaml") -> Portfolio:
     return Portfolio(
         name=config.get('name', 'Portfolio'),
         assets=assets,
-    )
\ No newline at end of file
+    )
+
+def load_portfolios(source: str) -> dict[str, Portfolio]:
+    """
+    Carica più portafogli da una cartella o da un pattern glob.
+    
+    Args:
+        source: Cartella (tutti i file .yaml/.yml) o pattern glob (es. "clienti/*.yaml")
+    
+    Returns:
+        Dict {nome file senza estensione: Portfolio}, in ordine alfabetico
+    
+    Raises:
+        FileNotFoundError: Se nessun file corrisponde
+        ValueError: Se un file ha un formato non valido (con il nome del file)
+    """
+    path = Path(source)
+    
+    if path.is_dir():
+        files = sorted(p for p in path.iterdir() if p.suffix in (".yaml", ".yml"))
+    else:
+        files = sorted(Path(p) for p in glob.glob(source))
+    
+    if not files:
+        raise FileNotFoundError(f"Nessun file di configurazione trovato: {source}")
+    
+    portfolios = {}
+    for file in files:
+        try:
+            portfolios[file.stem] = load_portfolio(str(file))
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"{file.name}: {e}") from e
+    
+    return portfolios
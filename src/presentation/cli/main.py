@@ -1,79 +1,908 @@
 """
 CLI per Portfolio Intelligence.
 """
+import asyncio
+import cProfile
+from contextlib import contextmanager
 import typer
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
+from rich.live import Live
 from pathlib import Path
 
-from src.application.services.analysis_service import AnalysisService
-from src.presentation.cli.config_loader import load_portfolio
+from src.application.services.analysis_service import AnalysisService, PORTFOLIO_JOIN_MODES
+from src.domain.analysis.value_at_risk import METHODS as VAR_METHODS
+from src.data.exceptions import DataFetchError
+from src.data.fetchers.cached_fetcher import CachedPriceFetcher
+from src.data.fetchers.insight_cache import InsightCache
+from src.presentation.cli.config_loader import load_portfolio, load_portfolios
+from src.presentation.reports.writers import EXTENSIONS as EXPORT_EXTENSIONS, var_cell, var_columns, writer_for
+from src.profiling import Profiler, span
 
 # Inizializza Typer e Rich
 app = typer.Typer(help="Portfolio Intelligence - Analizza il tuo portafoglio")
 console = Console()
 
 
+def _validate_join(value: str) -> str:
+    if value not in PORTFOLIO_JOIN_MODES:
+        raise typer.BadParameter(f"usa una tra: {', '.join(PORTFOLIO_JOIN_MODES)}")
+    return value
+
+
+def _validate_var_method(value: str) -> str:
+    if value not in VAR_METHODS:
+        raise typer.BadParameter(f"usa uno tra: {', '.join(VAR_METHODS)}")
+    return value
+
+
+def _validate_exports(values: list[str] | None) -> list[str]:
+    """Controlla subito le estensioni degli export, prima dell'analisi."""
+    for value in values or []:
+        try:
+            writer_for(value)
+        except ValueError:
+            raise typer.BadParameter(f"formato non supportato: {value} (usa {', '.join(EXPORT_EXTENSIONS)})") from None
+    return values or []
+
+
+def _validate_formats(values: list[str]) -> list[str]:
+    """Converte i formati (es. "md", ".CSV") in estensioni, controllandoli con writer_for."""
+    extensions = [f".{value.lstrip('.').lower()}" for value in values]
+    for value, extension in zip(values, extensions):
+        try:
+            writer_for(f"report{extension}")
+        except ValueError:
+            raise typer.BadParameter(f"formato non supportato: {value} (usa {', '.join(EXPORT_EXTENSIONS)})") from None
+    return list(dict.fromkeys(extensions))
+
+
+def _parse_var_levels(value: str) -> tuple[float, ...]:
+    """Converte "95,99" (o "0.95,0.99") nei livelli di confidenza."""
+    try:
+        levels = tuple(float(item) for item in value.split(",") if item.strip())
+    except ValueError:
+        raise typer.BadParameter(f"livelli non validi: {value}") from None
+    levels = tuple(level / 100 if level >= 1 else level for level in levels)
+    if not levels or any(not 0 < level < 1 for level in levels):
+        raise typer.BadParameter("i livelli devono essere tra 0 e 100 (es. 95,99)")
+    return levels
+
+
+def _parse_var_horizons(value: str) -> tuple[int, ...]:
+    """Converte "1,10" negli orizzonti in giorni di trading."""
+    try:
+        horizons = tuple(int(item) for item in value.split(",") if item.strip())
+    except ValueError:
+        raise typer.BadParameter(f"orizzonti non validi: {value}") from None
+    if not horizons or any(horizon < 1 for horizon in horizons):
+        raise typer.BadParameter("gli orizzonti devono essere giorni interi positivi (es. 1,10)")
+    return horizons
+
+
 @app.command()
 def analyze(
     period: str = typer.Option("1y", "--period", "-p", help="Periodo di analisi (es. 3mo, 1y, 2y)"),
+    periods: str = typer.Option(
+        None, "--periods", help="Più orizzonti affiancati con un solo download (es. 1mo,3mo,1y,5y)"
+    ),
     config: str = typer.Option("config/portfolio.yaml", "--config", "-c", help="File di configurazione"),
     no_ai: bool = typer.Option(False, "--no-ai", help="Disabilita insight AI"),
-    export: str = typer.Option(None, "--export", "-e", help="Esporta report in Markdown"),
+    export: list[str] = typer.Option(
+        None, "--export", "-e", callback=_validate_exports,
+        help="Esporta il report, formato dall'estensione: .md, .csv, .json, .jsonl, .html (ripetibile)"
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Scarica sempre i prezzi senza usare la cache locale"),
+    store: str = typer.Option(None, "--store", help="Leggi i prezzi dall'archivio locale in questa cartella (senza rete)"),
+    join: str = typer.Option(
+        "inner", "--join", callback=_validate_join,
+        help="Allineamento delle date: inner (solo date comuni) o ffill (ultimo prezzo noto)"
+    ),
+    var_method: str = typer.Option(
+        "historical", "--var-method", callback=_validate_var_method,
+        help="Metodo per VaR/CVaR: historical, parametric o monte_carlo"
+    ),
+    var_levels: str = typer.Option("95,99", "--var-levels", callback=_parse_var_levels, help="Livelli di confidenza del VaR in %"),
+    var_horizons: str = typer.Option("1,10", "--var-horizons", callback=_parse_var_horizons, help="Orizzonti del VaR in giorni di trading"),
+    stream: bool = typer.Option(False, "--stream", help="Mostra l'insight AI man mano che viene generato"),
+    ai_timeout: float = typer.Option(60.0, "--ai-timeout", help="Secondi massimi di attesa per ogni risposta AI"),
+    no_ai_cache: bool = typer.Option(False, "--no-ai-cache", help="Richiedi sempre un nuovo insight AI"),
+    ai_cache_tolerance: float = typer.Option(
+        0.0, "--ai-cache-tolerance", help="Riusa l'insight se le metriche differiscono meno di questa soglia (es. 0.05)"
+    ),
+    profile: bool = typer.Option(False, "--profile", help="Mostra i tempi di ogni stadio dell'analisi"),
+    profile_output: str = typer.Option(
+        None, "--profile-output", help="Salva il profilo: .prof = cProfile, altrimenti collapsed stack per flame graph"
+    ),
 ):
     """
     Analizza il portafoglio e mostra le metriche.
     """
     console.print("\n[bold blue]📊 Portfolio Intelligence[/bold blue]\n")
     
-    # Carica portfolio da YAML
+    with _profiling(profile, profile_output) as profiler:
+        # Carica portfolio da YAML
+        with span("config"):
+            portfolio = _load_portfolio_or_exit(config)
+        
+        # Analizza: con l'AI il report viene stampato mentre il riassunto è in generazione
+        with console.status("[bold green]Recupero dati e calcolo metriche..."):
+            service = AnalysisService(
+                fetcher=_build_fetcher(no_cache, store),
+                join=join,
+                var_method=var_method,
+                var_confidences=var_levels,
+                var_horizons=var_horizons,
+                ai_timeout=ai_timeout,
+                insight_cache=None if no_ai or no_ai_cache else InsightCache(tolerance=ai_cache_tolerance or None),
+            )
+            try:
+                if periods:
+                    multi = service.analyze_periods(
+                        portfolio, _parse_periods(periods), include_ai_insight=not no_ai, profiler=profiler
+                    )
+                elif no_ai or stream:
+                    report = service.analyze_portfolio(
+                        portfolio, period=period, include_ai_insight=False, profiler=profiler
+                    )
+                    with span("render"):
+                        _print_report(report)
+                else:
+                    report = asyncio.run(service.analyze_portfolio_async(
+                        portfolio, period=period, on_report=_print_report, profiler=profiler
+                    ))
+            except DataFetchError as e:
+                console.print(f"[red]Errore recupero dati: {e}[/red]")
+                raise typer.Exit(1)
+            except ValueError as e:
+                console.print(f"[red]Errore analisi: {e}[/red]")
+                raise typer.Exit(1)
+        
+        if periods:
+            with span("render"):
+                _print_periods(multi)
+            if export:
+                with span("export"):
+                    _export_periods(multi, export)
+        elif stream and not no_ai:
+            with span("ai"):
+                report.ai_insight = _stream_ai_insight(service, report)
+        elif report.ai_insight and not no_ai:
+            with span("render"):
+                _print_ai_insight(report)
+        
+        # Export se richiesto, tutti i formati in parallelo
+        if export and not periods:
+            with span("export"):
+                _export_reports([(report, path) for path in export])
+    
+    console.print("\n[dim]Analisi completata.[/dim]\n")
+
+
+@app.command("analyze-batch")
+def analyze_batch(
+    source: str = typer.Argument(..., help="Cartella o pattern glob di file YAML (es. 'clienti/*.yaml')"),
+    period: str = typer.Option("1y", "--period", "-p", help="Periodo di analisi (es. 3mo, 1y, 2y)"),
+    output_dir: str = typer.Option("reports", "--output-dir", "-o", help="Cartella per i report"),
+    formats: list[str] = typer.Option(
+        ["md"], "--format", "-f", callback=_validate_formats,
+        help="Formati dei report per portafoglio: md, csv, json, jsonl, html (ripetibile)"
+    ),
+    no_export: bool = typer.Option(False, "--no-export", help="Mostra solo il riepilogo, senza scrivere file"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Scarica sempre i prezzi senza usare la cache locale"),
+    store: str = typer.Option(None, "--store", help="Leggi i prezzi dall'archivio locale in questa cartella (senza rete)"),
+    join: str = typer.Option(
+        "inner", "--join", callback=_validate_join,
+        help="Allineamento delle date: inner (solo date comuni) o ffill (ultimo prezzo noto)"
+    ),
+):
+    """
+    Analizza più portafogli scaricando e analizzando ogni ticker una sola volta.
+    """
+    console.print("\n[bold blue]📊 Portfolio Intelligence — Batch[/bold blue]\n")
+    
     try:
-        portfolio = load_portfolio(config)
+        portfolios = load_portfolios(source)
+    except FileNotFoundError as e:
+        console.print(f"[red]Errore: {e}[/red]")
+        raise typer.Exit(1)
+    except ValueError as e:
+        console.print(f"[red]Errore configurazione: {e}[/red]")
+        raise typer.Exit(1)
+    
+    with console.status(f"[bold green]Analisi di {len(portfolios)} portafogli..."):
+        service = AnalysisService(fetcher=_build_fetcher(no_cache, store), join=join)
+        batch = service.analyze_portfolios(portfolios, period=period)
+    
+    for ticker, error in batch.fetch_errors.items():
+        console.print(f"[yellow]⚠️  {ticker} non recuperato: {error}[/yellow]")
+    for key, error in batch.errors.items():
+        console.print(f"[red]❌ {key}: {error}[/red]")
+    
+    _print_batch_summary(batch)
+    
+    if not no_export and batch.reports:
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        _export_reports([
+            (report, out / f"{key}{ext}") for key, report in batch.reports.items() for ext in formats
+        ])
+        _export_batch_summary(batch, str(out / "summary.md"), formats[0])
+    
+    console.print("\n[dim]Analisi batch completata.[/dim]\n")
+
+
+@app.command()
+def simulate(
+    period: str = typer.Option("5y", "--period", "-p", help="Storia usata per stimare i rendimenti"),
+    config: str = typer.Option("config/portfolio.yaml", "--config", "-c", help="File di configurazione"),
+    years: float = typer.Option(5.0, "--years", "-y", help="Orizzonte della proiezione in anni"),
+    paths: int = typer.Option(100_000, "--paths", "-n", help="Numero di percorsi simulati"),
+    mode: str = typer.Option("bootstrap", "--mode", "-m", help="Modalità: bootstrap o gbm"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Processi da usare (0 = tutte le CPU)"),
+    seed: int = typer.Option(None, "--seed", help="Seme per risultati riproducibili"),
+    initial: float = typer.Option(10_000.0, "--initial", help="Valore iniziale del portafoglio"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Scarica sempre i prezzi senza usare la cache locale"),
+    store: str = typer.Option(None, "--store", help="Leggi i prezzi dall'archivio locale in questa cartella (senza rete)"),
+    join: str = typer.Option(
+        "inner", "--join", callback=_validate_join,
+        help="Allineamento delle date: inner (solo date comuni) o ffill (ultimo prezzo noto)"
+    ),
+):
+    """
+    Proietta il valore futuro del portafoglio con una simulazione Monte Carlo.
+    """
+    console.print("\n[bold blue]🎲 Portfolio Intelligence — Monte Carlo[/bold blue]\n")
+    
+    portfolio = _load_portfolio_or_exit(config)
+    
+    with console.status("[bold green]Recupero dati e simulazione..."):
+        service = AnalysisService(fetcher=_build_fetcher(no_cache, store), join=join)
+        try:
+            result = service.simulate_portfolio(
+                portfolio,
+                period=period,
+                horizon_days=max(1, round(years * 252)),
+                n_paths=paths,
+                mode=mode,
+                workers=workers or None,
+                seed=seed,
+                initial_value=initial,
+            )
+        except DataFetchError as e:
+            console.print(f"[red]Errore recupero dati: {e}[/red]")
+            raise typer.Exit(1)
+        except ValueError as e:
+            console.print(f"[red]Errore simulazione: {e}[/red]")
+            raise typer.Exit(1)
+    
+    _print_simulation(portfolio.name, result)
+    console.print("\n[dim]Simulazione completata.[/dim]\n")
+
+
+@app.command()
+def optimize(
+    period: str = typer.Option("5y", "--period", "-p", help="Storia usata per stimare rendimenti e rischi"),
+    config: str = typer.Option("config/portfolio.yaml", "--config", "-c", help="File di configurazione"),
+    allow_short: bool = typer.Option(False, "--allow-short", help="Consenti pesi negativi (vendite allo scoperto)"),
+    max_weight: float = typer.Option(None, "--max-weight", help="Peso massimo per ogni asset (es. 0.4)"),
+    bound: list[str] = typer.Option(None, "--bound", "-b", help="Limiti per ticker, es. VWCE.MI=0.1:0.5 (ripetibile)"),
+    points: int = typer.Option(50, "--points", help="Punti della frontiera efficiente"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Scarica sempre i prezzi senza usare la cache locale"),
+    store: str = typer.Option(None, "--store", help="Leggi i prezzi dall'archivio locale in questa cartella (senza rete)"),
+    join: str = typer.Option(
+        "inner", "--join", callback=_validate_join,
+        help="Allineamento delle date: inner (solo date comuni) o ffill (ultimo prezzo noto)"
+    ),
+):
+    """
+    Calcola la frontiera efficiente e i pesi a Sharpe massimo e varianza minima.
+    """
+    console.print("\n[bold blue]🎯 Portfolio Intelligence — Ottimizzazione[/bold blue]\n")
+    
+    portfolio = _load_portfolio_or_exit(config)
+    
+    try:
+        bounds = _parse_bounds(portfolio, bound or [], max_weight, allow_short)
+    except ValueError as e:
+        console.print(f"[red]Errore limiti: {e}[/red]")
+        raise typer.Exit(1)
+    
+    with console.status("[bold green]Recupero dati e ottimizzazione..."):
+        service = AnalysisService(fetcher=_build_fetcher(no_cache, store), join=join)
+        try:
+            frontier = service.optimize_portfolio(
+                portfolio,
+                period=period,
+                long_only=not allow_short,
+                bounds=bounds,
+                n_points=points,
+            )
+        except DataFetchError as e:
+            console.print(f"[red]Errore recupero dati: {e}[/red]")
+            raise typer.Exit(1)
+        except ValueError as e:
+            console.print(f"[red]Errore ottimizzazione: {e}[/red]")
+            raise typer.Exit(1)
+    
+    _print_optimization(portfolio, frontier)
+    console.print("\n[dim]Ottimizzazione completata.[/dim]\n")
+
+
+@app.command()
+def backtest(
+    period: str = typer.Option("5y", "--period", "-p", help="Storia su cui eseguire il backtest"),
+    config: str = typer.Option("config/portfolio.yaml", "--config", "-c", help="File di configurazione"),
+    policy: list[str] = typer.Option(
+        None, "--policy", "-P",
+        help="Politica di ribilanciamento, ripetibile: none, monthly, quarterly, annual, band:5%, quarterly+band:10%"
+    ),
+    cost_bps: float = typer.Option(0.0, "--cost-bps", help="Costo di transazione in punti base sul controvalore scambiato"),
+    initial: float = typer.Option(10_000.0, "--initial", help="Valore iniziale del portafoglio"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Scarica sempre i prezzi senza usare la cache locale"),
+    store: str = typer.Option(None, "--store", help="Leggi i prezzi dall'archivio locale in questa cartella (senza rete)"),
+    join: str = typer.Option(
+        "inner", "--join", callback=_validate_join,
+        help="Allineamento delle date: inner (solo date comuni) o ffill (ultimo prezzo noto)"
+    ),
+):
+    """
+    Confronta sulla storia diverse politiche di ribilanciamento del portafoglio.
+    """
+    from src.domain.analysis.backtest import DEFAULT_POLICIES, RebalancePolicy
+
+    console.print("\n[bold blue]⏪ Portfolio Intelligence — Backtest[/bold blue]\n")
+
+    portfolio = _load_portfolio_or_exit(config)
+
+    try:
+        policies = [RebalancePolicy.parse(spec) for spec in policy or DEFAULT_POLICIES]
+    except ValueError as e:
+        console.print(f"[red]Errore politiche: {e}[/red]")
+        raise typer.Exit(1)
+
+    with console.status("[bold green]Recupero dati e backtest..."):
+        service = AnalysisService(fetcher=_build_fetcher(no_cache, store), join=join)
+        try:
+            result = service.backtest_portfolio(
+                portfolio,
+                period=period,
+                policies=policies,
+                transaction_cost=cost_bps / 10_000,
+                initial_value=initial,
+            )
+        except DataFetchError as e:
+            console.print(f"[red]Errore recupero dati: {e}[/red]")
+            raise typer.Exit(1)
+        except ValueError as e:
+            console.print(f"[red]Errore backtest: {e}[/red]")
+            raise typer.Exit(1)
+
+    _print_backtest(portfolio.name, result)
+    console.print("\n[dim]Backtest completato.[/dim]\n")
+
+
+@app.command()
+def correlate(
+    tickers: list[str] = typer.Argument(None, help="Ticker da analizzare (default: --universe, l'archivio --store o il portafoglio)"),
+    universe: Path = typer.Option(None, "--universe", "-u", help="File con un ticker per riga (# per i commenti)"),
+    config: str = typer.Option("config/portfolio.yaml", "--config", "-c", help="Portafoglio usato se non si indicano ticker"),
+    period: str = typer.Option("1y", "--period", "-p", help="Storia usata per i rendimenti"),
+    top: int = typer.Option(5, "--top", "-k", help="Asset più e meno correlati da riportare per ciascun asset"),
+    float32: bool = typer.Option(False, "--float32", help="Calcola in singola precisione (metà memoria)"),
+    no_cluster: bool = typer.Option(False, "--no-cluster", help="Salta il clustering: nessuna matrice N×N in memoria"),
+    block_size: int = typer.Option(512, "--block-size", help="Righe della matrice calcolate per blocco"),
+    limit: int = typer.Option(30, "--limit", help="Asset mostrati a schermo (0 = tutti)"),
+    output: str = typer.Option(None, "--output", "-o", help="Salva il riepilogo completo in CSV"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Scarica sempre i prezzi senza usare la cache locale"),
+    store: str = typer.Option(None, "--store", help="Leggi i prezzi dall'archivio locale in questa cartella (senza rete)"),
+    join: str = typer.Option(
+        "inner", "--join", callback=_validate_join,
+        help="Allineamento delle date: inner (solo date comuni) o ffill (ultimo prezzo noto)"
+    ),
+    profile: bool = typer.Option(False, "--profile", help="Mostra i tempi di ogni stadio"),
+):
+    """
+    Screen di correlazione su universi ampi: coppie estreme e ordinamento per cluster.
+    """
+    import numpy as np
+
+    console.print("\n[bold blue]🔗 Portfolio Intelligence — Correlazioni[/bold blue]\n")
+
+    with _profiling(profile, None) as profiler:
+        with span("config"):
+            tickers = _resolve_universe(tickers, universe, store, config)
+        if top < 1 or block_size < 1:
+            console.print("[red]Errore: --top e --block-size devono essere positivi[/red]")
+            raise typer.Exit(1)
+
+        with console.status(f"[bold green]Correlazioni su {len(tickers)} ticker..."):
+            service = AnalysisService(fetcher=_build_fetcher(no_cache, store), join=join)
+            try:
+                screen = service.screen_correlations(
+                    tickers,
+                    period=period,
+                    top_k=top,
+                    cluster=not no_cluster,
+                    dtype=np.float32 if float32 else np.float64,
+                    block_size=block_size,
+                    profiler=profiler,
+                )
+            except DataFetchError as e:
+                console.print(f"[red]Errore recupero dati: {e}[/red]")
+                raise typer.Exit(1)
+            except ValueError as e:
+                console.print(f"[red]Errore correlazioni: {e}[/red]")
+                raise typer.Exit(1)
+
+        with span("render"):
+            for ticker, error in screen.fetch_errors.items():
+                console.print(f"[yellow]⚠️  {ticker} non recuperato: {error}[/yellow]")
+            _print_correlations(screen, limit)
+        if output:
+            with span("export"):
+                _export_correlations_csv(screen, output)
+
+    console.print("\n[dim]Screen completato.[/dim]\n")
+
+
+@app.command()
+def watch(
+    config: str = typer.Option("config/portfolio.yaml", "--config", "-c", help="File di configurazione (ricaricato se modificato)"),
+    period: str = typer.Option("1y", "--period", "-p", help="Finestra di analisi (es. 3mo, 1y)"),
+    interval: float = typer.Option(60.0, "--interval", "-i", help="Secondi tra un aggiornamento e l'altro"),
+    count: int = typer.Option(0, "--count", "-n", help="Aggiornamenti da eseguire prima di uscire (0 = fino a Ctrl+C)"),
+    store: str = typer.Option(None, "--store", help="Leggi i prezzi dall'archivio locale in questa cartella (senza rete)"),
+    join: str = typer.Option(
+        "inner", "--join", callback=_validate_join,
+        help="Allineamento delle date: inner (solo date comuni) o ffill (ultimo prezzo noto)"
+    ),
+    var_method: str = typer.Option(
+        "historical", "--var-method", callback=_validate_var_method,
+        help="Metodo per VaR/CVaR: historical, parametric o monte_carlo"
+    ),
+):
+    """
+    Tiene il portafoglio in memoria e aggiorna le metriche a ogni nuova barra.
+    """
+    import time
+    from src.application.services.watch_service import PortfolioWatcher
+
+    if interval < 0:
+        console.print("[red]Errore: --interval non può essere negativo[/red]")
+        raise typer.Exit(1)
+
+    # Il watch scarica da sé solo le barre nuove: niente cache su disco in mezzo
+    service = AnalysisService(fetcher=_build_fetcher(no_cache=True, store=store), join=join, var_method=var_method)
+    watcher = PortfolioWatcher(service, config, load_portfolio, period=period)
+    with console.status("[bold green]Caricamento iniziale..."):
+        try:
+            watcher.start()
+        except FileNotFoundError as e:
+            console.print(f"[red]Errore: {e}[/red]")
+            raise typer.Exit(1)
+        except ValueError as e:
+            console.print(f"[red]Errore configurazione: {e}[/red]")
+            raise typer.Exit(1)
+        except DataFetchError as e:
+            console.print(f"[red]Errore recupero dati: {e}[/red]")
+            raise typer.Exit(1)
+
+    refreshes = 0
+    with Live(_watch_dashboard(watcher, interval), console=console, refresh_per_second=4) as live:
+        try:
+            while not count or refreshes < count:
+                time.sleep(interval)
+                watcher.refresh()
+                refreshes += 1
+                live.update(_watch_dashboard(watcher, interval))
+        except KeyboardInterrupt:
+            pass
+
+    console.print(f"\n[dim]Watch terminato dopo {refreshes} aggiornamenti.[/dim]\n")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Indirizzo su cui ascoltare"),
+    port: int = typer.Option(8000, "--port", help="Porta su cui ascoltare"),
+    ttl: float = typer.Option(300.0, "--ttl", help="Secondi per cui i prezzi restano in memoria"),
+    period: str = typer.Option("1y", "--period", "-p", help="Periodo di default delle richieste"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Non usare la cache prezzi su disco"),
+    store: str = typer.Option(None, "--store", help="Leggi i prezzi dall'archivio locale in questa cartella (senza rete)"),
+    join: str = typer.Option(
+        "inner", "--join", callback=_validate_join,
+        help="Allineamento delle date: inner (solo date comuni) o ffill (ultimo prezzo noto)"
+    ),
+    var_method: str = typer.Option(
+        "historical", "--var-method", callback=_validate_var_method,
+        help="Metodo per VaR/CVaR: historical, parametric o monte_carlo"
+    ),
+    matrices: bool = typer.Option(False, "--matrices", help="Includi covarianza e correlazione nelle risposte"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Registra ogni richiesta"),
+):
+    """
+    Avvia l'API HTTP locale di analisi (JSON), con cache prezzi condivisa.
+    """
+    from datetime import timedelta
+    from src.data.fetchers.coalescing_fetcher import CoalescingFetcher
+    from src.presentation.api.server import AnalysisAPI, create_server
+
+    if ttl < 0:
+        console.print("[red]Errore: --ttl non può essere negativo[/red]")
+        raise typer.Exit(1)
+
+    fetcher = CoalescingFetcher(_build_fetcher(no_cache, store), ttl=timedelta(seconds=ttl))
+    service = AnalysisService(fetcher=fetcher, join=join, var_method=var_method)
+    api = AnalysisAPI(service, include_matrices=matrices, default_period=period)
+    try:
+        server = create_server(api, host, port, verbose=verbose)
+    except OSError as e:
+        console.print(f"[red]Errore: impossibile ascoltare su {host}:{port} ({e})[/red]")
+        raise typer.Exit(1)
+
+    console.print(f"\n[bold blue]API in ascolto su http://{host}:{server.server_port}[/bold blue] [dim](Ctrl+C per uscire)[/dim]")
+    console.print("[dim]GET /health · GET/POST /analyze · POST /analyze/periods[/dim]\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    stats = fetcher.stats
+    console.print(
+        f"\n[dim]Server terminato: {stats.hits} prezzi dalla memoria, {stats.misses} scaricati, "
+        f"{stats.coalesced} richieste accorpate.[/dim]\n"
+    )
+
+
+@app.command("import-prices")
+def import_prices(
+    files: list[Path] = typer.Argument(..., help="CSV da importare (export yfinance, yf.download o formato lungo)"),
+    store: str = typer.Option(None, "--store", help="Cartella dell'archivio locale (default: ~/.local/share/...)"),
+    ticker: str = typer.Option(None, "--ticker", "-t", help="Ticker del file, se diverso dal nome (un solo file)"),
+):
+    """
+    Importa file CSV di prezzi nell'archivio binario locale.
+    """
+    from src.data.fetchers.local_store import DEFAULT_STORE_PATH, PriceStore
+    from src.data.price_import import import_files
+
+    price_store = PriceStore(store or DEFAULT_STORE_PATH)
+    with console.status(f"[bold green]Import di {len(files)} file..."):
+        try:
+            imported = import_files(price_store, files, ticker)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Errore import: {e}[/red]")
+            raise typer.Exit(1)
+
+    table = Table(title=f"Archivio {price_store.root}")
+    table.add_column("Ticker", style="cyan")
+    table.add_column("Barre", justify="right")
+    table.add_column("Dal", justify="right")
+    table.add_column("Al", justify="right")
+    for name in sorted(imported):
+        info = price_store.info(name)
+        table.add_row(name, str(info["rows"]), info["start"], info["end"])
+    console.print(table)
+    console.print(f"\n[dim]{len(imported)} ticker importati.[/dim]\n")
+
+
+def _parse_bounds(portfolio, specs: list[str], max_weight: float | None, allow_short: bool) -> dict:
+    """Converte le opzioni --bound/--max-weight nei limiti per ticker."""
+    default_low = -1.0 if allow_short else 0.0
+    default_high = 1.0 if max_weight is None else max_weight
+    bounds = {asset.ticker: (default_low, default_high) for asset in portfolio.assets}
+    
+    for spec in specs:
+        ticker, _, limits = spec.partition("=")
+        low, _, high = limits.partition(":")
+        if not ticker or not low or not high:
+            raise ValueError(f"Formato non valido: {spec} (atteso TICKER=min:max)")
+        bounds[ticker] = (float(low), float(high))
+    
+    return bounds
+
+
+def _print_optimization(portfolio, frontier):
+    """Stampa i pesi ottimali confrontati con quelli attuali e la frontiera."""
+    table = Table(title="Pesi ottimali")
+    table.add_column("Ticker", style="cyan")
+    table.add_column("Attuale", justify="right")
+    table.add_column("Sharpe max", justify="right")
+    table.add_column("Varianza min", justify="right")
+    
+    current = {asset.ticker: asset.weight for asset in portfolio.assets}
+    for i, ticker in enumerate(frontier.tickers):
+        table.add_row(
+            ticker,
+            f"{current.get(ticker, 0.0):.1%}",
+            f"{frontier.max_sharpe.weights[i]:.1%}",
+            f"{frontier.min_variance.weights[i]:.1%}",
+        )
+    table.add_section()
+    for label, point in (("Rendimento atteso", "expected_return"), ("Volatilità", "volatility")):
+        table.add_row(
+            label,
+            "",
+            f"{getattr(frontier.max_sharpe, point):.2%}",
+            f"{getattr(frontier.min_variance, point):.2%}",
+        )
+    table.add_row("Sharpe", "", f"{frontier.max_sharpe.sharpe_ratio:.2f}", f"{frontier.min_variance.sharpe_ratio:.2f}")
+    console.print(table)
+    
+    curve = Table(title="Frontiera efficiente")
+    curve.add_column("Volatilità", justify="right")
+    curve.add_column("Rendimento atteso", justify="right")
+    step = max(1, len(frontier.volatilities) // 10)
+    for vol, ret in zip(frontier.volatilities[::step], frontier.expected_returns[::step]):
+        curve.add_row(f"{vol:.2%}", f"{ret:+.2%}")
+    console.print(curve)
+
+
+def _load_portfolio_or_exit(config: str):
+    """Carica il portafoglio o termina con un messaggio d'errore."""
+    try:
+        return load_portfolio(config)
     except FileNotFoundError:
         console.print(f"[red]Errore: File non trovato: {config}[/red]")
         raise typer.Exit(1)
     except ValueError as e:
         console.print(f"[red]Errore configurazione: {e}[/red]")
         raise typer.Exit(1)
+
+
+def _print_simulation(portfolio_name: str, result):
+    """Stampa le bande percentili della simulazione."""
+    summary = f"""[bold]{portfolio_name}[/bold]
+Modalità: {result.mode} — {result.n_paths:,} percorsi, {result.horizon_days} giorni
+
+💰 Valore atteso: [green]{result.expected_value:,.0f}[/green] (iniziale {result.initial_value:,.0f})
+⚠️  Probabilità di perdita: [yellow]{result.probability_of_loss:.1%}[/yellow]
+"""
+    console.print(Panel(summary, title="Monte Carlo", border_style="blue"))
+    
+    table = Table(title="Bande percentili")
+    table.add_column("Anno", justify="right", style="cyan")
+    for pct in result.percentiles:
+        table.add_column(f"P{pct:g}", justify="right")
     
-    # Analizza
-    with console.status("[bold green]Recupero dati e calcolo metriche..."):
-        service = AnalysisService()
-        report = service.analyze_portfolio(
-            portfolio, 
-            period=period, 
-            include_ai_insight=not no_ai
+    for i, day in enumerate(result.checkpoints):
+        table.add_row(
+            f"{day / 252:.2f}",
+            *(f"{result.bands[j, i]:,.0f}" for j in range(len(result.percentiles))),
         )
     
-    # Mostra risultati
-    _print_summary(report)
-    _print_assets_table(report)
+    console.print(table)
+
+
+def _print_backtest(portfolio_name: str, result):
+    """Stampa il confronto tra le politiche di ribilanciamento."""
+    start = str(result.dates[0].astype("datetime64[D]"))
+    end = str(result.dates[-1].astype("datetime64[D]"))
+    table = Table(title=f"{portfolio_name} — {start} → {end}")
+    table.add_column("Politica", style="cyan")
+    table.add_column("Valore finale", justify="right")
+    table.add_column("Rendimento", justify="right")
+    table.add_column("CAGR", justify="right")
+    table.add_column("Volatilità", justify="right")
+    table.add_column("Max DD", justify="right")
+    table.add_column("Sharpe", justify="right")
+    table.add_column("Ribil.", justify="right")
+    table.add_column("Turnover/anno", justify="right")
+    table.add_column("Costi", justify="right")
+
+    for j, policy in enumerate(result.policies):
+        ret = result.total_return[j]
+        ret_color = "green" if ret > 0 else "red"
+        table.add_row(
+            policy.name,
+            f"{result.equity[-1, j]:,.0f}",
+            f"[{ret_color}]{ret:+.2%}[/{ret_color}]",
+            f"{result.cagr[j]:+.2%}",
+            f"{result.volatility[j]:.2%}",
+            f"[red]{result.max_drawdown[j]:.2%}[/red]",
+            f"{result.sharpe_ratio[j]:.2f}",
+            str(result.rebalances[j]),
+            f"{result.annual_turnover[j]:.1%}",
+            f"{result.costs[j]:,.2f}",
+        )
+
+    console.print(table)
+
+
+def _resolve_universe(tickers: list[str] | None, universe: Path | None, store: str | None, config: str) -> list[str]:
+    """Ticker dello screen: argomenti, file --universe, intero archivio --store o portafoglio."""
+    if tickers:
+        return list(tickers)
+    if universe is not None:
+        try:
+            lines = universe.read_text().splitlines()
+        except OSError as e:
+            console.print(f"[red]Errore: {e}[/red]")
+            raise typer.Exit(1)
+        return [line.split("#")[0].strip() for line in lines if line.split("#")[0].strip()]
+    if store is not None:
+        from src.data.fetchers.local_store import PriceStore
+        return PriceStore(store).tickers()
+    return [asset.ticker for asset in _load_portfolio_or_exit(config).assets]
+
+
+def _pairs_text(pairs, row: int, most: bool, precision: int = 2) -> str:
+    """Coppie di un asset come "TICKER ρ, ..." (le coppie non valide sono omesse)."""
+    indices, values = (pairs.most, pairs.most_values) if most else (pairs.least, pairs.least_values)
+    return ", ".join(
+        f"{pairs.tickers[j]} {value:+.{precision}f}" for j, value in zip(indices[row], values[row]) if value == value
+    )
+
+
+def _print_correlations(screen, limit: int):
+    """Stampa le coppie estreme per asset, nell'ordine dei cluster se disponibile."""
+    order = screen.clusters.order if screen.clusters is not None else range(len(screen.tickers))
+    rows = list(order)[:limit] if limit else list(order)
+    title = f"Correlazioni ({len(screen.tickers)} ticker, {screen.observations} rendimenti)"
+    if len(rows) < len(screen.tickers):
+        title += f" — primi {len(rows)}"
+    table = Table(title=title)
+    table.add_column("Ticker", style="cyan")
+    table.add_column("Più correlati")
+    table.add_column("Meno correlati")
+    for i in rows:
+        table.add_row(
+            screen.tickers[i],
+            f"[green]{_pairs_text(screen.pairs, i, True)}[/green]",
+            f"[red]{_pairs_text(screen.pairs, i, False)}[/red]",
+        )
+    console.print(table)
+
+
+def _export_correlations_csv(screen, filepath: str):
+    """Esporta in CSV il riepilogo di tutti gli asset, riga per riga."""
+    import csv
+
+    order = screen.clusters.order if screen.clusters is not None else range(len(screen.tickers))
+    with open(filepath, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "ticker", "most_correlated", "least_correlated"])
+        for rank, i in enumerate(order, 1):
+            writer.writerow([
+                rank,
+                screen.tickers[i],
+                _pairs_text(screen.pairs, i, True, precision=4),
+                _pairs_text(screen.pairs, i, False, precision=4),
+            ])
+    console.print(f"[green]✅ Correlazioni esportate in: {filepath}[/green]")
+
+
+def _watch_dashboard(watcher, interval: float):
+    """Dashboard del watch: riepilogo con lo stato dell'ultimo aggiornamento, asset e VaR."""
+    report, update = watcher.report, watcher.last_update
+    status = [f"[dim]Aggiornato: {update.refreshed_at:%Y-%m-%d %H:%M:%S} — ogni {interval:g}s[/dim]"]
+    if update.new_bars:
+        status.append("Nuove barre: " + ", ".join(f"{t} +{n}" for t, n in update.new_bars.items()))
+    if update.config_reloaded:
+        status.append("[cyan]Configurazione ricaricata[/cyan]")
+    if update.config_error is not None:
+        status.append(f"[red]Configurazione non valida, resta la precedente: {update.config_error}[/red]")
+    if update.analysis_error is not None:
+        status.append(f"[red]Analisi non riuscita, resta il report precedente: {update.analysis_error}[/red]")
+    status += [f"[yellow]⚠️  {ticker}: {error}[/yellow]" for ticker, error in update.errors.items()]
+
+    last_bars = {
+        ticker: str(state.series.dates[-1].astype("datetime64[D]")) for ticker, state in watcher.assets.items()
+    }
+    parts = [_summary_panel(report, "\n".join(status)), _assets_table(report, last_bars)]
+    if report.value_at_risk is not None:
+        parts.append(_var_table(report.value_at_risk))
+    return Group(*parts)
+
+
+def _build_fetcher(no_cache: bool = False, store: str | None = None):
+    """Crea il fetcher dei prezzi: archivio locale, oppure Yahoo con cache salvo richiesta contraria."""
+    if store is not None:
+        from src.data.fetchers.local_store import LocalStoreFetcher
+        return LocalStoreFetcher(store)
     
-    if report.ai_insight and not no_ai:
-        _print_ai_insight(report)
+    from src.data.fetchers.yahoo_fetcher import YahooFetcher
+    
+    fetcher = YahooFetcher()
+    if no_cache:
+        return fetcher
+    return CachedPriceFetcher(fetcher)
+
+
+@contextmanager
+def _profiling(show: bool, output: str | None):
+    """
+    Attiva il profiler per il corpo del comando.
     
-    # Export se richiesto
-    if export:
-        _export_markdown(report, export)
+    A fine comando (se completato) stampa la tabella dei tempi con `show`, e
+    con `output` salva il profilo: cProfile se il file finisce in .prof,
+    altrimenti gli span in formato collapsed stack.
+    """
+    profiler = Profiler()
+    cprofile = cProfile.Profile() if output and output.endswith(".prof") else None
     
-    console.print("\n[dim]Analisi completata.[/dim]\n")
+    if cprofile:
+        cprofile.enable()
+    try:
+        with profiler.activate():
+            yield profiler
+    finally:
+        if cprofile:
+            cprofile.disable()
+    
+    if show or output:
+        _print_profile(profiler)
+    if cprofile:
+        cprofile.dump_stats(output)
+        console.print(f"[green]✅ Profilo cProfile salvato in: {output}[/green]")
+    elif output:
+        Path(output).write_text("\n".join(profiler.collapsed_stacks()) + "\n")
+        console.print(f"[green]✅ Collapsed stack salvati in: {output}[/green]")
+
+
+def _print_profile(profiler):
+    """Stampa l'albero dei tempi: reale, CPU, chiamate e quota sul totale."""
+    total = profiler.root.wall or 1.0
+    table = Table(title="Tempi per stadio")
+    table.add_column("Stadio", style="cyan")
+    table.add_column("Chiamate", justify="right")
+    table.add_column("Reale", justify="right")
+    table.add_column("CPU", justify="right")
+    table.add_column("% totale", justify="right")
+    
+    for depth, node in profiler.root.walk():
+        table.add_row(
+            "  " * depth + node.name,
+            str(node.count),
+            f"{node.wall * 1000:,.1f} ms",
+            f"{node.cpu * 1000:,.1f} ms",
+            f"{node.wall / total:.1%}",
+        )
+    
+    console.print(table)
+
+
+def _print_report(report):
+    """Stampa asset esclusi, riepilogo e dettaglio asset."""
+    _print_fetch_errors(report)
+    _print_summary(report)
+    _print_assets_table(report)
+    _print_var_table(report)
+
+
+def _print_fetch_errors(report):
+    """Segnala gli asset esclusi perché il fetch è fallito."""
+    for ticker, error in report.fetch_errors.items():
+        console.print(f"[yellow]⚠️  {ticker} escluso dall'analisi: {error}[/yellow]")
 
 
 def _print_summary(report):
     """Stampa il riepilogo del portafoglio."""
+    console.print(_summary_panel(report))
+
+
+def _summary_panel(report, footer: str = "") -> Panel:
+    """Pannello di riepilogo del portafoglio."""
     summary = f"""[bold]{report.portfolio_name}[/bold]
 Periodo: {report.period}
 
 📈 Rendimento: [green]{report.portfolio_return:+.2%}[/green]
 📊 CAGR: [green]{report.portfolio_cagr:+.2%}[/green]
 📉 Volatilità: [yellow]{report.portfolio_volatility:.2%}[/yellow]
-"""
-    console.print(Panel(summary, title="Riepilogo", border_style="blue"))
+{footer}"""
+    return Panel(summary, title="Riepilogo", border_style="blue")
 
 
 def _print_assets_table(report):
     """Stampa la tabella degli asset."""
+    console.print(_assets_table(report))
+
+
+def _assets_table(report, last_bars: dict[str, str] | None = None) -> Table:
+    """Tabella degli asset, con la data dell'ultima barra se indicata."""
     table = Table(title="Dettaglio Asset")
     
     table.add_column("Ticker", style="cyan")
@@ -81,60 +910,217 @@ def _print_assets_table(report):
     table.add_column("Volatilità", justify="right")
     table.add_column("Sharpe", justify="right")
     table.add_column("Max DD", justify="right")
+    if last_bars is not None:
+        table.add_column("Ultima barra", justify="right")
     
     for ticker, analysis in report.assets.items():
         ret_color = "green" if analysis.total_return >= 0 else "red"
         sharpe_color = "green" if analysis.sharpe_ratio >= 1 else "yellow" if analysis.sharpe_ratio >= 0 else "red"
-        
-        table.add_row(
+        cells = [
             ticker,
             f"[{ret_color}]{analysis.total_return:+.2%}[/{ret_color}]",
             f"{analysis.volatility:.2%}",
             f"[{sharpe_color}]{analysis.sharpe_ratio:.2f}[/{sharpe_color}]",
             f"[red]{analysis.max_drawdown:.2%}[/red]",
-        )
+        ]
+        if last_bars is not None:
+            cells.append(last_bars.get(ticker, "-"))
+        table.add_row(*cells)
     
+    return table
+
+
+def _print_var_table(report):
+    """Stampa VaR e CVaR di asset e portafoglio per livello e orizzonte."""
+    if report.value_at_risk is not None:
+        console.print(_var_table(report.value_at_risk))
+
+
+def _var_table(var, period: str | None = None) -> Table:
+    """Tabella di VaR e CVaR di asset e portafoglio per livello e orizzonte."""
+    columns = var_columns(var)
+    scope = f"{period}, {var.method}" if period else var.method
+    table = Table(title=f"Value at Risk — VaR / CVaR ({scope})")
+    table.add_column("Ticker", style="cyan")
+    for label, _, _ in columns:
+        table.add_column(label, justify="right")
+    
+    for i, ticker in enumerate(var.tickers):
+        table.add_row(ticker, *(f"[red]{var_cell(var.var[c, h, i], var.cvar[c, h, i])}[/red]" for _, c, h in columns))
+    table.add_row(
+        "[bold]Portafoglio[/bold]",
+        *(f"[bold red]{var_cell(var.portfolio_var[c, h], var.portfolio_cvar[c, h])}[/bold red]" for _, c, h in columns),
+    )
+    return table
+
+
+def _parse_periods(periods: str) -> list[str]:
+    """Divide "1mo,3mo,1y" negli orizzonti, ignorando spazi e voci vuote."""
+    return [period.strip() for period in periods.split(",") if period.strip()]
+
+
+def _print_periods(multi):
+    """Stampa riepilogo e asset con gli orizzonti affiancati."""
+    reports = multi.reports
+    for period, error in multi.errors.items():
+        console.print(f"[yellow]⚠️  Periodo {period} escluso: {error}[/yellow]")
+    excluded = {ticker: error for report in reports.values() for ticker, error in report.fetch_errors.items()}
+    for ticker, error in excluded.items():
+        console.print(f"[yellow]⚠️  {ticker} escluso da almeno un periodo: {error}[/yellow]")
+    
+    summary = Table(title=f"{multi.portfolio_name} — Riepilogo (dati scaricati: {multi.fetched_period})")
+    summary.add_column("Metrica", style="cyan")
+    for period in reports:
+        summary.add_column(period, justify="right")
+    summary.add_row("Rendimento", *(_signed(r.portfolio_return) for r in reports.values()))
+    summary.add_row("CAGR", *(_signed(r.portfolio_cagr) for r in reports.values()))
+    summary.add_row("Volatilità", *(f"{r.portfolio_volatility:.2%}" for r in reports.values()))
+    console.print(summary)
+    
+    tickers = list(dict.fromkeys(ticker for r in reports.values() for ticker in r.assets))
+    table = Table(title="Dettaglio Asset — Rendimento (volatilità)")
+    table.add_column("Ticker", style="cyan")
+    for period in reports:
+        table.add_column(period, justify="right")
+    for ticker in tickers:
+        cells = []
+        for report in reports.values():
+            analysis = report.assets.get(ticker)
+            cells.append(
+                "—" if analysis is None else f"{_signed(analysis.total_return)} [dim]({analysis.volatility:.1%})[/dim]"
+            )
+        table.add_row(ticker, *cells)
     console.print(table)
+    
+    for period, report in reports.items():
+        if report.value_at_risk is not None:
+            console.print(_var_table(report.value_at_risk, period))
+    
+    longest = reports.get(multi.fetched_period)
+    if longest is not None and longest.ai_insight:
+        _print_ai_insight(longest)
+
+
+def _signed(value: float) -> str:
+    """Percentuale con segno, verde se positiva e rossa se negativa."""
+    color = "green" if value >= 0 else "red"
+    return f"[{color}]{value:+.2%}[/{color}]"
 
 
 def _print_ai_insight(report):
     """Stampa l'insight AI."""
     console.print(Panel(
         report.ai_insight.full_analysis,
-        title="🤖 AI Insight",
+        title="🤖 AI Insight" + (" (dalla cache)" if report.ai_insight.from_cache else ""),
         border_style="green"
     ))
+    
+    if report.ai_insight.asset_comments:
+        comments = "\n\n".join(
+            f"[cyan]{ticker}[/cyan]: {comment}"
+            for ticker, comment in report.ai_insight.asset_comments.items()
+        )
+        console.print(Panel(comments, title="🤖 Commenti per asset", border_style="green"))
 
 
-def _export_markdown(report, filepath: str):
-    """Esporta il report in Markdown."""
-    md_content = f"""# Report Portafoglio: {report.portfolio_name}
-
-**Data analisi:** {report.analysis_date.strftime('%Y-%m-%d %H:%M')}
-**Periodo:** {report.period}
+def _stream_ai_insight(service, report):
+    """Mostra l'insight AI in un pannello live aggiornato a ogni frammento."""
+    parts = []
+    
+    def panel(title="🤖 AI Insight"):
+        text = "".join(parts) or "[dim]In attesa della risposta...[/dim]"
+        return Panel(text, title=title, border_style="green")
+    
+    with Live(panel(), console=console, refresh_per_second=15) as live:
+        def on_text(delta):
+            parts.append(delta)
+            live.update(panel())
+        
+        insight = service.stream_ai_insight(report, on_text)
+        
+        if insight is None:
+            live.update(Panel("[dim]Insight AI non disponibile[/dim]", title="🤖 AI Insight", border_style="yellow"))
+        elif insight.from_cache:
+            live.update(panel("🤖 AI Insight (dalla cache)"))
+    
+    return insight
 
-## Riepilogo
 
-| Metrica | Valore |
-|---------|--------|
-| Rendimento | {report.portfolio_return:+.2%} |
-| CAGR | {report.portfolio_cagr:+.2%} |
-| Volatilità | {report.portfolio_volatility:.2%} |
+def _print_batch_summary(batch):
+    """Stampa il riepilogo combinato di tutti i portafogli."""
+    table = Table(title=f"Riepilogo portafogli ({len(batch.universe)} ticker unici)")
+    
+    table.add_column("Portafoglio", style="cyan")
+    table.add_column("Asset", justify="right")
+    table.add_column("Rendimento", justify="right")
+    table.add_column("CAGR", justify="right")
+    table.add_column("Volatilità", justify="right")
+    
+    for key, report in batch.reports.items():
+        ret_color = "green" if report.portfolio_return >= 0 else "red"
+        table.add_row(
+            f"{report.portfolio_name} [dim]({key})[/dim]",
+            str(len(report.assets)),
+            f"[{ret_color}]{report.portfolio_return:+.2%}[/{ret_color}]",
+            f"{report.portfolio_cagr:+.2%}",
+            f"{report.portfolio_volatility:.2%}",
+        )
+    
+    console.print(table)
 
-## Dettaglio Asset
 
-| Ticker | Rendimento | Volatilità | Sharpe | Max DD |
-|--------|------------|------------|--------|--------|
-"""
-    
-    for ticker, analysis in report.assets.items():
-        md_content += f"| {ticker} | {analysis.total_return:+.2%} | {analysis.volatility:.2%} | {analysis.sharpe_ratio:.2f} | {analysis.max_drawdown:.2%} |\n"
+def _export_batch_summary(batch, filepath: str, extension: str = ".md"):
+    """Esporta il riepilogo combinato in Markdown."""
+    lines = [
+        "# Riepilogo portafogli",
+        "",
+        f"**Ticker unici analizzati:** {len(batch.universe)}",
+        "",
+        "| Portafoglio | File | Asset | Rendimento | CAGR | Volatilità |",
+        "|-------------|------|-------|------------|------|------------|",
+    ]
+    for key, report in batch.reports.items():
+        lines.append(
+            f"| {report.portfolio_name} | {key}{extension} | {len(report.assets)} | "
+            f"{report.portfolio_return:+.2%} | {report.portfolio_cagr:+.2%} | {report.portfolio_volatility:.2%} |"
+        )
+    if batch.errors:
+        lines += ["", "## Portafogli non analizzati", ""]
+        lines += [f"- {key}: {error}" for key, error in batch.errors.items()]
     
-    if report.ai_insight:
-        md_content += f"\n## AI Insight\n\n{report.ai_insight.full_analysis}\n"
+    Path(filepath).write_text("\n".join(lines) + "\n")
+    console.print(f"[green]✅ Riepilogo esportato in: {filepath}[/green]")
+
+
+def _export_reports(jobs: list[tuple]):
+    """
+    Scrive in parallelo gli export (report, percorso[, writer]), nel formato
+    dato dall'estensione se il writer non è indicato.
+    """
+    from src.presentation.reports.writers import export_reports
     
-    Path(filepath).write_text(md_content)
-    console.print(f"\n[green]✅ Report esportato in: {filepath}[/green]")
+    errors = export_reports(jobs)
+    for _, path, *_ in jobs:
+        if str(path) in errors:
+            console.print(f"[red]❌ Export di {path} non riuscito: {errors[str(path)]}[/red]")
+        else:
+            console.print(f"[green]✅ Report esportato in: {path}[/green]")
+
+
+def _export_periods(multi, paths: list[str]):
+    """
+    Export con più orizzonti: il Markdown li affianca in un solo file,
+    gli altri formati hanno un file per orizzonte (es. report_1y.csv).
+    """
+    from src.presentation.reports.writers import MarkdownWriter, PeriodsMarkdownWriter
+
+    jobs = []
+    for path in map(Path, paths):
+        if isinstance(writer_for(path), MarkdownWriter):
+            jobs.append((multi, path, PeriodsMarkdownWriter()))
+        else:
+            jobs += [(report, path.with_name(f"{path.stem}_{period}{path.suffix}")) for period, report in multi.reports.items()]
+    _export_reports(jobs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,126 @@
+"""
+Serializzazione JSON dei report di analisi.
+
+I valori non finiti (NaN, ±inf) diventano null, così l'output è JSON
+valido per qualsiasi client. Le date sono in formato ISO 8601.
+"""
+import json
+import math
+import numpy as np
+
+
+def _number(value) -> float | None:
+    """Float JSON-compatibile: None per NaN e infiniti."""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _matrix(values: np.ndarray) -> list:
+    """Array NumPy in liste annidate, con None al posto dei valori non finiti."""
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isfinite(values), values, None).tolist()
+
+
+def asset_to_dict(analysis) -> dict:
+    """AssetAnalysis in dict."""
+    return {
+        "ticker": analysis.ticker,
+        "total_return": _number(analysis.total_return),
+        "cagr": _number(analysis.cagr),
+        "volatility": _number(analysis.volatility),
+        "sharpe_ratio": _number(analysis.sharpe_ratio),
+        "max_drawdown": _number(analysis.max_drawdown),
+    }
+
+
+def risk_to_dict(risk, include_matrices: bool = True) -> dict:
+    """PortfolioRisk in dict; le matrici N×N solo se richieste."""
+    data = {
+        "tickers": list(risk.tickers),
+        "weights": _matrix(risk.weights),
+        "volatility": _number(risk.volatility),
+    }
+    if include_matrices:
+        data["covariance"] = _matrix(risk.covariance)
+        data["correlation"] = _matrix(risk.correlation)
+    return data
+
+
+def var_entries(var, index: int | None = None) -> list[dict]:
+    """Voci {confidence, horizon, var, cvar} dell'asset in posizione `index` (None = portafoglio)."""
+    values, tails = (var.portfolio_var, var.portfolio_cvar) if index is None else (var.var[..., index], var.cvar[..., index])
+    return [
+        {"confidence": confidence, "horizon": horizon,
+         "var": _number(values[c, h]), "cvar": _number(tails[c, h])}
+        for c, confidence in enumerate(var.confidences)
+        for h, horizon in enumerate(var.horizons)
+    ]
+
+
+def var_to_dict(var) -> dict:
+    """VaRResult in dict: una voce per livello e orizzonte, per asset e portafoglio."""
+    return {
+        "method": var.method,
+        "confidences": list(var.confidences),
+        "horizons": list(var.horizons),
+        "assets": {ticker: var_entries(var, i) for i, ticker in enumerate(var.tickers)},
+        "portfolio": var_entries(var),
+    }
+
+
+def insight_to_dict(insight) -> dict:
+    """AIInsight in dict."""
+    return {
+        "summary": insight.summary,
+        "full_analysis": insight.full_analysis,
+        "generated_at": insight.generated_at.isoformat(),
+        "asset_comments": dict(insight.asset_comments),
+        "from_cache": insight.from_cache,
+    }
+
+
+def report_to_dict(report, include_matrices: bool = True) -> dict:
+    """
+    PortfolioReport in dict serializzabile con json.
+
+    Args:
+        report: PortfolioReport
+        include_matrices: Se False omette covarianza e correlazione (N×N)
+
+    Returns:
+        Dict con metriche di portafoglio, asset, rischio, VaR, errori e tempi
+    """
+    return {
+        "portfolio_name": report.portfolio_name,
+        "analysis_date": report.analysis_date.isoformat(),
+        "period": report.period,
+        "portfolio": {
+            "total_return": _number(report.portfolio_return),
+            "cagr": _number(report.portfolio_cagr),
+            "volatility": _number(report.portfolio_volatility),
+        },
+        "assets": {ticker: asset_to_dict(analysis) for ticker, analysis in report.assets.items()},
+        "risk": risk_to_dict(report.risk, include_matrices) if report.risk is not None else None,
+        "value_at_risk": var_to_dict(report.value_at_risk) if report.value_at_risk is not None else None,
+        "fetch_errors": {ticker: str(error) for ticker, error in report.fetch_errors.items()},
+        "ai_insight": insight_to_dict(report.ai_insight) if report.ai_insight is not None else None,
+        "timings": report.timings.to_dict() if report.timings is not None else None,
+    }
+
+
+def multi_period_to_dict(multi, include_matrices: bool = True) -> dict:
+    """MultiPeriodAnalysis in dict, con un report per orizzonte."""
+    return {
+        "portfolio_name": multi.portfolio_name,
+        "fetched_period": multi.fetched_period,
+        "reports": {
+            period: report_to_dict(report, include_matrices) for period, report in multi.reports.items()
+        },
+        "errors": {period: str(error) for period, error in multi.errors.items()},
+        "timings": multi.timings.to_dict() if multi.timings is not None else None,
+    }
+
+
+def report_to_json(report, include_matrices: bool = True, indent: int | None = None) -> str:
+    """PortfolioReport come stringa JSON (UTF-8, senza NaN)."""
+    return json.dumps(report_to_dict(report, include_matrices), ensure_ascii=False, allow_nan=False, indent=indent)
@@ -0,0 +1,542 @@
+"""
+Export dei report in Markdown, CSV, JSON, JSON Lines e HTML.
+
+Ogni writer scrive il report riga per riga sul file aperto, senza
+costruire il documento in memoria: il tempo è lineare nel numero di asset
+e la memoria aggiuntiva costante (una riga alla volta, con i valori NumPy
+convertiti a blocchi di BLOCK_SIZE asset). Le matrici N×N di covarianza e
+correlazione non sono esportate.
+
+Il formato si sceglie dall'estensione del file (vedi writer_for);
+export_reports scrive più file in parallelo su un thread pool.
+"""
+import csv
+import html
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from itertools import repeat
+from typing import Iterable, Iterator, Protocol, TextIO
+from .json_report import _number, asset_to_dict, insight_to_dict
+
+
+BUFFER_SIZE = 1 << 16
+BLOCK_SIZE = 1_024
+
+
+def var_columns(var) -> list[tuple[str, int, int]]:
+    """Colonne (etichetta, indice livello, indice orizzonte) delle tabelle VaR."""
+    return [
+        (f"{confidence * 100:g}% {horizon}g", c, h)
+        for c, confidence in enumerate(var.confidences)
+        for h, horizon in enumerate(var.horizons)
+    ]
+
+
+def var_cell(var_value: float, cvar_value: float) -> str:
+    """VaR / CVaR come perdite percentuali ("-" se non stimabili)."""
+    if var_value != var_value:
+        return "-"
+    return f"{var_value:.2%} / {cvar_value:.2%}"
+
+
+def _var_rows(var, columns, block: int = BLOCK_SIZE) -> Iterator[tuple[list[float], list[float]]]:
+    """
+    (VaR, CVaR) di ogni asset come float Python, nell'ordine delle colonne.
+
+    Gli array sono convertiti a blocchi di `block` asset: formattare float
+    Python è molto più rapido che indicizzare e formattare scalari NumPy,
+    e la memoria aggiuntiva resta quella di un blocco.
+    """
+    c = [c for _, c, _ in columns]
+    h = [h for _, _, h in columns]
+    for start in range(0, len(var.tickers), block):
+        values = var.var[c, h, start:start + block].T.tolist()
+        tails = var.cvar[c, h, start:start + block].T.tolist()
+        yield from zip(values, tails)
+
+
+def _var_cells(values: list[float], tails: list[float]) -> list[str]:
+    return [var_cell(value, tail) for value, tail in zip(values, tails)]
+
+
+def _portfolio_var(var, columns) -> tuple[list[float], list[float]]:
+    """(VaR, CVaR) del portafoglio come float Python, nell'ordine delle colonne."""
+    return (
+        [float(var.portfolio_var[c, h]) for _, c, h in columns],
+        [float(var.portfolio_cvar[c, h]) for _, c, h in columns],
+    )
+
+
+def _floats(values, block: int = BLOCK_SIZE) -> Iterator[float]:
+    """Valori di un array 1D come float Python, convertiti a blocchi."""
+    for start in range(0, len(values), block):
+        yield from values[start:start + block].tolist()
+
+
+def _asset_rows(report, columns) -> Iterator[tuple[str, object, float | None, tuple[list[float], list[float]] | None]]:
+    """
+    (ticker, AssetAnalysis, peso, (VaR, CVaR)) di ogni asset.
+
+    Asset, rischio e VaR del report sono nello stesso ordine (vedi
+    PortfolioAnalyzer.aggregate_portfolio): basta scorrerli insieme.
+
+    Raises:
+        ValueError: Se l'ordine dei ticker non coincide
+    """
+    var, risk = report.value_at_risk, report.risk
+    weights = _floats(risk.weights) if risk is not None else repeat(None)
+    rows = _var_rows(var, columns) if var is not None else repeat(None)
+    names = [part.tickers for part in (risk, var) if part is not None]
+    for (ticker, analysis), weight, row, *others in zip(report.assets.items(), weights, rows, *names):
+        if any(other != ticker for other in others):
+            raise ValueError(f"Ordine dei ticker incoerente nel report: {ticker} / {', '.join(others)}")
+        yield ticker, analysis, weight, row
+
+
+def _entries(var, columns, values: list[float], tails: list[float]) -> list[dict]:
+    """Voci {confidence, horizon, var, cvar} come in json_report.var_entries."""
+    return [
+        {"confidence": var.confidences[c], "horizon": var.horizons[h], "var": _number(value), "cvar": _number(tail)}
+        for (_, c, h), value, tail in zip(columns, values, tails)
+    ]
+
+
+class ReportWriter(Protocol):
+    """Interfaccia dei writer: scrivono un PortfolioReport su un file di testo aperto."""
+
+    format: str
+    extensions: tuple[str, ...]
+
+    def write(self, report, handle: TextIO) -> None:
+        """Scrive il report su `handle`, una riga alla volta."""
+        ...
+
+
+def _write_var_markdown(handle: TextIO, var, scope: str) -> None:
+    """Sezione Markdown con VaR e CVaR di asset e portafoglio."""
+    columns = var_columns(var)
+    handle.write(
+        f"\n## Value at Risk ({scope})\n\n"
+        "Perdite stimate come VaR / CVaR (Expected Shortfall), per livello di confidenza e orizzonte in giorni di trading.\n\n"
+        "| Ticker | " + " | ".join(label for label, _, _ in columns) + " |\n"
+        "|--------|" + "---:|" * len(columns) + "\n"
+    )
+    handle.writelines(
+        f"| {ticker} | " + " | ".join(_var_cells(*row)) + " |\n"
+        for ticker, row in zip(var.tickers, _var_rows(var, columns))
+    )
+    handle.write("| **Portafoglio** | " + " | ".join(_var_cells(*_portfolio_var(var, columns))) + " |\n")
+
+
+def _write_fetch_errors_markdown(handle: TextIO, fetch_errors: dict) -> None:
+    """Sezione Markdown con gli asset esclusi perché non recuperati."""
+    if fetch_errors:
+        handle.write("\n## Asset non recuperati\n\n")
+        handle.writelines(f"- {ticker}: {error}\n" for ticker, error in fetch_errors.items())
+
+
+class MarkdownWriter(ReportWriter):
+    """Report Markdown: riepilogo, asset, VaR e insight AI."""
+
+    format = "markdown"
+    extensions = (".md", ".markdown")
+
+    def write(self, report, handle: TextIO) -> None:
+        handle.write(
+            f"# Report Portafoglio: {report.portfolio_name}\n\n"
+            f"**Data analisi:** {report.analysis_date.strftime('%Y-%m-%d %H:%M')}\n"
+            f"**Periodo:** {report.period}\n\n"
+            "## Riepilogo\n\n"
+            "| Metrica | Valore |\n"
+            "|---------|--------|\n"
+            f"| Rendimento | {report.portfolio_return:+.2%} |\n"
+            f"| CAGR | {report.portfolio_cagr:+.2%} |\n"
+            f"| Volatilità | {report.portfolio_volatility:.2%} |\n\n"
+            "## Dettaglio Asset\n\n"
+            "| Ticker | Rendimento | Volatilità | Sharpe | Max DD |\n"
+            "|--------|------------|------------|--------|--------|\n"
+        )
+        handle.writelines(
+            f"| {ticker} | {a.total_return:+.2%} | {a.volatility:.2%} | {a.sharpe_ratio:.2f} | {a.max_drawdown:.2%} |\n"
+            for ticker, a in report.assets.items()
+        )
+
+        if report.value_at_risk is not None:
+            _write_var_markdown(handle, report.value_at_risk, report.value_at_risk.method)
+
+        _write_fetch_errors_markdown(handle, report.fetch_errors)
+
+        if report.ai_insight:
+            handle.write(f"\n## AI Insight\n\n{report.ai_insight.full_analysis}\n")
+            handle.writelines(
+                f"\n### {ticker}\n\n{comment}\n" for ticker, comment in report.ai_insight.asset_comments.items()
+            )
+
+
+class PeriodsMarkdownWriter(ReportWriter):
+    """
+    Report Markdown di una MultiPeriodAnalysis, con gli orizzonti affiancati.
+
+    Non è scelto dall'estensione: va passato esplicitamente a
+    export_report / export_reports.
+    """
+
+    format = "markdown"
+    extensions = (".md", ".markdown")
+
+    METRICS = (
+        ("Rendimento", lambda a: f"{a.total_return:+.2%}"),
+        ("Volatilità", lambda a: f"{a.volatility:.2%}"),
+        ("Sharpe", lambda a: f"{a.sharpe_ratio:.2f}"),
+        ("Max DD", lambda a: f"{a.max_drawdown:.2%}"),
+    )
+
+    def write(self, multi, handle: TextIO) -> None:
+        reports = multi.reports
+        header = "| " + " | ".join(reports) + " |\n"
+        separator = "|" + "---:|" * len(reports) + "\n"
+        analysis_date = next(iter(reports.values())).analysis_date if reports else None
+        handle.write(
+            f"# Report Portafoglio: {multi.portfolio_name}\n\n"
+            f"**Data analisi:** {analysis_date.strftime('%Y-%m-%d %H:%M') if analysis_date else '-'}\n"
+            f"**Periodi:** {', '.join(reports)} (dati scaricati: {multi.fetched_period})\n\n"
+            "## Riepilogo\n\n"
+            "| Metrica " + header + "|---------" + separator
+            + "| Rendimento | " + " | ".join(f"{r.portfolio_return:+.2%}" for r in reports.values()) + " |\n"
+            + "| CAGR | " + " | ".join(f"{r.portfolio_cagr:+.2%}" for r in reports.values()) + " |\n"
+            + "| Volatilità | " + " | ".join(f"{r.portfolio_volatility:.2%}" for r in reports.values()) + " |\n"
+        )
+
+        tickers = dict.fromkeys(ticker for r in reports.values() for ticker in r.assets)
+        for title, fmt in self.METRICS:
+            handle.write(f"\n## {title} per asset\n\n| Ticker " + header + "|--------" + separator)
+            handle.writelines(
+                f"| {ticker} | "
+                + " | ".join(fmt(r.assets[ticker]) if ticker in r.assets else "-" for r in reports.values())
+                + " |\n"
+                for ticker in tickers
+            )
+
+        for period, report in reports.items():
+            if report.value_at_risk is not None:
+                _write_var_markdown(handle, report.value_at_risk, f"{period}, {report.value_at_risk.method}")
+
+        # Un solo fetch: gli asset esclusi sono gli stessi per ogni orizzonte
+        _write_fetch_errors_markdown(
+            handle, {ticker: error for report in reports.values() for ticker, error in report.fetch_errors.items()}
+        )
+
+        longest = reports.get(multi.fetched_period)
+        if longest is not None and longest.ai_insight:
+            handle.write(f"\n## AI Insight ({multi.fetched_period})\n\n{longest.ai_insight.full_analysis}\n")
+
+
+class CsvWriter(ReportWriter):
+    """
+    Una riga per asset più una per il portafoglio (kind = "portfolio").
+
+    I valori sono numeri grezzi (0.05 = 5%), con una coppia di colonne
+    var_/cvar_ per livello e orizzonte (es. var_95_1g); le metriche non
+    definite per il portafoglio restano vuote.
+    """
+
+    format = "csv"
+    extensions = (".csv",)
+
+    def write(self, report, handle: TextIO) -> None:
+        var = report.value_at_risk
+        columns = var_columns(var) if var is not None else []
+        writer = csv.writer(handle)
+        writer.writerow(
+            ["kind", "ticker", "weight", "total_return", "cagr", "volatility", "sharpe_ratio", "max_drawdown"]
+            + [f"{kind}_{var.confidences[c] * 100:g}_{var.horizons[h]}g" for _, c, h in columns for kind in ("var", "cvar")]
+        )
+        no_var = [""] * (2 * len(columns))
+        writer.writerows(
+            [
+                "asset", ticker, "" if weight is None else weight,
+                a.total_return, a.cagr, a.volatility, a.sharpe_ratio, a.max_drawdown,
+                *(no_var if row is None else _csv_pairs(*row)),
+            ]
+            for ticker, a, weight, row in _asset_rows(report, columns)
+        )
+        writer.writerow([
+            "portfolio", report.portfolio_name, "" if report.risk is None else 1.0,
+            report.portfolio_return, report.portfolio_cagr, report.portfolio_volatility, "", "",
+            *(no_var if var is None else _csv_pairs(*_portfolio_var(var, columns))),
+        ])
+
+
+def _csv_pairs(values: list[float], tails: list[float]) -> list:
+    """Coppie VaR, CVaR affiancate, con celle vuote per i valori non stimabili."""
+    return ["" if value != value else value for pair in zip(values, tails) for value in pair]
+
+
+def _header(report) -> dict:
+    """Campi del report diversi da asset e VaR per asset (dimensione costante)."""
+    return {
+        "portfolio_name": report.portfolio_name,
+        "analysis_date": report.analysis_date.isoformat(),
+        "period": report.period,
+        "portfolio": {
+            "total_return": _number(report.portfolio_return),
+            "cagr": _number(report.portfolio_cagr),
+            "volatility": _number(report.portfolio_volatility),
+        },
+    }
+
+
+# Un solo encoder: json.dumps con opzioni non di default ne crea uno a ogni chiamata
+_dumps = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(", ", ": ")).encode
+
+
+def _write_object(handle: TextIO, items: Iterable[tuple[str, object]]) -> None:
+    """
+    Scrive un oggetto JSON voce per voce.
+
+    I valori callable scrivono da sé il proprio contenuto sul file
+    (oggetti e liste annidati in streaming), gli altri sono serializzati
+    con json.
+    """
+    handle.write("{")
+    separator = ""
+    for key, value in items:
+        handle.write(f"{separator}{_dumps(key)}: ")
+        if callable(value):
+            value(handle)
+        else:
+            handle.write(_dumps(value))
+        separator = ", "
+    handle.write("}")
+
+
+def _write_array(handle: TextIO, values: Iterable) -> None:
+    """Scrive una lista JSON un elemento alla volta."""
+    handle.write("[")
+    separator = ""
+    for value in values:
+        handle.write(separator + _dumps(value))
+        separator = ", "
+    handle.write("]")
+
+
+class JsonWriter(ReportWriter):
+    """
+    Un documento JSON con lo stesso schema di report_to_dict (senza
+    matrici), scritto un asset alla volta.
+    """
+
+    format = "json"
+    extensions = (".json",)
+
+    def write(self, report, handle: TextIO) -> None:
+        var, risk = report.value_at_risk, report.risk
+        columns = var_columns(var) if var is not None else []
+        _write_object(handle, [
+            *_header(report).items(),
+            ("assets", lambda h: _write_object(
+                h, ((ticker, asset_to_dict(a)) for ticker, a, _, _ in _asset_rows(report, columns))
+            )),
+            ("risk", None if risk is None else lambda h: _write_object(h, [
+                ("tickers", lambda h: _write_array(h, risk.tickers)),
+                ("weights", lambda h: _write_array(h, map(_number, _floats(risk.weights)))),
+                ("volatility", _number(risk.volatility)),
+            ])),
+            ("value_at_risk", None if var is None else lambda h: _write_object(h, [
+                ("method", var.method),
+                ("confidences", list(var.confidences)),
+                ("horizons", list(var.horizons)),
+                ("assets", lambda h: _write_object(
+                    h, ((ticker, _entries(var, columns, *row)) for ticker, row in zip(var.tickers, _var_rows(var, columns)))
+                )),
+                ("portfolio", _entries(var, columns, *_portfolio_var(var, columns))),
+            ])),
+            ("fetch_errors", {ticker: str(error) for ticker, error in report.fetch_errors.items()}),
+            ("ai_insight", insight_to_dict(report.ai_insight) if report.ai_insight is not None else None),
+            ("timings", report.timings.to_dict() if report.timings is not None else None),
+        ])
+        handle.write("\n")
+
+
+class JsonLinesWriter(ReportWriter):
+    """
+    Un oggetto JSON per riga: prima il portafoglio (type = "portfolio"),
+    poi un asset per riga (type = "asset") con peso e VaR.
+    """
+
+    format = "jsonl"
+    extensions = (".jsonl", ".ndjson")
+
+    def write(self, report, handle: TextIO) -> None:
+        var = report.value_at_risk
+        columns = var_columns(var) if var is not None else []
+        header = {"type": "portfolio", **_header(report)}
+        if var is not None:
+            header["value_at_risk"] = {
+                "method": var.method,
+                "confidences": list(var.confidences),
+                "horizons": list(var.horizons),
+                "levels": _entries(var, columns, *_portfolio_var(var, columns)),
+            }
+        header["fetch_errors"] = {ticker: str(error) for ticker, error in report.fetch_errors.items()}
+        header["ai_insight"] = insight_to_dict(report.ai_insight) if report.ai_insight is not None else None
+        handle.write(_dumps(header) + "\n")
+
+        handle.writelines(
+            _dumps({
+                "type": "asset",
+                **asset_to_dict(a),
+                "weight": _number(weight) if weight is not None else None,
+                "value_at_risk": _entries(var, columns, *row) if row is not None else None,
+            }) + "\n"
+            for _, a, weight, row in _asset_rows(report, columns)
+        )
+
+
+_HTML_STYLE = """
+body { font-family: system-ui, sans-serif; margin: 2rem auto; max-width: 72rem; color: #1f2328; }
+h1 { font-size: 1.6rem; } h2 { font-size: 1.2rem; margin-top: 2rem; }
+table { border-collapse: collapse; margin: 0.5rem 0; }
+th, td { border-bottom: 1px solid #d0d7de; padding: 0.3rem 0.8rem; }
+th { background: #f6f8fa; text-align: left; }
+td.n { text-align: right; font-variant-numeric: tabular-nums; }
+.pos { color: #1a7f37; } .neg { color: #cf222e; }
+.meta { color: #656d76; } pre { white-space: pre-wrap; }
+"""
+
+
+def _signed_cell(value: float) -> str:
+    css = "pos" if value >= 0 else "neg"
+    return f'<td class="n {css}">{value:+.2%}</td>'
+
+
+class HtmlWriter(ReportWriter):
+    """Pagina HTML autonoma (stile inline, nessuna risorsa esterna)."""
+
+    format = "html"
+    extensions = (".html", ".htm")
+
+    def write(self, report, handle: TextIO) -> None:
+        name = html.escape(report.portfolio_name)
+        handle.write(
+            "<!DOCTYPE html>\n<html lang=\"it\">\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>Report Portafoglio: {name}</title>\n<style>{_HTML_STYLE}</style>\n</head>\n<body>\n"
+            f"<h1>Report Portafoglio: {name}</h1>\n"
+            f"<p class=\"meta\">Data analisi: {report.analysis_date.strftime('%Y-%m-%d %H:%M')} · "
+            f"Periodo: {html.escape(report.period)}</p>\n"
+            "<h2>Riepilogo</h2>\n<table>\n"
+            f"<tr><th>Rendimento</th>{_signed_cell(report.portfolio_return)}</tr>\n"
+            f"<tr><th>CAGR</th>{_signed_cell(report.portfolio_cagr)}</tr>\n"
+            f"<tr><th>Volatilità</th><td class=\"n\">{report.portfolio_volatility:.2%}</td></tr>\n"
+            "</table>\n"
+            "<h2>Dettaglio Asset</h2>\n<table>\n"
+            "<tr><th>Ticker</th><th>Rendimento</th><th>Volatilità</th><th>Sharpe</th><th>Max DD</th></tr>\n"
+        )
+        handle.writelines(
+            f"<tr><td>{html.escape(ticker)}</td>{_signed_cell(a.total_return)}"
+            f"<td class=\"n\">{a.volatility:.2%}</td><td class=\"n\">{a.sharpe_ratio:.2f}</td>"
+            f"<td class=\"n neg\">{a.max_drawdown:.2%}</td></tr>\n"
+            for ticker, a in report.assets.items()
+        )
+        handle.write("</table>\n")
+
+        var = report.value_at_risk
+        if var is not None:
+            columns = var_columns(var)
+            handle.write(
+                f"<h2>Value at Risk ({html.escape(var.method)})</h2>\n"
+                "<p class=\"meta\">Perdite stimate come VaR / CVaR (Expected Shortfall), "
+                "per livello di confidenza e orizzonte in giorni di trading.</p>\n<table>\n"
+                "<tr><th>Ticker</th>" + "".join(f"<th>{label}</th>" for label, _, _ in columns) + "</tr>\n"
+            )
+            handle.writelines(
+                f"<tr><td>{html.escape(ticker)}</td>"
+                + "".join(f"<td class=\"n\">{cell}</td>" for cell in _var_cells(*row)) + "</tr>\n"
+                for ticker, row in zip(var.tickers, _var_rows(var, columns))
+            )
+            handle.write(
+                "<tr><th>Portafoglio</th>"
+                + "".join(f"<td class=\"n\"><strong>{cell}</strong></td>" for cell in _var_cells(*_portfolio_var(var, columns)))
+                + "</tr>\n</table>\n"
+            )
+
+        if report.fetch_errors:
+            handle.write("<h2>Asset non recuperati</h2>\n<ul>\n")
+            handle.writelines(
+                f"<li>{html.escape(ticker)}: {html.escape(str(error))}</li>\n"
+                for ticker, error in report.fetch_errors.items()
+            )
+            handle.write("</ul>\n")
+
+        if report.ai_insight:
+            handle.write(f"<h2>AI Insight</h2>\n<pre>{html.escape(report.ai_insight.full_analysis)}</pre>\n")
+            handle.writelines(
+                f"<h3>{html.escape(ticker)}</h3>\n<p>{html.escape(comment)}</p>\n"
+                for ticker, comment in report.ai_insight.asset_comments.items()
+            )
+        handle.write("</body>\n</html>\n")
+
+
+WRITERS: tuple[type[ReportWriter], ...] = (
+    MarkdownWriter, CsvWriter, JsonWriter, JsonLinesWriter, HtmlWriter,
+)
+EXTENSIONS = tuple(extension for writer in WRITERS for extension in writer.extensions)
+
+
+def writer_for(path: str | Path) -> ReportWriter:
+    """
+    Writer corrispondente all'estensione del file.
+
+    Raises:
+        ValueError: Se l'estensione non è supportata
+    """
+    suffix = Path(path).suffix.lower()
+    for writer in WRITERS:
+        if suffix in writer.extensions:
+            return writer()
+    raise ValueError(f"Formato di export non supportato: {path} (estensioni: {', '.join(EXTENSIONS)})")
+
+
+def export_report(report, path: str | Path, writer: ReportWriter | None = None) -> Path:
+    """
+    Scrive il report creando le cartelle mancanti.
+
+    Args:
+        report: Report da esportare
+        path: File di destinazione
+        writer: Writer da usare (default: quello dell'estensione, vedi writer_for)
+
+    Raises:
+        ValueError: Se l'estensione non è supportata
+        OSError: Se il file non può essere scritto
+    """
+    writer = writer or writer_for(path)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # newline="": il modulo csv gestisce da sé i terminatori di riga
+    with open(path, "w", encoding="utf-8", newline="", buffering=BUFFER_SIZE) as handle:
+        writer.write(report, handle)
+    return path
+
+
+def export_reports(jobs: list[tuple], max_workers: int = 4) -> dict[str, Exception]:
+    """
+    Scrive più export in parallelo.
+
+    La formattazione tiene il GIL, ma la scrittura su disco si sovrappone
+    tra i file. Un errore su un file non interrompe gli altri.
+
+    Args:
+        jobs: Tuple (report, percorso) o (report, percorso, writer), come
+            gli argomenti di export_report
+        max_workers: File scritti contemporaneamente
+
+    Returns:
+        Errori per percorso (vuoto se tutti i file sono stati scritti)
+    """
+    if not jobs:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as pool:
+        futures = {str(job[1]): pool.submit(export_report, *job) for job in jobs}
+    return {path: future.exception() for path, future in futures.items() if future.exception() is not None}
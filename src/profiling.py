@@ -0,0 +1,169 @@
+"""
+Strumentazione leggera a span annidati (tempo reale e CPU).
+
+Un Profiler raccoglie un albero di Span: ogni span accumula tempo reale
+(perf_counter), tempo CPU del thread che lo esegue (thread_time) e numero
+di chiamate; span con lo stesso nome sotto lo stesso padre sono aggregati.
+
+Lo span corrente vive in una ContextVar: la funzione `span()` di modulo
+si aggancia al profiler attivo senza doverlo passare tra i layer, e non
+fa nulla se nessun profiler è attivo. I thread pool che copiano il
+contesto (vedi fetch_many_concurrently, asyncio.to_thread) annidano gli
+span dei worker sotto lo span che li ha lanciati.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+
+@dataclass(eq=False)
+class Span:
+    """
+    Nodo dell'albero dei tempi.
+
+    Attributes:
+        name: Nome dello stadio (es. "fetch", "metriche", un ticker)
+        wall: Tempo reale totale in secondi
+        cpu: Tempo CPU totale in secondi (dei thread che hanno eseguito lo span)
+        count: Numero di esecuzioni aggregate
+        children: Sotto-span per nome, nell'ordine di prima apertura
+    """
+    name: str
+    wall: float = 0.0
+    cpu: float = 0.0
+    count: int = 0
+    children: dict[str, "Span"] = field(default_factory=dict)
+
+    @property
+    def self_wall(self) -> float:
+        """Tempo reale non coperto dai figli (0 se i figli girano in parallelo)."""
+        return max(0.0, self.wall - sum(child.wall for child in self.children.values()))
+
+    def walk(self, depth: int = 0) -> Iterator[tuple[int, "Span"]]:
+        """Visita in profondità: coppie (profondità, span)."""
+        yield depth, self
+        for child in self.children.values():
+            yield from child.walk(depth + 1)
+
+    def find(self, *path: str) -> "Span | None":
+        """Span discendente dal percorso di nomi, o None."""
+        node = self
+        for name in path:
+            node = node.children.get(name)
+            if node is None:
+                return None
+        return node
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "count": self.count,
+            "children": [child.to_dict() for child in self.children.values()],
+        }
+
+
+_current: ContextVar[tuple["Profiler", Span] | None] = ContextVar("profiling_current", default=None)
+
+
+class Profiler:
+    """
+    Raccoglie gli span di un'esecuzione.
+
+    Esempio:
+        profiler = Profiler()
+        with profiler.activate():
+            with span("fetch"):
+                ...
+        profiler.root  # albero dei tempi
+    """
+
+    def __init__(self, name: str = "totale"):
+        self.root = Span(name)
+        self._lock = threading.Lock()
+        self._started: tuple[float, float] | None = None
+
+    @contextmanager
+    def activate(self) -> Iterator["Profiler"]:
+        """
+        Rende il profiler attivo nel contesto corrente; il root misura l'intervallo.
+
+        Se è già attivo (chiamate annidate) non cambia nulla.
+        """
+        current = _current.get()
+        if current is not None and current[0] is self:
+            yield self
+            return
+        token = _current.set((self, self.root))
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+            self._add(self.root, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    @contextmanager
+    def span(self, name: str, parent: Span | None = None) -> Iterator[Span]:
+        """Misura un blocco come figlio di `parent` (default: root)."""
+        with self._lock:
+            node = (parent or self.root).children.get(name)
+            if node is None:
+                node = (parent or self.root).children[name] = Span(name)
+        token = _current.set((self, node))
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield node
+        finally:
+            _current.reset(token)
+            self._add(node, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def _add(self, node: Span, wall: float, cpu: float) -> None:
+        with self._lock:
+            node.wall += wall
+            node.cpu += cpu
+            node.count += 1
+
+    def collapsed_stacks(self, unit: float = 1e-6) -> list[str]:
+        """
+        Albero in formato "collapsed stack" per i flame graph (flamegraph.pl, speedscope).
+
+        Ogni riga è "root;figlio;nipote <tempo proprio>", in microsecondi di default.
+        """
+        lines = []
+
+        def visit(node: Span, prefix: str) -> None:
+            path = f"{prefix};{node.name}" if prefix else node.name
+            own = round(node.self_wall / unit)
+            if own > 0:
+                lines.append(f"{path.replace(' ', '_')} {own}")
+            for child in node.children.values():
+                visit(child, path)
+
+        visit(self.root, "")
+        return lines
+
+
+@contextmanager
+def span(name: str) -> Iterator[Span | None]:
+    """
+    Misura un blocco sotto lo span corrente del profiler attivo.
+
+    Senza profiler attivo è un no-op (restituisce None).
+    """
+    current = _current.get()
+    if current is None:
+        yield None
+        return
+    profiler, parent = current
+    with profiler.span(name, parent) as node:
+        yield node
+
+
+def active_profiler() -> Profiler | None:
+    """Profiler attivo nel contesto corrente, se c'è."""
+    current = _current.get()
+    return current[0] if current else None
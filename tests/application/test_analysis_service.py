@@ -1,22 +1,399 @@
+import asyncio
 import pytest
+import numpy as np
 from src.data.models.asset import Asset
 from src.data.models.portfolio import Portfolio
+from src.data.models.price_series import PriceSeries
+from src.data.exceptions import DataFetchError
+from src.data.fetchers.ai_client import AIClient, AsyncAIClient
+from src.data.fetchers.insight_cache import InsightCache
 from src.application.services.analysis_service import AnalysisService, PortfolioReport
+from tests.helpers import StubFetcher, make_series
 
 
 class TestAnalysisService:
     
     def test_period_to_years(self):
         """Test conversione periodo in anni"""
-        assert AnalysisService._period_to_years("1y") == 1.0
-        assert AnalysisService._period_to_years("2y") == 2.0
-        assert AnalysisService._period_to_years("6mo") == 0.5
-        assert AnalysisService._period_to_years("3mo") == 0.25
+        assert AnalysisService.period_to_years("1y") == 1.0
+        assert AnalysisService.period_to_years("2y") == 2.0
+        assert AnalysisService.period_to_years("6mo") == 0.5
+        assert AnalysisService.period_to_years("3mo") == 0.25
     
     def test_period_to_years_invalid(self):
         """Formato non valido solleva errore"""
         with pytest.raises(ValueError):
-            AnalysisService._period_to_years("invalid")
+            AnalysisService.period_to_years("invalid")
+    
+    def test_period_to_years_from_dates(self):
+        """Con le date contano gli anni effettivamente coperti, non l'etichetta"""
+        dates = np.array(["2023-01-02", "2024-07-02"], dtype="datetime64[ns]")
+        
+        assert AnalysisService.period_to_years("1y", dates) == pytest.approx(547 / 365.25)
+        assert AnalysisService.period_to_years("max", dates) == pytest.approx(547 / 365.25)
+        assert AnalysisService.period_to_years("6mo", dates[:1]) == 0.5
+    
+    def test_longest_period(self):
+        assert AnalysisService._longest_period(["1mo", "5y", "1y"]) == "5y"
+        assert AnalysisService._longest_period(["3mo", "max", "10y"]) == "max"
+        with pytest.raises(ValueError):
+            AnalysisService._longest_period(["1y", "boh"])
+    
+    def test_analyze_periods_single_fetch(self):
+        """Un solo fetch dell'orizzonte più lungo, gli altri tagliati per data"""
+        series = {"AAA": make_series(1, 600), "BBB": make_series(2, 600)}
+        fetcher = StubFetcher(series)
+        portfolio = Portfolio(name="Test", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+        ])
+        
+        multi = AnalysisService(fetcher=fetcher).analyze_periods(portfolio, ["1mo", "3mo", "1y", "max"])
+        
+        assert sorted(fetcher.calls) == ["AAA", "BBB"]
+        assert multi.fetched_period == "max"
+        assert list(multi.reports) == ["1mo", "3mo", "1y", "max"]
+        
+        # Ultima barra 2024-08-23: 3mo parte dal 2024-05-23 incluso
+        close = series["AAA"].close
+        first = np.searchsorted(series["AAA"].dates, np.datetime64("2024-05-23"))
+        report = multi.reports["3mo"]
+        assert report.assets["AAA"].total_return == pytest.approx(close[-1] / close[first] - 1)
+        assert multi.reports["max"].assets["AAA"].total_return == pytest.approx(close[-1] / close[0] - 1)
+        assert report.timings.find("fetch") is not None
+    
+    def test_analyze_periods_too_short_horizon(self):
+        """Un orizzonte senza almeno due barre è segnalato, gli altri proseguono"""
+        series = make_series(1, 300)
+        series.dates[-1] += np.timedelta64(10, "D")
+        fetcher = StubFetcher({"AAA": series})
+        portfolio = Portfolio(name="Test", assets=[Asset(ticker="AAA", name="A", asset_type="ETF", weight=1.0)])
+        
+        multi = AnalysisService(fetcher=fetcher).analyze_periods(portfolio, ["5d", "1y"])
+        
+        assert list(multi.reports) == ["1y"]
+        assert isinstance(multi.errors["5d"], DataFetchError)
+    
+    def test_analyze_periods_without_common_dates(self):
+        """Un orizzonte senza date in comune è segnalato, gli altri proseguono"""
+        shifted = make_series(2, 120)
+        shifted.dates += np.timedelta64(400, "D")
+        fetcher = StubFetcher({"AAA": make_series(1, 120), "BBB": shifted})
+        portfolio = Portfolio(name="Test", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+        ])
+        
+        multi = AnalysisService(fetcher=fetcher).analyze_periods(portfolio, ["1mo", "max"])
+        
+        assert list(multi.reports) == ["1mo"]
+        assert list(multi.reports["1mo"].assets) == ["BBB"]
+        assert isinstance(multi.errors["max"], ValueError)
+    
+    def test_analyze_portfolio_with_stub_fetcher(self):
+        """Il service usa le chiusure colonnari restituite dal fetcher"""
+        fetcher = StubFetcher({"AAA": make_series(1), "BBB": make_series(2)})
+        portfolio = Portfolio(name="Stub", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+        ])
+        
+        report = AnalysisService(fetcher=fetcher).analyze_portfolio(
+            portfolio, period="1y", include_ai_insight=False
+        )
+        
+        expected = fetcher.series["AAA"].close[-1] / fetcher.series["AAA"].close[0] - 1
+        assert report.assets["AAA"].total_return == pytest.approx(expected)
+        assert report.portfolio_volatility > 0
+    
+    def test_report_timings(self):
+        """Il report contiene i tempi per stadio e per ticker"""
+        fetcher = StubFetcher({"AAA": make_series(1), "BBB": make_series(2)})
+        portfolio = Portfolio(name="Test", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+        ])
+        
+        report = AnalysisService(fetcher=fetcher).analyze_portfolio(portfolio, period="1y", include_ai_insight=False)
+        
+        assert list(report.timings.children) == ["fetch", "metriche", "rischio"]
+        assert set(report.timings.find("fetch").children) == {"AAA", "BBB"}
+        assert report.timings.wall >= report.timings.find("metriche").wall
+    
+    def test_portfolio_risk_aligned_by_date(self):
+        """Calendari diversi: la volatilità usa solo le date comuni"""
+        full = make_series(1, 300)
+        holidays = np.ones(300, dtype=bool)
+        holidays[[20, 90, 150, 151]] = False
+        other = make_series(2, 300)
+        shifted = PriceSeries(
+            dates=other.dates[holidays], open=other.open[holidays], high=other.high[holidays],
+            low=other.low[holidays], close=other.close[holidays], volume=other.volume[holidays]
+        )
+        portfolio = Portfolio(name="Test", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+        ])
+
+        report = AnalysisService(fetcher=StubFetcher({"AAA": full, "BBB": shifted})).analyze_portfolio(
+            portfolio, period="1y", include_ai_insight=False
+        )
+
+        prices = np.column_stack([full.close[holidays], shifted.close])
+        returns = prices[1:] / prices[:-1] - 1
+        expected = np.std(returns @ [0.5, 0.5], ddof=1) * np.sqrt(252)
+        assert report.portfolio_volatility == pytest.approx(expected, rel=1e-10)
+        # Le metriche del singolo asset usano la sua serie completa
+        assert report.assets["AAA"].total_return == pytest.approx(full.close[-1] / full.close[0] - 1)
+
+    def test_report_value_at_risk(self):
+        """VaR/CVaR di asset e portafoglio nel report, con il metodo scelto"""
+        fetcher = StubFetcher({"AAA": make_series(1), "BBB": make_series(2)})
+        portfolio = Portfolio(name="Test", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+        ])
+
+        service = AnalysisService(fetcher=fetcher, var_method="parametric", var_horizons=(1, 5))
+        report = service.analyze_portfolio(portfolio, period="1y", include_ai_insight=False)
+
+        var = report.value_at_risk
+        assert var.method == "parametric"
+        assert var.tickers == ["AAA", "BBB"]
+        assert var.var.shape == (2, 2, 2)
+        assert 0 < var.portfolio(0.95)[0] < var.portfolio(0.99)[0]
+        with pytest.raises(ValueError, match="VaR"):
+            AnalysisService(fetcher=fetcher, var_method="garch")
+
+    def test_invalid_join(self):
+        with pytest.raises(ValueError, match="join"):
+            AnalysisService(fetcher=StubFetcher({}), join="union")
+
+    def test_failed_asset_is_excluded(self):
+        """Un ticker non recuperabile non interrompe l'analisi"""
+        fetcher = StubFetcher({"AAA": make_series(1), "BBB": make_series(2)})
+        portfolio = Portfolio(name="Stub", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.4),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.4),
+            Asset(ticker="BAD", name="X", asset_type="ETF", weight=0.2),
+        ])
+        
+        report = AnalysisService(fetcher=fetcher).analyze_portfolio(
+            portfolio, period="1y", include_ai_insight=False
+        )
+        
+        assert set(report.assets) == {"AAA", "BBB"}
+        assert isinstance(report.fetch_errors["BAD"], DataFetchError)
+        expected = (report.assets["AAA"].total_return + report.assets["BBB"].total_return) / 2
+        assert report.portfolio_return == pytest.approx(expected)
+    
+    def test_all_assets_failed(self):
+        portfolio = Portfolio(name="Stub", assets=[
+            Asset(ticker="BAD", name="X", asset_type="ETF", weight=1.0),
+        ])
+        with pytest.raises(DataFetchError):
+            AnalysisService(fetcher=StubFetcher({})).analyze_portfolio(
+                portfolio, period="1y", include_ai_insight=False
+            )
+    
+    def test_simulate_portfolio_with_stub_fetcher(self):
+        fetcher = StubFetcher({"AAA": make_series(1), "BBB": make_series(2)})
+        portfolio = Portfolio(name="Stub", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+        ])
+        
+        result = AnalysisService(fetcher=fetcher).simulate_portfolio(
+            portfolio, period="1y", horizon_days=63, n_paths=1_000, seed=0
+        )
+        
+        assert result.n_paths == 1_000
+        assert result.checkpoints[-1] == 63
+    
+    def test_backtest_portfolio_with_stub_fetcher(self):
+        fetcher = StubFetcher({"AAA": make_series(1, 400), "BBB": make_series(2, 400)})
+        portfolio = Portfolio(name="Stub", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.6),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.4),
+        ])
+
+        result = AnalysisService(fetcher=fetcher).backtest_portfolio(
+            portfolio, period="1y", policies=["none", "quarterly"], initial_value=100.0
+        )
+
+        assert result.tickers == ["AAA", "BBB"]
+        assert result.equity.shape == (400, 2)
+        assert result.equity[0].tolist() == [100.0, 100.0]
+        assert result.rebalances[0] == 0 and result.rebalances[1] > 0
+
+    def test_screen_correlations_with_stub_fetcher(self):
+        fetcher = StubFetcher({t: make_series(i) for i, t in enumerate(["AAA", "BBB", "CCC", "DDD"])})
+        service = AnalysisService(fetcher=fetcher)
+
+        screen = service.screen_correlations(["AAA", "BBB", "CCC", "DDD", "NOPE", "AAA"], top_k=2)
+
+        assert screen.tickers == ["AAA", "BBB", "CCC", "DDD"]
+        assert screen.observations == 251
+        assert screen.pairs.most.shape == (4, 2)
+        assert sorted(screen.clusters.order.tolist()) == [0, 1, 2, 3]
+        assert "NOPE" in screen.fetch_errors
+        assert list(screen.timings.children) == [
+            "fetch", "allineamento", "correlazioni", "clustering"
+        ]
+        assert service.screen_correlations(["AAA", "BBB"], cluster=False).clusters is None
+        with pytest.raises(DataFetchError):
+            service.screen_correlations(["AAA", "NOPE"])
+
+    def test_optimize_portfolio_with_stub_fetcher(self):
+        fetcher = StubFetcher({"AAA": make_series(1), "BBB": make_series(2)})
+        portfolio = Portfolio(name="Stub", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+        ])
+        
+        frontier = AnalysisService(fetcher=fetcher).optimize_portfolio(
+            portfolio, period="1y", bounds={"AAA": (0.0, 0.7)}
+        )
+        
+        assert frontier.tickers == ["AAA", "BBB"]
+        assert frontier.max_sharpe.weights.sum() == pytest.approx(1.0)
+        assert frontier.max_sharpe.weights[0] <= 0.7 + 1e-9
+    
+    def test_analyze_portfolios_shares_fetches(self):
+        """Ticker in comune tra portafogli sono scaricati una sola volta"""
+        fetcher = StubFetcher({t: make_series(i) for i, t in enumerate(["AAA", "BBB", "CCC"])})
+        portfolios = {
+            "uno": Portfolio(name="Uno", assets=[
+                Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+                Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+            ]),
+            "due": Portfolio(name="Due", assets=[
+                Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.3),
+                Asset(ticker="CCC", name="C", asset_type="ETF", weight=0.7),
+            ]),
+            "rotto": Portfolio(name="Rotto", assets=[
+                Asset(ticker="BAD", name="X", asset_type="ETF", weight=1.0),
+            ]),
+        }
+        service = AnalysisService(fetcher=fetcher)
+        
+        batch = service.analyze_portfolios(portfolios, period="1y")
+        
+        assert sorted(fetcher.calls) == ["AAA", "BAD", "BBB", "CCC"]
+        assert set(batch.reports) == {"uno", "due"}
+        assert "rotto" in batch.errors
+        assert batch.reports["uno"].assets["BBB"] is batch.reports["due"].assets["BBB"]
+        
+        single = service.analyze_portfolio(portfolios["due"], period="1y", include_ai_insight=False)
+        assert batch.reports["due"].portfolio_volatility == pytest.approx(single.portfolio_volatility)
+    
+    def test_analyze_portfolios_without_common_dates(self):
+        """Un portafoglio senza date in comune finisce in errors, gli altri proseguono"""
+        shifted = make_series(2)
+        shifted.dates += np.timedelta64(400, "D")
+        fetcher = StubFetcher({"AAA": make_series(1), "BBB": shifted, "CCC": make_series(3)})
+        portfolios = {
+            "sano": Portfolio(name="Sano", assets=[
+                Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+                Asset(ticker="CCC", name="C", asset_type="ETF", weight=0.5),
+            ]),
+            "disgiunto": Portfolio(name="Disgiunto", assets=[
+                Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+                Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+            ]),
+        }
+        
+        batch = AnalysisService(fetcher=fetcher).analyze_portfolios(portfolios, period="1y")
+        
+        assert list(batch.reports) == ["sano"]
+        assert isinstance(batch.errors["disgiunto"], ValueError)
+    
+    def test_analyze_portfolio_async_with_stub_api(self, anthropic_stub):
+        """Commenti per asset e riassunto arrivano dallo stub, il report è reso prima"""
+        anthropic_stub.reply = lambda prompt: "Riassunto del portafoglio. Dettagli." if "Analizza" in prompt else "Commento."
+        fetcher = StubFetcher({"AAA": make_series(1), "BBB": make_series(2)})
+        portfolio = Portfolio(name="Test", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.6),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.4),
+        ])
+        client = AsyncAIClient(api_key="test-key", base_url=anthropic_stub.base_url, max_retries=0)
+        service = AnalysisService(fetcher=fetcher, async_ai_client=client, ai_timeout=5.0)
+        rendered = []
+        
+        report = asyncio.run(service.analyze_portfolio_async(
+            portfolio, period="1y", on_report=lambda r: rendered.append(r.ai_insight)
+        ))
+        
+        assert rendered == [None]
+        assert report.ai_insight.summary == "Riassunto del portafoglio."
+        assert report.ai_insight.asset_comments == {"AAA": "Commento.", "BBB": "Commento."}
+        assert len(anthropic_stub.requests) == 3
+        
+        sync_report = service.analyze_portfolio(portfolio, period="1y", include_ai_insight=False)
+        assert report.portfolio_volatility == pytest.approx(sync_report.portfolio_volatility)
+    
+    def test_analyze_portfolio_async_ai_timeout(self, anthropic_stub):
+        """Se l'AI non risponde in tempo il report arriva senza insight"""
+        anthropic_stub.delay = 2.0
+        fetcher = StubFetcher({"AAA": make_series(1)})
+        portfolio = Portfolio(name="Test", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=1.0),
+        ])
+        client = AsyncAIClient(api_key="test-key", base_url=anthropic_stub.base_url, max_retries=0)
+        service = AnalysisService(fetcher=fetcher, async_ai_client=client, ai_timeout=0.1)
+        
+        report = asyncio.run(service.analyze_portfolio_async(portfolio, period="1y"))
+        
+        assert report.ai_insight is None
+        assert "AAA" in report.assets
+    
+    def test_analyze_portfolio_async_uses_insight_cache(self, anthropic_stub):
+        """La seconda analisi sugli stessi dati non chiama l'API"""
+        fetcher = StubFetcher({"AAA": make_series(1), "BBB": make_series(2)})
+        portfolio = Portfolio(name="Test", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=0.5),
+            Asset(ticker="BBB", name="B", asset_type="ETF", weight=0.5),
+        ])
+        cache = InsightCache(":memory:")
+        
+        def run():
+            client = AsyncAIClient(api_key="test-key", base_url=anthropic_stub.base_url, max_retries=0)
+            service = AnalysisService(fetcher=fetcher, async_ai_client=client, insight_cache=cache)
+            return asyncio.run(service.analyze_portfolio_async(portfolio, period="1y"))
+        
+        first = run()
+        second = run()
+        
+        assert len(anthropic_stub.requests) == 3
+        assert not first.ai_insight.from_cache
+        assert second.ai_insight.from_cache
+        assert second.ai_insight.full_analysis == first.ai_insight.full_analysis
+        assert second.ai_insight.asset_comments == first.ai_insight.asset_comments
+    
+    def test_stream_ai_insight(self, anthropic_stub):
+        """Lo streaming passa i delta alla callback e assembla l'insight"""
+        anthropic_stub.reply = lambda prompt: "Portafoglio equilibrato. Volatilità contenuta."
+        fetcher = StubFetcher({"AAA": make_series(1)})
+        portfolio = Portfolio(name="Test", assets=[
+            Asset(ticker="AAA", name="A", asset_type="ETF", weight=1.0),
+        ])
+        client = AIClient(api_key="test-key", base_url=anthropic_stub.base_url)
+        cache = InsightCache(":memory:")
+        service = AnalysisService(fetcher=fetcher, ai_client=client, insight_cache=cache)
+        report = service.analyze_portfolio(portfolio, period="1y", include_ai_insight=False)
+        
+        deltas = []
+        insight = service.stream_ai_insight(report, deltas.append)
+        
+        assert len(deltas) > 1
+        assert insight.full_analysis == "".join(deltas) == "Portafoglio equilibrato. Volatilità contenuta."
+        assert insight.summary == "Portafoglio equilibrato."
+        
+        cached_deltas = []
+        cached = service.stream_ai_insight(report, cached_deltas.append)
+        assert cached.from_cache
+        assert cached_deltas == [insight.full_analysis]
+        assert len(anthropic_stub.requests) == 1
     
     def test_analyze_portfolio_real_data(self):
         """Test con dati reali (richiede connessione internet)"""
@@ -0,0 +1,194 @@
+import os
+from datetime import datetime, timedelta
+import pytest
+import numpy as np
+from src.data.exceptions import TickerNotFoundError
+from src.data.models.price_series import PriceSeries
+from src.application.services.analysis_service import AnalysisService
+from src.application.services.watch_service import PortfolioWatcher
+from src.presentation.cli.config_loader import load_portfolio
+
+
+def make_bars(seed: int, start: str, days: int) -> PriceSeries:
+    """Barre giornaliere sintetiche a partire da una data"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0004, 0.01, days))
+    dates = np.arange(start, days, dtype="datetime64[D]").astype("datetime64[ns]")
+    return PriceSeries(dates=dates, open=close, high=close, low=close, close=close, volume=np.ones(days))
+
+
+class Market:
+    """Fetcher locale a cui i test aggiungono barre; registra le chiamate"""
+
+    def __init__(self, tickers: list[str], days: int = 400):
+        self.series = {t: make_bars(i, "2024-01-01", days) for i, t in enumerate(tickers)}
+        self.calls: list[tuple[str, str]] = []
+
+    def fetch_prices(self, ticker: str, period: str) -> PriceSeries:
+        self.calls.append(("full", ticker))
+        if ticker not in self.series:
+            raise TickerNotFoundError(ticker)
+        return self.series[ticker]
+
+    def fetch_prices_since(self, ticker: str, start: datetime) -> PriceSeries:
+        self.calls.append(("tail", ticker))
+        return self.series[ticker].since(start)
+
+    def append(self, ticker: str, closes: list[float], revise_last: float | None = None) -> None:
+        """Aggiunge barre nei giorni successivi, rivedendo eventualmente l'ultima"""
+        old = self.series[ticker]
+        close = old.close.copy()
+        if revise_last is not None:
+            close[-1] = revise_last
+        dates = old.dates[-1] + np.arange(1, len(closes) + 1) * np.timedelta64(1, "D")
+        close = np.concatenate([close, closes])
+        dates = np.concatenate([old.dates, dates])
+        self.series[ticker] = PriceSeries(
+            dates=dates, open=close, high=close, low=close, close=close, volume=np.ones(len(close))
+        )
+
+
+class Clock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def write_config(path, assets: dict[str, float]) -> None:
+    lines = ["name: Watch", "assets:"]
+    for ticker, weight in assets.items():
+        lines += [f"  - ticker: {ticker}", f"    name: {ticker}", "    type: ETF", f"    weight: {weight}"]
+    path.write_text("\n".join(lines) + "\n")
+    # mtime sempre diverso anche su filesystem con risoluzione grossolana
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def setup(tmp_path):
+    market = Market(["AAA", "BBB"])
+    config = tmp_path / "portfolio.yaml"
+    write_config(config, {"AAA": 0.6, "BBB": 0.4})
+    clock = Clock(datetime(2025, 2, 4, 18))
+    watcher = PortfolioWatcher(AnalysisService(fetcher=market), str(config), load_portfolio, "1y", clock)
+    watcher.start()
+    market.calls.clear()
+    return market, config, clock, watcher
+
+
+def full_analysis(market: Market, clock: Clock, config) -> dict:
+    """Analisi a freddo della stessa finestra, come farebbe analyze"""
+    start = datetime(clock.now.year - 1, clock.now.month, clock.now.day)
+    window = {t: s.since(start) for t, s in market.series.items()}
+    fetcher = Market([])
+    fetcher.series = window
+    return AnalysisService(fetcher=fetcher).analyze_portfolio(
+        load_portfolio(str(config)), period="1y", include_ai_insight=False
+    )
+
+
+class TestPortfolioWatcher:
+
+    def test_start_loads_window(self, setup):
+        market, config, clock, watcher = setup
+        assert set(watcher.assets) == {"AAA", "BBB"}
+        assert watcher.assets["AAA"].series.start >= datetime(2024, 2, 4)
+        assert watcher.report.value_at_risk is not None
+
+    def test_refresh_fetches_only_tails(self, setup):
+        market, config, clock, watcher = setup
+        update = watcher.refresh()
+
+        assert sorted(market.calls) == [("tail", "AAA"), ("tail", "BBB")]
+        assert update.recomputed == [] and update.new_bars == {}
+
+    def test_incremental_matches_cold_analysis(self, setup):
+        market, config, clock, watcher = setup
+        market.append("AAA", [101.0, 99.0], revise_last=market.series["AAA"].close[-1] * 1.01)
+
+        update = watcher.refresh()
+
+        assert update.new_bars == {"AAA": 2}
+        assert update.recomputed == ["AAA"]
+        cold = full_analysis(market, clock, config)
+        for ticker in ("AAA", "BBB"):
+            hot, expected = watcher.report.assets[ticker], cold.assets[ticker]
+            assert hot.total_return == pytest.approx(expected.total_return)
+            assert hot.volatility == pytest.approx(expected.volatility)
+            assert hot.max_drawdown == pytest.approx(expected.max_drawdown)
+        assert watcher.report.portfolio_volatility == pytest.approx(cold.portfolio_volatility)
+
+    def test_window_slides_with_flat_memory(self, setup):
+        market, config, clock, watcher = setup
+        lengths = []
+        for _ in range(60):
+            clock.now += timedelta(days=1)
+            for ticker in ("AAA", "BBB"):
+                market.append(ticker, [market.series[ticker].close[-1] * 1.001])
+            watcher.refresh()
+            lengths.append(len(watcher.assets["AAA"].series))
+
+        assert max(lengths) - min(lengths) <= 1
+        cold = full_analysis(market, clock, config)
+        assert watcher.report.assets["AAA"].volatility == pytest.approx(cold.assets["AAA"].volatility)
+        assert watcher.report.assets["AAA"].max_drawdown == pytest.approx(cold.assets["AAA"].max_drawdown)
+
+    def test_config_reload_recomputes_only_new_assets(self, setup):
+        market, config, clock, watcher = setup
+        market.series["CCC"] = make_bars(9, "2024-01-01", 400)
+        write_config(config, {"AAA": 0.5, "CCC": 0.5})
+
+        update = watcher.refresh()
+
+        assert update.config_reloaded
+        assert update.recomputed == ["CCC"]
+        assert ("full", "CCC") in market.calls and ("full", "AAA") not in market.calls
+        assert set(watcher.assets) == {"AAA", "CCC"}
+        assert set(watcher.report.assets) == {"AAA", "CCC"}
+
+    def test_weight_change_only_reaggregates(self, setup):
+        market, config, clock, watcher = setup
+        before = watcher.report.portfolio_return
+        write_config(config, {"AAA": 0.1, "BBB": 0.9})
+
+        update = watcher.refresh()
+
+        assert update.config_reloaded and update.recomputed == []
+        assert watcher.report.portfolio_return != pytest.approx(before)
+
+    def test_invalid_config_keeps_previous(self, setup):
+        market, config, clock, watcher = setup
+        config.write_text("name: [rotto")
+
+        update = watcher.refresh()
+
+        assert update.config_error is not None
+        assert set(watcher.report.assets) == {"AAA", "BBB"}
+
+    def test_disjoint_dates_keep_last_report(self, tmp_path):
+        """Un asset senza date in comune con gli altri non ferma il watch"""
+        market = Market(["AAA", "BBB"])
+        market.series["CCC"] = make_bars(9, "2022-01-01", 300)
+        config = tmp_path / "portfolio.yaml"
+        write_config(config, {"AAA": 0.6, "BBB": 0.4})
+        clock = Clock(datetime(2025, 2, 4, 18))
+        watcher = PortfolioWatcher(AnalysisService(fetcher=market), str(config), load_portfolio, "max", clock)
+        before = watcher.start()
+        write_config(config, {"AAA": 0.5, "CCC": 0.5})
+
+        update = watcher.refresh()
+
+        assert isinstance(update.analysis_error, ValueError)
+        assert watcher.report is before
+        assert set(watcher.report.assets) == {"AAA", "BBB"}
+
+    def test_fetch_error_keeps_last_metrics(self, setup):
+        market, config, clock, watcher = setup
+        del market.series["BBB"]
+
+        update = watcher.refresh()
+
+        assert "BBB" in update.errors
+        assert "BBB" in watcher.report.assets
@@ -0,0 +1,75 @@
+"""
+Test della suite di benchmark (costruzione, misura, baseline).
+"""
+import json
+from typer.testing import CliRunner
+from benchmarks.__main__ import app
+from benchmarks.baseline import Comparison, compare, load_baseline, save_baseline
+from benchmarks.suite import Benchmark, BenchmarkResult, build_suite, measure, metric_functions
+
+
+def test_every_metric_is_benchmarked():
+    """Ogni funzione pubblica delle metriche ha un caso nel profilo quick"""
+    names = [b.name for b in build_suite("quick")]
+    
+    assert len(names) == len(set(names))
+    for label, _ in metric_functions():
+        assert any(name.startswith(f"metrics.{label}[") for name in names), label
+    assert any(name.startswith("service.analyze_portfolio[") for name in names)
+
+
+def test_measure_positive_time():
+    """La misura restituisce il tempo per chiamata"""
+    result = measure(Benchmark("somma", lambda: (list(range(1000)),), sum), repeat=2, min_time=0.001)
+    
+    assert result.seconds > 0
+    assert result.loops >= 1
+
+
+def test_regression_threshold():
+    """Regressione solo oltre la soglia relativa e la differenza minima"""
+    slower = Comparison("caso", baseline=1.0, current=1.3)
+    
+    assert slower.ratio == 1.3
+    assert slower.is_regression(threshold=0.2)
+    assert not slower.is_regression(threshold=0.5)
+    assert not Comparison("breve", baseline=1e-7, current=2e-7).is_regression(0.2, min_delta=1e-5)
+
+
+def test_baseline_roundtrip(tmp_path):
+    """I tempi salvati si rileggono e si confrontano per nome"""
+    path = tmp_path / "baseline.json"
+    save_baseline([BenchmarkResult("a", 0.5, 1, 1), BenchmarkResult("b", 0.1, 1, 1)], path, "quick")
+    
+    baseline = load_baseline(path)
+    comparisons = compare([BenchmarkResult("a", 0.75, 1, 1), BenchmarkResult("c", 1.0, 1, 1)], baseline)
+    
+    assert json.loads(path.read_text())["profile"] == "quick"
+    assert baseline == {"a": 0.5, "b": 0.1}
+    assert [(c.name, c.ratio) for c in comparisons] == [("a", 1.5)]
+
+
+def test_cli_fails_on_regression(tmp_path):
+    """La CLI termina con codice 1 se un caso supera la soglia"""
+    path = tmp_path / "baseline.json"
+    case = "metrics.returns.simple_return[n=1000]"
+    path.write_text(json.dumps({"results": {case: 1e-12}}))
+    
+    result = CliRunner().invoke(app, ["-k", case, "-r", "1", "-b", str(path), "--min-delta", "0"])
+    
+    assert result.exit_code == 1
+    
+    path.write_text(json.dumps({"results": {case: 10.0}}))
+    result = CliRunner().invoke(app, ["-k", case, "-r", "1", "-b", str(path)])
+    
+    assert result.exit_code == 0
+
+
+def test_api_load_command():
+    """Il test di carico dell'API completa le richieste senza errori"""
+    from benchmarks.api_load import app as load_app
+    
+    result = CliRunner().invoke(load_app, ["--requests", "20", "--clients", "2", "--assets", "3", "--days", "60"])
+    
+    assert result.exit_code == 0, result.output
+    assert "req/s" in result.output
@@ -0,0 +1,120 @@
+"""
+Fixture condivise: uno stub HTTP locale che sostituisce l'API di Anthropic.
+
+Lo stub risponde in JSON, o in Server-Sent Events se la richiesta ha "stream": true.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+
+class AnthropicStub:
+    """
+    Server HTTP locale che risponde a POST /v1/messages come l'API reale.
+    
+    Attributes:
+        base_url: URL da passare ai client
+        requests: Corpi JSON delle richieste ricevute
+        delay: Secondi di attesa prima di ogni risposta
+        chunk_delay: Secondi tra un delta e il successivo in streaming
+        reply: Funzione prompt -> testo della risposta
+    """
+    
+    def __init__(self):
+        self.requests: list[dict] = []
+        self.delay = 0.0
+        self.chunk_delay = 0.0
+        self.reply = lambda prompt: f"Risposta a {len(prompt)} caratteri. Fine."
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+    
+    def _handler(self):
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append(body)
+                time.sleep(stub.delay)
+                
+                text = stub.reply(body["messages"][0]["content"])
+                if body.get("stream"):
+                    self._send_events(body, text)
+                    return
+                payload = json.dumps({
+                    "id": f"msg_{len(stub.requests)}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": body["model"],
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": 10, "output_tokens": 10},
+                }).encode()
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+            
+            def _send_events(self, body, text):
+                """Invia la risposta come eventi SSE, una parola per delta."""
+                words = text.split(" ")
+                deltas = [word + " " for word in words[:-1]] + words[-1:]
+                events = [("message_start", {"type": "message_start", "message": {
+                    "id": f"msg_{len(stub.requests)}", "type": "message", "role": "assistant",
+                    "model": body["model"], "content": [], "stop_reason": None,
+                    "stop_sequence": None, "usage": {"input_tokens": 10, "output_tokens": 1},
+                }}), ("content_block_start", {
+                    "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+                })]
+                events += [("content_block_delta", {
+                    "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": delta},
+                }) for delta in deltas]
+                events += [
+                    ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+                    ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn",
+                                       "stop_sequence": None}, "usage": {"output_tokens": len(deltas)}}),
+                    ("message_stop", {"type": "message_stop"}),
+                ]
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Cache-Control", "no-cache")
+                    self.end_headers()
+                    for name, data in events:
+                        self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+                        self.wfile.flush()
+                        if name == "content_block_delta":
+                            time.sleep(stub.chunk_delay)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+            
+            def log_message(self, *args):
+                pass
+        
+        return Handler
+    
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def anthropic_stub():
+    """Stub dell'API di Anthropic attivo per la durata del test."""
+    stub = AnthropicStub()
+    stub.start()
+    yield stub
+    stub.stop()
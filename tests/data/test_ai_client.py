@@ -0,0 +1,88 @@
+"""
+Test per il client AI asincrono, contro lo stub HTTP locale.
+"""
+import asyncio
+import time
+import pytest
+from src.data.fetchers.ai_client import AIClient, AsyncAIClient
+
+
+def make_client(stub, **kwargs) -> AsyncAIClient:
+    return AsyncAIClient(api_key="test-key", base_url=stub.base_url, max_retries=0, **kwargs)
+
+
+class TestAsyncAIClient:
+    
+    def test_ask_returns_text(self, anthropic_stub):
+        """La risposta dello stub arriva come stringa"""
+        anthropic_stub.reply = lambda prompt: f"Eco: {prompt}"
+        
+        async def run():
+            async with make_client(anthropic_stub) as client:
+                return await client.ask("ciao", system_prompt="sistema", max_tokens=50)
+        
+        assert asyncio.run(run()) == "Eco: ciao"
+        request = anthropic_stub.requests[0]
+        assert request["system"] == "sistema"
+        assert request["max_tokens"] == 50
+    
+    def test_requests_run_concurrently(self, anthropic_stub):
+        """Più richieste in volo insieme durano quanto una sola"""
+        anthropic_stub.delay = 0.3
+        
+        async def run():
+            async with make_client(anthropic_stub) as client:
+                return await asyncio.gather(*(client.ask(f"prompt {i}") for i in range(5)))
+        
+        start = time.perf_counter()
+        answers = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        
+        assert len(answers) == 5
+        assert elapsed < 1.0
+    
+    def test_timeout_cancels_request(self, anthropic_stub):
+        """Oltre il timeout la richiesta viene cancellata"""
+        anthropic_stub.delay = 2.0
+        
+        async def run():
+            async with make_client(anthropic_stub) as client:
+                await client.ask("lento", timeout=0.1)
+        
+        start = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            asyncio.run(run())
+        assert time.perf_counter() - start < 1.5
+    
+    def test_missing_api_key(self, monkeypatch):
+        """Senza API key il client non si crea"""
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        
+        with pytest.raises(ValueError):
+            AsyncAIClient()
+
+
+class TestAIClientStream:
+    
+    def test_stream_yields_deltas(self, anthropic_stub):
+        """I delta SSE concatenati danno la risposta completa"""
+        anthropic_stub.reply = lambda prompt: "Il portafoglio è diversificato. Bene."
+        client = AIClient(api_key="test-key", base_url=anthropic_stub.base_url)
+        
+        deltas = list(client.stream("analizza", system_prompt="sistema"))
+        
+        assert len(deltas) == 5
+        assert "".join(deltas) == "Il portafoglio è diversificato. Bene."
+        assert anthropic_stub.requests[0]["stream"] is True
+    
+    def test_first_delta_arrives_before_full_response(self, anthropic_stub):
+        """Il primo frammento arriva senza attendere la fine della risposta"""
+        anthropic_stub.reply = lambda prompt: "uno due tre quattro"
+        anthropic_stub.chunk_delay = 0.2
+        client = AIClient(api_key="test-key", base_url=anthropic_stub.base_url)
+        
+        start = time.perf_counter()
+        arrivals = [time.perf_counter() - start for _ in client.stream("analizza")]
+        
+        assert arrivals[-1] >= 0.5
+        assert arrivals[0] < arrivals[-1] - 0.4
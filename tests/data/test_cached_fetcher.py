@@ -0,0 +1,117 @@
+import pytest
+from datetime import datetime, timedelta
+import numpy as np
+from src.data.models.price_series import PriceSeries
+from src.data.fetchers.cached_fetcher import CachedPriceFetcher, PriceCache
+from src.data.periods import period_start
+
+
+def daily_series(start: str, end: str, base: float = 100.0) -> PriceSeries:
+    """Serie giornaliera con chiusure crescenti tra due date (incluse)"""
+    dates = np.arange(start, np.datetime64(end) + 1, dtype="datetime64[D]").astype("datetime64[ns]")
+    close = base + np.arange(len(dates), dtype=np.float64)
+    return PriceSeries(dates=dates, open=close, high=close, low=close, close=close, volume=np.ones(len(dates)))
+
+
+class FakeClock:
+
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class CountingFetcher:
+    """Fetcher locale che registra ogni chiamata 'di rete'"""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.calls: list[tuple] = []
+
+    def fetch_prices(self, ticker: str, period: str) -> PriceSeries:
+        self.calls.append(("full", ticker, period))
+        start = period_start(period, self.clock())
+        return daily_series(str(start.date()), str(self.clock().date()))
+
+    def fetch_prices_since(self, ticker: str, start: datetime) -> PriceSeries:
+        self.calls.append(("tail", ticker, start))
+        return daily_series(str(start.date()), str(self.clock().date()), base=1000.0)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(datetime(2024, 6, 28, 18, 0))
+
+
+@pytest.fixture
+def inner(clock):
+    return CountingFetcher(clock)
+
+
+@pytest.fixture
+def fetcher(inner, clock):
+    return CachedPriceFetcher(inner, cache=PriceCache(":memory:"), max_age=timedelta(hours=12), clock=clock)
+
+
+class TestCachedPriceFetcher:
+
+    def test_cold_cache_fetches_full_period(self, fetcher, inner):
+        series = fetcher.fetch_prices("AAA", "1mo")
+
+        assert inner.calls == [("full", "AAA", "1mo")]
+        assert series.start == datetime(2024, 5, 28)
+
+    def test_warm_cache_skips_network(self, fetcher, inner, clock):
+        first = fetcher.fetch_prices("AAA", "1mo")
+        clock.now += timedelta(hours=1)
+        second = fetcher.fetch_prices("AAA", "1mo")
+
+        assert len(inner.calls) == 1
+        assert np.array_equal(first.close, second.close)
+
+    def test_shorter_period_is_served_from_cache(self, fetcher, inner):
+        fetcher.fetch_prices("AAA", "1y")
+        series = fetcher.fetch_prices("AAA", "1mo")
+
+        assert len(inner.calls) == 1
+        assert series.start == datetime(2024, 5, 28)
+
+    def test_stale_cache_fetches_only_tail(self, fetcher, inner, clock):
+        fetcher.fetch_prices("AAA", "1mo")
+        clock.now += timedelta(days=3)
+        series = fetcher.fetch_prices("AAA", "1mo")
+
+        assert inner.calls[-1] == ("tail", "AAA", datetime(2024, 6, 28))
+        assert series.end == datetime(2024, 7, 1)
+        # L'ultima barra in cache viene sostituita da quella aggiornata
+        i = int(np.searchsorted(series.dates, np.datetime64("2024-06-28", "ns")))
+        assert series[i].close == 1000.0
+
+    def test_longer_period_refetches(self, fetcher, inner):
+        fetcher.fetch_prices("AAA", "1mo")
+        fetcher.fetch_prices("AAA", "1y")
+
+        assert [call[0] for call in inner.calls] == ["full", "full"]
+
+    def test_persists_across_instances(self, inner, clock, tmp_path):
+        path = tmp_path / "prices.sqlite"
+        CachedPriceFetcher(inner, cache=PriceCache(path), clock=clock).fetch_prices("AAA", "1mo")
+        CachedPriceFetcher(inner, cache=PriceCache(path), clock=clock).fetch_prices("AAA", "1mo")
+
+        assert len(inner.calls) == 1
+
+
+class TestPriceCacheEviction:
+
+    def test_least_recently_used_is_evicted(self, inner, clock):
+        cache = PriceCache(":memory:", max_rows=70)
+        fetcher = CachedPriceFetcher(inner, cache=cache, clock=clock)
+
+        fetcher.fetch_prices("AAA", "1mo")
+        fetcher.fetch_prices("BBB", "1mo")
+        fetcher.fetch_prices("AAA", "1mo")  # AAA diventa il più recente
+        fetcher.fetch_prices("CCC", "1mo")
+
+        assert cache.tickers() == ["AAA", "CCC"]
+        assert cache.total_rows() <= 70
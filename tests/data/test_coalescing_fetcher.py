@@ -0,0 +1,163 @@
+import threading
+from datetime import timedelta
+import numpy as np
+import pytest
+from src.data.exceptions import DataFetchError
+from src.data.fetchers.coalescing_fetcher import CoalescingFetcher
+from src.data.models.price_series import PriceSeries
+
+
+def make_series(n: int = 5) -> PriceSeries:
+    dates = np.arange("2024-01-01", n, dtype="datetime64[D]").astype("datetime64[ns]")
+    close = 100.0 + np.arange(n, dtype=np.float64)
+    return PriceSeries(dates=dates, open=close, high=close, low=close, close=close, volume=np.ones(n))
+
+
+class SlowFetcher:
+    """Fetcher che resta bloccato finché il test non lo rilascia"""
+
+    def __init__(self, error: Exception | None = None):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.error = error
+        self.calls: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def fetch_prices(self, ticker: str, period: str) -> PriceSeries:
+        with self._lock:
+            self.calls.append((ticker, period))
+        self.started.set()
+        self.release.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        return make_series()
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run_concurrently(fetcher: CoalescingFetcher, inner: SlowFetcher, n: int = 20) -> list:
+    """Lancia n fetch dello stesso ticker, li sblocca quando sono tutti in attesa"""
+    results: list = [None] * n
+
+    def call(i):
+        try:
+            results[i] = fetcher.fetch_prices("AAA", "1y")
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    assert inner.started.wait(timeout=5)
+    # Tutti i thread devono essere entrati prima di sbloccare il fetch
+    while fetcher.stats.misses + fetcher.stats.coalesced < n:
+        threading.Event().wait(0.001)
+    inner.release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+def test_concurrent_requests_share_one_fetch():
+    inner = SlowFetcher()
+    fetcher = CoalescingFetcher(inner)
+
+    results = run_concurrently(fetcher, inner)
+
+    assert inner.calls == [("AAA", "1y")]
+    assert all(result is results[0] for result in results)
+    assert fetcher.stats.misses == 1
+    assert fetcher.stats.coalesced == 19
+
+
+def test_cached_series_served_until_ttl_expires():
+    inner = SlowFetcher()
+    inner.release.set()
+    clock = FakeClock()
+    fetcher = CoalescingFetcher(inner, ttl=timedelta(seconds=60), clock=clock)
+
+    first = fetcher.fetch_prices("AAA", "1y")
+    clock.now = 59
+    assert fetcher.fetch_prices("AAA", "1y") is first
+    assert len(inner.calls) == 1
+    assert fetcher.stats.hits == 1
+
+    clock.now = 61
+    fetcher.fetch_prices("AAA", "1y")
+    assert len(inner.calls) == 2
+
+
+def test_period_is_part_of_the_key():
+    inner = SlowFetcher()
+    inner.release.set()
+    fetcher = CoalescingFetcher(inner)
+
+    fetcher.fetch_prices("AAA", "1y")
+    fetcher.fetch_prices("AAA", "5y")
+
+    assert inner.calls == [("AAA", "1y"), ("AAA", "5y")]
+
+
+def test_least_recently_used_entry_is_evicted():
+    inner = SlowFetcher()
+    inner.release.set()
+    fetcher = CoalescingFetcher(inner, max_entries=2)
+
+    fetcher.fetch_prices("AAA", "1y")
+    fetcher.fetch_prices("BBB", "1y")
+    fetcher.fetch_prices("AAA", "1y")
+    fetcher.fetch_prices("CCC", "1y")
+    assert len(fetcher) == 2
+
+    fetcher.fetch_prices("AAA", "1y")
+    fetcher.fetch_prices("BBB", "1y")
+    assert [ticker for ticker, _ in inner.calls] == ["AAA", "BBB", "CCC", "BBB"]
+
+
+def test_error_is_shared_by_waiters_and_not_cached():
+    inner = SlowFetcher(error=DataFetchError("rete non disponibile"))
+    fetcher = CoalescingFetcher(inner)
+
+    results = run_concurrently(fetcher, inner, n=5)
+
+    assert all(isinstance(result, DataFetchError) for result in results)
+    assert len(inner.calls) == 1
+    assert fetcher.stats.errors == 1
+    assert len(fetcher) == 0
+
+    inner.error = None
+    fetcher.fetch_prices("AAA", "1y")
+    assert len(inner.calls) == 2
+
+
+def test_clear_empties_the_cache():
+    inner = SlowFetcher()
+    inner.release.set()
+    fetcher = CoalescingFetcher(inner)
+    fetcher.fetch_prices("AAA", "1y")
+
+    fetcher.clear()
+
+    assert len(fetcher) == 0
+    fetcher.fetch_prices("AAA", "1y")
+    assert len(inner.calls) == 2
+
+
+def test_fetch_many_serves_cached_tickers_without_refetching():
+    inner = SlowFetcher()
+    inner.release.set()
+    fetcher = CoalescingFetcher(inner)
+    fetcher.fetch_prices("BBB", "1y")
+
+    result = fetcher.fetch_many(["AAA", "BBB", "AAA"], "1y")
+
+    assert list(result.prices) == ["AAA", "BBB"]
+    assert [ticker for ticker, _ in inner.calls] == ["BBB", "AAA"]
+    assert fetcher.stats.hits == 1
@@ -0,0 +1,55 @@
+import time
+import pytest
+from src.data.exceptions import DataFetchError, TickerNotFoundError
+from src.data.fetchers.base import PriceFetcher, fetch_many_concurrently
+from src.data.models.price_series import PriceSeries
+
+
+class SlowFetcher(PriceFetcher):
+    """Fetcher locale che simula la latenza di rete"""
+
+    def __init__(self, latency: float = 0.2, missing: set[str] = frozenset()):
+        self.latency = latency
+        self.missing = missing
+
+    def fetch_prices(self, ticker: str, period: str) -> PriceSeries:
+        time.sleep(self.latency)
+        if ticker in self.missing:
+            raise TickerNotFoundError(ticker)
+        return PriceSeries.empty()
+
+
+class TestFetchMany:
+
+    def test_fetches_overlap(self):
+        """20 fetch da 0.2s su 20 thread richiedono circa un solo round-trip"""
+        fetcher = SlowFetcher(latency=0.2)
+        tickers = [f"T{i}" for i in range(20)]
+
+        start = time.perf_counter()
+        result = fetcher.fetch_many(tickers, "1y", max_workers=20)
+        elapsed = time.perf_counter() - start
+
+        assert list(result.prices) == tickers
+        assert elapsed < 1.0
+
+    def test_failures_are_collected(self):
+        fetcher = SlowFetcher(latency=0.0, missing={"BAD"})
+        result = fetcher.fetch_many(["AAA", "BAD", "BBB"], "1y")
+
+        assert list(result.prices) == ["AAA", "BBB"]
+        assert isinstance(result.errors["BAD"], DataFetchError)
+        assert isinstance(result.errors["BAD"].original_error, TickerNotFoundError)
+
+    def test_duplicates_fetched_once(self):
+        calls = []
+
+        class Recorder:
+            def fetch_prices(self, ticker, period):
+                calls.append(ticker)
+                return PriceSeries.empty()
+
+        result = fetch_many_concurrently(Recorder(), ["AAA", "AAA", "BBB"], "1y")
+
+        assert sorted(calls) == ["AAA", "BBB"]
+        assert list(result.prices) == ["AAA", "BBB"]
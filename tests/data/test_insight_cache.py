@@ -0,0 +1,84 @@
+"""
+Test per la cache delle risposte AI.
+"""
+from datetime import timedelta
+import pytest
+from src.data.fetchers.insight_cache import InsightCache, bucket_numbers, insight_key
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_key_depends_on_model_system_and_prompt():
+    """La chiave cambia se cambia uno qualsiasi dei tre campi"""
+    base = insight_key("m", "sys", "prompt")
+    
+    assert base == insight_key("m", "sys", "prompt")
+    assert base != insight_key("m2", "sys", "prompt")
+    assert base != insight_key("m", "sys2", "prompt")
+    assert base != insight_key("m", "sys", "prompt2")
+    assert insight_key("ab", "c", "p") != insight_key("a", "bc", "p")
+
+
+def test_bucket_numbers():
+    """Numeri entro la tolleranza finiscono nello stesso bucket"""
+    assert bucket_numbers("vol 12.34%", 0.05) == bucket_numbers("vol 12.36%", 0.05)
+    assert bucket_numbers("vol 12.34%", 0.05) != bucket_numbers("vol 12.54%", 0.05)
+    assert bucket_numbers("Sharpe -0.51", 0.1) == "Sharpe -5"
+    with pytest.raises(ValueError):
+        bucket_numbers("1", 0)
+
+
+def test_tolerance_key_ignores_noise():
+    """Con tolleranza il rumore sull'ultima cifra non cambia la chiave"""
+    noisy = "Rendimento: 10.01%, volatilità 15.00%"
+    other = "Rendimento: 10.02%, volatilità 15.01%"
+    
+    assert insight_key("m", None, noisy) != insight_key("m", None, other)
+    assert insight_key("m", None, noisy, tolerance=0.05) == insight_key("m", None, other, tolerance=0.05)
+
+
+def test_put_get_roundtrip(tmp_path):
+    """Una risposta salvata si ritrova anche riaprendo il file"""
+    path = tmp_path / "insights.sqlite"
+    cache = InsightCache(path)
+    key = cache.key("m", "sys", "prompt")
+    cache.put(key, "Analisi.")
+    
+    cached = InsightCache(path).get(key)
+    
+    assert cached.text == "Analisi."
+    assert InsightCache(path).get("altra") is None
+
+
+def test_ttl_expiry():
+    """Le risposte scadute non sono restituite e vengono rimosse"""
+    clock = FakeClock()
+    cache = InsightCache(":memory:", ttl=timedelta(hours=1), clock=clock)
+    cache.put("k", "testo")
+    
+    clock.now += 1800
+    assert cache.get("k").text == "testo"
+    
+    clock.now += 3600
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    """Oltre max_entries viene rimossa la risposta usata meno di recente"""
+    cache = InsightCache(":memory:", max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")
+    
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a").text == "A"
+    assert cache.get("c").text == "C"
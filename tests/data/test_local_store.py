@@ -0,0 +1,111 @@
+import pytest
+from datetime import datetime
+import numpy as np
+from src.data.exceptions import TickerNotFoundError
+from src.data.models.price_series import PriceSeries
+from src.data.fetchers.local_store import LocalStoreFetcher, PriceStore, read_header
+
+
+def daily_series(start: str, days: int, base: float = 100.0) -> PriceSeries:
+    dates = np.arange(start, days, dtype="datetime64[D]").astype("datetime64[ns]")
+    close = base + np.arange(days, dtype=np.float64)
+    return PriceSeries(dates=dates, open=close - 1, high=close + 1, low=close - 2, close=close, volume=np.ones(days))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PriceStore(tmp_path / "store")
+    store.write("AAA", daily_series("2020-01-01", 1000))
+    store.write("^GSPC", daily_series("2023-01-01", 10))
+    return store
+
+
+class TestPriceStore:
+
+    def test_roundtrip(self, store):
+        original = daily_series("2020-01-01", 1000)
+        series = store.open("AAA")
+
+        assert np.array_equal(series.dates, original.dates)
+        assert np.array_equal(series.high, original.high)
+        assert np.array_equal(series.volume, original.volume)
+
+    def test_columns_are_read_only_views(self, store):
+        series = store.open("AAA")
+
+        assert not series.close.flags.writeable
+        assert not series.close.flags.owndata
+        assert series.close.base is series.open.base
+
+    def test_index_survives_reopen(self, store):
+        reopened = PriceStore(store.root)
+
+        assert reopened.tickers() == ["AAA", "^GSPC"]
+        assert reopened.info("AAA")["rows"] == 1000
+        assert reopened.info("AAA")["start"] == "2020-01-01"
+        assert len(reopened.open("^GSPC")) == 10
+
+    def test_header(self, store):
+        assert read_header(store.root / store.info("AAA")["file"]) == (1, 1000)
+        with pytest.raises(ValueError):
+            read_header(store.root / "index.json")
+
+    def test_merge_new_bars_win(self, store):
+        update = daily_series("2022-09-26", 10, base=5000.0)
+        rows = store.write("AAA", update)
+
+        series = store.open("AAA")
+        assert rows == len(series) == 1000 + 9
+        assert series.close[-1] == 5009.0
+        assert np.all(np.diff(series.dates) > np.timedelta64(0))
+
+    def test_write_sorts_unordered_bars(self, tmp_path):
+        store = PriceStore(tmp_path)
+        series = daily_series("2024-01-01", 5)
+        store.write("X", series[::-1], merge=False)
+
+        assert np.array_equal(store.open("X").close, series.close)
+
+    def test_missing_ticker(self, store):
+        with pytest.raises(TickerNotFoundError):
+            store.open("NOPE")
+
+    def test_empty_series_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            PriceStore(tmp_path).write("X", PriceSeries.empty())
+
+
+class TestLocalStoreFetcher:
+
+    def test_period_counts_back_from_last_bar(self, store):
+        series = LocalStoreFetcher(store).fetch_prices("AAA", "1y")
+
+        # Ultima barra 2022-09-26: il periodo parte dal 2021-09-26 incluso
+        assert series.start == datetime(2021, 9, 26)
+        assert series.end == datetime(2022, 9, 26)
+
+    def test_max_returns_everything(self, store):
+        assert len(LocalStoreFetcher(store.root).fetch_prices("AAA", "max")) == 1000
+
+    def test_as_of_cuts_future_bars(self, store):
+        fetcher = LocalStoreFetcher(store, as_of=datetime(2021, 1, 31))
+        series = fetcher.fetch_prices("AAA", "1mo")
+
+        assert series.start == datetime(2020, 12, 31)
+        assert series.end == datetime(2021, 1, 31)
+
+    def test_fetch_prices_since(self, store):
+        series = LocalStoreFetcher(store).fetch_prices_since("AAA", datetime(2022, 9, 20))
+        assert len(series) == 7
+
+    def test_missing_ticker_and_empty_period(self, store):
+        with pytest.raises(TickerNotFoundError):
+            LocalStoreFetcher(store).fetch_prices("NOPE", "1y")
+        with pytest.raises(TickerNotFoundError):
+            LocalStoreFetcher(store, as_of=datetime(2019, 1, 1)).fetch_prices("AAA", "1y")
+
+    def test_fetch_many(self, store):
+        result = LocalStoreFetcher(store).fetch_many(["AAA", "^GSPC", "NOPE"], "1mo")
+
+        assert set(result.prices) == {"AAA", "^GSPC"}
+        assert "NOPE" in result.errors
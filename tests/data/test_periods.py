@@ -0,0 +1,25 @@
+import pytest
+from datetime import datetime
+from src.data.periods import period_start
+
+
+class TestPeriodStart:
+
+    def test_months_are_calendar_aware(self):
+        """Un mese prima del 31 marzo è il 29 febbraio (anno bisestile)"""
+        assert period_start("1mo", datetime(2024, 3, 31)) == datetime(2024, 2, 29)
+
+    def test_years(self):
+        assert period_start("5y", datetime(2024, 6, 28)) == datetime(2019, 6, 28)
+
+    def test_days_and_weeks(self):
+        assert period_start("5d", datetime(2024, 6, 28)) == datetime(2024, 6, 23)
+        assert period_start("2wk", datetime(2024, 6, 28)) == datetime(2024, 6, 14)
+
+    def test_ytd_and_max(self):
+        assert period_start("ytd", datetime(2024, 6, 28, 15, 30)) == datetime(2024, 1, 1)
+        assert period_start("max", datetime(2024, 6, 28)) is None
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            period_start("invalid", datetime(2024, 6, 28))
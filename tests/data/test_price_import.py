@@ -0,0 +1,85 @@
+import pytest
+import numpy as np
+from src.data.fetchers.local_store import PriceStore
+from src.data.price_import import import_files, read_price_csv
+
+
+SINGLE = """Date,Open,High,Low,Close,Adj Close,Volume,Dividends,Stock Splits
+2024-01-02 00:00:00-05:00,470,472,468,471,465,1000,0,0
+2024-01-03 00:00:00-05:00,471,473,469,470,464,1100,0,0
+2024-01-04 00:00:00-05:00,470,474,469,473,467,1200,0,0
+"""
+
+MULTI = """Price,Close,Close,Open,Open,Volume,Volume
+Ticker,AAPL,MSFT,AAPL,MSFT,AAPL,MSFT
+Date,,,,,,
+2024-01-02,185,370,187,373,100,200
+2024-01-03,184,,185,,110,
+2024-01-04,181,367,182,368,120,220
+"""
+
+LONG = """Date,Ticker,Close
+2024-01-02,AAA,10
+2024-01-02,BBB,20
+2024-01-03,AAA,11
+"""
+
+
+def write(tmp_path, name: str, content: str):
+    path = tmp_path / name
+    path.write_text(content)
+    return path
+
+
+class TestReadPriceCsv:
+
+    def test_single_ticker_from_file_name(self, tmp_path):
+        series = read_price_csv(write(tmp_path, "SPY.csv", SINGLE))["SPY"]
+
+        assert series.dates.astype("datetime64[D]").astype(str).tolist() == ["2024-01-02", "2024-01-03", "2024-01-04"]
+        assert series.close.tolist() == [471.0, 470.0, 473.0]
+        assert series.volume.tolist() == [1000.0, 1100.0, 1200.0]
+
+    def test_explicit_ticker(self, tmp_path):
+        assert list(read_price_csv(write(tmp_path, "dump.csv", SINGLE), ticker="SPY")) == ["SPY"]
+
+    def test_multi_ticker_download(self, tmp_path):
+        data = read_price_csv(write(tmp_path, "multi.csv", MULTI))
+
+        assert sorted(data) == ["AAPL", "MSFT"]
+        assert data["AAPL"].open.tolist() == [187.0, 185.0, 182.0]
+        # Il giorno senza chiusura di MSFT è scartato
+        assert data["MSFT"].close.tolist() == [370.0, 367.0]
+
+    def test_long_format(self, tmp_path):
+        data = read_price_csv(write(tmp_path, "long.csv", LONG))
+
+        assert data["AAA"].close.tolist() == [10.0, 11.0]
+        # Senza colonne OHLV si usa la chiusura e volume zero
+        assert data["BBB"].high.tolist() == [20.0]
+        assert data["BBB"].volume.tolist() == [0.0]
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            read_price_csv(write(tmp_path, "bad.csv", "a,b\n1,2\n"))
+
+    @pytest.mark.parametrize("content, line", [
+        (SINGLE + "2024-01-05 00:00:00-05:00,473,475\n", 5),
+        (MULTI.replace("2024-01-04,181,367,182,368,120,220", "2024-01-04,181,367"), 6),
+        (LONG.replace("2024-01-03,AAA,11", "2024-01-03,AAA"), 4),
+    ])
+    def test_truncated_row(self, tmp_path, content, line):
+        """Una riga troncata è segnalata con file e numero di riga"""
+        with pytest.raises(ValueError, match=f"ragged.csv, riga {line}:"):
+            read_price_csv(write(tmp_path, "ragged.csv", content))
+
+
+def test_import_files_merges_into_store(tmp_path):
+    store = PriceStore(tmp_path / "store")
+    imported = import_files(store, [write(tmp_path, "SPY.csv", SINGLE), write(tmp_path, "multi.csv", MULTI)])
+
+    assert imported == {"SPY": 3, "AAPL": 3, "MSFT": 2}
+    assert np.array_equal(store.open("AAPL").close, [185.0, 184.0, 181.0])
+
+    with pytest.raises(ValueError):
+        import_files(store, [tmp_path / "SPY.csv", tmp_path / "multi.csv"], ticker="X")
@@ -0,0 +1,89 @@
+import pytest
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from src.data.models.price_data import PriceData
+from src.data.models.price_series import PriceSeries
+
+
+@pytest.fixture
+def history():
+    """DataFrame nel formato restituito da yfinance (indice con fuso orario)"""
+    index = pd.date_range("2024-01-02", periods=4, freq="D", tz="Europe/Rome")
+    return pd.DataFrame(
+        {
+            "Open": [10.0, 11.0, 12.0, 13.0],
+            "High": [10.5, 11.5, 12.5, 13.5],
+            "Low": [9.5, 10.5, 11.5, 12.5],
+            "Close": [10.2, 11.2, 12.2, 13.2],
+            "Volume": [100, 200, 300, 400],
+        },
+        index=index,
+    )
+
+
+class TestFromDataFrame:
+
+    def test_columns_are_float_arrays(self, history):
+        series = PriceSeries.from_dataframe(history)
+
+        assert series.close.dtype == np.float64
+        assert series.volume.dtype == np.float64
+        assert series.close.tolist() == [10.2, 11.2, 12.2, 13.2]
+
+    def test_dates_keep_local_time(self, history):
+        """Le date tz-aware diventano datetime64 nell'ora locale della borsa"""
+        series = PriceSeries.from_dataframe(history)
+
+        assert series.dates.dtype == np.dtype("datetime64[ns]")
+        assert series.start == datetime(2024, 1, 2)
+        assert series.end == datetime(2024, 1, 5)
+
+
+class TestRowView:
+
+    def test_len_and_index(self, history):
+        series = PriceSeries.from_dataframe(history)
+
+        assert len(series) == 4
+        row = series[0]
+        assert isinstance(row, PriceData)
+        assert row.close == 10.2
+        assert row.volume == 100
+        assert series[-1].date == datetime(2024, 1, 5)
+
+    def test_missing_volume_is_zero(self, history):
+        """Volumi NaN o infiniti non fanno fallire la vista per riga"""
+        history["Volume"] = [np.nan, 200, np.inf, 400]
+        series = PriceSeries.from_dataframe(history)
+
+        assert [row.volume for row in series] == [0, 200, 0, 400]
+
+    def test_iteration(self, history):
+        series = PriceSeries.from_dataframe(history)
+        assert [row.close for row in series] == [10.2, 11.2, 12.2, 13.2]
+
+    def test_slice_is_series(self, history):
+        series = PriceSeries.from_dataframe(history)
+        tail = series[2:]
+
+        assert isinstance(tail, PriceSeries)
+        assert tail.close.tolist() == [12.2, 13.2]
+
+    def test_roundtrip_from_price_data(self, history):
+        series = PriceSeries.from_dataframe(history)
+        rebuilt = PriceSeries.from_price_data(list(series))
+
+        assert np.array_equal(rebuilt.dates, series.dates)
+        assert np.array_equal(rebuilt.close, series.close)
+
+    def test_mismatched_columns(self):
+        with pytest.raises(ValueError):
+            PriceSeries(
+                dates=np.array(["2024-01-02"], dtype="datetime64[ns]"),
+                open=np.array([1.0]),
+                high=np.array([1.0]),
+                low=np.array([1.0]),
+                close=np.array([1.0, 2.0]),
+                volume=np.array([1.0]),
+            )
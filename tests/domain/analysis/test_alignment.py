@@ -0,0 +1,85 @@
+import pytest
+import numpy as np
+from src.domain.analysis.alignment import align_prices
+from src.domain.analysis.risk_engine import aligned_price_matrix
+
+
+def days(*values: str) -> np.ndarray:
+    return np.array(values, dtype="datetime64[D]")
+
+
+@pytest.fixture
+def series():
+    """Due borse con festività diverse: A chiusa il 3, B chiusa il 4"""
+    return {
+        "A": (days("2024-01-02", "2024-01-04", "2024-01-05"), np.array([10.0, 11.0, 12.0])),
+        "B": (days("2024-01-01", "2024-01-02", "2024-01-03", "2024-01-05"), np.array([1.0, 2.0, 3.0, 4.0])),
+    }
+
+
+class TestAlignPrices:
+
+    def test_inner_keeps_common_dates(self, series):
+        aligned = align_prices(series, how="inner")
+
+        assert aligned.tickers == ["A", "B"]
+        assert aligned.dates.tolist() == days("2024-01-02", "2024-01-05").tolist()
+        assert np.array_equal(aligned.prices, [[10.0, 2.0], [12.0, 4.0]])
+        assert aligned.mask.all()
+
+    def test_ffill_fills_holidays(self, series):
+        aligned = align_prices(series, how="ffill")
+
+        # Il 1° gennaio è scartato: A non ha ancora quotato
+        assert aligned.dates.tolist() == days("2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05").tolist()
+        assert np.array_equal(aligned.prices, [[10.0, 2.0], [10.0, 3.0], [11.0, 3.0], [12.0, 4.0]])
+        assert aligned.mask.tolist() == [[True, True], [False, True], [True, False], [True, True]]
+
+    def test_union_marks_missing(self, series):
+        aligned = align_prices(series, how="union")
+
+        assert len(aligned.dates) == 5
+        assert np.isnan(aligned.prices[~aligned.mask]).all()
+        assert np.array_equal(aligned.column("B")[aligned.mask[:, 1]], [1.0, 2.0, 3.0, 4.0])
+        assert np.isnan(aligned.returns()[0, 0])
+
+    def test_timezones_fall_on_same_day(self):
+        """Chiusure di borse in fusi diversi, stessa data di calendario"""
+        europe = np.array(["2024-01-02T16:30", "2024-01-03T16:30"], dtype="datetime64[ns]")
+        america = np.array(["2024-01-02T21:00", "2024-01-03T21:00"], dtype="datetime64[ns]")
+        aligned = align_prices({"EU": (europe, [1.0, 2.0]), "US": (america, [3.0, 4.0])})
+
+        assert np.array_equal(aligned.prices, [[1.0, 3.0], [2.0, 4.0]])
+
+    def test_matches_tail_alignment_on_same_calendar(self):
+        rng = np.random.default_rng(0)
+        dates = np.arange("2023-01-02", 300, dtype="datetime64[D]")
+        data = {t: 100 * np.cumprod(1 + rng.normal(0, 0.01, 300)) for t in ("A", "B", "C")}
+
+        aligned = align_prices({t: (dates, prices) for t, prices in data.items()})
+
+        assert np.array_equal(aligned.prices, aligned_price_matrix(data, list(data)))
+
+    def test_returns_on_common_calendar(self, series):
+        aligned = align_prices(series, how="ffill")
+        assert aligned.returns().shape == (3, 2)
+        assert aligned.returns()[0, 0] == 0.0
+
+    def test_invalid_mode(self, series):
+        with pytest.raises(ValueError, match="join"):
+            align_prices(series, how="outer")
+
+    def test_no_series(self):
+        with pytest.raises(ValueError):
+            align_prices({})
+
+    def test_mismatched_lengths(self):
+        with pytest.raises(ValueError, match="lunghezze"):
+            align_prices({"A": (days("2024-01-02"), np.array([1.0, 2.0]))})
+
+    def test_no_common_dates(self):
+        with pytest.raises(ValueError, match="comune"):
+            align_prices({
+                "A": (days("2024-01-02"), np.array([1.0])),
+                "B": (days("2024-01-03"), np.array([2.0])),
+            })
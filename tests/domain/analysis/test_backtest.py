@@ -0,0 +1,122 @@
+import pytest
+import numpy as np
+from src.domain.analysis.backtest import RebalancePolicy, backtest, calendar_schedule
+
+
+@pytest.fixture
+def market():
+    rng = np.random.default_rng(3)
+    dates = np.arange("2020-01-01", 800, dtype="datetime64[D]")
+    prices = 100 * np.cumprod(1 + rng.normal([0.001, 0.0, -0.0005], 0.01, size=(800, 3)), axis=0)
+    return dates, prices, np.array([0.5, 0.3, 0.2])
+
+
+def reference(prices, weights, rebalance_days, cost=0.0):
+    """Simulazione giorno per giorno di una sola politica, senza vettorizzazione"""
+    holdings = weights.copy()
+    values = [1.0]
+    for t in range(1, len(prices)):
+        holdings = holdings * prices[t] / prices[t - 1]
+        value = holdings.sum()
+        if rebalance_days[t]:
+            value -= np.abs(value * weights - holdings).sum() * cost
+            holdings = value * weights
+        values.append(value)
+    return np.array(values)
+
+
+class TestRebalancePolicy:
+
+    def test_parse(self):
+        assert RebalancePolicy.parse("none") == RebalancePolicy("none")
+        assert RebalancePolicy.parse("quarterly").frequency == "quarterly"
+        assert RebalancePolicy.parse("band:5%").band == pytest.approx(0.05)
+        assert RebalancePolicy.parse("band:0.1").band == pytest.approx(0.1)
+        combined = RebalancePolicy.parse("annual+band:10%")
+        assert (combined.frequency, combined.band) == ("annual", pytest.approx(0.1))
+
+    @pytest.mark.parametrize("spec", ["weekly", "band:x", "band:-1%"])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            RebalancePolicy.parse(spec)
+
+    def test_calendar_schedule(self):
+        dates = np.array(["2024-01-30", "2024-01-31", "2024-02-01", "2024-03-29", "2024-04-01"], dtype="datetime64[D]")
+        schedule = calendar_schedule(dates, [RebalancePolicy.parse(s) for s in ("none", "monthly", "quarterly")])
+
+        assert schedule[:, 0].tolist() == [False] * 5
+        assert schedule[:, 1].tolist() == [False, False, True, True, True]
+        assert schedule[:, 2].tolist() == [False, False, False, False, True]
+
+
+class TestBacktest:
+
+    def test_buy_and_hold(self, market):
+        dates, prices, weights = market
+        result = backtest(prices, weights, dates, ["none"], initial_value=1000.0)
+
+        expected = 1000.0 * (prices / prices[0]) @ weights
+        assert np.allclose(result.equity[:, 0], expected)
+        assert result.rebalances[0] == 0
+        assert result.turnover[0] == 0.0
+
+    def test_calendar_matches_reference(self, market):
+        dates, prices, weights = market
+        result = backtest(prices, weights, dates, ["monthly", "quarterly"], transaction_cost=0.002)
+
+        months = dates.astype("datetime64[M]").astype(int)
+        monthly = np.r_[False, months[1:] != months[:-1]]
+        quarterly = np.r_[False, months[1:] // 3 != months[:-1] // 3]
+        assert np.allclose(result.equity[:, 0], reference(prices, weights, monthly, 0.002))
+        assert np.allclose(result.equity[:, 1], reference(prices, weights, quarterly, 0.002))
+        assert result.rebalances.tolist() == [monthly.sum(), quarterly.sum()]
+
+    def test_band_rebalances_only_on_drift(self, market):
+        dates, prices, weights = market
+        result = backtest(prices, weights, dates, ["band:2%", "band:50%"])
+
+        assert result.rebalances[0] > 0
+        assert result.rebalances[1] == 0
+        assert np.allclose(result.equity[:, 1], (prices / prices[0]) @ weights)
+        # Dopo l'ultimo ribilanciamento i pesi restano entro la banda (salvo l'ultimo giorno)
+        assert np.abs(result.final_weights[0] - weights).max() < 0.02 + 0.01
+
+    def test_policies_are_independent(self, market):
+        """Simularne molte insieme dà gli stessi risultati che simularle una alla volta"""
+        dates, prices, weights = market
+        specs = ["none", "monthly", "quarterly", "annual", "band:3%", "quarterly+band:10%"]
+        together = backtest(prices, weights, dates, specs, transaction_cost=0.001)
+
+        for j, spec in enumerate(specs):
+            alone = backtest(prices, weights, dates, [spec], transaction_cost=0.001)
+            assert np.allclose(together.equity[:, j], alone.equity[:, 0])
+            assert together.turnover[j] == pytest.approx(alone.turnover[0])
+
+    def test_costs_reduce_equity(self, market):
+        dates, prices, weights = market
+        free = backtest(prices, weights, dates, ["monthly"])
+        paid = backtest(prices, weights, dates, ["monthly"], transaction_cost=0.01)
+
+        assert paid.equity[-1, 0] < free.equity[-1, 0]
+        assert paid.costs[0] > 0 and free.costs[0] == 0
+        assert paid.turnover[0] == pytest.approx(free.turnover[0], rel=0.05)
+
+    def test_metrics(self, market):
+        dates, prices, weights = market
+        result = backtest(prices, weights, dates, ["none", "monthly"])
+
+        assert result.total_return == pytest.approx(result.equity[-1] / result.equity[0] - 1)
+        assert np.all(result.max_drawdown <= 0)
+        assert np.all(result.volatility > 0)
+        assert result.final_weights.sum(axis=1) == pytest.approx([1.0, 1.0])
+
+    def test_validation(self, market):
+        dates, prices, weights = market
+        with pytest.raises(ValueError):
+            backtest(prices, weights[:2], dates)
+        with pytest.raises(ValueError):
+            backtest(prices, weights, dates[:-1])
+        with pytest.raises(ValueError):
+            backtest(prices, weights, dates, [])
+        with pytest.raises(ValueError):
+            backtest(prices, weights, dates, transaction_cost=-0.1)
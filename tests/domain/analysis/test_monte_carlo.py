@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+from src.domain.analysis.monte_carlo import simulate_portfolio
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(21)
+    cov = np.array([[1.0, 0.6], [0.6, 1.0]]) * 0.01 ** 2
+    return rng.multivariate_normal([0.0004, 0.0002], cov, size=750)
+
+
+class TestSimulatePortfolio:
+
+    @pytest.mark.parametrize("mode", ["bootstrap", "gbm"])
+    def test_bands_are_ordered(self, returns, mode):
+        result = simulate_portfolio(returns, [0.6, 0.4], horizon_days=252, n_paths=4_000,
+                                    mode=mode, chunk_size=1_000, seed=1)
+
+        assert result.bands.shape == (5, 12)
+        assert np.all(np.diff(result.bands, axis=0) >= 0)
+        assert result.checkpoints[-1] == 252
+        assert 0.0 <= result.probability_of_loss <= 1.0
+
+    def test_reproducible_regardless_of_workers(self, returns):
+        """Stesso seme → stessi risultati con 1 o più processi"""
+        options = dict(horizon_days=126, n_paths=3_000, chunk_size=1_000, seed=7)
+        single = simulate_portfolio(returns, [0.5, 0.5], workers=1, **options)
+        multi = simulate_portfolio(returns, [0.5, 0.5], workers=2, **options)
+
+        assert np.array_equal(single.bands, multi.bands)
+        assert single.probability_of_loss == multi.probability_of_loss
+
+    def test_chunk_boundaries_do_not_drop_paths(self, returns):
+        result = simulate_portfolio(returns, [0.5, 0.5], horizon_days=10, n_paths=2_500,
+                                    chunk_size=1_000, seed=3)
+        assert result.n_paths == 2_500
+
+    def test_gbm_median_matches_drift(self, returns):
+        """La mediana GBM segue la crescita logaritmica media"""
+        weights = np.array([0.6, 0.4])
+        result = simulate_portfolio(returns, weights, horizon_days=252, n_paths=20_000,
+                                    mode="gbm", seed=2)
+        log_drift = np.log1p(returns @ weights).mean() * 252
+        assert result.bands[2, -1] == pytest.approx(np.exp(log_drift), rel=0.02)
+
+    def test_deterministic_loss(self):
+        """Rendimenti sempre negativi → perdita certa"""
+        returns = np.full((50, 1), -0.001)
+        result = simulate_portfolio(returns, [1.0], horizon_days=20, n_paths=100, seed=0)
+        assert result.probability_of_loss == 1.0
+        assert result.expected_value == pytest.approx(0.999 ** 20)
+
+    def test_invalid_mode(self, returns):
+        with pytest.raises(ValueError):
+            simulate_portfolio(returns, [0.5, 0.5], mode="quantum")
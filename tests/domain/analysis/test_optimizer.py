@@ -0,0 +1,87 @@
+import time
+import pytest
+import numpy as np
+from src.domain.analysis.optimizer import (
+    efficient_frontier, evaluate_portfolios, project_capped_simplex,
+)
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(8)
+    cov = np.array([
+        [1.0, 0.3, 0.1],
+        [0.3, 2.0, 0.4],
+        [0.1, 0.4, 3.0],
+    ]) * 0.01 ** 2
+    return rng.multivariate_normal([0.0002, 0.0005, 0.0008], cov, size=1000)
+
+
+class TestProjection:
+
+    def test_rows_sum_to_one_within_bounds(self):
+        values = np.random.default_rng(0).normal(size=(10, 5))
+        lower, upper = np.zeros(5), np.full(5, 0.4)
+        projected = project_capped_simplex(values, lower, upper)
+
+        assert np.allclose(projected.sum(axis=1), 1.0)
+        assert (projected >= -1e-12).all() and (projected <= 0.4 + 1e-12).all()
+
+
+class TestEfficientFrontier:
+
+    def test_min_variance_two_assets(self, returns):
+        """Con due asset la varianza minima ha soluzione in forma chiusa"""
+        two = returns[:, :2]
+        cov = np.cov(two, rowvar=False)
+        expected = (cov[1, 1] - cov[0, 1]) / (cov[0, 0] + cov[1, 1] - 2 * cov[0, 1])
+
+        frontier = efficient_frontier(two, ["A", "B"])
+        assert frontier.min_variance.weights[0] == pytest.approx(expected, abs=1e-4)
+
+    def test_max_sharpe_beats_grid_search(self, returns):
+        """Nessun portafoglio di una griglia fitta ha Sharpe migliore"""
+        frontier = efficient_frontier(returns, ["A", "B", "C"], risk_free_rate=0.0)
+
+        grid = np.array([(a, b, 1 - a - b) for a in np.linspace(0, 1, 101)
+                         for b in np.linspace(0, 1, 101) if a + b <= 1 + 1e-12])
+        mean = returns.mean(axis=0) * 252
+        cov = np.cov(returns, rowvar=False) * 252
+        grid_returns, grid_vols = evaluate_portfolios(grid, mean, cov)
+
+        assert frontier.max_sharpe.sharpe_ratio >= (grid_returns / grid_vols).max() - 1e-4
+
+    def test_frontier_is_sorted_and_efficient(self, returns):
+        frontier = efficient_frontier(returns, ["A", "B", "C"], n_points=20)
+
+        assert np.all(np.diff(frontier.volatilities) >= -1e-9)
+        assert frontier.volatilities[0] == pytest.approx(frontier.min_variance.volatility)
+        assert np.allclose(frontier.weights.sum(axis=1), 1.0)
+
+    def test_per_asset_bounds(self, returns):
+        bounds = {"C": (0.0, 0.2), "A": (0.1, 1.0)}
+        frontier = efficient_frontier(returns, ["A", "B", "C"], bounds=bounds)
+
+        assert (frontier.weights[:, 2] <= 0.2 + 1e-9).all()
+        assert (frontier.weights[:, 0] >= 0.1 - 1e-9).all()
+
+    def test_short_selling_allowed(self, returns):
+        frontier = efficient_frontier(returns, ["A", "B", "C"], long_only=False)
+        assert (frontier.weights >= -1.0 - 1e-9).all()
+        assert frontier.weights.min() < 0
+
+    def test_infeasible_bounds(self, returns):
+        with pytest.raises(ValueError):
+            efficient_frontier(returns, ["A", "B", "C"], bounds={t: (0.0, 0.2) for t in "ABC"})
+
+    def test_large_universe_in_seconds(self):
+        rng = np.random.default_rng(3)
+        factors = rng.normal(0, 0.01, size=(756, 5))
+        returns = factors @ rng.normal(0, 1, size=(5, 200)) * 0.3 + rng.normal(0.0003, 0.01, size=(756, 200))
+
+        start = time.perf_counter()
+        frontier = efficient_frontier(returns, [str(i) for i in range(200)])
+        elapsed = time.perf_counter() - start
+
+        assert frontier.weights.shape == (50, 200)
+        assert elapsed < 5.0
@@ -0,0 +1,75 @@
+import time
+import pytest
+import numpy as np
+from src.domain.analysis.risk_engine import aligned_price_matrix, compute_portfolio_risk
+from src.domain.analysis.portfolio_analyzer import PortfolioAnalyzer
+from src.domain.metrics.correlation import covariance, pearson_correlation
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(0)
+    return rng.normal(0.0005, 0.01, size=(500, 4))
+
+
+class TestComputePortfolioRisk:
+
+    def test_matrices_match_pairwise_functions(self, returns):
+        risk = compute_portfolio_risk(returns, np.full(4, 0.25), ["A", "B", "C", "D"])
+
+        x, y = returns[:, 0].tolist(), returns[:, 2].tolist()
+        assert risk.covariance[0, 2] == pytest.approx(covariance(x, y) * 252, rel=1e-10)
+        assert risk.correlation[0, 2] == pytest.approx(pearson_correlation(x, y), rel=1e-10)
+        assert np.allclose(np.diag(risk.correlation), 1.0)
+
+    def test_volatility_formula(self, returns):
+        weights = np.array([0.4, 0.3, 0.2, 0.1])
+        risk = compute_portfolio_risk(returns, weights, ["A", "B", "C", "D"])
+
+        expected = np.std(returns @ weights, ddof=1) * np.sqrt(252)
+        assert risk.volatility == pytest.approx(expected, rel=1e-10)
+
+    def test_diversification_lowers_risk(self, returns):
+        """Asset indipendenti: volatilità minore della media pesata"""
+        weights = np.full(4, 0.25)
+        risk = compute_portfolio_risk(returns, weights, ["A", "B", "C", "D"])
+
+        weighted_sum = float(weights @ (np.std(returns, axis=0, ddof=1) * np.sqrt(252)))
+        assert risk.volatility < weighted_sum
+
+    def test_mismatched_weights(self, returns):
+        with pytest.raises(ValueError):
+            compute_portfolio_risk(returns, [0.5, 0.5], ["A", "B"])
+
+    def test_large_universe_is_fast(self):
+        """1.000 asset × 5 anni in ben meno di un secondo"""
+        returns = np.random.default_rng(1).normal(0, 0.01, size=(1260, 1000))
+        weights = np.full(1000, 1 / 1000)
+
+        start = time.perf_counter()
+        risk = compute_portfolio_risk(returns, weights, [str(i) for i in range(1000)])
+        elapsed = time.perf_counter() - start
+
+        assert risk.covariance.shape == (1000, 1000)
+        assert elapsed < 1.0
+
+
+class TestAlignedPriceMatrix:
+
+    def test_aligns_on_tail(self):
+        matrix = aligned_price_matrix({"A": [1.0, 2.0, 3.0, 4.0], "B": [10.0, 20.0]}, ["A", "B"])
+        assert matrix.tolist() == [[3.0, 10.0], [4.0, 20.0]]
+
+
+class TestAnalyzePortfolio:
+
+    def test_perfectly_correlated_assets(self):
+        """Con correlazione +1 la volatilità è la media pesata"""
+        base = 100 * np.cumprod(1 + np.random.default_rng(3).normal(0, 0.01, 300))
+        analyzer = PortfolioAnalyzer()
+        result = analyzer.analyze_portfolio({"A": base, "B": base * 2}, {"A": 0.5, "B": 0.5}, 1.0)
+
+        portfolio = result["portfolio"]
+        assert portfolio["volatility"] == pytest.approx(result["assets"]["A"].volatility, rel=1e-10)
+        assert portfolio["risk"].tickers == ["A", "B"]
+        assert portfolio["risk"].correlation[0, 1] == pytest.approx(1.0)
@@ -0,0 +1,139 @@
+import pytest
+import numpy as np
+from src.domain.metrics import vectorized
+from src.domain.analysis.universe_correlation import (
+    blocked_correlation_matrix,
+    hierarchical_order,
+    standardize,
+    top_correlated_pairs,
+)
+
+
+@pytest.fixture
+def universe():
+    """Tre gruppi di asset guidati da fattori comuni, più rumore idiosincratico"""
+    rng = np.random.default_rng(11)
+    factors = rng.normal(0, 0.01, size=(500, 3))
+    groups = np.repeat([0, 1, 2], [7, 5, 8])
+    rng.shuffle(groups)
+    returns = factors[:, groups] + rng.normal(0, 0.004, size=(500, len(groups)))
+    tickers = [f"T{i}" for i in range(len(groups))]
+    return returns, tickers, groups
+
+
+def naive_average_linkage(distances):
+    """Average linkage ingenuo O(N³): fusioni (distanza, dimensione) in ordine"""
+    clusters = {i: [i] for i in range(len(distances))}
+    merges = []
+    while len(clusters) > 1:
+        keys = list(clusters)
+        best = min(
+            ((distances[np.ix_(clusters[a], clusters[b])].mean(), a, b)
+             for i, a in enumerate(keys) for b in keys[i + 1:]),
+            key=lambda x: x[0],
+        )
+        distance, a, b = best
+        clusters[a] = clusters[a] + clusters.pop(b)
+        merges.append((distance, len(clusters[a])))
+    return merges
+
+
+class TestBlockedCorrelation:
+
+    @pytest.mark.parametrize("block_size", [1, 7, 512])
+    def test_matches_full_matrix(self, universe, block_size):
+        returns, _, _ = universe
+        blocked = blocked_correlation_matrix(returns, block_size=block_size)
+        assert np.allclose(blocked, vectorized.correlation_matrix(returns))
+
+    def test_float32(self, universe):
+        returns, _, _ = universe
+        blocked = blocked_correlation_matrix(returns, dtype=np.float32)
+        assert blocked.dtype == np.float32
+        assert np.allclose(blocked, vectorized.correlation_matrix(returns), atol=1e-5)
+
+    def test_writes_into_destination(self, universe, tmp_path):
+        returns, _, _ = universe
+        n = returns.shape[1]
+        out = np.lib.format.open_memmap(tmp_path / "corr.npy", mode="w+", dtype=np.float64, shape=(n, n))
+        assert blocked_correlation_matrix(returns, block_size=4, out=out) is out
+        assert np.allclose(np.load(tmp_path / "corr.npy"), vectorized.correlation_matrix(returns))
+
+    def test_constant_series(self):
+        returns = np.column_stack([np.linspace(0, 1, 10), np.zeros(10), np.sin(np.arange(10))])
+        corr = blocked_correlation_matrix(returns)
+        assert np.isnan(corr[1]).all() and np.isnan(corr[:, 1]).all()
+        assert corr[0, 0] == pytest.approx(1.0)
+
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            standardize(np.ones((1, 3)))
+        with pytest.raises(ValueError):
+            blocked_correlation_matrix(np.ones((10, 3)), out=np.empty((2, 2)))
+
+
+class TestTopCorrelatedPairs:
+
+    @pytest.mark.parametrize("block_size", [3, 512])
+    def test_matches_brute_force(self, universe, block_size):
+        returns, tickers, _ = universe
+        pairs = top_correlated_pairs(returns, tickers, k=4, block_size=block_size)
+
+        corr = vectorized.correlation_matrix(returns)
+        np.fill_diagonal(corr, np.nan)
+        for i in range(len(tickers)):
+            row = np.where(np.isnan(corr[i]), -np.inf, corr[i])
+            assert pairs.most[i].tolist() == np.argsort(-row, kind="stable")[:4].tolist()
+            row = np.where(np.isnan(corr[i]), np.inf, corr[i])
+            assert pairs.least[i].tolist() == np.argsort(row, kind="stable")[:4].tolist()
+        assert np.allclose(pairs.most_values, np.take_along_axis(corr, pairs.most, axis=1))
+
+    def test_most_correlated_share_group(self, universe):
+        returns, tickers, groups = universe
+        pairs = top_correlated_pairs(returns, tickers, k=3, dtype=np.float32)
+
+        assert np.all(groups[pairs.most] == groups[:, None])
+        assert np.all(groups[pairs.least] != groups[:, None])
+        best = pairs.most_correlated("T0")
+        assert len(best) == 3 and best[0][1] >= best[-1][1]
+
+    def test_k_capped_and_self_excluded(self, universe):
+        returns, tickers, _ = universe
+        pairs = top_correlated_pairs(returns[:, :3], tickers[:3], k=10)
+        assert pairs.most.shape == (3, 2)
+        assert all(i not in row for i, row in enumerate(pairs.most.tolist()))
+
+    def test_validation(self, universe):
+        returns, tickers, _ = universe
+        with pytest.raises(ValueError):
+            top_correlated_pairs(returns, tickers[:-1])
+        with pytest.raises(ValueError):
+            top_correlated_pairs(returns[:, :1], tickers[:1])
+
+
+class TestHierarchicalOrder:
+
+    def test_groups_are_contiguous(self, universe):
+        returns, tickers, groups = universe
+        result = hierarchical_order(returns, tickers, block_size=6)
+
+        assert sorted(result.order.tolist()) == list(range(len(tickers)))
+        ordered = groups[result.order]
+        assert (ordered[1:] != ordered[:-1]).sum() == 2
+        assert result.ordered_tickers[0] == tickers[result.order[0]]
+
+    def test_linkage_matches_naive(self, universe):
+        returns, tickers, _ = universe
+        result = hierarchical_order(returns[:, :12], tickers[:12])
+
+        corr = vectorized.correlation_matrix(returns[:, :12])
+        expected = naive_average_linkage(np.sqrt(0.5 * (1 - corr)))
+        assert np.allclose(result.linkage[:, 2], [d for d, _ in expected])
+        assert result.linkage[:, 3].tolist() == [s for _, s in expected]
+        assert result.linkage[-1, 3] == 12
+        assert np.all(np.diff(result.linkage[:, 2]) >= 0)
+
+    def test_single_asset(self):
+        result = hierarchical_order(np.arange(10.0)[:, None], ["A"])
+        assert result.order.tolist() == [0]
+        assert result.linkage.shape == (0, 4)
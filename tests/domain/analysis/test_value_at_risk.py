@@ -0,0 +1,103 @@
+import pytest
+import numpy as np
+from statistics import NormalDist
+from src.domain.analysis.value_at_risk import horizon_returns, tail_risk, value_at_risk
+from src.domain.analysis.portfolio_analyzer import PortfolioAnalyzer
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(5)
+    cov = np.array([[1.0, 0.6, 0.1], [0.6, 1.0, 0.2], [0.1, 0.2, 1.0]]) * 1e-4
+    return rng.multivariate_normal([0.0004, 0.0002, 0.0], cov, size=5_000)
+
+
+WEIGHTS = np.array([0.5, 0.3, 0.2])
+TICKERS = ["A", "B", "C"]
+
+
+class TestTailRisk:
+
+    def test_matches_quantile_and_tail_mean(self):
+        losses = np.random.default_rng(0).standard_t(4, size=(1_001, 3))
+        var, cvar = tail_risk(losses, [0.9, 0.95, 0.99])
+
+        for c, level in enumerate([0.9, 0.95, 0.99]):
+            expected = np.quantile(losses, level, axis=0, method="inverted_cdf")
+            assert np.allclose(var[c], expected)
+            for j in range(3):
+                assert cvar[c, j] == pytest.approx(losses[losses[:, j] >= expected[j], j].mean())
+        assert np.all(cvar >= var)
+
+    def test_horizon_returns_compound(self):
+        daily = np.array([[0.1], [-0.1], [0.2]])
+        assert np.allclose(horizon_returns(daily, 2)[:, 0], [1.1 * 0.9 - 1, 0.9 * 1.2 - 1])
+        assert horizon_returns(daily, 1) is daily
+
+
+class TestValueAtRisk:
+
+    def test_historical_portfolio_column(self, returns):
+        result = value_at_risk(returns, WEIGHTS, TICKERS, confidences=(0.95,), horizons=(1,))
+
+        portfolio_losses = -(returns @ WEIGHTS)
+        assert result.portfolio(0.95)[0] == pytest.approx(np.quantile(portfolio_losses, 0.95, method="inverted_cdf"))
+        assert result.asset("A", 0.95)[0] == pytest.approx(np.quantile(-returns[:, 0], 0.95, method="inverted_cdf"))
+
+    def test_shapes_and_ordering(self, returns):
+        result = value_at_risk(returns, WEIGHTS, TICKERS, confidences=(0.95, 0.99), horizons=(1, 10))
+
+        assert result.var.shape == result.cvar.shape == (2, 2, 3)
+        assert result.portfolio_var.shape == (2, 2)
+        assert np.all(result.var[1] > result.var[0])
+        assert np.all(result.var[:, 1] > result.var[:, 0])
+        assert np.all(result.cvar >= result.var)
+
+    def test_parametric_closed_form(self, returns):
+        result = value_at_risk(returns, WEIGHTS, TICKERS, confidences=(0.99,), horizons=(1, 10), method="parametric")
+
+        portfolio = returns @ WEIGHTS
+        z = NormalDist().inv_cdf(0.99)
+        mu, sigma = portfolio.mean(), portfolio.std(ddof=1)
+        assert result.portfolio(0.99, 10)[0] == pytest.approx(z * np.sqrt(10) * sigma - 10 * mu)
+        assert result.portfolio(0.99)[1] == pytest.approx(sigma * NormalDist().pdf(z) / 0.01 - mu)
+
+    def test_methods_agree_on_normal_data(self, returns):
+        results = {
+            method: value_at_risk(returns, WEIGHTS, TICKERS, method=method, seed=1)
+            for method in ("historical", "parametric", "monte_carlo")
+        }
+        reference = results["parametric"]
+        for method in ("historical", "monte_carlo"):
+            assert np.allclose(results[method].var[0, 0], reference.var[0, 0], rtol=0.1)
+            assert np.allclose(results[method].portfolio_var[0], reference.portfolio_var[0], rtol=0.15)
+
+    def test_monte_carlo_reproducible(self, returns):
+        first = value_at_risk(returns, WEIGHTS, TICKERS, method="monte_carlo", seed=7, n_paths=2_000)
+        second = value_at_risk(returns, WEIGHTS, TICKERS, method="monte_carlo", seed=7, n_paths=2_000)
+        assert np.array_equal(first.var, second.var)
+
+    def test_historical_horizon_longer_than_history(self, returns):
+        result = value_at_risk(returns[:5], WEIGHTS, TICKERS, horizons=(1, 10))
+        assert np.isfinite(result.var[:, 0]).all()
+        assert np.isnan(result.var[:, 1]).all()
+
+    @pytest.mark.parametrize("options", [
+        {"method": "garch"}, {"confidences": (1.5,)}, {"horizons": (0,)}, {"confidences": ()},
+    ])
+    def test_validation(self, returns, options):
+        with pytest.raises(ValueError):
+            value_at_risk(returns, WEIGHTS, TICKERS, **options)
+
+    def test_in_portfolio_analysis(self, returns):
+        prices = 100 * np.cumprod(1 + returns, axis=0)
+        analyzer = PortfolioAnalyzer(var_method="parametric", var_confidences=(0.99,))
+        result = analyzer.analyze_portfolio(
+            {t: prices[:, i] for i, t in enumerate(TICKERS)}, dict(zip(TICKERS, WEIGHTS)), years=20.0
+        )
+
+        var = result["portfolio"]["value_at_risk"]
+        assert var.method == "parametric"
+        assert var.confidences == (0.99,)
+        with pytest.raises(ValueError):
+            PortfolioAnalyzer(var_method="garch")
@@ -0,0 +1,99 @@
+import json
+import pytest
+import numpy as np
+from src.domain.metrics.online import (
+    RunningMoments, RunningCovariance, RunningDrawdown, RunningReturn, AssetAccumulator,
+)
+from src.domain.metrics.volatility import variance
+from src.domain.metrics.correlation import covariance
+from src.domain.metrics.ratios import max_drawdown
+from src.domain.analysis.portfolio_analyzer import PortfolioAnalyzer
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(5)
+    return (100 * np.cumprod(1 + rng.normal(0.0004, 0.01, 1000))).tolist()
+
+
+class TestRunningMoments:
+
+    def test_matches_batch_variance(self):
+        values = [2.0, 4.0, 6.0, 3.5, 8.25]
+        moments = RunningMoments()
+        for value in values:
+            moments.update(value)
+
+        assert moments.mean == pytest.approx(sum(values) / len(values))
+        assert moments.variance == pytest.approx(variance(values), rel=1e-12)
+
+    def test_insufficient_values(self):
+        moments = RunningMoments()
+        moments.update(1.0)
+        with pytest.raises(ValueError):
+            moments.variance
+
+
+class TestRunningCovariance:
+
+    def test_matches_batch_covariance(self):
+        x = [1.0, 2.0, 3.0, 4.0, 5.0]
+        y = [2.0, 1.5, 6.0, 8.0, 9.5]
+        acc = RunningCovariance()
+        for xi, yi in zip(x, y):
+            acc.update(xi, yi)
+        assert acc.covariance == pytest.approx(covariance(x, y), rel=1e-12)
+
+
+class TestRunningDrawdown:
+
+    def test_matches_batch_drawdown(self):
+        prices = [100, 120, 90, 110, 85, 100]
+        acc = RunningDrawdown()
+        for price in prices:
+            acc.update(price)
+        assert acc.max_drawdown == pytest.approx(max_drawdown(prices), rel=1e-12)
+        assert acc.peak == 120
+
+
+class TestRunningReturn:
+
+    def test_total_return_and_cagr(self):
+        acc = RunningReturn()
+        for price in [1000, 1100, 1331]:
+            acc.update(price)
+        assert acc.total_return == pytest.approx(0.331)
+        assert acc.cagr(3) == pytest.approx(0.10, rel=1e-4)
+
+
+class TestAssetAccumulator:
+
+    def test_same_analysis_as_batch_path(self, prices):
+        """Dopo aggiornamenti incrementali, stessa AssetAnalysis del calcolo batch"""
+        analyzer = PortfolioAnalyzer()
+        accumulator = AssetAccumulator.from_prices(prices[:500])
+        accumulator.extend(prices[500:])
+
+        batch = analyzer.analyze_asset("AAA", prices, years=4.0)
+        online = analyzer.analyze_accumulated("AAA", accumulator, years=4.0)
+
+        assert online.total_return == pytest.approx(batch.total_return, rel=1e-10)
+        assert online.cagr == pytest.approx(batch.cagr, rel=1e-10)
+        assert online.volatility == pytest.approx(batch.volatility, rel=1e-9)
+        assert online.sharpe_ratio == pytest.approx(batch.sharpe_ratio, rel=1e-9)
+        assert online.max_drawdown == pytest.approx(batch.max_drawdown, rel=1e-12)
+
+    def test_json_roundtrip(self, prices):
+        """Lo stato si salva e si ripristina senza perdere aggiornamenti"""
+        accumulator = AssetAccumulator.from_prices(prices[:600])
+        restored = AssetAccumulator.from_dict(json.loads(json.dumps(accumulator.to_dict())))
+
+        accumulator.extend(prices[600:])
+        restored.extend(prices[600:])
+
+        assert restored.to_dict() == accumulator.to_dict()
+        assert restored.count == len(prices)
+
+    def test_non_positive_first_price(self):
+        with pytest.raises(ValueError):
+            AssetAccumulator.from_prices([0.0, 1.0])
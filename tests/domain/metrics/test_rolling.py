@@ -0,0 +1,88 @@
+import pytest
+import numpy as np
+from src.domain.metrics.rolling import (
+    rolling_mean_std, rolling_volatility, rolling_sharpe, rolling_max,
+    rolling_drawdown, compute_rolling_metrics,
+)
+from src.domain.metrics.volatility import annualized_volatility
+from src.domain.metrics.ratios import sharpe_ratio
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(11)
+    return 100 * np.cumprod(1 + rng.normal(0.0003, 0.012, 600))
+
+
+@pytest.fixture
+def returns(prices):
+    return prices[1:] / prices[:-1] - 1
+
+
+class TestRollingAgainstSlices:
+    """Ogni finestra deve coincidere con la metrica calcolata sullo slice"""
+
+    @pytest.mark.parametrize("window", [2, 30, 90, 252])
+    def test_volatility(self, returns, window):
+        result = rolling_volatility(returns, window)
+        for t in (window - 1, len(returns) // 2, len(returns) - 1):
+            expected = annualized_volatility(returns[t - window + 1:t + 1].tolist())
+            assert result[t] == pytest.approx(expected, rel=1e-8)
+        assert np.isnan(result[:window - 1]).all()
+
+    @pytest.mark.parametrize("window", [30, 90])
+    def test_sharpe(self, returns, window):
+        result = rolling_sharpe(returns, window, risk_free_rate=0.0001)
+        t = len(returns) - 7
+        expected = sharpe_ratio(returns[t - window + 1:t + 1].tolist(), 0.0001)
+        assert result[t] == pytest.approx(expected, rel=1e-8)
+
+    @pytest.mark.parametrize("window", [2, 7, 30, 599])
+    def test_max(self, prices, window):
+        result = rolling_max(prices, window)
+        expected = [prices[t - window + 1:t + 1].max() for t in range(window - 1, len(prices))]
+        assert result[window - 1:].tolist() == expected
+
+    def test_drawdown(self, prices):
+        result = rolling_drawdown(prices, 30)
+        peak = prices[100 - 29:101].max()
+        assert result[100] == pytest.approx((prices[100] - peak) / peak)
+        assert (result[29:] <= 0).all()
+
+
+class TestMatrixInput:
+
+    def test_columns_match_single_series(self, prices):
+        matrix = np.column_stack([prices, prices[::-1]])
+        mean, std = rolling_mean_std(matrix, 30)
+        _, std_single = rolling_mean_std(prices[::-1], 30)
+
+        assert std.shape == matrix.shape
+        assert np.allclose(std[29:, 1], std_single[29:])
+
+
+class TestComputeRollingMetrics:
+
+    def test_multiple_windows_aligned_to_prices(self, prices):
+        dates = np.arange("2022-01-03", len(prices), dtype="datetime64[D]")
+        result = compute_rolling_metrics(prices, windows=(30, 90, 252), dates=dates)
+
+        assert sorted(result) == [30, 90, 252]
+        for window, metrics in result.items():
+            assert len(metrics.volatility) == len(prices)
+            assert len(metrics.drawdown) == len(prices)
+            assert np.isnan(metrics.volatility[window - 1])
+            assert not np.isnan(metrics.volatility[window])
+            assert metrics.dates is dates
+
+    def test_value_matches_trailing_window(self, prices, returns):
+        metrics = compute_rolling_metrics(prices, windows=(90,))[90]
+        expected = annualized_volatility(returns[-90:].tolist())
+        assert metrics.volatility[-1] == pytest.approx(expected, rel=1e-8)
+
+    def test_too_long_window_is_skipped(self, prices):
+        assert compute_rolling_metrics(prices[:50], windows=(30, 90)).keys() == {30}
+
+    def test_invalid_window(self, returns):
+        with pytest.raises(ValueError):
+            rolling_mean_std(returns, 1)
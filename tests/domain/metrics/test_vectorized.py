@@ -0,0 +1,103 @@
+import pytest
+import math
+import numpy as np
+from src.domain.metrics import vectorized
+
+
+def _reference_returns(prices):
+    return [(prices[i] - prices[i - 1]) / prices[i - 1] for i in range(1, len(prices))]
+
+
+def _reference_variance(values):
+    mean = sum(values) / len(values)
+    return sum((x - mean) ** 2 for x in values) / (len(values) - 1)
+
+
+def _reference_covariance(x, y):
+    mean_x = sum(x) / len(x)
+    mean_y = sum(y) / len(y)
+    return sum((a - mean_x) * (b - mean_y) for a, b in zip(x, y)) / (len(x) - 1)
+
+
+def _reference_max_drawdown(prices):
+    worst = 0.0
+    peak = prices[0]
+    for price in prices:
+        peak = max(peak, price)
+        worst = min(worst, (price - peak) / peak)
+    return worst
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(42)
+    return (100 * np.cumprod(1 + rng.normal(0.0003, 0.01, 2000))).tolist()
+
+
+@pytest.fixture
+def other_prices():
+    rng = np.random.default_rng(7)
+    return (50 * np.cumprod(1 + rng.normal(0.0001, 0.015, 2000))).tolist()
+
+
+class TestParity:
+    """Il motore vettorizzato deve coincidere con l'implementazione pure-Python."""
+
+    def test_returns_series(self, prices):
+        result = vectorized.returns_series(np.array(prices))
+        assert result == pytest.approx(_reference_returns(prices), rel=1e-12)
+
+    def test_variance_and_std(self, prices):
+        returns = _reference_returns(prices)
+        expected = _reference_variance(returns)
+        assert vectorized.variance(np.array(returns)) == pytest.approx(expected, rel=1e-10)
+        assert vectorized.std_dev(np.array(returns)) == pytest.approx(math.sqrt(expected), rel=1e-10)
+
+    def test_covariance_and_correlation(self, prices, other_prices):
+        x = _reference_returns(prices)
+        y = _reference_returns(other_prices)
+        cov = _reference_covariance(x, y)
+        corr = cov / math.sqrt(_reference_variance(x) * _reference_variance(y))
+        assert vectorized.covariance(np.array(x), np.array(y)) == pytest.approx(cov, rel=1e-10)
+        assert vectorized.pearson_correlation(np.array(x), np.array(y)) == pytest.approx(corr, rel=1e-10)
+
+    def test_sharpe_ratio(self, prices):
+        returns = _reference_returns(prices)
+        mean = sum(returns) / len(returns)
+        expected = (mean - 0.0001) / math.sqrt(_reference_variance(returns))
+        assert vectorized.sharpe_ratio(np.array(returns), 0.0001) == pytest.approx(expected, rel=1e-10)
+
+    def test_max_drawdown(self, prices):
+        expected = _reference_max_drawdown(prices)
+        assert vectorized.max_drawdown(np.array(prices)) == pytest.approx(expected, rel=1e-12)
+
+
+class TestMatrixInput:
+
+    def test_columns_are_independent_series(self, prices, other_prices):
+        """Una matrice (T, N) produce una metrica per colonna"""
+        matrix = np.column_stack([prices, other_prices])
+        result = vectorized.max_drawdown(matrix)
+
+        assert result.shape == (2,)
+        assert result[0] == pytest.approx(_reference_max_drawdown(prices), rel=1e-12)
+        assert result[1] == pytest.approx(_reference_max_drawdown(other_prices), rel=1e-12)
+
+    def test_returns_matrix_shape(self, prices, other_prices):
+        matrix = np.column_stack([prices, other_prices])
+        assert vectorized.returns_series(matrix).shape == (len(prices) - 1, 2)
+
+
+class TestValidation:
+
+    def test_insufficient_prices(self):
+        with pytest.raises(ValueError):
+            vectorized.max_drawdown(np.array([100.0]))
+
+    def test_non_positive_price(self):
+        with pytest.raises(ValueError):
+            vectorized.returns_series(np.array([100.0, 0.0, 110.0]))
+
+    def test_different_shapes(self):
+        with pytest.raises(ValueError):
+            vectorized.covariance(np.array([1.0, 2.0, 3.0]), np.array([1.0, 2.0]))
@@ -0,0 +1,28 @@
+"""
+Helper condivisi dai test: serie sintetiche e un fetcher senza rete.
+"""
+import numpy as np
+from src.data.exceptions import TickerNotFoundError
+from src.data.models.price_series import PriceSeries
+
+
+def make_series(seed: int, days: int = 252) -> PriceSeries:
+    """Serie sintetica con date lavorative consecutive"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0004, 0.01, days))
+    dates = np.arange("2023-01-02", days, dtype="datetime64[D]").astype("datetime64[ns]")
+    return PriceSeries(dates=dates, open=close, high=close, low=close, close=close, volume=np.ones(days))
+
+
+class StubFetcher:
+    """Fetcher locale che non usa la rete"""
+
+    def __init__(self, series: dict[str, PriceSeries]):
+        self.series = series
+        self.calls: list[str] = []
+
+    def fetch_prices(self, ticker: str, period: str) -> PriceSeries:
+        self.calls.append(ticker)
+        if ticker not in self.series:
+            raise TickerNotFoundError(ticker)
+        return self.series[ticker]
@@ -0,0 +1,193 @@
+"""
+Test dell'API HTTP locale (server reale su una porta libera).
+"""
+import http.client
+import json
+import threading
+import pytest
+from src.application.services.analysis_service import AnalysisService
+from src.data.fetchers.coalescing_fetcher import CoalescingFetcher
+from src.presentation.api.server import AnalysisAPI, create_server, parse_portfolio, portfolio_from_query
+from tests.helpers import StubFetcher, make_series
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+class SlowStubFetcher(StubFetcher):
+    """Stub che attende un segnale prima di rispondere"""
+
+    def __init__(self, series):
+        super().__init__(series)
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def fetch_prices(self, ticker: str, period: str):
+        with self._lock:
+            self.calls.append(ticker)
+        self.release.wait(timeout=5)
+        return self.series[ticker]
+
+
+@pytest.fixture
+def stub():
+    return StubFetcher({ticker: make_series(i) for i, ticker in enumerate(TICKERS)})
+
+
+def start_server(fetcher, **kwargs):
+    service = AnalysisService(fetcher=CoalescingFetcher(fetcher))
+    server = create_server(AnalysisAPI(service, **kwargs), port=0)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def server(stub):
+    server = start_server(stub)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method: str, path: str, body=None) -> tuple[int, dict]:
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=10)
+    try:
+        data = body if isinstance(body, (bytes, type(None))) else json.dumps(body).encode()
+        connection.request(method, path, data, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def portfolio_body(tickers=TICKERS, period="max") -> dict:
+    weight = 1.0 / len(tickers)
+    return {
+        "portfolio": {"name": "Test", "assets": [{"ticker": t, "weight": weight} for t in tickers]},
+        "period": period,
+    }
+
+
+def test_parse_portfolio_defaults_and_errors():
+    portfolio = parse_portfolio({"assets": [{"ticker": "AAA", "weight": 1}]})
+
+    assert portfolio.name == "Portfolio"
+    assert portfolio.assets[0].name == "AAA"
+    assert portfolio.assets[0].weight == 1.0
+    with pytest.raises(ValueError):
+        parse_portfolio({"assets": []})
+    with pytest.raises(ValueError):
+        parse_portfolio({"assets": [{"ticker": "AAA"}]})
+
+
+def test_portfolio_from_query_equal_weights():
+    portfolio = portfolio_from_query({"tickers": ["AAA,BBB"]})
+
+    assert [a.weight for a in portfolio.assets] == [0.5, 0.5]
+    with pytest.raises(ValueError):
+        portfolio_from_query({"tickers": ["AAA,BBB"], "weights": ["1"]})
+
+
+def test_health_reports_cache_stats(server):
+    status, payload = request(server, "GET", "/health")
+
+    assert status == 200
+    assert payload["status"] == "ok"
+    assert payload["price_cache"]["entries"] == 0
+
+
+def test_post_analyze_returns_report(server, stub):
+    status, payload = request(server, "POST", "/analyze", portfolio_body())
+
+    assert status == 200
+    assert payload["portfolio_name"] == "Test"
+    assert list(payload["assets"]) == TICKERS
+    assert payload["risk"]["tickers"] == TICKERS
+    assert "covariance" not in payload["risk"]
+    assert payload["value_at_risk"]["method"] == "historical"
+    assert payload["ai_insight"] is None
+
+    # La seconda richiesta è servita dalla memoria
+    request(server, "POST", "/analyze", portfolio_body())
+    assert sorted(stub.calls) == TICKERS
+
+
+def test_get_analyze_query_form(server):
+    status, payload = request(server, "GET", "/analyze?tickers=AAA,BBB&weights=0.7,0.3&period=max")
+
+    assert status == 200
+    assert payload["risk"]["weights"] == [0.7, 0.3]
+
+
+def test_analyze_periods(server):
+    body = {"portfolio": portfolio_body()["portfolio"], "periods": ["3mo", "6mo"]}
+    status, payload = request(server, "POST", "/analyze/periods", body)
+
+    assert status == 200
+    assert list(payload["reports"]) == ["3mo", "6mo"]
+
+
+def test_include_matrices(stub):
+    server = start_server(stub, include_matrices=True)
+    try:
+        _, payload = request(server, "POST", "/analyze", portfolio_body())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(payload["risk"]["correlation"]) == len(TICKERS)
+
+
+@pytest.mark.parametrize("method, path, body, expected", [
+    ("POST", "/analyze", b"{non json", 400),
+    ("POST", "/analyze", {"portfolio": {"assets": []}}, 400),
+    ("GET", "/analyze", None, 400),
+    ("GET", "/sconosciuto", None, 404),
+    ("POST", "/health", {}, 405),
+    ("POST", "/analyze", portfolio_body(["ZZZ"]), 502),
+])
+def test_errors(server, method, path, body, expected):
+    status, payload = request(server, method, path, body)
+
+    assert status == expected
+    assert payload["error"]
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_invalid_content_length(server, length):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=10)
+    try:
+        connection.putrequest("POST", "/analyze")
+        connection.putheader("Content-Length", length)
+        connection.endheaders()
+        response = connection.getresponse()
+
+        assert response.status == 400
+        assert "Content-Length" in json.loads(response.read())["error"]
+    finally:
+        connection.close()
+
+
+def test_concurrent_requests_fetch_each_ticker_once():
+    slow = SlowStubFetcher({ticker: make_series(i) for i, ticker in enumerate(TICKERS)})
+    server = start_server(slow)
+    results = []
+    try:
+        threads = [
+            threading.Thread(target=lambda: results.append(request(server, "POST", "/analyze", portfolio_body())))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        # Le richieste si accumulano sul fetch in corso
+        fetcher = server.api.service.fetcher
+        while fetcher.stats.misses + fetcher.stats.coalesced < 10 * len(TICKERS):
+            threading.Event().wait(0.005)
+        slow.release.set()
+        for thread in threads:
+            thread.join(timeout=10)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert [status for status, _ in results] == [200] * 10
+    assert sorted(slow.calls) == TICKERS
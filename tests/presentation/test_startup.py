@@ -0,0 +1,93 @@
+"""
+Test del tempo di avvio della CLI, misurato con `python -X importtime`.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Budget per l'import della CLI (cumulativo, in secondi): prima dei lazy
+# import era ~1.6 s, ora ~0.4 s; il margine assorbe macchine lente
+STARTUP_BUDGET = 1.0
+
+HEAVY_MODULES = ("anthropic", "yfinance", "pandas", "dotenv")
+
+
+def import_times(module: str) -> dict[str, float]:
+    """
+    Importa `module` in un interprete pulito con -X importtime.
+    
+    Returns:
+        Dict {modulo: tempo cumulativo in secondi} per ogni modulo importato
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def run_python(code: str) -> str:
+    """Esegue codice in un interprete pulito e ne restituisce lo stdout."""
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return result.stdout
+
+
+def test_cli_import_skips_heavy_dependencies():
+    """Importare la CLI non carica anthropic, yfinance, pandas né dotenv"""
+    times = import_times("src.presentation.cli.main")
+    
+    loaded = [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+    assert loaded == []
+
+
+def test_cli_import_within_budget():
+    """L'import della CLI resta nel budget di avvio"""
+    times = import_times("src.presentation.cli.main")
+    
+    assert times["src.presentation.cli.main"] < STARTUP_BUDGET
+
+
+def test_no_ai_run_never_imports_anthropic():
+    """Un'analisi con --no-ai e fetcher locale non carica anthropic né yfinance"""
+    output = run_python(
+        "import sys\n"
+        "from typer.testing import CliRunner\n"
+        "from tests.helpers import StubFetcher, make_series\n"
+        "import src.presentation.cli.main as main\n"
+        "fetcher = StubFetcher({t: make_series(i) for i, t in enumerate(['IUSA.MI', 'MSE.MI', 'SWDA.MI'])})\n"
+        "main._build_fetcher = lambda *args, **kwargs: fetcher\n"
+        "result = CliRunner().invoke(main.app, ['analyze', '--no-ai'])\n"
+        "assert result.exit_code == 0, result.output\n"
+        "print(','.join(m for m in ('anthropic', 'yfinance') if m in sys.modules))\n"
+    )
+    
+    assert output.strip() == ""
+
+
+def test_store_run_never_imports_yfinance(tmp_path):
+    """Un'analisi con --store legge l'archivio locale senza caricare yfinance"""
+    output = run_python(
+        "import sys\n"
+        "from typer.testing import CliRunner\n"
+        "from tests.helpers import make_series\n"
+        "from src.data.fetchers.local_store import PriceStore\n"
+        "import src.presentation.cli.main as main\n"
+        f"store = PriceStore({str(tmp_path)!r})\n"
+        "for i, t in enumerate(['IUSA.MI', 'MSE.MI', 'SWDA.MI']):\n"
+        "    store.write(t, make_series(i, 600))\n"
+        f"result = CliRunner().invoke(main.app, ['analyze', '--no-ai', '--store', {str(tmp_path)!r}])\n"
+        "assert result.exit_code == 0, result.output\n"
+        "print(','.join(m for m in ('anthropic', 'yfinance', 'pandas') if m in sys.modules))\n"
+    )
+    
+    assert output.strip() == ""
@@ -0,0 +1,172 @@
+"""
+Test dei writer di export (Markdown, CSV, JSON, JSON Lines, HTML).
+"""
+import csv
+import io
+import json
+from dataclasses import replace
+from datetime import datetime
+import pytest
+from src.application.services.analysis_service import AIInsight, AnalysisService
+from src.data.exceptions import TickerNotFoundError
+from src.data.models.asset import Asset
+from src.data.models.portfolio import Portfolio
+from src.presentation.reports.json_report import report_to_dict
+from src.presentation.reports.writers import (
+    CsvWriter, HtmlWriter, JsonLinesWriter, JsonWriter, MarkdownWriter, PeriodsMarkdownWriter, export_report,
+    export_reports, writer_for,
+)
+from tests.helpers import StubFetcher, make_series
+
+TICKERS = ["AAA", "BBB", "C&<D>"]
+
+
+@pytest.fixture(scope="module")
+def report():
+    fetcher = StubFetcher({ticker: make_series(i, 120) for i, ticker in enumerate(TICKERS)})
+    portfolio = Portfolio(
+        name="Test <Portafoglio>",
+        assets=[Asset(ticker, ticker, "ETF", weight) for ticker, weight in zip(TICKERS, (0.5, 0.3, 0.2))],
+    )
+    # Orizzonte di 200 giorni più lungo della storia: VaR non stimabile (NaN)
+    service = AnalysisService(fetcher=fetcher, var_horizons=(1, 200))
+    report = service.analyze_portfolio(portfolio, period="max", include_ai_insight=False)
+    report.ai_insight = AIInsight(
+        summary="Sintesi", full_analysis="Analisi <completa>", generated_at=datetime(2024, 1, 2),
+        asset_comments={"AAA": "Commento"},
+    )
+    return report
+
+
+def render(writer, report) -> str:
+    handle = io.StringIO()
+    writer.write(report, handle)
+    return handle.getvalue()
+
+
+def test_writer_for_extension():
+    assert isinstance(writer_for("out/report.MD"), MarkdownWriter)
+    assert isinstance(writer_for("report.csv"), CsvWriter)
+    assert isinstance(writer_for("report.json"), JsonWriter)
+    assert isinstance(writer_for("report.ndjson"), JsonLinesWriter)
+    assert isinstance(writer_for("report.htm"), HtmlWriter)
+    with pytest.raises(ValueError):
+        writer_for("report.xlsx")
+
+
+def test_markdown_sections(report):
+    text = render(MarkdownWriter(), report)
+
+    assert text.startswith("# Report Portafoglio: Test <Portafoglio>\n")
+    assert "| AAA | " in text
+    assert "| 95% 1g | 95% 200g | 99% 1g | 99% 200g |" in text
+    assert "| - |" in text
+    assert "| **Portafoglio** |" in text
+    assert "## AI Insight\n\nAnalisi <completa>\n" in text
+    assert "### AAA\n\nCommento\n" in text
+    assert "Asset non recuperati" not in text
+
+
+def test_markdown_fetch_errors(report):
+    failed = replace(report, fetch_errors={"ZZZ": TickerNotFoundError("ZZZ")})
+
+    text = render(MarkdownWriter(), failed)
+
+    section = text.index("## Asset non recuperati\n\n- ZZZ: ")
+    assert text.index("## Value at Risk") < section < text.index("## AI Insight")
+
+
+def test_csv_rows(report):
+    rows = list(csv.DictReader(io.StringIO(render(CsvWriter(), report))))
+
+    assert [row["ticker"] for row in rows] == TICKERS + ["Test <Portafoglio>"]
+    assert [row["kind"] for row in rows] == ["asset"] * 3 + ["portfolio"]
+    assert float(rows[0]["weight"]) == pytest.approx(0.5)
+    assert float(rows[0]["total_return"]) == pytest.approx(report.assets["AAA"].total_return)
+    var, cvar = report.value_at_risk.asset("BBB", 0.99, 1)
+    assert float(rows[1]["var_99_1g"]) == pytest.approx(var)
+    assert float(rows[1]["cvar_99_1g"]) == pytest.approx(cvar)
+    assert rows[1]["var_95_200g"] == ""
+    assert float(rows[3]["var_95_1g"]) == pytest.approx(report.value_at_risk.portfolio(0.95, 1)[0])
+    assert rows[3]["sharpe_ratio"] == ""
+
+
+def test_json_matches_report_to_dict(report):
+    data = json.loads(render(JsonWriter(), report))
+
+    expected = json.loads(json.dumps(report_to_dict(report, include_matrices=False)))
+    assert data == expected
+
+
+def test_json_lines(report):
+    lines = [json.loads(line) for line in render(JsonLinesWriter(), report).splitlines()]
+
+    assert [line["type"] for line in lines] == ["portfolio", "asset", "asset", "asset"]
+    assert lines[0]["value_at_risk"]["horizons"] == [1, 200]
+    assert lines[0]["ai_insight"]["summary"] == "Sintesi"
+    assert lines[3]["ticker"] == "C&<D>"
+    assert lines[3]["weight"] == pytest.approx(0.2)
+    assert lines[1]["value_at_risk"][1] == {"confidence": 0.95, "horizon": 200, "var": None, "cvar": None}
+
+
+def test_html_is_escaped_and_self_contained(report):
+    text = render(HtmlWriter(), report)
+
+    assert text.startswith("<!DOCTYPE html>")
+    assert text.rstrip().endswith("</html>")
+    assert "<style>" in text and "<link" not in text and "<script" not in text
+    assert "Test &lt;Portafoglio&gt;" in text
+    assert "C&amp;&lt;D&gt;" in text
+    assert "Analisi &lt;completa&gt;" in text
+    assert text.count("<tr><td>") == 2 * len(TICKERS)
+
+
+def test_export_reports_writes_all_formats(report, tmp_path):
+    paths = [tmp_path / "sub" / f"report.{ext}" for ext in ("md", "csv", "json", "jsonl", "html")]
+
+    errors = export_reports([(report, path) for path in paths])
+
+    assert errors == {}
+    for path in paths:
+        assert path.read_bytes().decode("utf-8") == render(writer_for(path), report)
+
+
+def test_export_reports_collects_errors(report, tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+
+    errors = export_reports([(report, tmp_path / "ok.md"), (report, blocker / "ko.md"), (report, tmp_path / "ko.xlsx")])
+
+    assert set(errors) == {str(blocker / "ko.md"), str(tmp_path / "ko.xlsx")}
+    assert isinstance(errors[str(tmp_path / "ko.xlsx")], ValueError)
+    assert (tmp_path / "ok.md").exists()
+
+
+def test_periods_markdown_through_export_reports(tmp_path):
+    fetcher = StubFetcher({ticker: make_series(i, 120) for i, ticker in enumerate(TICKERS)})
+    portfolio = Portfolio(name="Orizzonti", assets=[Asset(ticker, ticker, "ETF", 1 / 3) for ticker in TICKERS])
+    multi = AnalysisService(fetcher=fetcher).analyze_periods(portfolio, ["1mo", "3mo"])
+    path = tmp_path / "nuova" / "periodi.md"
+
+    errors = export_reports([(multi, path, PeriodsMarkdownWriter())])
+
+    assert errors == {}
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith("# Report Portafoglio: Orizzonti\n")
+    assert "| Metrica | 1mo | 3mo |" in text
+    assert "## Sharpe per asset" in text
+    assert "## Value at Risk (1mo, historical)" in text
+    assert "## Value at Risk (3mo, historical)" in text
+
+
+def test_export_report_large_universe(tmp_path):
+    """Universo ampio: una riga per asset, senza matrici N×N"""
+    from benchmarks.synthetic import StubFetcher as UniverseFetcher, make_portfolio, make_universe
+    universe = make_universe(2_000, 30)
+    service = AnalysisService(fetcher=UniverseFetcher(universe), var_horizons=(1,))
+    report = service.analyze_portfolio(make_portfolio(list(universe)), period="max", include_ai_insight=False)
+
+    path = export_report(report, tmp_path / "large.jsonl")
+
+    with open(path, encoding="utf-8") as handle:
+        assert sum(1 for _ in handle) == 2_001
@@ -0,0 +1,80 @@
+"""
+Test per la strumentazione a span.
+"""
+import time
+from src.profiling import Profiler, active_profiler, span
+from src.data.fetchers.base import fetch_many_concurrently
+
+
+class SleepyFetcher:
+    def fetch_prices(self, ticker: str, period: str):
+        with span("rete"):
+            time.sleep(0.01)
+        return ticker
+
+
+def test_span_without_profiler_is_noop():
+    """Senza profiler attivo span() non registra nulla"""
+    with span("fetch") as node:
+        pass
+    
+    assert node is None
+    assert active_profiler() is None
+
+
+def test_nested_spans_aggregate():
+    """Span con lo stesso nome sotto lo stesso padre sono sommati"""
+    profiler = Profiler()
+    with profiler.activate():
+        for _ in range(3):
+            with span("metriche"):
+                with span("asset"):
+                    time.sleep(0.001)
+    
+    metriche = profiler.root.find("metriche")
+    assert metriche.count == 3
+    assert profiler.root.find("metriche", "asset").count == 3
+    assert profiler.root.wall >= metriche.wall >= 0.003
+    assert profiler.root.count == 1
+
+
+def test_nested_activate_is_reentrant():
+    """Riattivare lo stesso profiler non azzera lo span corrente"""
+    profiler = Profiler()
+    with profiler.activate():
+        with span("cli"):
+            with profiler.activate():
+                with span("service"):
+                    pass
+    
+    assert profiler.root.find("cli", "service") is not None
+    assert profiler.root.count == 1
+
+
+def test_thread_pool_spans_nest_under_caller():
+    """Gli span dei worker finiscono sotto lo span che ha lanciato il fetch"""
+    profiler = Profiler()
+    with profiler.activate():
+        with span("fetch"):
+            result = fetch_many_concurrently(SleepyFetcher(), ["A", "B", "C"], "1y")
+    
+    fetch = profiler.root.find("fetch")
+    assert list(fetch.children) == ["A", "B", "C"]
+    assert fetch.find("A", "rete").wall >= 0.01
+    assert set(result.latencies) == {"A", "B", "C"}
+    assert all(latency >= 0.01 for latency in result.latencies.values())
+
+
+def test_collapsed_stacks():
+    """Una riga per percorso con il tempo proprio in microsecondi"""
+    profiler = Profiler()
+    with profiler.activate():
+        with span("fetch"):
+            with span("IUSA MI"):
+                time.sleep(0.002)
+    
+    lines = profiler.collapsed_stacks()
+    paths = [line.rsplit(" ", 1)[0] for line in lines]
+    
+    assert "totale;fetch;IUSA_MI" in paths
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)